@@ -0,0 +1,392 @@
+"""
+Audit of the attribute layouts of a scene, or of many scene files.
+
+`audit_scene` reads the user-defined attributes of every object in one bulk
+pass and reports:
+
+    - separators (single-field dividers) with no attribute under them;
+    - separators whose enum fields differ from what their section expects: the
+      schema's, or else the fields most objects use for that separator;
+    - attributes whose type, range, enum fields or default differ from a
+      schema, or that are missing from (or not part of) its section;
+    - controls whose layout differs from the one most of their siblings (the
+      objects under the same parent) share, including controls missing it entirely.
+
+Objects are grouped by a fingerprint of their layout first, so every check
+runs once per distinct layout rather than once per object, and thousands of
+identical controls cost little more than one:
+
+    report = audit.audit_scene(schemas=[schema.load_schema("face_ctrl")])
+    print(report.report(verbose=True))
+    report.write_csv("audit.csv")
+
+Scene files are audited through the same loader as batch mode, inside Maya
+standalone or the `fake_maya` stand-in:
+
+    python -m crv_attrs.audit --files "rigs/**/*.ma" --fake --json audit.json --csv audit.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import sys
+from collections import Counter
+from typing import NamedTuple
+
+from crv_attrs import backends, layout, planner, profiler, schema
+
+# Finding kinds
+EMPTY_SEPARATOR = "empty_separator"
+SEPARATOR_ENUM = "separator_enum"
+SCHEMA_DRIFT = "schema_drift"
+SIBLING_DRIFT = "sibling_drift"
+
+KINDS = (EMPTY_SEPARATOR, SEPARATOR_ENUM, SCHEMA_DRIFT, SIBLING_DRIFT)
+
+_DRIFT_MESSAGES = {planner.ADD: "missing",
+                   planner.REPLACE: "type differs from the schema",
+                   planner.EDIT_RANGE: "range differs from the schema",
+                   planner.EDIT_ENUM: "enum fields differ from the schema",
+                   planner.EDIT_DEFAULT: "default differs from the schema"}
+
+
+class Finding(NamedTuple):
+    """
+    One inconsistency found on one object.
+    """
+    kind: str
+    node: str
+    attr: str
+    message: str
+    # Fingerprint of the layout of the object.
+    fingerprint: str
+    file: str = None
+
+
+def fingerprint(specs):
+    """
+    Returns a short, stable hash of a layout: identical layouts share it.
+    """
+    return hashlib.sha1(repr(tuple(specs)).encode("utf-8")).hexdigest()[:12]
+
+
+class AuditReport:
+    """
+    The findings of an audit, and the objects grouped by layout fingerprint.
+    """
+
+    def __init__(self, findings: list = None, layouts: dict = None, scanned: int = 0, files: list = None):
+        self.findings: list = findings or []
+        # fingerprint -> [objects having that layout]
+        self.layouts: dict = layouts or {}
+        self.scanned = scanned
+        # (file, error) of the scene files that could not be audited.
+        self.failed_files: list = files or []
+
+    def __iter__(self):
+        return iter(self.findings)
+
+    def __len__(self):
+        return len(self.findings)
+
+    def counts(self):
+        """
+        Returns a {kind: count} dict covering every kind.
+        """
+        counter = Counter(finding.kind for finding in self.findings)
+        return {kind: counter.get(kind, 0) for kind in KINDS}
+
+    def extend(self, other):
+        self.findings.extend(other.findings)
+        for key, nodes in other.layouts.items():
+            self.layouts.setdefault(key, []).extend(nodes)
+        self.scanned += other.scanned
+        self.failed_files.extend(other.failed_files)
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        counts = ", ".join(f"{kind}: {count}" for kind, count in self.counts().items())
+        lines = [f"{self.scanned} objects, {len(self.layouts)} layouts -> {counts}"]
+        if verbose:
+            for finding in self.findings[:limit]:
+                target = ".".join(part for part in (finding.node, finding.attr) if part)
+                where = f"{finding.file}: " if finding.file else ""
+                lines.append(f"  {finding.kind:<16} {where}{target}: {finding.message}")
+            if len(self.findings) > limit:
+                lines.append(f"  ... and {len(self.findings) - limit} more")
+        if self.failed_files:
+            lines.append(f"failed files: {len(self.failed_files)}")
+            lines.extend(f"  {path}: {error}" for path, error in self.failed_files[:limit])
+        return "\n".join(lines)
+
+    def to_dict(self):
+        return {"summary": {"objects": self.scanned, "layouts": len(self.layouts), "findings": self.counts()},
+                "findings": [finding._asdict() for finding in self.findings],
+                "layouts": {key: {"count": len(nodes), "objects": nodes} for key, nodes in self.layouts.items()},
+                "failed_files": [{"file": path, "error": error} for path, error in self.failed_files]}
+
+    def write_json(self, path: str):
+        with open(path, "w") as report_file:
+            json.dump(self.to_dict(), report_file, indent=2)
+
+    def write_csv(self, path: str):
+        with open(path, "w", newline="") as report_file:
+            writer = csv.writer(report_file)
+            writer.writerow(Finding._fields)
+            writer.writerows(self.findings)
+
+
+# -------------------------------------------------
+# ----------------- Layout Checks -----------------
+# -------------------------------------------------
+def _separator_checks(specs: tuple, expected_enums: dict):
+    """
+    Yields (kind, attr, message) for the empty and mismatched separators of a layout.
+    """
+    separators = [planner.is_separator(planner.state_from_spec(spec)) for spec in specs]
+    for index, spec in enumerate(specs):
+        if not separators[index]:
+            continue
+        # A separator with several enum fields is a switch (see enum mode), not a mere divider.
+        divider = len(backends.parse_enum_string(spec.enum_names)) == 1
+        if divider and (index + 1 == len(specs) or separators[index + 1]):
+            yield EMPTY_SEPARATOR, spec.name, "has no attributes under it"
+        expected = expected_enums.get(spec.name)
+        if expected is not None and not backends.same_enum_fields(spec.enum_names, expected):
+            yield SEPARATOR_ENUM, spec.name, f"enum {spec.enum_names!r} does not match {expected!r}"
+
+
+def _schema_checks(audit_layout: layout.AttrLayout, compiled: schema.CompiledSchema):
+    """
+    Yields (kind, attr, message) for every difference between a layout and a schema section.
+    """
+    separator = compiled.separator_spec.name
+    sections = audit_layout.sections()
+    if separator not in sections:
+        return
+    members = sections[separator]
+    states = {spec.name: planner.state_from_spec(spec) for spec in audit_layout.specs}
+    section_of = {attr: section for section, attrs in sections.items() for attr in attrs}
+
+    for spec in compiled.attr_specs:
+        state = states.get(spec.name)
+        if state is not None and spec.name not in members:
+            yield SCHEMA_DRIFT, spec.name, f"is under {section_of.get(spec.name)} instead of {separator}"
+        changes = [planner.diff_attr(audit_layout.source, spec, state)]
+        if changes[0].action not in (planner.ADD, planner.REPLACE):
+            changes.extend(planner.diff_children(audit_layout.source, spec, state))
+        for change in changes:
+            if change.action in _DRIFT_MESSAGES:
+                yield SCHEMA_DRIFT, change.attr, _DRIFT_MESSAGES[change.action]
+
+    expected = {spec.name for spec in compiled.attr_specs}
+    for attr in members:
+        if attr not in expected:
+            yield SCHEMA_DRIFT, attr, f"is not part of the {compiled.name or separator} schema"
+
+
+def describe_drift(specs: tuple, reference: tuple):
+    """
+    Returns a short text of how a layout differs from a reference layout.
+    """
+    names = [spec.name for spec in specs]
+    reference_names = [spec.name for spec in reference]
+    name_set = set(names)
+    reference_set = set(reference_names)
+    missing = [name for name in reference_names if name not in name_set]
+    extra = [name for name in names if name not in reference_set]
+    by_name = dict(zip(names, specs))
+    different = [spec.name for spec in reference if spec.name in by_name and by_name[spec.name] != spec]
+
+    parts = []
+    if missing:
+        parts.append("missing " + ", ".join(missing))
+    if extra:
+        parts.append("extra " + ", ".join(extra))
+    if different:
+        parts.append("different " + ", ".join(different))
+    if not parts:
+        parts.append("different attribute order")
+    return "; ".join(parts)
+
+
+# -------------------------------------------------
+# ----------------- Audit -------------------------
+# -------------------------------------------------
+def _expected_enums(layouts_by_key: dict, counts: dict, compiled_schemas: list):
+    """
+    Returns {separator: enum fields}: the schema's, or else those most objects use.
+    """
+    used = {}
+    for key, audit_layout in layouts_by_key.items():
+        for spec in audit_layout.specs:
+            if planner.is_separator(planner.state_from_spec(spec)):
+                used.setdefault(spec.name, Counter())[spec.enum_names] += counts[key]
+    expected = {name: counter.most_common(1)[0][0] for name, counter in used.items()}
+    # The default divider keeps the fields of existing separators (see `planner.plan_attributes`).
+    expected.update((compiled.separator_spec.name, compiled.separator_spec.enum_names)
+                    for compiled in compiled_schemas
+                    if compiled.separator_spec.enum_names != backends.SEPARATOR_ENUM)
+    return expected
+
+
+def audit_scene(objects: list = None,
+                schemas: list = (),
+                backend: backends.AttrBackend = None,
+                inventory=None,
+                siblings: bool = True,
+                file: str = None):
+    """
+    Audits the attribute layouts of the objects, from one bulk read of their attributes.
+
+    Args:
+        objects (list): Object names. Defaults to every transform of the scene.
+        schemas (list): AttrSchema (or CompiledSchema) the objects having their separator must follow.
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+        siblings (bool): Compare every control with the layout shared by its siblings.
+        file (str): The scene file, stored on the findings.
+
+    Returns:
+        AuditReport: The findings, and the objects grouped by layout.
+    """
+    backend = backend or backends.get_backend()
+    cmds = backend.cmds
+    if objects is None:
+        objects = cmds.ls(type="transform", long=True) or []
+    compiled_schemas = [item if isinstance(item, schema.CompiledSchema) else schema.compile_schema(item)
+                        for item in schemas]
+
+    with profiler.section("audit.audit_scene"):
+        layouts = layout.read_layouts(objects, backend=backend, inventory=inventory)
+
+        # Group the objects by layout; every check below runs once per distinct layout.
+        # Objects with no attributes share the empty layout, so the sibling check
+        # still sees a control missing its whole layout.
+        keys = {}
+        groups = {}
+        layouts_by_key = {}
+        for node, audit_layout in layouts.items():
+            key = keys[node] = fingerprint(audit_layout.specs)
+            groups.setdefault(key, []).append(node)
+            layouts_by_key.setdefault(key, audit_layout)
+
+        expected_enums = _expected_enums(layouts_by_key, {key: len(nodes) for key, nodes in groups.items()},
+                                         compiled_schemas)
+        findings = []
+        for key, audit_layout in layouts_by_key.items():
+            if not audit_layout.specs:
+                continue
+            issues = list(_separator_checks(audit_layout.specs, expected_enums))
+            for compiled in compiled_schemas:
+                issues.extend(_schema_checks(audit_layout, compiled))
+            findings.extend(Finding(kind, node, attr, message, key, file)
+                            for node in groups[key] for kind, attr, message in issues)
+
+        if siblings and keys:
+            findings.extend(_sibling_findings(cmds, keys, layouts_by_key, file))
+
+    return AuditReport(findings, groups, scanned=len(objects))
+
+
+def _sibling_findings(cmds, keys: dict, layouts_by_key: dict, file: str = None):
+    """
+    Reports the objects whose layout differs from the one most of their siblings share.
+    """
+    paths = backends.long_names(cmds, list(keys))
+    families = {}
+    for node in keys:
+        families.setdefault(paths.get(node, node).rpartition("|")[0], []).append(node)
+
+    findings = []
+    descriptions = {}
+    for members in families.values():
+        if len(members) < 2:
+            continue
+        counter = Counter(keys[node] for node in members)
+        reference, reference_count = counter.most_common(1)[0]
+        if not layouts_by_key[reference].specs:
+            # Mostly plain transforms (groups, geometry): the ones with attributes are not drift.
+            continue
+        for node in members:
+            key = keys[node]
+            if key == reference or counter[key] >= reference_count:
+                continue
+            if (key, reference) not in descriptions:
+                descriptions[(key, reference)] = describe_drift(layouts_by_key[key].specs,
+                                                                layouts_by_key[reference].specs)
+            findings.append(Finding(SIBLING_DRIFT, node, None,
+                                    f"differs from {reference_count} of its {len(members) - 1} siblings: "
+                                    + descriptions[(key, reference)], key, file))
+    return findings
+
+
+def audit_files(files: list,
+                object_patterns: list = ("*",),
+                schemas: list = (),
+                siblings: bool = True,
+                log=print):
+    """
+    Opens every scene file in turn and audits the transforms matching `object_patterns`.
+
+    The files are opened through `maya.cmds`: in Maya standalone, or in the
+    `fake_maya` stand-in once installed (see `main`).
+
+    Args:
+        files (list): Scene file paths.
+        object_patterns (list): `cmds.ls` patterns selecting the transforms to audit.
+        schemas (list): AttrSchema the objects having their separator must follow.
+        siblings (bool): Compare every control with the layout shared by its siblings.
+        log (callable): Receives one progress line per file.
+
+    Returns:
+        AuditReport: The findings of every file, each tagged with its file.
+    """
+    from maya import cmds
+
+    compiled_schemas = [schema.compile_schema(item) for item in schemas]
+    report = AuditReport()
+    for path in files:
+        try:
+            cmds.file(path, open=True, force=True)
+            objects = cmds.ls(*object_patterns, type="transform", long=True) or []
+            file_report = audit_scene(objects, compiled_schemas, backend=backends.get_backend(undoable=False),
+                                      siblings=siblings, file=path)
+        except Exception as error:
+            report.failed_files.append((path, f"{type(error).__name__}: {error}"))
+            if log:
+                log(f"failed  {path}  ({error})")
+            continue
+        report.extend(file_report)
+        if log:
+            log(f"{len(file_report):>7} findings  {path}")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Audit the attribute layouts of Maya scene files.")
+    parser.add_argument("--files", nargs="+", required=True, help="Scene files or glob patterns.")
+    parser.add_argument("--schema", nargs="*", default=[], help="Schema JSON files (or library names).")
+    parser.add_argument("--objects", nargs="+", default=["*"], help="ls patterns of the transforms to audit.")
+    parser.add_argument("--no-siblings", action="store_true", help="Do not compare controls with their siblings.")
+    parser.add_argument("--json", help="Write the full report to this JSON file.")
+    parser.add_argument("--csv", help="Write the findings to this CSV file.")
+    parser.add_argument("--fake", action="store_true", help="Use the fake_maya stand-in instead of Maya.")
+    args = parser.parse_args(argv)
+
+    from crv_attrs import batch
+    batch.init_worker(fake=args.fake)
+    report = audit_files(batch.expand_files(args.files),
+                         object_patterns=args.objects,
+                         schemas=[schema.load_schema(path) for path in args.schema],
+                         siblings=not args.no_siblings)
+    print(report.report())
+    if args.json:
+        report.write_json(args.json)
+    if args.csv:
+        report.write_csv(args.csv)
+
+    return 1 if report.failed_files else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,894 @@
+"""
+Execution backends for the attribute functions in `core`.
+
+A backend receives the primitive attribute edits (add, edit, delete) that an
+operation needs and decides how they reach the scene:
+
+    - `CmdsBackend` issues one `maya.cmds` call per edit, exactly like the
+      original implementation. It is kept as the fallback engine.
+    - `OpenMayaBackend` queues every edit on a single `MDGModifier` and runs
+      them all with one `doIt()` when `flush()` is called.
+
+Both backends take the Maya modules they talk to as arguments, so they can be
+driven by in-memory stand-ins outside of a Maya session.
+"""
+import os
+from typing import NamedTuple
+
+from crv_attrs import profiler
+
+SEPARATOR_ENUM = "======="
+
+# Attribute types
+NUMERIC_TYPES = ("bool", "long", "short", "byte", "float", "double")
+RANGED_TYPES = ("long", "short", "byte", "float", "double")
+# Three-child numeric compounds, and the type of their X, Y and Z children.
+VECTOR_TYPES = {"double3": "double", "float3": "float"}
+VECTOR_AXES = ("X", "Y", "Z")
+ATTRIBUTE_TYPES = ("enum", "string", "compound") + NUMERIC_TYPES + tuple(VECTOR_TYPES)
+TYPE_ALIASES = {"int": "long", "integer": "long", "vector": "double3"}
+
+UNDO_PLUGIN = "crv_attrs_undo"
+UNDO_PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), UNDO_PLUGIN + ".py")
+UNDO_COMMAND = "crvAttrsDoIt"
+
+# Modifiers waiting to be picked up by the undo plugin command.
+_pending_modifiers: list = []
+
+
+class AttrState(NamedTuple):
+    """
+    Current definition of one user-defined attribute, as read by a backend.
+    """
+    attr_type: str
+    min_val: float = None
+    max_val: float = None
+    enum_names: str = None
+    keyable: bool = True
+    channel_box: bool = False
+    locked: bool = False
+    default_val: object = None
+    soft_min: float = None
+    soft_max: float = None
+    # (name, AttrState) pairs of the children of a compound or vector attribute.
+    children: tuple = ()
+    multi: bool = False
+
+
+# -------------------------------------------------
+# ----------------- Helper Functions --------------
+# -------------------------------------------------
+def parse_enum_string(enum_names: str):
+    """
+    Splits a Maya enum string ("a:b=4:c") into (index, name) pairs.
+
+    Args:
+        enum_names (str): The enum string as passed to `addAttr -en`.
+
+    Returns:
+        list: A list of (index, name) tuples, with implicit indices resolved the
+              same way Maya does (previous index + 1). Fields whose text after the
+              last "=" is not an integer, like the "=======" separator, are kept whole.
+    """
+    fields = []
+    next_index = 0
+    for field in enum_names.split(":") if enum_names else []:
+        name, _, index = field.rpartition("=")
+        if name and index.lstrip("-").isdigit():
+            next_index = int(index)
+        else:
+            name = field
+        fields.append((next_index, name))
+        next_index += 1
+
+    return fields
+
+
+def format_enum_fields(fields: list):
+    """
+    Joins (index, name) pairs into a Maya enum string, writing an index only
+    where it is not the implicit one (previous index + 1), as `addAttr -q -en` does.
+    """
+    parts = []
+    next_index = 0
+    for index, name in fields:
+        parts.append(name if index == next_index else f"{name}={index}")
+        next_index = index + 1
+    return ":".join(parts)
+
+
+def has_explicit_indices(enum_names: str):
+    """
+    Tells whether an enum string assigns at least one index itself ("a:b=4").
+    """
+    for field in enum_names.split(":") if enum_names else []:
+        name, _, index = field.rpartition("=")
+        if name and index.lstrip("-").isdigit():
+            return True
+    return False
+
+
+def same_enum_fields(current: str, requested: str):
+    """
+    Tells whether an enum attribute already has the requested fields. Without
+    explicit indices, only the field names are requested, in any order.
+    """
+    if has_explicit_indices(requested):
+        return parse_enum_string(current) == parse_enum_string(requested)
+    return sorted(name for _, name in parse_enum_string(current)) == \
+        sorted(name for _, name in parse_enum_string(requested))
+
+
+def merge_enum_fields(current: str, requested: str):
+    """
+    Returns the enum string with the fields of `requested` where the fields
+    `current` already has keep their index, so stored values, keys and
+    connections still point to the same field.
+
+    New fields take the index after the field they follow in `requested`, or
+    the first index above every used one when it is taken. `requested` is only
+    read for its names: use explicit indices to assign them yourself.
+    """
+    kept = {name: index for index, name in parse_enum_string(current)}
+    names = [name for _, name in parse_enum_string(requested)]
+    used = {kept[name] for name in names if name in kept}
+
+    fields = []
+    previous = -1
+    for name in names:
+        index = kept.get(name)
+        if index is None:
+            index = previous + 1
+            if index in used:
+                index = max(used) + 1
+            used.add(index)
+        fields.append((index, name))
+        previous = index
+    return format_enum_fields(fields)
+
+
+def normalize_type(attr_type: str):
+    """
+    Resolves the type aliases accepted from the UI and schemas ("int", "vector").
+    """
+    return TYPE_ALIASES.get(attr_type, attr_type)
+
+
+def node_types(cmds, nodes: list):
+    """
+    Returns {node (as given): node type} from one `ls -showType` call.
+
+    `ls` drops missing nodes, and duplicates once names are resolved ("pCube1" and
+    "|pCube1"), so when its output does not line up with `nodes` each node is
+    queried on its own. Missing nodes are left out.
+    """
+    nodes = list(dict.fromkeys(nodes))
+    if not nodes:
+        return {}
+    pairs = cmds.ls(nodes, showType=True) or []
+    if len(pairs) == 2 * len(nodes):
+        return dict(zip(nodes, pairs[1::2]))
+    types = {}
+    for node in nodes:
+        pair = cmds.ls(node, showType=True) or []
+        if len(pair) == 2:
+            types[node] = pair[1]
+    return types
+
+
+def _ls_by_node(cmds, nodes: list, **flags):
+    """
+    Returns {node (as given): value} from one `ls` call whose flags give one
+    value per node.
+
+    As in `node_types`, when the output does not line up with `nodes` each
+    node is queried on its own. Missing nodes are left out.
+    """
+    nodes = list(dict.fromkeys(nodes))
+    if not nodes:
+        return {}
+    values = cmds.ls(nodes, **flags) or []
+    if len(values) == len(nodes):
+        return dict(zip(nodes, values))
+    by_node = {}
+    for node in nodes:
+        value = cmds.ls(node, **flags) or []
+        if len(value) == 1:
+            by_node[node] = value[0]
+    return by_node
+
+
+def long_names(cmds, nodes: list):
+    """
+    Returns {node (as given, name or uuid): full path}.
+    """
+    return _ls_by_node(cmds, nodes, long=True)
+
+
+def node_uuids(cmds, nodes: list):
+    """
+    Returns {node (as given): uuid}.
+    """
+    return _ls_by_node(cmds, nodes, uuid=True)
+
+
+def range_flags(min_val: float = None, max_val: float = None,
+                soft_min: float = None, soft_max: float = None):
+    """
+    Returns the `addAttr -edit` flags setting a hard and soft range, where None
+    removes the corresponding limit.
+    """
+    flags = {}
+    for value, flag, has_flag in ((min_val, "minValue", "hasMinValue"),
+                                  (max_val, "maxValue", "hasMaxValue"),
+                                  (soft_min, "softMinValue", "hasSoftMinValue"),
+                                  (soft_max, "softMaxValue", "hasSoftMaxValue")):
+        if value is None:
+            flags[has_flag] = False
+        else:
+            flags[flag] = value
+    return flags
+
+
+def mel_flags(flags: dict):
+    return " ".join(f"-{flag} {str(value).lower() if isinstance(value, bool) else value}"
+                    for flag, value in flags.items())
+
+
+def mel_string(value: str):
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _descendants(state: AttrState):
+    for child, child_state in state.children:
+        yield child
+        yield from _descendants(child_state)
+
+
+def pop_pending_modifier():
+    """
+    Returns the oldest modifier queued by `OpenMayaBackend`, used by the undo plugin.
+    """
+    return _pending_modifiers.pop(0)
+
+
+# -------------------------------------------------
+# ----------------- Backends ----------------------
+# -------------------------------------------------
+class AttrBackend:
+    """
+    Interface shared by every backend.
+
+    Edits may be executed immediately or deferred until `flush()`; callers must
+    always call `flush()` once they have queued the whole operation.
+    """
+    name = ""
+
+    def list_user_attrs(self, nodes: list):
+        """
+        Returns a dict mapping every node to its user-defined attributes, in creation order.
+        """
+        raise NotImplementedError
+
+    def query_user_attrs(self, nodes: list):
+        """
+        Returns a dict mapping every node to an ordered {attr: AttrState} dict of its
+        user-defined attributes.
+        """
+        raise NotImplementedError
+
+    def add_attr(self, node: str, attr: str, attr_type: str,
+                 min_val: float = None, max_val: float = None,
+                 enum_names: str = None, keyable: bool = True, channel_box: bool = False,
+                 default_val=None, soft_min: float = None, soft_max: float = None,
+                 children: tuple = (), multi: bool = False):
+        """
+        Adds a dynamic attribute whose nice name matches its long name.
+
+        Compound and vector attributes are added with their `children`, given as
+        specs with the same fields (`planner.AttrSpec`), in the same call.
+        """
+        raise NotImplementedError
+
+    def edit_enum(self, node: str, attr: str, enum_names: str):
+        """
+        Unlocks an existing enum attribute and replaces its fields.
+        """
+        raise NotImplementedError
+
+    def edit_range(self, node: str, attr: str, min_val: float, max_val: float,
+                   soft_min: float = None, soft_max: float = None):
+        """
+        Sets the hard and soft minimum and maximum of an existing numeric attribute.
+        A None value removes that limit.
+        """
+        raise NotImplementedError
+
+    def edit_default(self, node: str, attr: str, default_val):
+        """
+        Sets the default value of an existing attribute.
+        """
+        raise NotImplementedError
+
+    def set_channel_box(self, node: str, attr: str):
+        """
+        Makes an attribute non-keyable but displayed in the channel box.
+        """
+        raise NotImplementedError
+
+    def delete_attr(self, node: str, attr: str):
+        """
+        Deletes a dynamic attribute.
+        """
+        raise NotImplementedError
+
+    def get_values(self, plugs: list):
+        """
+        Reads the values of (node, attr, attr_type) plugs, in one pass.
+
+        Returns:
+            list: The values, in the order of `plugs`.
+        """
+        raise NotImplementedError
+
+    def set_value(self, node: str, attr: str, attr_type: str, value):
+        """
+        Sets the value of an attribute.
+        """
+        raise NotImplementedError
+
+    def set_lock(self, node: str, attr: str, locked: bool):
+        raise NotImplementedError
+
+    def set_keyable(self, node: str, attr: str, keyable: bool, channel_box: bool = False):
+        """
+        Sets whether an attribute is keyable, or else shown in the channel box.
+        """
+        raise NotImplementedError
+
+    def connect_attr(self, source: str, destination: str):
+        """
+        Connects two plugs ("node.attr"), replacing any existing input of `destination`.
+        """
+        raise NotImplementedError
+
+    def disconnect_attr(self, source: str, destination: str):
+        raise NotImplementedError
+
+    def create_node(self, node_type: str, name: str):
+        """
+        Creates a dependency node (e.g. a unitConversion) called `name`, which must be unique.
+        """
+        raise NotImplementedError
+
+    def delete_node(self, name: str):
+        """
+        Deletes a dependency node and its connections.
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """
+        Executes every edit queued since the previous flush.
+        """
+
+
+class CmdsBackend(AttrBackend):
+    """
+    Runs every edit straight away through `maya.cmds`.
+    """
+    name = "cmds"
+
+    def __init__(self, cmds=None):
+        if cmds is None:
+            from maya import cmds
+        self.cmds = cmds
+
+    # Types reported by `getAttr -type` and `attributeQuery -attributeType` that differ from `addAttr`'s.
+    _queried_types = {"TdataCompound": "compound", "typed": "string"}
+
+    def list_user_attrs(self, nodes: list):
+        # `listAttr -ud` also lists the children of compounds: keep the top-level attributes.
+        return {node: list(states) for node, states in self.query_user_attrs(nodes).items()}
+
+    def _query_attr(self, node, attr, in_multi=False):
+        plug = f"{node}.{attr}"
+        query = self.cmds.attributeQuery
+        multi = bool(query(attr, node=node, multi=True))
+        # Plugs of multi attributes (and their children) have no value without an index.
+        plugless = multi or in_multi
+        attr_type = query(attr, node=node, attributeType=True) if plugless else self.cmds.getAttr(plug, type=True)
+        attr_type = self._queried_types.get(attr_type, attr_type)
+
+        min_val = max_val = soft_min = soft_max = default_val = enum_names = None
+        children = ()
+        if attr_type == "enum":
+            enum_names = (query(attr, node=node, listEnum=True) or [""])[0]
+        elif attr_type == "compound" or attr_type in VECTOR_TYPES:
+            children = tuple((child, self._query_attr(node, child, in_multi=plugless))
+                             for child in query(attr, node=node, listChildren=True) or [])
+        elif attr_type in RANGED_TYPES:
+            if query(attr, node=node, minExists=True):
+                min_val = query(attr, node=node, minimum=True)[0]
+            if query(attr, node=node, maxExists=True):
+                max_val = query(attr, node=node, maximum=True)[0]
+            if query(attr, node=node, softMinExists=True):
+                soft_min = query(attr, node=node, softMin=True)[0]
+            if query(attr, node=node, softMaxExists=True):
+                soft_max = query(attr, node=node, softMax=True)[0]
+        if attr_type == "enum" or attr_type in NUMERIC_TYPES:
+            default_val = (query(attr, node=node, listDefault=True) or [None])[0]
+
+        if plugless:
+            keyable = bool(query(attr, node=node, keyable=True))
+            channel_box = bool(query(attr, node=node, channelBox=True))
+            locked = False
+        else:
+            keyable = self.cmds.getAttr(plug, keyable=True)
+            channel_box = self.cmds.getAttr(plug, channelBox=True)
+            locked = self.cmds.getAttr(plug, lock=True)
+
+        return AttrState(attr_type=attr_type,
+                         min_val=min_val,
+                         max_val=max_val,
+                         enum_names=enum_names,
+                         keyable=keyable,
+                         channel_box=channel_box,
+                         locked=locked,
+                         default_val=default_val,
+                         soft_min=soft_min,
+                         soft_max=soft_max,
+                         children=children,
+                         multi=multi)
+
+    def query_user_attrs(self, nodes):
+        current_states = {}
+        for node in nodes:
+            states = current_states[node] = {}
+            children = set()
+            for attr in self.cmds.listAttr(node, ud=True) or []:
+                if attr in children:
+                    continue
+                state = states[attr] = self._query_attr(node, attr)
+                children.update(_descendants(state))
+        return current_states
+
+    def _add_attr(self, node, attr, attr_type, min_val=None, max_val=None, enum_names=None,
+                  keyable=True, default_val=None, soft_min=None, soft_max=None,
+                  children=(), multi=False, parent=None):
+        flags = {"ln": attr, "nn": attr, "k": keyable, "r": True}
+        flags["dt" if attr_type == "string" else "at"] = attr_type
+        for flag, value in (("en", enum_names), ("min", min_val), ("max", max_val),
+                            ("smn", soft_min), ("smx", soft_max), ("p", parent)):
+            if value is not None:
+                flags[flag] = value
+        if default_val is not None and attr_type != "string":
+            flags["dv"] = default_val
+        if attr_type == "compound":
+            flags["nc"] = len(children)
+        if multi:
+            flags["m"] = True
+
+        self.cmds.addAttr(node, **flags)
+        # Children have to be added right after their parent.
+        for child in children:
+            self._add_attr(node, child.name, child.attr_type, min_val=child.min_val, max_val=child.max_val,
+                           enum_names=child.enum_names, keyable=keyable, default_val=child.default_val,
+                           soft_min=child.soft_min, soft_max=child.soft_max, parent=attr)
+
+    def add_attr(self, node, attr, attr_type,
+                 min_val=None, max_val=None,
+                 enum_names=None, keyable=True, channel_box=False,
+                 default_val=None, soft_min=None, soft_max=None,
+                 children=(), multi=False):
+        self._add_attr(node, attr, attr_type, min_val=min_val, max_val=max_val, enum_names=enum_names,
+                       keyable=keyable, default_val=default_val, soft_min=soft_min, soft_max=soft_max,
+                       children=children, multi=multi)
+        if channel_box and not keyable:
+            self.cmds.setAttr(f"{node}.{attr}", channelBox=True)
+        if attr_type == "string" and default_val is not None and not multi:
+            self.cmds.setAttr(f"{node}.{attr}", default_val, type="string")
+
+    def edit_enum(self, node, attr, enum_names):
+        self.cmds.setAttr(f"{node}.{attr}", lock=False)
+        self.cmds.addAttr(f"{node}.{attr}", e=True, en=enum_names)
+
+    def edit_range(self, node, attr, min_val, max_val, soft_min=None, soft_max=None):
+        self.cmds.addAttr(f"{node}.{attr}", e=True, **range_flags(min_val, max_val, soft_min, soft_max))
+
+    def edit_default(self, node, attr, default_val):
+        self.cmds.addAttr(f"{node}.{attr}", e=True, dv=default_val)
+
+    def set_channel_box(self, node, attr):
+        self.cmds.setAttr(f"{node}.{attr}", keyable=False, channelBox=True)
+
+    def delete_attr(self, node, attr):
+        self.cmds.deleteAttr(node, attribute=attr)
+
+    def get_values(self, plugs):
+        values = []
+        for node, attr, attr_type in plugs:
+            value = self.cmds.getAttr(f"{node}.{attr}")
+            # Vectors are read as [(x, y, z)].
+            values.append(tuple(value[0]) if attr_type in VECTOR_TYPES and value else value)
+        return values
+
+    def set_value(self, node, attr, attr_type, value):
+        if attr_type == "string":
+            self.cmds.setAttr(f"{node}.{attr}", value, type="string")
+        elif attr_type in VECTOR_TYPES:
+            self.cmds.setAttr(f"{node}.{attr}", *value)
+        else:
+            self.cmds.setAttr(f"{node}.{attr}", value)
+
+    def set_lock(self, node, attr, locked):
+        self.cmds.setAttr(f"{node}.{attr}", lock=locked)
+
+    def set_keyable(self, node, attr, keyable, channel_box=False):
+        self.cmds.setAttr(f"{node}.{attr}", keyable=keyable)
+        if not keyable:
+            self.cmds.setAttr(f"{node}.{attr}", channelBox=channel_box)
+
+    def connect_attr(self, source, destination):
+        self.cmds.connectAttr(source, destination, force=True)
+
+    def disconnect_attr(self, source, destination):
+        self.cmds.disconnectAttr(source, destination)
+
+    def create_node(self, node_type, name):
+        self.cmds.createNode(node_type, name=name, skipSelect=True)
+
+    def delete_node(self, name):
+        self.cmds.delete(name)
+
+
+class OpenMayaBackend(AttrBackend):
+    """
+    Queues every edit on one `MDGModifier` and executes them in a single `doIt()`.
+
+    New attributes are built with the `MFnAttribute` function sets. Edits to
+    existing attributes that the API cannot express (enum fields, ranges,
+    channel box state) are queued on the same modifier as commands, so they
+    still run inside the one `doIt()` and undo with it.
+
+    When `undoable` is set, the modifier is executed through the `crvAttrsDoIt`
+    plugin command so that it lands on Maya's undo queue.
+    """
+    name = "om2"
+
+    _numeric_types = {"float": "kFloat", "double": "kDouble", "bool": "kBoolean",
+                      "long": "kLong", "short": "kShort", "byte": "kByte"}
+    _vector_types = {"double3": "k3Double", "float3": "k3Float"}
+
+    def __init__(self, om=None, cmds=None, undoable: bool = True):
+        if om is None:
+            import maya.api.OpenMaya as om
+        if cmds is None:
+            from maya import cmds
+        self.om = om
+        self.cmds = cmds
+        self.undoable = undoable
+
+        self._modifier = om.MDGModifier()
+        self._queued = 0
+        # Nodes whose attributes this modifier adds or removes: their plugs are not final yet.
+        self._edited_nodes = set()
+        self._profiler = profiler.active_profiler()
+        self._mobjects = {}
+        self._static_attr_counts = {}
+        self._numeric_type_names = {getattr(om.MFnNumericData, data_type): attr_type
+                                    for attr_type, data_type in {**self._numeric_types,
+                                                                 **self._vector_types}.items()}
+
+    # ----------------- Queries -----------------
+    def _get_mobject(self, node: str):
+        handle = self._mobjects.get(node)
+        if handle is None or not handle.isValid():
+            selection = self.om.MSelectionList()
+            selection.add(node)
+            handle = self.om.MObjectHandle(selection.getDependNode(0))
+            self._mobjects[node] = handle
+
+        return handle.object()
+
+    def _static_attr_count(self, type_name: str):
+        # Dynamic attributes are always indexed after the static ones of the node type.
+        count = self._static_attr_counts.get(type_name)
+        if count is None:
+            count = self._static_attr_counts[type_name] = len(self.om.MNodeClass(type_name).getAttributes())
+        return count
+
+    def _iter_user_attrs(self, node):
+        node_fn = self.om.MFnDependencyNode(self._get_mobject(node))
+        for index in range(self._static_attr_count(node_fn.typeName), node_fn.attributeCount()):
+            attr_obj = node_fn.attribute(index)
+            attr_fn = self.om.MFnAttribute(attr_obj)
+            if attr_fn.dynamic and attr_fn.parent.isNull():
+                yield attr_obj, attr_fn
+
+    def list_user_attrs(self, nodes):
+        return {node: [attr_fn.name for _, attr_fn in self._iter_user_attrs(node)] for node in nodes}
+
+    def _attr_state(self, node, attr_obj, attr_fn):
+        om = self.om
+        min_val = max_val = soft_min = soft_max = default_val = enum_names = None
+        children = ()
+        if attr_obj.hasFn(om.MFn.kEnumAttribute):
+            attr_type = "enum"
+            enum_fn = om.MFnEnumAttribute(attr_obj)
+            fields = []
+            for index in range(enum_fn.getMin(), enum_fn.getMax() + 1):
+                try:
+                    fields.append(f"{enum_fn.fieldName(index)}={index}")
+                except RuntimeError:
+                    continue
+            enum_names = ":".join(fields)
+            default_val = enum_fn.default
+        elif attr_obj.hasFn(om.MFn.kNumericAttribute):
+            numeric_fn = om.MFnNumericAttribute(attr_obj)
+            attr_type = self._numeric_type_names.get(numeric_fn.numericType(), "numeric")
+            if attr_type in RANGED_TYPES:
+                min_val = numeric_fn.getMin() if numeric_fn.hasMin() else None
+                max_val = numeric_fn.getMax() if numeric_fn.hasMax() else None
+                soft_min = numeric_fn.getSoftMin() if numeric_fn.hasSoftMin() else None
+                soft_max = numeric_fn.getSoftMax() if numeric_fn.hasSoftMax() else None
+            if attr_type in NUMERIC_TYPES:
+                default_val = numeric_fn.default
+        elif attr_obj.hasFn(om.MFn.kTypedAttribute) and \
+                om.MFnTypedAttribute(attr_obj).attrType() == om.MFnData.kString:
+            attr_type = "string"
+        elif attr_obj.hasFn(om.MFn.kCompoundAttribute):
+            attr_type = "compound"
+        else:
+            attr_type = attr_obj.apiTypeStr
+
+        if attr_type == "compound" or attr_type in VECTOR_TYPES:
+            compound_fn = om.MFnCompoundAttribute(attr_obj)
+            child_objs = [compound_fn.child(index) for index in range(compound_fn.numChildren())]
+            children = tuple((om.MFnAttribute(child_obj).name,
+                              self._attr_state(node, child_obj, om.MFnAttribute(child_obj)))
+                             for child_obj in child_objs)
+
+        return AttrState(attr_type=attr_type,
+                         min_val=min_val,
+                         max_val=max_val,
+                         enum_names=enum_names,
+                         keyable=attr_fn.keyable,
+                         channel_box=attr_fn.channelBox,
+                         locked=om.MPlug(self._get_mobject(node), attr_obj).isLocked,
+                         default_val=default_val,
+                         soft_min=soft_min,
+                         soft_max=soft_max,
+                         children=children,
+                         multi=attr_fn.array)
+
+    def query_user_attrs(self, nodes):
+        return {node: {attr_fn.name: self._attr_state(node, attr_obj, attr_fn)
+                       for attr_obj, attr_fn in self._iter_user_attrs(node)}
+                for node in nodes}
+
+    # ----------------- Edits -------------------
+    def _create_attribute(self, attr, attr_type, min_val=None, max_val=None, enum_names=None,
+                          default_val=None, soft_min=None, soft_max=None, children=(), keyable=True):
+        om = self.om
+        if attr_type == "enum":
+            attr_fn = om.MFnEnumAttribute()
+            attr_obj = attr_fn.create(attr, attr, default_val or 0)
+            for index, field in parse_enum_string(enum_names):
+                attr_fn.addField(field, index)
+        elif attr_type in self._numeric_types:
+            attr_fn = om.MFnNumericAttribute()
+            data_type = getattr(om.MFnNumericData, self._numeric_types[attr_type])
+            attr_obj = attr_fn.create(attr, attr, data_type, default_val or 0)
+            for value, setter in ((min_val, attr_fn.setMin), (max_val, attr_fn.setMax),
+                                  (soft_min, attr_fn.setSoftMin), (soft_max, attr_fn.setSoftMax)):
+                if value is not None:
+                    setter(value)
+        elif attr_type == "string":
+            attr_fn = om.MFnTypedAttribute()
+            default = (om.MFnStringData().create(default_val),) if default_val is not None else ()
+            attr_obj = attr_fn.create(attr, attr, om.MFnData.kString, *default)
+        elif attr_type in self._vector_types or attr_type == "compound":
+            # The children are part of the attribute: the whole tree is added with one addAttribute.
+            child_objs = [self._create_attribute(child.name, child.attr_type, min_val=child.min_val,
+                                                 max_val=child.max_val, enum_names=child.enum_names,
+                                                 default_val=child.default_val, soft_min=child.soft_min,
+                                                 soft_max=child.soft_max, keyable=keyable)[1]
+                          for child in children]
+            if attr_type == "compound":
+                attr_fn = om.MFnCompoundAttribute()
+                attr_obj = attr_fn.create(attr, attr)
+                for child_obj in child_objs:
+                    attr_fn.addChild(child_obj)
+            else:
+                attr_fn = om.MFnNumericAttribute()
+                attr_obj = attr_fn.create(attr, attr, *child_objs)
+        else:
+            raise ValueError(f"Unsupported attribute type: {attr_type}")
+
+        attr_fn.setNiceNameOverride(attr)
+        attr_fn.keyable = keyable
+        return attr_fn, attr_obj
+
+    def _count_queued(self, operation: str, node: str, attr: str):
+        self._queued += 1
+        if self._profiler:
+            self._profiler.record(f"MDGModifier.{operation}", 0.0, node, attr)
+
+    def _queue_command(self, node: str, attr: str, command: str):
+        self._modifier.commandToExecute(command)
+        self._count_queued("commandToExecute", node, attr)
+
+    def add_attr(self, node, attr, attr_type,
+                 min_val=None, max_val=None,
+                 enum_names=None, keyable=True, channel_box=False,
+                 default_val=None, soft_min=None, soft_max=None,
+                 children=(), multi=False):
+        attr_fn, attr_obj = self._create_attribute(attr, attr_type, min_val=min_val, max_val=max_val,
+                                                   enum_names=enum_names, default_val=default_val,
+                                                   soft_min=soft_min, soft_max=soft_max,
+                                                   children=children, keyable=keyable)
+        attr_fn.channelBox = channel_box and not keyable
+        if multi:
+            attr_fn.array = True
+            attr_fn.usesArrayDataBuilder = True
+        self._modifier.addAttribute(self._get_mobject(node), attr_obj)
+        self._edited_nodes.add(node)
+        self._count_queued("addAttribute", node, attr)
+
+    def edit_enum(self, node, attr, enum_names):
+        self._queue_command(node, attr,
+                            f'setAttr -lock false "{node}.{attr}"; addAttr -e -en "{enum_names}" "{node}.{attr}"')
+
+    def edit_range(self, node, attr, min_val, max_val, soft_min=None, soft_max=None):
+        flags = mel_flags(range_flags(min_val, max_val, soft_min, soft_max))
+        self._queue_command(node, attr, f'addAttr -e {flags} "{node}.{attr}"')
+
+    def edit_default(self, node, attr, default_val):
+        self._queue_command(node, attr, f'addAttr -e {mel_flags({"defaultValue": default_val})} "{node}.{attr}"')
+
+    def set_channel_box(self, node, attr):
+        self._queue_command(node, attr, f'setAttr -keyable false -channelBox true "{node}.{attr}"')
+
+    def delete_attr(self, node, attr):
+        mobject = self._get_mobject(node)
+        self._modifier.removeAttribute(mobject, self.om.MFnDependencyNode(mobject).attribute(attr))
+        self._edited_nodes.add(node)
+        self._count_queued("removeAttribute", node, attr)
+
+    def get_values(self, plugs):
+        values = []
+        for node, attr, attr_type in plugs:
+            node_fn = self.om.MFnDependencyNode(self._get_mobject(node))
+            plug = node_fn.findPlug(attr, False)
+            if attr_type == "bool":
+                values.append(plug.asBool())
+            elif attr_type in ("enum", "long", "short", "byte"):
+                values.append(plug.asInt())
+            elif attr_type in ("float", "double"):
+                values.append(plug.asDouble())
+            elif attr_type == "string":
+                values.append(plug.asString())
+            elif attr_type in VECTOR_TYPES:
+                values.append(tuple(plug.child(index).asDouble() for index in range(len(VECTOR_AXES))))
+            else:
+                values.append(None)
+        return values
+
+    def set_value(self, node, attr, attr_type, value):
+        if attr_type == "string":
+            self._queue_command(node, attr, f'setAttr -type "string" "{node}.{attr}" {mel_string(value)}')
+            return
+        if isinstance(value, bool):
+            value = int(value)
+        values = " ".join(map(str, value)) if attr_type in VECTOR_TYPES else value
+        self._queue_command(node, attr, f'setAttr "{node}.{attr}" {values}')
+
+    def set_lock(self, node, attr, locked):
+        self._queue_command(node, attr, f'setAttr -lock {"true" if locked else "false"} "{node}.{attr}"')
+
+    def set_keyable(self, node, attr, keyable, channel_box=False):
+        flags = "-keyable true" if keyable else f'-keyable false -channelBox {"true" if channel_box else "false"}'
+        self._queue_command(node, attr, f'setAttr {flags} "{node}.{attr}"')
+
+    def _find_plug(self, plug: str):
+        selection = self.om.MSelectionList()
+        selection.add(plug)
+        return selection.getPlug(0)
+
+    def connect_attr(self, source, destination):
+        node, _, attr = destination.partition(".")
+        source_plug = destination_plug = None
+        if not {source.partition(".")[0], node} & self._edited_nodes:
+            try:
+                source_plug, destination_plug = self._find_plug(source), self._find_plug(destination)
+            except (RuntimeError, ValueError):
+                pass
+        if destination_plug is None or destination_plug.isDestination:
+            # Plugs added, removed or created in this modifier, or inputs to replace: left to the command.
+            self._queue_command(node, attr, f'connectAttr -force "{source}" "{destination}"')
+            return
+        self._modifier.connect(source_plug, destination_plug)
+        self._count_queued("connect", node, attr)
+
+    def disconnect_attr(self, source, destination):
+        node, _, attr = destination.partition(".")
+        self._queue_command(node, attr, f'disconnectAttr "{source}" "{destination}"')
+
+    def create_node(self, node_type, name):
+        self._modifier.renameNode(self._modifier.createNode(node_type), name)
+        self._count_queued("createNode", name, None)
+
+    def delete_node(self, name):
+        self._modifier.deleteNode(self._get_mobject(name))
+        self._edited_nodes.add(name)
+        self._count_queued("deleteNode", name, None)
+
+    def flush(self):
+        if not self._queued:
+            return
+
+        modifier = self._modifier
+        self._modifier = self.om.MDGModifier()
+        self._queued = 0
+        self._edited_nodes = set()
+
+        if not self.undoable:
+            with profiler.timed("MDGModifier.doIt"):
+                modifier.doIt()
+            return
+
+        if not self.cmds.pluginInfo(UNDO_PLUGIN, query=True, loaded=True):
+            self.cmds.loadPlugin(UNDO_PLUGIN_PATH, quiet=True)
+
+        _pending_modifiers.append(modifier)
+        try:
+            getattr(self.cmds, UNDO_COMMAND)()
+        finally:
+            if modifier in _pending_modifiers:
+                _pending_modifiers.remove(modifier)
+
+
+BACKENDS: dict = {CmdsBackend.name: CmdsBackend,
+                  OpenMayaBackend.name: OpenMayaBackend}
+
+
+def register_backend(backend_class):
+    """
+    Registers an `AttrBackend` subclass so `get_backend` can build it by name.
+    """
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+def get_backend(name: str = None, **kwargs):
+    """
+    Builds the backend used to run attribute operations.
+
+    Args:
+        name (str): A registered backend name. Defaults to the `CRV_ATTRS_BACKEND`
+                    environment variable, then to "om2".
+        **kwargs: Forwarded to the backend constructor (e.g. `cmds=` or `om=` stand-ins).
+                  While a `profiler.profile` session is open, the backend's `cmds`
+                  is wrapped so that every command is counted and timed.
+
+    Returns:
+        AttrBackend: The requested backend. "om2" falls back to "cmds" when
+                     `maya.api.OpenMaya` cannot be imported.
+    """
+    name = name or os.environ.get("CRV_ATTRS_BACKEND", OpenMayaBackend.name)
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown attribute backend: {name}")
+
+    try:
+        backend = BACKENDS[name](**kwargs)
+    except ImportError:
+        if name != OpenMayaBackend.name:
+            raise
+        kwargs.pop("om", None)
+        kwargs.pop("undoable", None)
+        backend = CmdsBackend(**kwargs)
+
+    # Opt-in command instrumentation, see `profiler.profile`.
+    backend.cmds = profiler.instrument(backend.cmds)
+    return backend
@@ -0,0 +1,251 @@
+"""
+Headless batch mode: apply an attribute schema to many scene files at once.
+
+Run it with `mayapy` from the folder containing `crv_attrs`:
+
+    mayapy -m crv_attrs.batch --schema face_ctrl.json --objects "*_ctrl" \\
+        --files "rigs/**/*.ma" --workers 4 --report report.json
+
+Files are spread over a pool of worker processes. Each worker initializes
+Maya standalone once, then for every scene: opens it, applies the schema (or
+deletes every user-defined attribute with `--delete-all`) on the transforms
+matching `--objects`, and saves it. Per-file timing, failures and a summary
+are written to the JSON report.
+
+With `--journal`, every change made in every scene is appended to an
+operation journal (see `journal`), with a checkpoint per saved file; after an
+interruption, `--resume` skips the files the same batch already completed.
+
+With `--fake`, the workers use the `fake_maya` stand-in instead of Maya, so
+the whole pipeline runs in a plain Python interpreter against fake scene
+files (JSON dumps of a `FakeScene`), without a Maya license.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+SCENE_EXTENSIONS = (".ma", ".mb")
+
+APPLY = "apply"
+DELETE_ALL = "delete_all"
+
+
+# -------------------------------------------------
+# ----------------- Worker ------------------------
+# -------------------------------------------------
+def init_worker(fake: bool = False):
+    """
+    Starts Maya (or the stand-in) once per worker process, with undo disabled.
+    """
+    if fake:
+        from crv_attrs import fake_maya
+        fake_maya.install()
+
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+
+    from maya import cmds
+    cmds.undoInfo(state=False)
+
+
+def process_scene(path: str,
+                  operation: str,
+                  object_patterns: list,
+                  schema_data: dict = None,
+                  save: bool = True,
+                  record: bool = False):
+    """
+    Opens one scene, runs the operation on the matching transforms and saves it.
+
+    Never raises: failures are reported in the returned dict.
+
+    Returns:
+        dict: {"file", "status", "error", "objects", "changes", "time"}, and the
+              "journal" records of the scene when `record` is set.
+    """
+    from maya import cmds
+    from crv_attrs import backends, engine, journal, schema
+
+    start = time.perf_counter()
+    result = {"file": path, "status": "ok", "error": None, "objects": 0, "changes": None}
+    # Recorded in memory: only the controller writes to the journal file.
+    log = journal.Journal()
+    try:
+        cmds.file(path, open=True, force=True)
+        objects = cmds.ls(*object_patterns, type="transform") or []
+        backend = backends.get_backend(undoable=False)
+
+        with journal.recording(log, operation, objects, file=path) if record else contextlib.nullcontext():
+            if operation == DELETE_ALL:
+                engine.delete_all_attrs(objects=objects, backend=backend)
+            else:
+                plan = schema.apply_schema(objects=objects,
+                                           schema=schema.AttrSchema.from_dict(schema_data),
+                                           backend=backend)
+                result["changes"] = plan.counts()
+
+        if save:
+            cmds.file(save=True, force=True)
+        result["objects"] = len(objects)
+
+    except Exception as error:
+        result.update({"status": "failed",
+                       "error": f"{type(error).__name__}: {error}",
+                       "traceback": traceback.format_exc()})
+
+    if record:
+        result["journal"] = log.records
+    result["time"] = time.perf_counter() - start
+    return result
+
+
+# -------------------------------------------------
+# ----------------- Controller --------------------
+# -------------------------------------------------
+def expand_files(patterns: list):
+    """
+    Expands file paths and glob patterns (recursive `**` allowed) to unique scene files.
+    """
+    files = []
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True) if glob.has_magic(pattern) else [pattern]
+        files.extend(os.path.abspath(path) for path in sorted(matches)
+                     if os.path.splitext(path)[1].lower() in SCENE_EXTENSIONS)
+
+    return list(dict.fromkeys(files))
+
+
+def run_batch(files: list,
+              operation: str = APPLY,
+              object_patterns: list = ("*",),
+              schema_data: dict = None,
+              workers: int = None,
+              fake: bool = False,
+              save: bool = True,
+              log=print,
+              journal_path: str = None,
+              resume: bool = False):
+    """
+    Processes every scene file on a pool of worker processes.
+
+    Args:
+        files (list): Scene file paths.
+        operation (str): "apply" (the schema) or "delete_all".
+        object_patterns (list): `cmds.ls` patterns selecting the transforms to edit.
+        schema_data (dict): The schema, as stored in its JSON file (needed for "apply").
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        fake (bool): Run the workers against the `fake_maya` stand-in.
+        save (bool): Save every scene after editing it.
+        log (callable): Receives one progress line per finished file.
+        journal_path (str): Append every change and a checkpoint per completed file to this journal.
+        resume (bool): Skip the files this batch already completed, according to `journal_path`.
+
+    Returns:
+        dict: The report: {"operation", "schema", "files": [...], "summary": {...}}.
+    """
+    from crv_attrs import journal
+
+    if operation == APPLY:
+        # Fail fast on an invalid schema instead of once per file.
+        from crv_attrs import schema
+        schema.compile_schema(schema.AttrSchema.from_dict(schema_data))
+
+    batch_name = " ".join(["batch", operation] + ([schema_data["name"]] if schema_data else []))
+    skipped = []
+    if resume and journal_path and os.path.exists(journal_path):
+        done = set().union(*(item.applied for item in journal.read_operations(journal_path)
+                             if item.name == batch_name))
+        skipped = [path for path in files if path in done]
+        files = [path for path in files if path not in done]
+
+    start = time.perf_counter()
+    results = []
+    batch_journal = journal.Journal(journal_path) if journal_path else None
+    if batch_journal:
+        batch_journal.begin(batch_name, files)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(fake,)) as pool:
+            futures = [pool.submit(process_scene, path, operation, list(object_patterns), schema_data, save,
+                                   bool(batch_journal))
+                       for path in files]
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                if batch_journal:
+                    batch_journal.write(result.pop("journal", []))
+                    if result["status"] == "ok" and save:
+                        batch_journal.checkpoint([result["file"]])
+                if log:
+                    log(f"{result['status']:<7} {result['time']:8.2f}s  {result['file']}"
+                        + (f"  ({result['error']})" if result["error"] else ""))
+    finally:
+        if batch_journal:
+            batch_journal.end(journal.OK if len(results) == len(files) else journal.INTERRUPTED)
+            batch_journal.close()
+
+    failed = [result for result in results if result["status"] != "ok"]
+    return {"operation": operation,
+            "schema": (schema_data or {}).get("name"),
+            "files": results,
+            "resumed": skipped,
+            "summary": {"files": len(results),
+                        "ok": len(results) - len(failed),
+                        "failed": len(failed),
+                        "objects": sum(result["objects"] for result in results),
+                        "process_time": sum(result["time"] for result in results),
+                        "wall_time": time.perf_counter() - start}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply crv_attrs schemas to many scene files.")
+    parser.add_argument("--files", nargs="+", required=True, help="Scene files or glob patterns.")
+    parser.add_argument("--schema", help="Schema JSON file (or library name) to apply.")
+    parser.add_argument("--delete-all", action="store_true",
+                        help="Delete every user-defined attribute instead of applying a schema.")
+    parser.add_argument("--objects", nargs="+", default=["*"], help="ls patterns of the transforms to edit.")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", help="Write the JSON report to this file.")
+    parser.add_argument("--no-save", action="store_true", help="Do not save the scenes (dry run).")
+    parser.add_argument("--fake", action="store_true", help="Use the fake_maya stand-in instead of Maya.")
+    parser.add_argument("--journal", help="Append every change to this operation journal.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Skip the files already completed by the same batch in --journal.")
+    args = parser.parse_args(argv)
+
+    if not args.delete_all and not args.schema:
+        parser.error("--schema is required unless --delete-all is given")
+
+    schema_data = None
+    if args.schema:
+        from crv_attrs import schema
+        schema_data = schema.load_schema(args.schema).to_dict()
+
+    files = expand_files(args.files)
+    report = run_batch(files=files,
+                       operation=DELETE_ALL if args.delete_all else APPLY,
+                       object_patterns=args.objects,
+                       schema_data=schema_data,
+                       workers=args.workers,
+                       fake=args.fake,
+                       save=not args.no_save,
+                       journal_path=args.journal,
+                       resume=args.resume)
+
+    summary = report["summary"]
+    print(f"{summary['ok']}/{summary['files']} files ok, {summary['failed']} failed, "
+          f"{summary['objects']} objects in {summary['wall_time']:.2f}s")
+    if args.report:
+        with open(args.report, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
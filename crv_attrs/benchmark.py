@@ -0,0 +1,233 @@
+"""
+Headless benchmark suite for the attribute operations.
+
+Every scenario builds a fresh `fake_maya` scene, runs one operation through a
+backend and records wall time, the number of Maya calls it issued and the
+peak Python memory it allocated. Results are saved as JSON so two runs can be
+compared to catch regressions:
+
+    python -m crv_attrs.benchmark --preset quick --output before.json
+    python -m crv_attrs.benchmark --preset quick --output after.json --baseline before.json
+"""
+import argparse
+import itertools
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from crv_attrs import backends, engine, fake_maya, wiring
+
+PATHS = ("add", "readd", "delete_all", "wire")
+# "multi" stands for float multi (array) attributes; "vector" is an alias of "double3".
+ATTRIBUTE_TYPES = ("float", "bool", "enum", "long", "string", "double3", "compound", "multi")
+BACKEND_NAMES = ("cmds", "om2")
+
+PRESETS: dict = {"quick": {"objects": [10, 1000], "attrs": [1, 10]},
+                 "full": {"objects": [10, 1000, 50000], "attrs": [1, 10, 100]}}
+
+
+class Scenario:
+    """
+    One benchmark case: a path run on `objects` nodes with `attrs` attributes of one type.
+    """
+
+    def __init__(self, path: str, backend: str, attribute_type: str, objects: int, attrs: int):
+        self.path = path
+        self.backend = backend
+        self.attribute_type = attribute_type
+        self.objects = objects
+        self.attrs = attrs
+
+    @property
+    def key(self):
+        return f"{self.path}/{self.backend}/{self.attribute_type}/{self.objects}x{self.attrs}"
+
+    def as_dict(self):
+        return {"path": self.path, "backend": self.backend, "attribute_type": self.attribute_type,
+                "objects": self.objects, "attrs": self.attrs}
+
+
+def _build_scene(scenario: Scenario):
+    scene = fake_maya.FakeScene()
+    cmds = fake_maya.FakeCmds(scene)
+    om = fake_maya.FakeOpenMaya(scene, cmds)
+    objects = scene.populate(scenario.objects)
+
+    if scenario.backend == backends.OpenMayaBackend.name:
+        backend = backends.get_backend(scenario.backend, om=om, cmds=cmds, undoable=False)
+    else:
+        backend = backends.get_backend(scenario.backend, cmds=cmds)
+
+    return cmds, om, backend, objects
+
+
+def _operation(scenario: Scenario, backend, objects: list):
+    attrs_names = [f"attr_{index:02d}" for index in range(scenario.attrs)]
+    if scenario.attribute_type == "compound":
+        # `attrs` float children under one compound.
+        attrs_names.insert(0, "compound")
+    multi = scenario.attribute_type == "multi"
+    create_kwargs = {"objects": objects, "attrs_names": attrs_names, "chosen_separator_attr": "separator",
+                     "attribute_type": "float" if multi else scenario.attribute_type, "min_val": 0, "max_val": 10,
+                     "multi": multi, "backend": backend}
+
+    if scenario.path != "add":
+        # "readd", "delete_all" and "wire" run on objects that already carry the layout.
+        engine.create_custom_attributes(**create_kwargs)
+    if scenario.path == "wire":
+        # Every attribute drives its own attribute on one driven node, like blendShape weights.
+        driven = backend.cmds.createNode("transform", name="driven")
+        for node in objects:
+            for attr in attrs_names:
+                backend.cmds.addAttr(driven, longName=f"{node}_{attr}", attributeType="float")
+
+    def operation():
+        # Same single undo chunk the UI wraps every operation in.
+        backend.cmds.undoInfo(openChunk=True, chunkName=scenario.path)
+        try:
+            if scenario.path == "delete_all":
+                engine.delete_all_attrs(objects, backend=backend)
+            elif scenario.path == "wire":
+                wiring.wire(wiring.map_by_pattern(objects, "driven.{node}_{attr}", backend=backend),
+                            backend=backend)
+            else:
+                engine.create_custom_attributes(**create_kwargs)
+        finally:
+            backend.cmds.undoInfo(closeChunk=True)
+
+    return operation
+
+
+def run_scenario(scenario: Scenario, measure_memory: bool = True):
+    """
+    Runs one scenario and returns its result dict.
+
+    Wall time and call counts come from a first run; peak memory comes from a
+    second run on a fresh scene so that tracemalloc does not skew the timing.
+    """
+    cmds, om, backend, objects = _build_scene(scenario)
+    operation = _operation(scenario, backend, objects)
+    cmds.reset_calls()
+    om.calls.clear()
+
+    start = time.perf_counter()
+    operation()
+    wall_time = time.perf_counter() - start
+
+    calls = dict(cmds.calls)
+    calls.update(om.calls)
+    result = scenario.as_dict()
+    result.update({"key": scenario.key,
+                   "wall_time": wall_time,
+                   "calls": calls,
+                   "total_calls": sum(cmds.calls.values()) + sum(om.calls.values()),
+                   "peak_memory": None})
+
+    if measure_memory:
+        _, _, backend, objects = _build_scene(scenario)
+        operation = _operation(scenario, backend, objects)
+        tracemalloc.start()
+        operation()
+        result["peak_memory"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return result
+
+
+def build_scenarios(objects: list, attrs: list, attribute_types=ATTRIBUTE_TYPES,
+                    paths=PATHS, backend_names=BACKEND_NAMES):
+    """
+    Returns the cartesian product of the requested dimensions as `Scenario` objects.
+    """
+    return [Scenario(path, backend, attribute_type, object_count, attr_count)
+            for path, backend, attribute_type, object_count, attr_count
+            in itertools.product(paths, backend_names, attribute_types, objects, attrs)]
+
+
+def run_benchmarks(scenarios: list, measure_memory: bool = True, log=print):
+    """
+    Runs every scenario and returns the machine-readable results document.
+    """
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(scenario, measure_memory=measure_memory)
+        results.append(result)
+        if log:
+            log(f"{scenario.key:<40} {result['wall_time']:9.4f}s {result['total_calls']:>9} calls")
+
+    return {"python": platform.python_version(),
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results}
+
+
+def compare_results(current: dict, baseline: dict, threshold: float = 1.2, min_time: float = 0.005):
+    """
+    Lists the scenarios that got slower or issue more calls than in `baseline`.
+
+    Args:
+        current (dict): A results document from `run_benchmarks`.
+        baseline (dict): A previously saved results document.
+        threshold (float): Wall-time ratio above which a scenario counts as a regression.
+        min_time (float): Scenarios faster than this (in seconds) are too noisy to compare
+                          on wall time; their call counts are still compared.
+
+    Returns:
+        list: One message per regression.
+    """
+    baseline_results = {result["key"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        previous = baseline_results.get(result["key"])
+        if previous is None:
+            continue
+        if result["total_calls"] > previous["total_calls"]:
+            regressions.append(f"{result['key']}: calls {previous['total_calls']} -> {result['total_calls']}")
+        slow_enough = max(result["wall_time"], previous["wall_time"]) >= min_time
+        if slow_enough and previous["wall_time"] and result["wall_time"] / previous["wall_time"] > threshold:
+            regressions.append(f"{result['key']}: wall time "
+                               f"{previous['wall_time']:.4f}s -> {result['wall_time']:.4f}s")
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark crv_attrs against a fake maya.cmds scene.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="quick")
+    parser.add_argument("--objects", type=int, nargs="+", help="Object counts (overrides the preset).")
+    parser.add_argument("--attrs", type=int, nargs="+", help="Attribute counts (overrides the preset).")
+    parser.add_argument("--types", nargs="+", default=list(ATTRIBUTE_TYPES), choices=ATTRIBUTE_TYPES)
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=PATHS)
+    parser.add_argument("--backends", nargs="+", default=list(BACKEND_NAMES), choices=BACKEND_NAMES)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the peak memory run.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="Compare against a previous results file.")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args(argv)
+
+    preset = PRESETS[args.preset]
+    scenarios = build_scenarios(objects=args.objects or preset["objects"],
+                                attrs=args.attrs or preset["attrs"],
+                                attribute_types=args.types,
+                                paths=args.paths,
+                                backend_names=args.backends)
+    results = run_benchmarks(scenarios, measure_memory=not args.no_memory)
+
+    if args.output:
+        with open(args.output, "w") as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_results(results, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
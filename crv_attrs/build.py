@@ -1,17 +1,63 @@
-import importlib
-
-from crv_attrs import crv_attrs_ui
-
-importlib.reload(crv_attrs_ui)
-from crv_attrs.crv_attrs_ui import SmartAttributeUI
-
-if __name__ == "__main__":
-    try:
-        global main
-        main.close()
-        main.deleteLater()
-
-    except:
-        pass
-    main = SmartAttributeUI()
-    main.show()
+"""
+Launches `SmartAttributeUI`:
+
+    from crv_attrs import build
+    build.launch()
+
+The dialog is built on the first launch of the session and shown again on the
+next ones. While working on the tool, set the `CRV_ATTRS_DEV` environment
+variable (or call `launch(dev=True)`) to reload the crv_attrs modules and
+rebuild the dialog on every launch.
+"""
+import importlib
+import os
+import sys
+
+from crv_attrs import crv_attrs_ui
+
+DEV_MODE_VARIABLE = "CRV_ATTRS_DEV"
+# Reloaded in this order, dependencies first. The inventory and the profiler
+# keep their session state (scene callbacks, open sessions) and are not reloaded.
+# The journal is: no recording is open once the dialog is closed. Batch, benchmark
+# and fake_maya are command-line tools the dialog does not import.
+DEV_MODULES = ("backends", "planner", "deletion", "validation", "snapshot", "enums", "engine", "journal", "schema",
+               "targeting", "selection", "scheduler", "wiring", "layout", "audit", "core", "crv_attrs_ui")
+
+
+def dev_mode():
+    return os.environ.get(DEV_MODE_VARIABLE, "") not in ("", "0")
+
+
+def reload_modules():
+    """
+    Closes the dialog and reloads the crv_attrs modules, for development only.
+    """
+    global crv_attrs_ui
+    crv_attrs_ui.close()
+    for name in DEV_MODULES:
+        module = sys.modules.get(f"crv_attrs.{name}")
+        if module is not None:
+            importlib.reload(module)
+    crv_attrs_ui = sys.modules["crv_attrs.crv_attrs_ui"]
+
+
+def launch(dev: bool = None):
+    """
+    Shows the tool.
+
+    Args:
+        dev (bool): Reload the modules and rebuild the dialog first. Defaults to `dev_mode()`.
+
+    Returns:
+        SmartAttributeUI: The dialog.
+    """
+    if dev_mode() if dev is None else dev:
+        reload_modules()
+        dialog = crv_attrs_ui.show()
+        print(f"crv_attrs startup: {crv_attrs_ui.startup_report()}")
+        return dialog
+    return crv_attrs_ui.show()
+
+
+if __name__ == "__main__":
+    launch()
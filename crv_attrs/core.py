@@ -1,353 +1,693 @@
-import maya.cmds as cmds
-from maya import mel
-import maya.OpenMayaUI as OMUI
-
-try:
-    from shiboken2 import wrapInstance
-    from PySide2 import QtCore, QtWidgets
-except ModuleNotFoundError:
-    from shiboken6 import wrapInstance
-    from PySide6 import QtCore, QtWidgets
-
-
-# -------------------------------------------------
-# ----------------- Core Functions ----------------
-# -------------------------------------------------
-def enable_undo(function, _name=None):
-    """
-    returns Decorator That Make The Process Undoable in one undo step
-    """
-
-    def undo_func(*args, **kwargs):
-        # Open Chunk
-        cmds.undoInfo(openChunk=True, chunkName=_name)
-
-        result = function(*args, **kwargs)
-
-        # Close Chunk
-        cmds.undoInfo(closeChunk=True)
-
-        return result
-
-    return undo_func
-
-
-# -------------------------------------------------
-# ------------ PyQt Core Functions ----------------
-# -------------------------------------------------
-style_sheet_dict: dict = {"line_edit":
-                              """
-                              QLineEdit 
-                              { 
-                              height: 20; 
-                              border-style: outset; 
-                              border-width: 3px; 
-                              border-radius: 4px;
-                              font: bold;
-                              }
-                              QLineEdit:placeholder 
-                              {
-                                font: bold;
-                              }
-                              """
-    ,
-                          "button_blue":
-                              """
-                        QPushButton
-                            {
-                                height: 22.5;
-                                width: 90;
-                                background-color: rgb(20, 20, 20);
-                                border-style: outset;
-                                border-width: 2px;
-                                border-radius: 5px;
-                                font: bold; 
-                            }
-                            QPushButton:pressed 
-                            {
-                                background-color: rgb(23, 153, 231);
-                                color: black; 
-                            }
-
-                            QPushButton:hover 
-                            {
-                                border-color: rgb(23, 153, 231);
-                            }
-                        """
-    ,
-                          "button_green":
-                              """
-                       QPushButton
-                           {
-                               height: 22.5;
-                               width: 90;
-                               background-color: rgb(20, 20, 20);
-                               border-style: outset;
-                               border-width: 2px;
-                               border-radius: 5px;
-                               font: bold;
-                           }
-                           QPushButton:pressed 
-                           {
-                               background-color: rgb(37, 211, 102);
-                               color: black; 
-                           }
-
-                           QPushButton:hover 
-                           {
-                               border-color: rgb(37, 211, 102);
-                           }
-                       """
-    ,
-                          "button_red":
-                              """
-                       QPushButton
-                           {
-                               height: 22.5;
-                               width: 90;
-                               background-color: rgb(20, 20, 20);
-                               border-style: outset;
-                               border-width: 2px;
-                               border-radius: 5px;
-                               font: bold;
-                           }
-                           QPushButton:pressed 
-                           {
-                               background-color: rgb(255, 58, 58);
-                                color: black; 
-                           }
-
-                           QPushButton:hover 
-                           {
-                               border-color: rgb(255, 58, 58);
-                           }
-                       """
-    ,
-
-                          "label":
-                              """
-                              QLabel
-                              {   
-                                  height: 20;
-                                  width: 80;
-                                  background-color: rgb(20, 20, 20);
-                                  border-style: outset;
-                                  border-width: 2px;
-                                  border-radius: 5px;
-                                  font: bold; 
-                              }
-                              """
-    ,
-                          "small_label":
-                              """
-                              QLabel
-                              {   
-                                  height: 20;
-                                  width: 60;
-                                  background-color: rgb(20, 20, 20);
-                                  border-style: outset;
-                                  border-width: 2px;
-                                  border-radius: 5px;
-                                  font: bold; 
-                              }
-                              """
-
-    ,
-                          "spin_box":
-                              """
-                              QDoubleSpinBox 
-                              {
-                                  height: 20; 
-                                  border-style: outset; 
-                                  border-width: 2px; 
-                                  border-radius: 5px;
-                              }
-                              QDoubleSpinBox:placeholder 
-                              {
-                                font: bold;
-                              }
-                              """
-    ,
-                          "group_box":
-                              """
-                              QGroupBox 
-                              {
-                                  font: bold 13px;
-                                  border-style: outset;
-                                  border-width: 2px;
-                                  border-radius: 6px;
-                                  border-color: black;
-                                  padding: 10px;
-                              }
-                              """
-    ,
-                          "radio_button":
-                              """
-                              QRadioButton 
-                              {
-                                  font: bold 13px;
-                              }
-                              """
-                          }
-
-
-def apply_style_sheet(widget_list: QtWidgets,
-                      stylesheet):
-    #
-    for widget in widget_list:
-        widget.setStyleSheet(stylesheet)
-
-
-def beautiful_organize(qt_grp_box_name: QtWidgets,
-                       parent_layout: QtWidgets,
-                       organize_layout: QtWidgets):
-    #
-    qt_grp_box = QtWidgets.QGroupBox(qt_grp_box_name)
-    qt_grp_box.setLayout(parent_layout)
-    organize_layout.addWidget(qt_grp_box)
-    qt_grp_box.setStyleSheet(style_sheet_dict["group_box"])
-
-
-def get_maya_main_window():
-    main_window_ptr = OMUI.MQtUtil.mainWindow()
-    return wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
-
-
-def connect_widget_to_widget(drv_widget: QtWidgets,
-                             driven_widget_list: [QtWidgets]):
-    widget_status = drv_widget.isChecked()  # Fixed typo
-    for widget in driven_widget_list:
-        widget.setEnabled(widget_status)
-
-
-# -------------------------------------------------
-# ------------ Attrs Core Functions ---------------
-# -------------------------------------------------
-def convert_selected_textfield(input_str_list: str):
-    """
-    Cleans and processes a string representing a list, returning a sorted list of items.
-
-    Args:
-        input_str_list (str): A string containing a representation of a list.
-
-    Returns:
-        list: A sorted list of cleaned items.
-    """
-
-    # Remove unwanted characters and split into items
-    cleaned_list: list = input_str_list.translate({ord(c): None for c in "[] '"}).split(",")
-
-    # Remove leading 'u' from each item and return the sorted list
-    return sorted(item.lstrip("u") for item in cleaned_list)
-
-
-def get_channelbox_attr():
-    """
-        Retrieves the first selected attribute from the Maya Channel Box.
-
-        This function queries the global Maya Channel Box (`$gChannelBoxName`) to
-        determine the currently selected main attributes. If no attributes are
-        selected or an error occurs, it returns an empty list.
-
-        Returns:
-            list: A list containing the name of the first selected attribute.
-                  Returns an empty list if no attributes are selected or a
-                  TypeError occurs.
-        """
-    try:
-        channel_box_attr = mel.eval('$temp=$gChannelBoxName')
-        return cmds.channelBox(channel_box_attr, query=True, sma=True)[0] or []
-    except TypeError:
-        pass
-
-
-def create_custom_attributes(objects: list,
-                             attrs_names: list,
-                             chosen_separator_attr: str,
-                             attribute_type: str,
-                             min_val: float,
-                             max_val: float):
-    """
-        Creates custom attributes on a list of objects in Autodesk Maya.
-
-        This function adds custom attributes to the specified objects. It checks if the
-        given separator attribute already exists on the object, and if not, creates it.
-        It then either adds a set of "enum" attributes or regular attributes (e.g.,
-        "float") based on the specified `attribute_type`. Optionally, for float attributes,
-        the minimum and maximum values can be set.
-
-        Args:
-            objects (list): A list of object names (e.g., curve names) to which the custom
-                            attributes will be added.
-            attrs_names (list): A list of names for the attributes to be created.
-            chosen_separator_attr (str): The name of the separator attribute used to group
-                                         the custom attributes together.
-            attribute_type (str): The type of the attributes to be created. Can be either
-                                  "enum", "float" or "bool".
-            min_val (float): The minimum value for float attributes (if `attribute_type` is "float").
-            max_val (float): The maximum value for float attributes (if `attribute_type` is "float").
-
-        Returns:
-            None: This function does not return any value. It directly modifies the objects.
-
-        Notes:
-            - If the `chosen_separator_attr` does not exist on an object, it will be created as an
-              "enum" attribute with the value `=======`.
-            - The `attrs_names` attributes will be added or deleted based on whether they already exist
-              on the object.
-            - If `attribute_type` is set to "float", the function will add a float range between `min_val`
-              and `max_v
-    """
-
-    if not attrs_names or not objects:
-        return
-
-    for crv in objects:
-        ctrl_exist_attributes = set(cmds.listAttr(crv, ud=True) or [])
-
-        if chosen_separator_attr not in ctrl_exist_attributes:
-            cmds.addAttr(crv,
-                         ln=chosen_separator_attr, nn=chosen_separator_attr, at="enum", en="=======", k=True, r=True)
-
-        [cmds.deleteAttr(crv, attribute=attr) for attr in attrs_names if attr in ctrl_exist_attributes]
-
-        if attribute_type == "enum":
-            enum_attr = ":".join(attrs_names)
-            cmds.setAttr(f"{crv}.{chosen_separator_attr}", lock=False, channelBox=True)
-            cmds.addAttr(f"{crv}.{chosen_separator_attr}", e=True, en=enum_attr, k=True, r=True)
-        else:
-            cmds.addAttr(f"{crv}.{chosen_separator_attr}", e=True, en="=======", k=True, r=True)
-
-            for attr in attrs_names:
-                cmds.addAttr(crv, ln=attr, nn=attr, at=attribute_type, k=True, r=True)
-                if attribute_type == "float":
-                    cmds.addAttr(f"{crv}.{attr}", e=True, min=min_val, max=max_val)
-
-        cmds.setAttr(f"{crv}.{chosen_separator_attr}", keyable=False, channelBox=True)
-
-
-def delete_all_attrs(objects: list):
-    """
-        Deletes all user-defined attributes from a list of objects in Autodesk Maya.
-
-        This function iterates over a list of objects and deletes any user-defined
-        attributes (`ud`) associated with them. If an object has user-defined attributes,
-        they are removed using the `deleteAttr` command.
-
-        Args:
-            objects (list): A list of object names (e.g., nodes like curves or meshes) from
-                            which user-defined attributes will be deleted.
-
-        Returns:
-            None: This function does not return any value. It modifies the objects directly.
-
-        Notes:
-            - The function will only delete attributes marked as user-defined .
-            - If an object has no user-defined attributes, it will be skipped without any errors.
-        """
-
-    [
-        cmds.deleteAttr(crv, attribute=attr)
-        for crv in objects
-        for attr in cmds.listAttr(crv, ud=1) or []
-    ]
+import re
+
+import maya.cmds as cmds
+
+try:
+    from PySide2 import QtCore, QtWidgets
+except ModuleNotFoundError:
+    from PySide6 import QtCore, QtWidgets
+
+# Feature modules are imported inside the functions that use them, so loading `core` stays cheap.
+from crv_attrs import backends
+
+
+# -------------------------------------------------
+# ----------------- Core Functions ----------------
+# -------------------------------------------------
+def enable_undo(function, _name=None):
+    """
+    returns Decorator That Make The Process Undoable in one undo step
+    """
+    from crv_attrs import profiler
+
+    def undo_func(*args, **kwargs):
+        with profiler.section(f"enable_undo.{_name or function.__name__}"):
+            # Open Chunk
+            with profiler.timed("undoInfo.openChunk"):
+                cmds.undoInfo(openChunk=True, chunkName=_name)
+
+            try:
+                return function(*args, **kwargs)
+            finally:
+                # Close Chunk, even when the function raised
+                with profiler.timed("undoInfo.closeChunk"):
+                    cmds.undoInfo(closeChunk=True)
+
+    return undo_func
+
+
+# -------------------------------------------------
+# ------------ PyQt Core Functions ----------------
+# -------------------------------------------------
+style_sheet_dict: dict = {"line_edit":
+                              """
+                              QLineEdit 
+                              { 
+                              height: 20; 
+                              border-style: outset; 
+                              border-width: 3px; 
+                              border-radius: 4px;
+                              font: bold;
+                              }
+                              QLineEdit:placeholder 
+                              {
+                                font: bold;
+                              }
+                              """
+    ,
+                          "button_blue":
+                              """
+                        QPushButton
+                            {
+                                height: 22.5;
+                                width: 90;
+                                background-color: rgb(20, 20, 20);
+                                border-style: outset;
+                                border-width: 2px;
+                                border-radius: 5px;
+                                font: bold; 
+                            }
+                            QPushButton:pressed 
+                            {
+                                background-color: rgb(23, 153, 231);
+                                color: black; 
+                            }
+
+                            QPushButton:hover 
+                            {
+                                border-color: rgb(23, 153, 231);
+                            }
+                        """
+    ,
+                          "button_green":
+                              """
+                       QPushButton
+                           {
+                               height: 22.5;
+                               width: 90;
+                               background-color: rgb(20, 20, 20);
+                               border-style: outset;
+                               border-width: 2px;
+                               border-radius: 5px;
+                               font: bold;
+                           }
+                           QPushButton:pressed 
+                           {
+                               background-color: rgb(37, 211, 102);
+                               color: black; 
+                           }
+
+                           QPushButton:hover 
+                           {
+                               border-color: rgb(37, 211, 102);
+                           }
+                       """
+    ,
+                          "button_red":
+                              """
+                       QPushButton
+                           {
+                               height: 22.5;
+                               width: 90;
+                               background-color: rgb(20, 20, 20);
+                               border-style: outset;
+                               border-width: 2px;
+                               border-radius: 5px;
+                               font: bold;
+                           }
+                           QPushButton:pressed 
+                           {
+                               background-color: rgb(255, 58, 58);
+                                color: black; 
+                           }
+
+                           QPushButton:hover 
+                           {
+                               border-color: rgb(255, 58, 58);
+                           }
+                       """
+    ,
+
+                          "label":
+                              """
+                              QLabel
+                              {   
+                                  height: 20;
+                                  width: 80;
+                                  background-color: rgb(20, 20, 20);
+                                  border-style: outset;
+                                  border-width: 2px;
+                                  border-radius: 5px;
+                                  font: bold; 
+                              }
+                              """
+    ,
+                          "small_label":
+                              """
+                              QLabel
+                              {   
+                                  height: 20;
+                                  width: 60;
+                                  background-color: rgb(20, 20, 20);
+                                  border-style: outset;
+                                  border-width: 2px;
+                                  border-radius: 5px;
+                                  font: bold; 
+                              }
+                              """
+
+    ,
+                          "spin_box":
+                              """
+                              QDoubleSpinBox 
+                              {
+                                  height: 20; 
+                                  border-style: outset; 
+                                  border-width: 2px; 
+                                  border-radius: 5px;
+                              }
+                              QDoubleSpinBox:placeholder 
+                              {
+                                font: bold;
+                              }
+                              """
+    ,
+                          "group_box":
+                              """
+                              QGroupBox 
+                              {
+                                  font: bold 13px;
+                                  border-style: outset;
+                                  border-width: 2px;
+                                  border-radius: 6px;
+                                  border-color: black;
+                                  padding: 10px;
+                              }
+                              """
+    ,
+                          "radio_button":
+                              """
+                              QRadioButton, QCheckBox
+                              {
+                                  font: bold 13px;
+                              }
+                              """
+                          }
+
+
+# Dynamic property naming the `style_sheet_dict` entry of a widget.
+STYLE_PROPERTY = "crvStyle"
+_SELECTOR = re.compile(r"([^{}]+)\{")
+_combined_style_sheet = None
+
+
+def _scope_style(style: str, stylesheet: str):
+    """
+    Restricts every selector of `stylesheet` to the widgets tagged with `style`:
+    "QPushButton:pressed" becomes 'QPushButton[crvStyle="button_blue"]:pressed'.
+    """
+
+    def scope(match):
+        selectors = []
+        for selector in match.group(1).split(","):
+            widget_type, colon, state = selector.strip().partition(":")
+            selectors.append(f'{widget_type}[{STYLE_PROPERTY}="{style}"]{colon}{state}')
+        return "\n" + ", ".join(selectors) + "\n{"
+
+    return _SELECTOR.sub(scope, stylesheet)
+
+
+def combined_style_sheet():
+    """
+    Returns every entry of `style_sheet_dict` as one stylesheet, built once per session.
+    Set on the dialog, it styles each widget through its `STYLE_PROPERTY`, so Qt
+    parses a single stylesheet instead of one per widget.
+    """
+    global _combined_style_sheet
+    if _combined_style_sheet is None:
+        _combined_style_sheet = "\n".join(_scope_style(style, stylesheet)
+                                          for style, stylesheet in style_sheet_dict.items())
+    return _combined_style_sheet
+
+
+def tag_style(widget_list: QtWidgets,
+              style: str):
+    #
+    for widget in widget_list:
+        widget.setProperty(STYLE_PROPERTY, style)
+
+
+def apply_style_sheet(widget_list: QtWidgets,
+                      stylesheet):
+    #
+    for widget in widget_list:
+        widget.setStyleSheet(stylesheet)
+
+
+def beautiful_organize(qt_grp_box_name: QtWidgets,
+                       parent_layout: QtWidgets,
+                       organize_layout: QtWidgets):
+    #
+    qt_grp_box = QtWidgets.QGroupBox(qt_grp_box_name)
+    qt_grp_box.setLayout(parent_layout)
+    organize_layout.addWidget(qt_grp_box)
+    tag_style([qt_grp_box], "group_box")
+
+
+def get_maya_main_window():
+    # Imported on first use: the UI and shiboken modules are only needed to parent the dialog.
+    import maya.OpenMayaUI as OMUI
+    try:
+        from shiboken2 import wrapInstance
+    except ModuleNotFoundError:
+        from shiboken6 import wrapInstance
+
+    main_window_ptr = OMUI.MQtUtil.mainWindow()
+    return wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
+
+
+def connect_widget_to_widget(drv_widget: QtWidgets,
+                             driven_widget_list: [QtWidgets]):
+    widget_status = drv_widget.isChecked()  # Fixed typo
+    for widget in driven_widget_list:
+        widget.setEnabled(widget_status)
+
+
+# -------------------------------------------------
+# ------------ Attrs Core Functions ---------------
+# -------------------------------------------------
+def convert_selected_textfield(input_str_list: str):
+    """
+    Cleans and processes a string representing a list, returning a sorted list of items.
+
+    Args:
+        input_str_list (str): A string containing a representation of a list.
+
+    Returns:
+        list: A sorted list of cleaned items.
+    """
+
+    # Remove unwanted characters and split into items
+    cleaned_list: list = input_str_list.translate({ord(c): None for c in "[] '"}).split(",")
+
+    # Remove leading 'u' from each item and return the sorted list
+    return sorted(item.lstrip("u") for item in cleaned_list)
+
+
+def get_channelbox_attr():
+    """
+        Retrieves the first selected attribute from the Maya Channel Box.
+
+        This function queries the global Maya Channel Box (`$gChannelBoxName`) to
+        determine the currently selected main attributes. If no attributes are
+        selected or an error occurs, it returns an empty list.
+
+        Returns:
+            list: A list containing the name of the first selected attribute.
+                  Returns an empty list if no attributes are selected or a
+                  TypeError occurs.
+        """
+    from maya import mel
+
+    try:
+        channel_box_attr = mel.eval('$temp=$gChannelBoxName')
+        return cmds.channelBox(channel_box_attr, query=True, sma=True)[0] or []
+    except TypeError:
+        pass
+
+
+def create_custom_attributes(objects: list,
+                             attrs_names: list,
+                             chosen_separator_attr: str,
+                             attribute_type: str,
+                             min_val: float,
+                             max_val: float,
+                             backend: backends.AttrBackend = None,
+                             dry_run: bool = False,
+                             inventory=None,
+                             default_val=None,
+                             soft_min: float = None,
+                             soft_max: float = None,
+                             multi: bool = False):
+    """
+        Creates custom attributes on a list of objects in Autodesk Maya.
+
+        This function adds custom attributes to the specified objects. It checks if the
+        given separator attribute already exists on the object, and if not, creates it.
+        It then either adds a set of "enum" attributes or regular attributes (e.g.,
+        "float") based on the specified `attribute_type`. Optionally, for float attributes,
+        the minimum and maximum values can be set.
+
+        Args:
+            objects (list): A list of object names (e.g., curve names) to which the custom
+                            attributes will be added.
+            attrs_names (list): A list of names for the attributes to be created.
+            chosen_separator_attr (str): The name of the separator attribute used to group
+                                         the custom attributes together.
+            attribute_type (str): The type of the attributes to be created: "enum", "float", "bool",
+                                  "double", "long" (or "int"), "string", "double3" (or "vector"),
+                                  "float3" or "compound". In "compound" mode the first name is the
+                                  compound and the others become its float children.
+            min_val (float): The minimum value for numeric attributes (vector and compound children included).
+            max_val (float): The maximum value for numeric attributes (vector and compound children included).
+            backend (AttrBackend): The engine that executes the edits. Defaults to
+                                   `backends.get_backend()` (OpenMaya 2, falling back to cmds).
+            dry_run (bool): Only plan the changes, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of reading them
+                                       from the scene, and records the applied changes.
+            default_val: The default value (a number, a string, or an (x, y, z) tuple for vectors).
+            soft_min (float): The soft minimum (slider range) for numeric attributes.
+            soft_max (float): The soft maximum (slider range) for numeric attributes.
+            multi (bool): Create the attributes as multi (array) attributes.
+
+        Raises:
+            ValidationError: If a name, type or range is invalid, or clashes with an object,
+                             before any object is edited. Use `validate_attributes` to get
+                             the full conflict report upfront.
+
+        Returns:
+            AttrPlan: The changes planned for every object. Use `plan.report()` for a
+                      dry-run summary.
+
+        Notes:
+            - If the `chosen_separator_attr` does not exist on an object, it will be created as an
+              "enum" attribute with the value `=======`.
+            - Existing attributes are diffed against the request: matching ones are left untouched,
+              ranges and enum fields are edited in place and only type changes are re-created.
+            - If `attribute_type` is set to "float", the function will add a float range between `min_val`
+              and `max_v
+    """
+    from crv_attrs import engine
+
+    return engine.create_custom_attributes(objects=objects,
+                                           attrs_names=attrs_names,
+                                           chosen_separator_attr=chosen_separator_attr,
+                                           attribute_type=attribute_type,
+                                           min_val=min_val,
+                                           max_val=max_val,
+                                           backend=backend,
+                                           dry_run=dry_run,
+                                           inventory=inventory,
+                                           default_val=default_val,
+                                           soft_min=soft_min,
+                                           soft_max=soft_max,
+                                           multi=multi)
+
+
+def validate_attributes(objects: list,
+                        attrs_names: list,
+                        chosen_separator_attr: str,
+                        attribute_type: str,
+                        min_val: float,
+                        max_val: float,
+                        backend: backends.AttrBackend = None,
+                        inventory=None,
+                        default_val=None,
+                        soft_min: float = None,
+                        soft_max: float = None,
+                        multi: bool = False):
+    """
+        Checks a `create_custom_attributes` request against every object, without editing the scene.
+
+        Names, types and ranges are checked once, then every object is checked from its
+        attributes read in one pass: missing or referenced objects, clashes with built-in
+        attributes, existing attributes of another type and locked attributes to remove.
+
+        Args:
+            objects (list): A list of object names.
+            attrs_names (list): The names of the attributes (or enum fields) to be created.
+            chosen_separator_attr (str): The name of the separator attribute.
+            attribute_type (str): Any type accepted by `create_custom_attributes`.
+            min_val (float): The minimum value for numeric attributes.
+            max_val (float): The maximum value for numeric attributes.
+            backend (AttrBackend): Used to read the attributes.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+            default_val: The default value.
+            soft_min (float): The soft minimum for numeric attributes.
+            soft_max (float): The soft maximum for numeric attributes.
+            multi (bool): Whether the attributes are multi attributes.
+
+        Returns:
+            ValidationReport: Every error and warning. `report.ok` is False when the request
+                              would fail; use `report.report(verbose=True)` to list them.
+        """
+    from crv_attrs import planner, validation
+
+    separator_spec, attr_specs, removed_attrs = planner.build_specs(attrs_names=attrs_names,
+                                                                   chosen_separator_attr=chosen_separator_attr,
+                                                                   attribute_type=attribute_type,
+                                                                   min_val=min_val,
+                                                                   max_val=max_val,
+                                                                   default_val=default_val,
+                                                                   soft_min=soft_min,
+                                                                   soft_max=soft_max,
+                                                                   multi=multi)
+    return validation.validate_specs(objects=objects,
+                                     separator_spec=separator_spec,
+                                     attr_specs=attr_specs,
+                                     removed_attrs=removed_attrs,
+                                     backend=backend,
+                                     inventory=inventory)
+
+
+def delete_all_attrs(objects: list,
+                     backend: backends.AttrBackend = None,
+                     dry_run: bool = False,
+                     inventory=None):
+    """
+        Deletes all user-defined attributes from a list of objects in Autodesk Maya.
+
+        The user-defined attributes (`ud`) of every object are read in one pass and
+        deleted together, in a single backend flush.
+
+        Args:
+            objects (list): A list of object names (e.g., nodes like curves or meshes) from
+                            which user-defined attributes will be deleted.
+            backend (AttrBackend): The engine that executes the deletions. Defaults to
+                                   `backends.get_backend()`.
+            dry_run (bool): Only report what would be deleted, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Returns:
+            DeletionPlan: The deletions and the skipped attributes. Use `plan.report()`
+                          for a summary.
+
+        Notes:
+            - The function will only delete attributes marked as user-defined .
+            - If an object has no user-defined attributes, it will be skipped without any errors.
+            - Locked attributes and attributes of referenced nodes are skipped instead of
+              stopping the operation halfway through.
+        """
+    from crv_attrs import engine
+
+    return engine.delete_all_attrs(objects=objects, backend=backend, dry_run=dry_run, inventory=inventory)
+
+
+def delete_attrs(objects: list,
+                 patterns: list = None,
+                 section: str = None,
+                 attr_types: list = None,
+                 not_in=None,
+                 backend: backends.AttrBackend = None,
+                 dry_run: bool = False,
+                 inventory=None):
+    """
+        Deletes the user-defined attributes matching every given filter.
+
+        Args:
+            objects (list): A list of object names.
+            patterns (list): Attribute name globs (e.g. ["*_old", "tmp*"]).
+            section (str): A separator name: deletes it and the attributes listed under it.
+            attr_types (list): Attribute types to delete (e.g. ["float"]).
+            not_in: Attribute names, or a schema, whose attributes are kept.
+            backend (AttrBackend): The engine that executes the deletions.
+            dry_run (bool): Only report what would be deleted, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Returns:
+            DeletionPlan: The deletions and the skipped (locked or referenced) attributes.
+        """
+    from crv_attrs import deletion
+
+    attr_filter = deletion.AttrFilter(patterns=patterns, section=section, attr_types=attr_types, not_in=not_in)
+    return deletion.delete_attrs(objects=objects, attr_filter=attr_filter, backend=backend,
+                                 dry_run=dry_run, inventory=inventory)
+
+
+def reorder_attrs(objects: list,
+                  order: list,
+                  backend: backends.AttrBackend = None,
+                  dry_run: bool = False,
+                  inventory=None):
+    """
+        Reorders user-defined attributes in the channel box of every object.
+
+        Maya lists dynamic attributes in creation order, so reordering means re-creating
+        attributes. Only the smallest set is re-created: the attributes after the longest
+        part of the new order that is already in place. Their values, connections, keys,
+        lock and keyable state are carried over, and all objects are edited in one batch.
+
+        Args:
+            objects (list): A list of object names.
+            order (list): The attribute names in their new order. They are moved into the
+                          slots they occupy, so the other attributes keep their place.
+            backend (AttrBackend): The engine that executes the edits.
+            dry_run (bool): Only plan the changes, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Returns:
+            AttrPlan: "recreate" changes for the attributes re-created, "noop" for the others.
+        """
+    from crv_attrs import engine
+
+    return engine.reorder_attrs(objects=objects, order=order, backend=backend,
+                                dry_run=dry_run, inventory=inventory)
+
+
+def edit_enum_fields(objects: list,
+                     attr: str,
+                     edits,
+                     backend: backends.AttrBackend = None,
+                     dry_run: bool = False,
+                     inventory=None):
+    """
+        Appends, inserts, renames and removes fields of an enum attribute (e.g. a separator)
+        without shifting the index of the fields that stay.
+
+        Values and keys pointing to a field whose index has to change (inserted before it,
+        or removed) are moved to its new index. Each object gets one enum edit, and all
+        objects are edited in one batch.
+
+        Args:
+            objects (list): A list of object names.
+            attr (str): The enum attribute.
+            edits: A list of `enums.EnumEdit`, or their short form as a string,
+                   e.g. "+ik +blend@1 fk>fkArm -old>ik" (see `enums.parse_edits`).
+            backend (AttrBackend): The engine that executes the edits.
+            dry_run (bool): Only plan the changes, without touching the scene.
+            inventory (AttrInventory): Provides the current fields instead of the scene.
+
+        Raises:
+            ValueError: If the short form cannot be read.
+
+        Returns:
+            AttrPlan: The planned changes; objects the edits do not fit are reported as
+                      skipped, and `plan.remapped` reports the moved values and keys.
+        """
+    from crv_attrs import enums
+
+    if isinstance(edits, str):
+        edits = enums.parse_edits(edits)
+    return enums.edit_enum_fields(objects, attr, edits, backend=backend, dry_run=dry_run, inventory=inventory)
+
+
+def wire_attributes(objects: list,
+                    destination: str,
+                    patterns: list = None,
+                    section: str = None,
+                    converter: str = None,
+                    settings: tuple = (),
+                    replace: bool = True,
+                    backend: backends.AttrBackend = None,
+                    dry_run: bool = False,
+                    inventory=None):
+    """
+        Connects the user-defined attributes of every object to their driven plugs.
+
+        The mapping is resolved in bulk (plug existence, current inputs) and every
+        connection, with its optional converter node, is made in one backend flush.
+
+        Args:
+            objects (list): A list of driver object names.
+            destination (str): The destination plug template, formatted with {node} (driver
+                               short name), {attr} and {section}, e.g. "face_BS.{attr}".
+            patterns (list): Attribute name globs to wire. Every attribute when omitted.
+            section (str): Only wire the attributes under this separator.
+            converter (str): "unitConversion" or "remapValue", inserted between each pair.
+            settings (tuple): The converter settings: (factor,) for a unitConversion,
+                              (input_min, input_max, output_min, output_max) for a remapValue.
+            replace (bool): Replace existing inputs; when off, connected destinations are skipped.
+            backend (AttrBackend): The engine that executes the connections.
+            dry_run (bool): Only list the connections, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Returns:
+            WiringPlan: The connections and the skipped ones. Use `plan.report(verbose=True)`
+                        for a dry-run listing.
+        """
+    from crv_attrs import wiring
+
+    backend = backend or backends.get_backend()
+    connections = wiring.map_by_pattern(objects, destination, patterns=patterns, section=section,
+                                        converter=converter, settings=settings, backend=backend,
+                                        inventory=inventory)
+    return wiring.wire(connections, backend=backend, dry_run=dry_run, replace=replace)
+
+
+def transfer_layout(source: str,
+                    targets: list,
+                    values: bool = False,
+                    exact: bool = False,
+                    backend: backends.AttrBackend = None,
+                    dry_run: bool = False,
+                    inventory=None):
+    """
+        Copies the full user-defined attribute layout of one object onto many others.
+
+        Separators, types, ranges, enum fields and defaults are read once from `source`
+        and applied to every target like a `create_custom_attributes` request: only the
+        missing or different attributes are edited, all targets in one batch.
+
+        Args:
+            source (str): The object whose layout is copied.
+            targets (list): A list of target object names.
+            values (bool): Also copy the current values.
+            exact (bool): Also delete the target attributes that are not part of the layout.
+            backend (AttrBackend): The engine that executes the edits.
+            dry_run (bool): Only plan the changes, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Raises:
+            ValidationError: If the layout clashes with a target, before any edit.
+
+        Returns:
+            LayoutPlan: The planned changes and values. Use `plan.report()` for a summary.
+        """
+    from crv_attrs import layout
+
+    backend = backend or backends.get_backend()
+    source_layout = layout.read_layout(source, backend=backend, inventory=inventory, values=values)
+    return layout.transfer_layout(source_layout, targets, backend=backend, dry_run=dry_run,
+                                  inventory=inventory, values=values, exact=exact)
+
+
+def mirror_layouts(objects: list,
+                   rule: str = "L_*:R_*",
+                   rename_attrs: bool = True,
+                   values: bool = False,
+                   backend: backends.AttrBackend = None,
+                   dry_run: bool = False,
+                   inventory=None):
+    """
+        Copies the layout of every object matching a name rule onto its mirrored counterpart.
+
+        Args:
+            objects (list): A list of object names; those not matching the rule are ignored.
+            rule (str): "source:target" globs, e.g. "L_*:R_*" or "*_L:*_R".
+            rename_attrs (bool): Mirror the attribute names matching the rule too.
+            values (bool): Also copy the current values.
+            backend (AttrBackend): The engine that executes the edits.
+            dry_run (bool): Only plan the changes, without touching the scene.
+            inventory (AttrInventory): Provides the current attributes instead of the scene.
+
+        Raises:
+            ValueError: If the rule is invalid.
+            ValidationError: If a layout clashes with its counterpart, before any edit.
+
+        Returns:
+            LayoutPlan: The planned changes. Missing counterparts are reported as skipped.
+        """
+    from crv_attrs import layout
+
+    return layout.mirror_layouts(objects, layout.MirrorRule.parse(rule), rename_attrs=rename_attrs,
+                                 backend=backend, dry_run=dry_run, inventory=inventory, values=values)
@@ -1,196 +1,837 @@
-import importlib
-from maya import cmds
-
-try:
-    from PySide2 import QtCore, QtWidgets
-except ModuleNotFoundError:
-    from PySide6 import QtCore, QtWidgets
-
-from crv_attrs import core
-
-importlib.reload(core)
-
-
-class SmartAttributeUI(QtWidgets.QDialog):
-    def __init__(self, parent=core.get_maya_main_window()):
-        super().__init__(parent)
-
-        self.setWindowTitle("{RigTopia::Smart_Attribute}")
-        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
-        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowMinimizeButtonHint)
-        self.setMinimumWidth(310)
-        self.setMaximumHeight(300)
-
-        self.create_widgets()
-        self.create_layout()
-        self.define_widgets_style_sheet()
-        self.create_connections()
-
-    def create_widgets(self):
-        # Objects Widgets
-        self.get_objects_button = QtWidgets.QPushButton(":: Objects ::")
-        self.objects_field = QtWidgets.QLineEdit()
-        self.objects_field.setPlaceholderText("Select Scene Objects")
-
-        # Separator Widgets
-        self.get_separator_button = QtWidgets.QPushButton(":: Separator ::")
-        self.separator_attr_field = QtWidgets.QLineEdit()
-        self.separator_attr_field.setPlaceholderText("Enum To Separate Attrs")
-
-        # Attributes Widgets
-        self.attrs_label = QtWidgets.QLabel(":: Attributes ::")
-        self.attrs_field = QtWidgets.QLineEdit()
-        self.attrs_field.setPlaceholderText("Example: attr_01/attr_02/..")
-
-        # Attribute Type Widgets
-        self.attribute_type_group = QtWidgets.QButtonGroup()
-        self.float_radio = QtWidgets.QRadioButton("float")
-        self.bool_radio = QtWidgets.QRadioButton("bool")
-        self.enum_radio = QtWidgets.QRadioButton("enum")
-        self.attribute_type_group.addButton(self.float_radio)
-        self.attribute_type_group.addButton(self.bool_radio)
-        self.attribute_type_group.addButton(self.enum_radio)
-        self.bool_radio.setChecked(True)
-
-        # Min/Max Values
-        self.min_val_label = QtWidgets.QLabel(":: Min ::")
-
-        self.min_val_field = QtWidgets.QDoubleSpinBox()
-        self.min_val_field.setRange(-10000, 10000)
-        self.min_val_field.setValue(0)
-        self.min_val_field.setEnabled(False)
-
-        self.max_val_label = QtWidgets.QLabel(":: Max ::")
-
-        self.max_val_field = QtWidgets.QDoubleSpinBox()
-        self.max_val_field.setRange(-10000, 10000)
-        self.max_val_field.setValue(10)
-        self.max_val_field.setEnabled(False)
-
-        # Run Widgets
-        self.delete_attrs_button = QtWidgets.QPushButton(":: Delete All ::")
-        self.add_attrs_button = QtWidgets.QPushButton(":: Add New ::")
-
-    def create_layout(self):
-        main_layout = QtWidgets.QVBoxLayout(self)
-        organize_layout = QtWidgets.QVBoxLayout()
-
-        objects_layout = QtWidgets.QHBoxLayout()
-        objects_layout.addWidget(self.get_objects_button)
-        objects_layout.addWidget(self.objects_field)
-        core.beautiful_organize(qt_grp_box_name="Objects",
-                                parent_layout=objects_layout,
-                                organize_layout=organize_layout)
-
-        separator_layout = QtWidgets.QHBoxLayout()
-        separator_layout.addWidget(self.get_separator_button)
-        separator_layout.addWidget(self.separator_attr_field)
-        core.beautiful_organize(qt_grp_box_name="Separator",
-                                parent_layout=separator_layout,
-                                organize_layout=organize_layout)
-
-        attributes_layout = QtWidgets.QHBoxLayout()
-        attributes_layout.addWidget(self.attrs_label)
-        attributes_layout.addWidget(self.attrs_field)
-        core.beautiful_organize(qt_grp_box_name="Attributes",
-                                parent_layout=attributes_layout,
-                                organize_layout=organize_layout)
-
-        attributes_type_layout = QtWidgets.QHBoxLayout()
-        attributes_type_layout.addWidget(self.float_radio)
-        attributes_type_layout.addWidget(self.bool_radio)
-        attributes_type_layout.addWidget(self.enum_radio)
-        core.beautiful_organize(qt_grp_box_name="Attributes_Type",
-                                parent_layout=attributes_type_layout,
-                                organize_layout=organize_layout)
-
-        min_max_layout = QtWidgets.QHBoxLayout()
-        min_max_layout.addWidget(self.min_val_label)
-        min_max_layout.addWidget(self.min_val_field)
-        min_max_layout.addStretch()
-        min_max_layout.addWidget(self.max_val_label)
-        min_max_layout.addWidget(self.max_val_field)
-        core.beautiful_organize(qt_grp_box_name="Max____Min",
-                                parent_layout=min_max_layout,
-                                organize_layout=organize_layout)
-
-        build_layout = QtWidgets.QHBoxLayout()
-        build_layout.addWidget(self.delete_attrs_button)
-        build_layout.addWidget(self.add_attrs_button)
-        core.beautiful_organize(qt_grp_box_name="Build",
-                                parent_layout=build_layout,
-                                organize_layout=organize_layout)
-
-        main_layout.addLayout(organize_layout)
-
-    def define_widgets_style_sheet(self):
-        # Group widgets by style
-        widgets_by_style = {
-            "button_blue": [self.get_objects_button, self.get_separator_button],
-            "button_green": [self.add_attrs_button],
-            "button_red": [self.delete_attrs_button],
-            "line_edit": [self.objects_field, self.separator_attr_field, self.attrs_field],
-            "label": [self.attrs_label, self.min_val_label, self.max_val_label],
-            "spin_box": [self.min_val_field, self.max_val_field],
-            "radio_button": [self.bool_radio, self.float_radio, self.enum_radio],
-        }
-
-        # Apply stylesheets in a loop
-        for style, widgets in widgets_by_style.items():
-            core.apply_style_sheet(widget_list=widgets, stylesheet=core.style_sheet_dict[style])
-
-    def create_connections(self):
-        self.get_objects_button.clicked.connect(self.get_scene_objects)
-        self.get_separator_button.clicked.connect(self.get_channelbox_separator)
-
-        self.attribute_type_group.buttonClicked.connect(self.get_attrs_type)
-        self.float_radio.toggled.connect(self.control_double_field)
-
-        self.add_attrs_button.clicked.connect(self.add_attrs)
-        self.delete_attrs_button.clicked.connect(self.delete_all_attributes)
-
-    def control_double_field(self):
-
-        core.connect_widget_to_widget(drv_widget=self.float_radio,
-                                      driven_widget_list=[self.min_val_field,
-                                                          self.max_val_field])
-
-    def get_scene_objects(self):
-        selected_curves = cmds.ls(sl=1, type="transform")
-        self.objects_field.setText(str(selected_curves))
-
-    def get_channelbox_separator(self):
-        attr = core.get_channelbox_attr()
-        self.separator_attr_field.setText(str(attr))
-
-    def get_attrs_names(self):
-        typed_attributes = self.attrs_field.text()
-        return typed_attributes.split("/") if typed_attributes else []
-
-    def get_attrs_type(self):
-        for button in self.attribute_type_group.buttons():
-            if button.isChecked():
-                return str(button.text())
-
-    @core.enable_undo
-    def add_attrs(self):
-        attrs_names = self.get_attrs_names()
-        chosen_separator_attr = self.separator_attr_field.text()
-        objects = core.convert_selected_textfield(self.objects_field.text())
-        min_val = self.min_val_field.value()
-        max_val = self.max_val_field.value()
-
-        if objects:
-            if chosen_separator_attr:
-                if attrs_names:
-                    core.create_custom_attributes(objects=objects,
-                                                  attrs_names=attrs_names,
-                                                  chosen_separator_attr=chosen_separator_attr,
-                                                  attribute_type=self.get_attrs_type(),
-                                                  min_val=min_val,
-                                                  max_val=max_val)
-
-    @core.enable_undo
-    def delete_all_attributes(self):
-        objects = core.convert_selected_textfield(self.objects_field.text())
-        core.delete_all_attrs(objects=objects)
+import contextlib
+import time
+
+_import_start = time.perf_counter()
+
+from maya import cmds
+
+try:
+    from PySide2 import QtCore, QtWidgets
+except ModuleNotFoundError:
+    from PySide6 import QtCore, QtWidgets
+
+# Feature modules are imported where they are used, so opening the window only loads what it shows.
+from crv_attrs import backends, core, selection
+
+# Seconds spent in each startup step of the last launch: "import", "build" and "show".
+STARTUP_TIMES: dict = {}
+
+
+class SmartAttributeUI(QtWidgets.QDialog):
+    def __init__(self, parent=None):
+        if parent is None:
+            parent = core.get_maya_main_window()
+        super().__init__(parent)
+
+        self.setWindowTitle("{RigTopia::Smart_Attribute}")
+        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowContextHelpButtonHint)
+        self.setWindowFlags(self.windowFlags() ^ QtCore.Qt.WindowMinimizeButtonHint)
+        self.setMinimumWidth(310)
+        self.setMaximumHeight(640)
+
+        self.task = None
+        self.task_timer = None
+        self.selection_model = selection.SelectionModel(cmds=cmds)
+        # UUIDs of the rows of the expanded objects list.
+        self.listed_uuids = []
+        self.live_selection = selection.LiveSelection(self.selection_model,
+                                                      on_selection=self.update_live_objects,
+                                                      on_channel_box=self.update_live_separator,
+                                                      schedule=self.schedule_live_update)
+
+        self.create_widgets()
+        self.create_layout()
+        self.define_widgets_style_sheet()
+        self.create_connections()
+
+    def create_widgets(self):
+        from crv_attrs import journal, schema
+        # Objects Widgets
+        self.get_objects_button = QtWidgets.QPushButton(":: Objects ::")
+        self.objects_field = QtWidgets.QLineEdit()
+        self.objects_field.setPlaceholderText("Select Scene Objects")
+        self.objects_field.setReadOnly(True)
+        self.live_selection_checkbox = QtWidgets.QCheckBox("Live")
+        self.live_selection_checkbox.setToolTip("Follow the scene selection and the channel box separator "
+                                                "without clicking :: Objects :: or :: Separator ::")
+        self.objects_list_button = QtWidgets.QToolButton()
+        self.objects_list_button.setArrowType(QtCore.Qt.DownArrow)
+        self.objects_list_button.setCheckable(True)
+        self.objects_list_model = QtCore.QStringListModel()
+        self.objects_list = QtWidgets.QListView()
+        self.objects_list.setModel(self.objects_list_model)
+        self.objects_list.setUniformItemSizes(True)
+        self.objects_list.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.objects_list.setMaximumHeight(120)
+        self.objects_list.hide()
+        self.get_rule_objects_button = QtWidgets.QPushButton(":: Rules ::")
+        self.rules_field = QtWidgets.QLineEdit()
+        self.rules_field.setPlaceholderText("name:*_ctrl shape:nurbsCurve under:rig; set:ctrls")
+        self.rules_field.setToolTip("Target transforms by rule instead of by selection.\n"
+                                    "Criteria: name, regex, type, shape, under, set.\n"
+                                    "All criteria of a rule must match; rules are separated by ';'.")
+
+        # Separator Widgets
+        self.get_separator_button = QtWidgets.QPushButton(":: Separator ::")
+        self.separator_attr_field = QtWidgets.QLineEdit()
+        self.separator_attr_field.setPlaceholderText("Enum To Separate Attrs")
+        self.find_separator_button = QtWidgets.QPushButton(":: Find ::")
+        self.find_separator_button.setToolTip("Target every transform that already has this separator or attribute")
+
+        # Attributes Widgets
+        self.attrs_label = QtWidgets.QLabel(":: Attributes ::")
+        self.attrs_field = QtWidgets.QLineEdit()
+        self.attrs_field.setPlaceholderText("Example: attr_01/attr_02/..")
+
+        # Attribute Type Widgets
+        self.attribute_type_group = QtWidgets.QButtonGroup()
+        self.float_radio = QtWidgets.QRadioButton("float")
+        self.bool_radio = QtWidgets.QRadioButton("bool")
+        self.enum_radio = QtWidgets.QRadioButton("enum")
+        self.int_radio = QtWidgets.QRadioButton("int")
+        self.string_radio = QtWidgets.QRadioButton("string")
+        self.vector_radio = QtWidgets.QRadioButton("vector")
+        self.compound_radio = QtWidgets.QRadioButton("compound")
+        self.compound_radio.setToolTip("The first attribute is the compound, the others its float children")
+        for radio in (self.float_radio, self.bool_radio, self.enum_radio, self.int_radio,
+                      self.string_radio, self.vector_radio, self.compound_radio):
+            self.attribute_type_group.addButton(radio)
+        self.bool_radio.setChecked(True)
+        self.multi_checkbox = QtWidgets.QCheckBox("Multi")
+        self.multi_checkbox.setToolTip("Create multi (array) attributes")
+
+        # Min/Max Values
+        self.min_val_label = QtWidgets.QLabel(":: Min ::")
+
+        self.min_val_field = QtWidgets.QDoubleSpinBox()
+        self.min_val_field.setRange(-10000, 10000)
+        self.min_val_field.setValue(0)
+        self.min_val_field.setEnabled(False)
+
+        self.max_val_label = QtWidgets.QLabel(":: Max ::")
+
+        self.max_val_field = QtWidgets.QDoubleSpinBox()
+        self.max_val_field.setRange(-10000, 10000)
+        self.max_val_field.setValue(10)
+        self.max_val_field.setEnabled(False)
+
+        self.soft_checkbox = QtWidgets.QCheckBox("Soft")
+        self.soft_checkbox.setToolTip("Apply Min/Max as a soft (slider) range instead of hard limits")
+        self.soft_checkbox.setEnabled(False)
+
+        self.default_checkbox = QtWidgets.QCheckBox("Default")
+        self.default_val_field = QtWidgets.QDoubleSpinBox()
+        self.default_val_field.setRange(-10000, 10000)
+        self.default_val_field.setEnabled(False)
+
+        # Preset Widgets
+        self.preset_combo = QtWidgets.QComboBox()
+        self.preset_combo.setEditable(True)
+        self.preset_combo.lineEdit().setPlaceholderText("Preset Name")
+        self.preset_combo.addItems(schema.list_schemas())
+        self.preset_combo.setCurrentIndex(-1)
+        self.save_preset_button = QtWidgets.QPushButton(":: Save ::")
+        self.apply_preset_button = QtWidgets.QPushButton(":: Apply ::")
+
+        # Reorder Widgets
+        self.reorder_list = QtWidgets.QListWidget()
+        self.reorder_list.setDragDropMode(QtWidgets.QAbstractItemView.InternalMove)
+        self.reorder_list.setDefaultDropAction(QtCore.Qt.MoveAction)
+        self.reorder_list.setUniformItemSizes(True)
+        self.reorder_list.setMaximumHeight(110)
+        self.reorder_list.setToolTip("Drag the attributes into their new channel box order")
+        self.load_order_button = QtWidgets.QPushButton(":: Load ::")
+        self.reorder_button = QtWidgets.QPushButton(":: Reorder ::")
+
+        # Layout Widgets
+        self.mirror_rule_field = QtWidgets.QLineEdit()
+        self.mirror_rule_field.setPlaceholderText("Mirror Rule: L_*:R_*")
+        self.layout_values_checkbox = QtWidgets.QCheckBox("Values")
+        self.layout_values_checkbox.setToolTip("Copy the current values along with the layout")
+        self.transfer_layout_button = QtWidgets.QPushButton(":: Transfer ::")
+        self.transfer_layout_button.setToolTip("Copy the layout of the first object onto the others")
+        self.mirror_layout_button = QtWidgets.QPushButton(":: Mirror ::")
+        self.mirror_layout_button.setToolTip("Copy the layout of every object matching the rule onto its counterpart")
+
+        # Enum Fields Widgets
+        self.enum_edits_field = QtWidgets.QLineEdit()
+        self.enum_edits_field.setPlaceholderText("+new  +new@1  old>new  -old>other")
+        self.enum_edits_field.setToolTip("Edit the fields of the separator (or enum attribute) without\n"
+                                         "shifting the others: +append, +insert@position, old>rename,\n"
+                                         "-remove (>field taking over its values and keys).")
+        self.edit_enum_button = QtWidgets.QPushButton(":: Edit Enum ::")
+
+        # Run Widgets
+        self.delete_attrs_button = QtWidgets.QPushButton(":: Delete All ::")
+        self.preview_attrs_button = QtWidgets.QPushButton(":: Preview ::")
+        self.profile_checkbox = QtWidgets.QCheckBox("Profile")
+        self.profile_checkbox.setToolTip("Show a per-command timing report after each operation")
+        self.journal_checkbox = QtWidgets.QCheckBox("Journal")
+        self.journal_checkbox.setToolTip("Record every change to the operation journal, to resume or replay it:\n"
+                                         + journal.default_path())
+
+        # Progress Widgets
+        self.progress_bar = QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.eta_label = QtWidgets.QLabel()
+        self.cancel_button = QtWidgets.QPushButton(":: Cancel ::")
+        self.add_attrs_button = QtWidgets.QPushButton(":: Add New ::")
+
+    def create_layout(self):
+        main_layout = QtWidgets.QVBoxLayout(self)
+        organize_layout = QtWidgets.QVBoxLayout()
+
+        objects_row_layout = QtWidgets.QHBoxLayout()
+        objects_row_layout.addWidget(self.get_objects_button)
+        objects_row_layout.addWidget(self.objects_field)
+        objects_row_layout.addWidget(self.live_selection_checkbox)
+        objects_row_layout.addWidget(self.objects_list_button)
+        objects_layout = QtWidgets.QVBoxLayout()
+        objects_layout.addLayout(objects_row_layout)
+        objects_layout.addWidget(self.objects_list)
+        rules_row_layout = QtWidgets.QHBoxLayout()
+        rules_row_layout.addWidget(self.get_rule_objects_button)
+        rules_row_layout.addWidget(self.rules_field)
+        objects_layout.addLayout(rules_row_layout)
+        core.beautiful_organize(qt_grp_box_name="Objects",
+                                parent_layout=objects_layout,
+                                organize_layout=organize_layout)
+
+        separator_layout = QtWidgets.QHBoxLayout()
+        separator_layout.addWidget(self.get_separator_button)
+        separator_layout.addWidget(self.separator_attr_field)
+        separator_layout.addWidget(self.find_separator_button)
+        core.beautiful_organize(qt_grp_box_name="Separator",
+                                parent_layout=separator_layout,
+                                organize_layout=organize_layout)
+
+        attributes_layout = QtWidgets.QHBoxLayout()
+        attributes_layout.addWidget(self.attrs_label)
+        attributes_layout.addWidget(self.attrs_field)
+        core.beautiful_organize(qt_grp_box_name="Attributes",
+                                parent_layout=attributes_layout,
+                                organize_layout=organize_layout)
+
+        basic_types_layout = QtWidgets.QHBoxLayout()
+        basic_types_layout.addWidget(self.float_radio)
+        basic_types_layout.addWidget(self.bool_radio)
+        basic_types_layout.addWidget(self.enum_radio)
+        basic_types_layout.addWidget(self.int_radio)
+        extended_types_layout = QtWidgets.QHBoxLayout()
+        extended_types_layout.addWidget(self.string_radio)
+        extended_types_layout.addWidget(self.vector_radio)
+        extended_types_layout.addWidget(self.compound_radio)
+        extended_types_layout.addWidget(self.multi_checkbox)
+        attributes_type_layout = QtWidgets.QVBoxLayout()
+        attributes_type_layout.addLayout(basic_types_layout)
+        attributes_type_layout.addLayout(extended_types_layout)
+        core.beautiful_organize(qt_grp_box_name="Attributes_Type",
+                                parent_layout=attributes_type_layout,
+                                organize_layout=organize_layout)
+
+        min_max_layout = QtWidgets.QHBoxLayout()
+        min_max_layout.addWidget(self.min_val_label)
+        min_max_layout.addWidget(self.min_val_field)
+        min_max_layout.addStretch()
+        min_max_layout.addWidget(self.max_val_label)
+        min_max_layout.addWidget(self.max_val_field)
+        min_max_layout.addWidget(self.soft_checkbox)
+        default_layout = QtWidgets.QHBoxLayout()
+        default_layout.addWidget(self.default_checkbox)
+        default_layout.addWidget(self.default_val_field)
+        default_layout.addStretch()
+        values_layout = QtWidgets.QVBoxLayout()
+        values_layout.addLayout(min_max_layout)
+        values_layout.addLayout(default_layout)
+        core.beautiful_organize(qt_grp_box_name="Max____Min",
+                                parent_layout=values_layout,
+                                organize_layout=organize_layout)
+
+        presets_layout = QtWidgets.QHBoxLayout()
+        presets_layout.addWidget(self.preset_combo)
+        presets_layout.addWidget(self.save_preset_button)
+        presets_layout.addWidget(self.apply_preset_button)
+        core.beautiful_organize(qt_grp_box_name="Presets",
+                                parent_layout=presets_layout,
+                                organize_layout=organize_layout)
+
+        reorder_buttons_layout = QtWidgets.QVBoxLayout()
+        reorder_buttons_layout.addWidget(self.load_order_button)
+        reorder_buttons_layout.addWidget(self.reorder_button)
+        reorder_buttons_layout.addStretch()
+        reorder_layout = QtWidgets.QHBoxLayout()
+        reorder_layout.addWidget(self.reorder_list)
+        reorder_layout.addLayout(reorder_buttons_layout)
+        core.beautiful_organize(qt_grp_box_name="Reorder",
+                                parent_layout=reorder_layout,
+                                organize_layout=organize_layout)
+
+        layout_row_layout = QtWidgets.QHBoxLayout()
+        layout_row_layout.addWidget(self.mirror_rule_field)
+        layout_row_layout.addWidget(self.layout_values_checkbox)
+        layout_row_layout.addWidget(self.transfer_layout_button)
+        layout_row_layout.addWidget(self.mirror_layout_button)
+        core.beautiful_organize(qt_grp_box_name="Layout",
+                                parent_layout=layout_row_layout,
+                                organize_layout=organize_layout)
+
+        enum_fields_layout = QtWidgets.QHBoxLayout()
+        enum_fields_layout.addWidget(self.enum_edits_field)
+        enum_fields_layout.addWidget(self.edit_enum_button)
+        core.beautiful_organize(qt_grp_box_name="Enum Fields",
+                                parent_layout=enum_fields_layout,
+                                organize_layout=organize_layout)
+
+        build_layout = QtWidgets.QHBoxLayout()
+        build_layout.addWidget(self.delete_attrs_button)
+        build_layout.addWidget(self.preview_attrs_button)
+        build_layout.addWidget(self.add_attrs_button)
+        build_layout.addWidget(self.profile_checkbox)
+        build_layout.addWidget(self.journal_checkbox)
+        core.beautiful_organize(qt_grp_box_name="Build",
+                                parent_layout=build_layout,
+                                organize_layout=organize_layout)
+
+        progress_layout = QtWidgets.QHBoxLayout()
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.eta_label)
+        progress_layout.addWidget(self.cancel_button)
+        self.progress_group = QtWidgets.QGroupBox("Progress")
+        self.progress_group.setLayout(progress_layout)
+        core.tag_style([self.progress_group], "group_box")
+        self.progress_group.hide()
+        organize_layout.addWidget(self.progress_group)
+
+        main_layout.addLayout(organize_layout)
+
+    def define_widgets_style_sheet(self):
+        # Group widgets by style
+        widgets_by_style = {
+            "button_blue": [self.get_objects_button, self.get_rule_objects_button, self.get_separator_button,
+                            self.find_separator_button, self.preview_attrs_button, self.save_preset_button,
+                            self.load_order_button],
+            "button_green": [self.add_attrs_button, self.apply_preset_button, self.reorder_button,
+                             self.transfer_layout_button, self.mirror_layout_button, self.edit_enum_button],
+            "button_red": [self.delete_attrs_button, self.cancel_button],
+            "line_edit": [self.objects_field, self.rules_field, self.separator_attr_field, self.attrs_field,
+                          self.mirror_rule_field, self.enum_edits_field],
+            "label": [self.attrs_label, self.min_val_label, self.max_val_label],
+            "spin_box": [self.min_val_field, self.max_val_field, self.default_val_field],
+            "radio_button": [self.bool_radio, self.float_radio, self.enum_radio, self.int_radio,
+                             self.string_radio, self.vector_radio, self.compound_radio, self.multi_checkbox,
+                             self.soft_checkbox, self.default_checkbox, self.layout_values_checkbox,
+                             self.profile_checkbox, self.journal_checkbox, self.live_selection_checkbox],
+        }
+
+        # Tag the widgets, then style them all with one dialog-level stylesheet
+        for style, widgets in widgets_by_style.items():
+            core.tag_style(widget_list=widgets, style=style)
+        self.setStyleSheet(core.combined_style_sheet())
+
+    def create_connections(self):
+        self.get_objects_button.clicked.connect(self.get_scene_objects)
+        self.objects_list_button.toggled.connect(self.toggle_objects_list)
+        self.live_selection_checkbox.toggled.connect(self.toggle_live_selection)
+        self.get_rule_objects_button.clicked.connect(self.get_rule_objects)
+        self.rules_field.returnPressed.connect(self.get_rule_objects)
+        self.get_separator_button.clicked.connect(self.get_channelbox_separator)
+        self.find_separator_button.clicked.connect(self.find_attr_owners)
+
+        self.attribute_type_group.buttonClicked.connect(self.get_attrs_type)
+        self.attribute_type_group.buttonClicked.connect(self.control_double_field)
+        self.default_checkbox.toggled.connect(self.control_double_field)
+
+        self.add_attrs_button.clicked.connect(self.add_attrs)
+        self.preview_attrs_button.clicked.connect(self.preview_attrs)
+        self.delete_attrs_button.clicked.connect(self.delete_all_attributes)
+        self.cancel_button.clicked.connect(self.cancel_task)
+
+        self.preset_combo.activated.connect(self.load_preset)
+        self.save_preset_button.clicked.connect(self.save_preset)
+        self.apply_preset_button.clicked.connect(self.apply_preset)
+
+        self.load_order_button.clicked.connect(self.load_attrs_order)
+        self.reorder_button.clicked.connect(self.reorder_attrs)
+
+        self.transfer_layout_button.clicked.connect(self.transfer_layout)
+        self.mirror_layout_button.clicked.connect(self.mirror_layouts)
+
+        self.edit_enum_button.clicked.connect(self.edit_enum_fields)
+        self.enum_edits_field.returnPressed.connect(self.edit_enum_fields)
+
+    def control_double_field(self):
+        # Numeric types, vectors and compound (float) children take a range.
+        attribute_type = backends.normalize_type(self.get_attrs_type())
+        ranged = (attribute_type in backends.RANGED_TYPES or attribute_type in backends.VECTOR_TYPES
+                  or attribute_type == "compound")
+        for widget in (self.min_val_field, self.max_val_field, self.soft_checkbox):
+            widget.setEnabled(ranged)
+        self.default_checkbox.setEnabled(ranged)
+        core.connect_widget_to_widget(drv_widget=self.default_checkbox,
+                                      driven_widget_list=[self.default_val_field])
+        self.default_val_field.setEnabled(ranged and self.default_checkbox.isChecked())
+
+    def get_scene_objects(self):
+        self.selection_model.set_from_selection(node_type="transform")
+        self.refresh_objects_field()
+
+    def get_rule_objects(self):
+        from crv_attrs import targeting
+        try:
+            rules = targeting.parse_rules(self.rules_field.text())
+        except ValueError as error:
+            QtWidgets.QMessageBox.warning(self, "Rules", str(error))
+            return
+
+        # The index is kept current by callbacks, so re-running a rule costs no rescan.
+        self.selection_model.set_uuids(targeting.scene_index(cmds=cmds).resolve_uuids(rules) if rules else [])
+        self.refresh_objects_field()
+
+    def refresh_objects_field(self):
+        self.objects_field.setText(self.selection_model.summary())
+        if self.objects_list.isVisible():
+            self.fill_objects_list()
+
+    def fill_objects_list(self, expanded=True):
+        self.listed_uuids = self.selection_model.uuids if expanded else []
+        self.objects_list_model.setStringList(self.selection_model.names() if expanded else [])
+
+    def toggle_objects_list(self, expanded):
+        # Names are only resolved when the list is actually shown.
+        self.objects_list_button.setArrowType(QtCore.Qt.UpArrow if expanded else QtCore.Qt.DownArrow)
+        self.fill_objects_list(expanded)
+        self.objects_list.setVisible(expanded)
+        self.setMaximumHeight(760 if expanded else 640)
+
+    # ----------------- Live Selection ----------
+    def toggle_live_selection(self, enabled):
+        if not enabled:
+            self.live_selection.stop()
+        elif not self.live_selection.start():
+            self.live_selection_checkbox.setChecked(False)
+        self.get_objects_button.setEnabled(not enabled)
+
+    def schedule_live_update(self, seconds, callback):
+        QtCore.QTimer.singleShot(int(seconds * 1000), callback)
+
+    def update_live_objects(self, added, removed):
+        # Only the count is shown until the list is expanded.
+        self.objects_field.setText(self.selection_model.summary())
+        if not self.objects_list.isVisible():
+            return
+
+        # Keep the listed names and resolve only the added nodes, unless the order changed.
+        removed = set(removed)
+        kept = [uuid for uuid in self.listed_uuids if uuid not in removed]
+        names = self.objects_list_model.stringList()
+        added_names = cmds.ls(added, long=False) or [] if added else []
+        if (kept + added != self.selection_model.uuids or len(names) != len(self.listed_uuids)
+                or len(added_names) != len(added)):
+            self.fill_objects_list()
+            return
+        kept_names = [name for name, uuid in zip(names, self.listed_uuids) if uuid not in removed]
+        self.listed_uuids = kept + added
+        self.objects_list_model.setStringList(kept_names + added_names)
+
+    def update_live_separator(self):
+        attr = core.get_channelbox_attr()
+        if attr and attr != self.separator_attr_field.text():
+            self.separator_attr_field.setText(str(attr))
+
+    def showEvent(self, event):
+        if self.live_selection_checkbox.isChecked():
+            self.toggle_live_selection(True)
+        super().showEvent(event)
+
+    def closeEvent(self, event):
+        # No callbacks are left running while the dialog is hidden.
+        self.live_selection.stop()
+        super().closeEvent(event)
+
+    def get_channelbox_separator(self):
+        attr = core.get_channelbox_attr()
+        self.separator_attr_field.setText(str(attr))
+
+    def find_attr_owners(self):
+        from crv_attrs import inventory
+        attr = self.separator_attr_field.text().strip()
+        if not attr:
+            return
+
+        # Answered from the scene inventory, without scanning the scene again.
+        self.selection_model.set_uuids(inventory.scene_inventory().nodes_with_attr(attr, uuids=True))
+        self.refresh_objects_field()
+
+    def get_attrs_names(self):
+        # "a//b/" and stray spaces would otherwise become empty or invalid names.
+        return [name.strip() for name in self.attrs_field.text().split("/") if name.strip()]
+
+    def get_attrs_type(self):
+        for button in self.attribute_type_group.buttons():
+            if button.isChecked():
+                return str(button.text())
+
+    def get_create_kwargs(self):
+        attrs_names = self.get_attrs_names()
+        chosen_separator_attr = self.separator_attr_field.text()
+        objects = self.selection_model.names()
+
+        if not (objects and chosen_separator_attr and attrs_names):
+            return None
+
+        return dict(objects=objects,
+                    attrs_names=attrs_names,
+                    chosen_separator_attr=chosen_separator_attr,
+                    attribute_type=self.get_attrs_type(),
+                    **self.get_value_kwargs())
+
+    def get_value_kwargs(self):
+        # With "Soft" checked, Min/Max become the slider range and no hard limits are set.
+        min_val, max_val = self.min_val_field.value(), self.max_val_field.value()
+        soft = self.soft_checkbox.isChecked()
+        return {"min_val": None if soft else min_val,
+                "max_val": None if soft else max_val,
+                "soft_min": min_val if soft else None,
+                "soft_max": max_val if soft else None,
+                "default_val": self.default_val_field.value() if self.default_checkbox.isChecked() else None,
+                "multi": self.multi_checkbox.isChecked()}
+
+    def run_chunked(self, operation_name, objects, function):
+        """
+        Runs `function(chunk)` over `objects` in chunks from the event loop, as one
+        undo step, while the progress bar and Cancel button stay responsive.
+        Data that could not be carried over by re-created attributes is reported at the end.
+        """
+        from crv_attrs import journal, profiler, scheduler
+        if self.task or not objects:
+            return
+
+        issues = []
+
+        def run_chunk(chunk):
+            plan = function(chunk)
+            snapshots = getattr(plan, "snapshots", None)
+            if snapshots:
+                issues.extend(snapshots.issues)
+            remapped = getattr(plan, "remapped", None)
+            if remapped is not None:
+                issues.extend(remapped.issues)
+
+        session_stack = contextlib.ExitStack()
+        session = None
+        if self.profile_checkbox.isChecked():
+            session = session_stack.enter_context(profiler.profile(operation_name))
+        log = None
+        if self.journal_checkbox.isChecked():
+            log = session_stack.enter_context(journal.recording(journal.default_path(), operation_name, objects))
+
+        def finished(task):
+            if log is not None:
+                log.status = journal.CANCELLED if task.cancelled else journal.FAILED if task.error else None
+            session_stack.close()
+            if session:
+                # Only the chunks count as work; the event loop ran between them.
+                session.exclude_idle(task.elapsed)
+            self.task = self.task_timer = None
+            self.set_running(False)
+            if task.error is not None:
+                QtWidgets.QMessageBox.critical(self, operation_name,
+                                               f"Failed after {task.done} of {task.total} objects:\n"
+                                               f"{type(task.error).__name__}: {task.error}\n\n"
+                                               "The objects done so far stay edited (one undo step).")
+            elif task.cancelled:
+                QtWidgets.QMessageBox.information(self, operation_name,
+                                                  f"Cancelled after {task.done} of {task.total} objects.")
+            if issues:
+                lines = [f"{plug}: {message}" for plug, message in issues[:20]]
+                if len(issues) > 20:
+                    lines.append(f"... and {len(issues) - 20} more")
+                QtWidgets.QMessageBox.warning(self, operation_name,
+                                              f"{len(issues)} values or connections could not be kept:\n"
+                                              + "\n".join(lines))
+            if session:
+                QtWidgets.QMessageBox.information(self, f"Profile :: {operation_name}", session.format_report())
+
+        self.task = scheduler.ChunkedTask(objects, run_chunk, name=operation_name, cmds=cmds)
+        self.set_running(True)
+        self.task_timer = scheduler.run_deferred(self.task, on_progress=self.update_progress, on_finished=finished,
+                                                 interactive=(self.cancel_button,))
+
+    def set_running(self, running):
+        for widget in (self.add_attrs_button, self.delete_attrs_button, self.preview_attrs_button,
+                       self.apply_preset_button, self.reorder_button, self.transfer_layout_button,
+                       self.mirror_layout_button, self.edit_enum_button):
+            widget.setEnabled(not running)
+        self.progress_bar.setValue(0)
+        self.eta_label.setText("")
+        self.progress_group.setVisible(running)
+
+    def update_progress(self, task):
+        self.progress_bar.setValue(int(task.progress * 100))
+        self.progress_bar.setFormat(f"{task.done}/{task.total}")
+        eta = task.eta
+        self.eta_label.setText(f"ETA {eta:.1f}s" if eta is not None else "")
+
+    def cancel_task(self):
+        if self.task:
+            self.task.cancel()
+
+    def add_attrs(self):
+        from crv_attrs import inventory
+        create_kwargs = self.get_create_kwargs()
+        if not create_kwargs:
+            return
+        objects = create_kwargs.pop("objects")
+        scene_inventory = inventory.scene_inventory()
+
+        # Check the whole request before the first object is edited.
+        report = core.validate_attributes(objects=objects, inventory=scene_inventory, **create_kwargs)
+        if not report.ok:
+            QtWidgets.QMessageBox.warning(self, "Add New", report.report(verbose=True))
+            return
+        if report.warnings():
+            answer = QtWidgets.QMessageBox.question(self, "Add New", report.report(verbose=True) + "\n\nContinue?")
+            if answer != QtWidgets.QMessageBox.Yes:
+                return
+
+        self.run_chunked("Add New", objects,
+                         lambda chunk: core.create_custom_attributes(objects=chunk, inventory=scene_inventory,
+                                                                     **create_kwargs))
+
+    def preview_attrs(self):
+        create_kwargs = self.get_create_kwargs()
+        if create_kwargs:
+            plan = core.create_custom_attributes(dry_run=True, **create_kwargs)
+            QtWidgets.QMessageBox.information(self, "Preview", plan.report(verbose=True))
+
+    def delete_all_attributes(self):
+        objects = self.selection_model.names()
+        if not objects:
+            return
+
+        # Show what would be removed (and skipped) before committing.
+        plan = core.delete_all_attrs(objects=objects, dry_run=True)
+        answer = QtWidgets.QMessageBox.question(self, "Delete All", plan.report(verbose=True) + "\n\nDelete?")
+        if answer != QtWidgets.QMessageBox.Yes:
+            return
+
+        self.run_chunked("Delete All", objects, lambda chunk: core.delete_all_attrs(objects=chunk))
+
+    def get_preset_schema(self):
+        from crv_attrs import schema
+        preset_name = self.preset_combo.currentText()
+        if preset_name not in schema.list_schemas():
+            return None
+        return schema.load_schema(preset_name)
+
+    def load_preset(self):
+        # Fill the fields when the preset fits them (a single attribute type).
+        attr_schema = self.get_preset_schema()
+        if attr_schema is None:
+            return
+
+        self.separator_attr_field.setText(attr_schema.separator)
+        types = {attribute["type"] for attribute in attr_schema.attributes}
+        if not attr_schema.attributes:
+            self.attrs_field.setText("/".join(name for _, name in
+                                              backends.parse_enum_string(attr_schema.separator_enum)))
+            self.enum_radio.setChecked(True)
+        elif len(types) == 1:
+            self.attrs_field.setText("/".join(attribute["name"] for attribute in attr_schema.attributes))
+            first = attr_schema.attributes[0]
+            if first["type"] == "compound":
+                # A compound fills the fields as "compound/child/child".
+                children = first.get("children", [])
+                self.attrs_field.setText("/".join([first["name"]] + [child["name"] for child in children]))
+                first = children[0] if children else first
+            radio = {"float": self.float_radio, "bool": self.bool_radio, "long": self.int_radio,
+                     "int": self.int_radio, "string": self.string_radio, "double3": self.vector_radio,
+                     "vector": self.vector_radio, "compound": self.compound_radio}.get(types.pop())
+            if radio:
+                radio.setChecked(True)
+            self.multi_checkbox.setChecked(bool(attr_schema.attributes[0].get("multi")))
+            soft = first.get("min") is None and first.get("max") is None \
+                and (first.get("soft_min") is not None or first.get("soft_max") is not None)
+            self.soft_checkbox.setChecked(soft)
+            for key, field in (("min", self.min_val_field), ("max", self.max_val_field)):
+                value = first.get(f"soft_{key}" if soft else key)
+                if value is not None:
+                    field.setValue(value)
+            default_val = first.get("default")
+            self.default_checkbox.setChecked(isinstance(default_val, (int, float)))
+            if isinstance(default_val, (int, float)):
+                self.default_val_field.setValue(default_val)
+            self.control_double_field()
+
+    def save_preset(self):
+        from crv_attrs import schema
+        preset_name = self.preset_combo.currentText().strip()
+        attrs_names = self.get_attrs_names()
+        chosen_separator_attr = self.separator_attr_field.text()
+        if not (preset_name and attrs_names and chosen_separator_attr):
+            return
+
+        attr_schema = schema.AttrSchema.from_fields(name=preset_name,
+                                                    attrs_names=attrs_names,
+                                                    chosen_separator_attr=chosen_separator_attr,
+                                                    attribute_type=self.get_attrs_type(),
+                                                    **self.get_value_kwargs())
+        try:
+            schema.compile_schema(attr_schema)
+        except schema.SchemaError as error:
+            QtWidgets.QMessageBox.warning(self, "Presets", str(error))
+            return
+
+        schema.save_schema(attr_schema)
+        if self.preset_combo.findText(preset_name) < 0:
+            self.preset_combo.addItem(preset_name)
+
+    def apply_preset(self):
+        from crv_attrs import schema
+        attr_schema = self.get_preset_schema()
+        if attr_schema is None:
+            return
+
+        try:
+            compiled = schema.compile_schema(attr_schema)
+        except schema.SchemaError as error:
+            QtWidgets.QMessageBox.warning(self, "Presets", str(error))
+            return
+
+        self.run_chunked(f"Apply {compiled.name}", self.selection_model.names(),
+                         lambda chunk: schema.apply_schema(objects=chunk, schema=compiled))
+
+    def load_attrs_order(self):
+        # The list shows the current order of the first target object.
+        objects = self.selection_model.names()
+        self.reorder_list.clear()
+        if objects:
+            self.reorder_list.addItems(backends.get_backend().list_user_attrs(objects[:1])[objects[0]])
+
+    def reorder_attrs(self):
+        order = [self.reorder_list.item(row).text() for row in range(self.reorder_list.count())]
+        if order:
+            self.run_chunked("Reorder", self.selection_model.names(),
+                             lambda chunk: core.reorder_attrs(objects=chunk, order=order))
+
+    def confirm_layout_plan(self, operation_name, plan):
+        # The dry run validates every target before the first one is edited.
+        if not plan.validation.ok:
+            QtWidgets.QMessageBox.warning(self, operation_name, plan.validation.report(verbose=True))
+            return False
+        answer = QtWidgets.QMessageBox.question(self, operation_name, plan.report(verbose=True) + "\n\nContinue?")
+        return answer == QtWidgets.QMessageBox.Yes
+
+    def transfer_layout(self):
+        from crv_attrs import inventory, layout
+        objects = self.selection_model.names()
+        if len(objects) < 2:
+            return
+
+        # The source layout is read once and shared by every chunk.
+        scene_inventory = inventory.scene_inventory()
+        values = self.layout_values_checkbox.isChecked()
+        source_layout = layout.read_layout(objects[0], inventory=scene_inventory, values=values)
+        plan = layout.transfer_layout(source_layout, objects[1:], dry_run=True, inventory=scene_inventory,
+                                      values=values)
+        if self.confirm_layout_plan("Transfer", plan):
+            self.run_chunked("Transfer", objects[1:],
+                             lambda chunk: layout.transfer_layout(source_layout, chunk, inventory=scene_inventory,
+                                                                  values=values))
+
+    def mirror_layouts(self):
+        from crv_attrs import inventory, layout
+        objects = self.selection_model.names()
+        try:
+            rule = layout.MirrorRule.parse(self.mirror_rule_field.text() or "L_*:R_*")
+        except ValueError as error:
+            QtWidgets.QMessageBox.warning(self, "Mirror", str(error))
+            return
+        if not objects:
+            return
+
+        scene_inventory = inventory.scene_inventory()
+        values = self.layout_values_checkbox.isChecked()
+        plan = layout.mirror_layouts(objects, rule, dry_run=True, inventory=scene_inventory, values=values)
+        if self.confirm_layout_plan("Mirror", plan):
+            self.run_chunked("Mirror", objects,
+                             lambda chunk: layout.mirror_layouts(chunk, rule, inventory=scene_inventory,
+                                                                 values=values))
+
+    def edit_enum_fields(self):
+        from crv_attrs import enums
+        attr = self.separator_attr_field.text()
+        try:
+            edits = enums.parse_edits(self.enum_edits_field.text())
+        except ValueError as error:
+            QtWidgets.QMessageBox.warning(self, "Edit Enum", str(error))
+            return
+        if not attr or not edits:
+            return
+
+        self.run_chunked("Edit Enum", self.selection_model.names(),
+                         lambda chunk: core.edit_enum_fields(objects=chunk, attr=attr, edits=edits))
+
+
+# -------------------------------------------------
+# ----------------- Launch ------------------------
+# -------------------------------------------------
+_dialog = None
+
+
+def _alive(dialog):
+    try:
+        dialog.isVisible()
+    except RuntimeError:
+        # The C++ dialog was deleted with its parent.
+        return False
+    return True
+
+
+def show():
+    """
+    Shows the tool, building the dialog on the first launch of the session and
+    raising the same dialog, with its fields as they were left, on the next ones.
+
+    Returns:
+        SmartAttributeUI: The dialog.
+    """
+    global _dialog
+    start = time.perf_counter()
+    if _dialog is None or not _alive(_dialog):
+        _dialog = SmartAttributeUI()
+        STARTUP_TIMES["build"] = time.perf_counter() - start
+    else:
+        STARTUP_TIMES["build"] = 0.0
+
+    _dialog.show()
+    _dialog.raise_()
+    _dialog.activateWindow()
+    STARTUP_TIMES["show"] = time.perf_counter() - start
+    return _dialog
+
+
+def close():
+    """
+    Closes and deletes the dialog, so the next `show` builds a new one. A running
+    task is cancelled and left to finish first, closing its undo chunk and journal.
+    """
+    global _dialog
+    if _dialog is not None and _alive(_dialog):
+        _dialog.cancel_task()
+        while _dialog.task is not None:
+            QtWidgets.QApplication.processEvents()
+        _dialog.close()
+        _dialog.deleteLater()
+    _dialog = None
+
+
+def startup_report():
+    """
+    Returns the startup times of the last launch as readable text.
+    """
+    return "  ".join(f"{step} {STARTUP_TIMES[step] * 1000:.1f}ms"
+                     for step in ("import", "build", "show") if step in STARTUP_TIMES)
+
+
+STARTUP_TIMES["import"] = time.perf_counter() - _import_start
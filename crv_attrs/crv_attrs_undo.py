@@ -0,0 +1,50 @@
+"""
+Maya plug-in that puts the `MDGModifier` batches built by
+`backends.OpenMayaBackend` on Maya's undo queue.
+
+The backend loads this file with `cmds.loadPlugin` and then calls the
+`crvAttrsDoIt` command, which takes the pending modifier, runs it, and keeps it
+around for undo/redo.
+"""
+import maya.api.OpenMaya as om
+
+
+def maya_useNewAPI():
+    """
+    Tells Maya this plug-in uses the Python API 2.0.
+    """
+
+
+class CrvAttrsDoIt(om.MPxCommand):
+    command_name = "crvAttrsDoIt"
+
+    def __init__(self):
+        super().__init__()
+        self._modifier = None
+
+    @staticmethod
+    def creator():
+        return CrvAttrsDoIt()
+
+    def doIt(self, args):
+        from crv_attrs import backends
+
+        self._modifier = backends.pop_pending_modifier()
+        self.redoIt()
+
+    def redoIt(self):
+        self._modifier.doIt()
+
+    def undoIt(self):
+        self._modifier.undoIt()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    om.MFnPlugin(plugin, "RigTopia", "1.0").registerCommand(CrvAttrsDoIt.command_name, CrvAttrsDoIt.creator)
+
+
+def uninitializePlugin(plugin):
+    om.MFnPlugin(plugin).deregisterCommand(CrvAttrsDoIt.command_name)
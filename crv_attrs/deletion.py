@@ -0,0 +1,181 @@
+"""
+Selective bulk deletion of user-defined attributes.
+
+`plan_deletion` reads the attributes of every object in one pass and picks
+the ones matching an `AttrFilter`: name patterns, a separator section, types,
+or everything that is not part of a schema. Attributes that cannot be deleted
+(locked ones, and every attribute of a referenced node) are reported as
+skipped upfront instead of failing halfway through. The plan can be shown
+before anything changes, then applied with a single backend flush:
+
+    plan = deletion.plan_deletion(objects, deletion.AttrFilter(section="FACE"))
+    print(plan.report())
+    deletion.apply_deletion(plan)
+"""
+import fnmatch
+
+from crv_attrs import backends, planner, profiler
+
+# Skip reasons
+LOCKED = "locked"
+REFERENCED = "referenced"
+
+
+class AttrFilter:
+    """
+    Selects the user-defined attributes to delete. Every given criterion must match.
+
+    Args:
+        patterns (list): Name globs; an attribute matching any of them is selected.
+        section (str): Separator whose section is selected: the separator itself
+                       and the attributes following it, up to the next separator.
+        attr_types (list): Attribute types to select (e.g. ["float", "bool"]).
+        not_in (list): Attribute names to keep, or a schema (AttrSchema or
+                       CompiledSchema) whose separator and attributes are kept.
+    """
+
+    def __init__(self, patterns: list = None, section: str = None, attr_types: list = None, not_in=None):
+        self.patterns = [patterns] if isinstance(patterns, str) else list(patterns or [])
+        self.section = section
+        self.attr_types = set(attr_types or [])
+        self.keep = _kept_names(not_in) if not_in is not None else None
+
+    def select(self, states: dict):
+        """
+        Returns the selected attributes of one node, in creation order.
+
+        Args:
+            states (dict): The ordered {attr: AttrState} of the node.
+        """
+        selected = []
+        section = None
+        for attr, state in states.items():
+            if planner.is_separator(state):
+                section = attr
+            if self.patterns and not any(fnmatch.fnmatchcase(attr, pattern) for pattern in self.patterns):
+                continue
+            if self.section and section != self.section:
+                continue
+            if self.attr_types and state.attr_type not in self.attr_types:
+                continue
+            if self.keep is not None and attr in self.keep:
+                continue
+            selected.append(attr)
+
+        return selected
+
+
+def _kept_names(not_in):
+    if hasattr(not_in, "separator"):
+        from crv_attrs import schema
+        not_in = schema.compile_schema(not_in)
+    if hasattr(not_in, "separator_spec"):
+        return {not_in.separator_spec.name} | {spec.name for spec in not_in.attr_specs}
+    return set(not_in)
+
+
+class DeletionPlan(planner.AttrPlan):
+    """
+    Deletions selected by `plan_deletion`, plus the attributes skipped and why.
+    """
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        nodes = {change.node for change in self.changes}
+        lines = [f"{len(self.changes)} attributes to delete on {len(nodes)} objects"]
+        if self.skipped:
+            reasons = {}
+            for _, _, reason in self.skipped:
+                reasons[reason] = reasons.get(reason, 0) + 1
+            lines.append("skipped: " + ", ".join(f"{count} {reason}" for reason, count in reasons.items()))
+        if verbose:
+            lines.extend(f"  delete     {change.node}.{change.attr}" for change in self.changes[:limit])
+            lines.extend(f"  {reason:<10} {node}.{attr}" for node, attr, reason in self.skipped[:limit])
+            if len(self.changes) > limit or len(self.skipped) > limit:
+                lines.append("  ...")
+
+        return "\n".join(lines)
+
+
+def referenced_nodes(cmds, nodes: list):
+    """
+    Returns the subset of `nodes` (as given) read from a referenced file, with two `ls` calls.
+    """
+    nodes = list(dict.fromkeys(nodes))
+    referenced = set(cmds.ls(nodes, referencedNodes=True, long=True) or []) if nodes else set()
+    if not referenced:
+        return set()
+    return {node for node, path in backends.long_names(cmds, nodes).items() if path in referenced}
+
+
+def plan_deletion(objects: list,
+                  attr_filter: AttrFilter = None,
+                  backend: backends.AttrBackend = None,
+                  inventory=None):
+    """
+    Selects the attributes to delete on every object, without editing the scene.
+
+    Args:
+        objects (list): Object names.
+        attr_filter (AttrFilter): What to delete. Every user-defined attribute when omitted.
+        backend (AttrBackend): Used to read the attributes. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+
+    Returns:
+        DeletionPlan: One DELETE change per deletable attribute, and the skipped
+                      (node, attr, reason) entries.
+    """
+    backend = backend or backends.get_backend()
+    attr_filter = attr_filter or AttrFilter()
+    if not objects:
+        return DeletionPlan()
+
+    if inventory is not None:
+        current_states = inventory.states_for(objects)
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(objects)
+    referenced = referenced_nodes(backend.cmds, objects)
+
+    changes = []
+    skipped = []
+    for node, states in current_states.items():
+        for attr in attr_filter.select(states):
+            if node in referenced:
+                skipped.append((node, attr, REFERENCED))
+            elif states[attr].locked:
+                skipped.append((node, attr, LOCKED))
+            else:
+                changes.append(planner.AttrChange(node, attr, planner.DELETE, state=states[attr]))
+
+    return DeletionPlan(changes, skipped)
+
+
+def apply_deletion(plan: DeletionPlan,
+                   backend: backends.AttrBackend = None,
+                   inventory=None):
+    """
+    Deletes every attribute of the plan with a single backend flush.
+
+    Returns:
+        DeletionPlan: The applied plan.
+    """
+    return planner.apply_plan(plan, backend=backend, inventory=inventory)
+
+
+def delete_attrs(objects: list,
+                 attr_filter: AttrFilter = None,
+                 backend: backends.AttrBackend = None,
+                 dry_run: bool = False,
+                 inventory=None):
+    """
+    Plans and, unless `dry_run` is set, applies a selective deletion.
+
+    Returns:
+        DeletionPlan: The planned (and applied) deletions.
+    """
+    backend = backend or backends.get_backend()
+    plan = plan_deletion(objects, attr_filter=attr_filter, backend=backend, inventory=inventory)
+    if dry_run:
+        return plan
+
+    return apply_deletion(plan, backend=backend, inventory=inventory)
@@ -0,0 +1,186 @@
+"""
+Scene-independent implementation of the attribute operations exposed by `core`.
+
+Everything here talks to the scene through an `AttrBackend`, so it runs the
+same way inside Maya and against in-memory stand-ins of `maya.cmds`/OpenMaya.
+"""
+from crv_attrs import backends, deletion, planner, snapshot, validation
+
+
+def create_custom_attributes(objects: list,
+                             attrs_names: list,
+                             chosen_separator_attr: str,
+                             attribute_type: str,
+                             min_val: float,
+                             max_val: float,
+                             backend: backends.AttrBackend = None,
+                             dry_run: bool = False,
+                             inventory=None,
+                             preserve: bool = True,
+                             default_val=None,
+                             soft_min: float = None,
+                             soft_max: float = None,
+                             multi: bool = False):
+    """
+    Backend-driven body of `core.create_custom_attributes`.
+
+    The current attributes of every object are read in one pass and diffed
+    against the request; only the resulting changes are sent to the backend,
+    which is flushed once at the end.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) changes.
+    """
+    if not attrs_names or not objects:
+        return planner.AttrPlan()
+
+    separator_spec, attr_specs, removed_attrs = planner.build_specs(attrs_names=attrs_names,
+                                                                   chosen_separator_attr=chosen_separator_attr,
+                                                                   attribute_type=attribute_type,
+                                                                   min_val=min_val,
+                                                                   max_val=max_val,
+                                                                   default_val=default_val,
+                                                                   soft_min=soft_min,
+                                                                   soft_max=soft_max,
+                                                                   multi=multi)
+
+    return apply_specs(objects=objects,
+                       separator_spec=separator_spec,
+                       attr_specs=attr_specs,
+                       removed_attrs=removed_attrs,
+                       backend=backend,
+                       dry_run=dry_run,
+                       inventory=inventory,
+                       preserve=preserve)
+
+
+def apply_specs(objects: list,
+                separator_spec: planner.AttrSpec,
+                attr_specs: list,
+                removed_attrs: list = (),
+                backend: backends.AttrBackend = None,
+                dry_run: bool = False,
+                inventory=None,
+                preserve: bool = True):
+    """
+    Plans and applies a separator section described by specs on every object.
+
+    This is the common path of `create_custom_attributes` and of compiled schemas.
+    With an `AttrInventory`, the current attributes are taken from it instead of
+    being read from the scene, and the applied changes are written back into it.
+    With `preserve`, attributes re-created with a new type keep their value
+    (converted), connections, keys, lock and keyable state; see `snapshot`.
+
+    The request is validated against every object first (see `validation`),
+    from the same attribute data the plan is built from.
+
+    Raises:
+        ValidationError: If the request has errors. Nothing is edited then;
+                         with `dry_run` the report is stored on `plan.validation` instead.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) changes.
+    """
+    if not objects:
+        return planner.AttrPlan()
+
+    backend = backend or backends.get_backend()
+    report = validation.validate_specs(objects=objects,
+                                       separator_spec=separator_spec,
+                                       attr_specs=attr_specs,
+                                       removed_attrs=removed_attrs,
+                                       backend=backend,
+                                       inventory=inventory,
+                                       preserve=preserve)
+    if not (report.ok or dry_run):
+        raise validation.ValidationError(report)
+
+    plan = planner.plan_attributes(objects=report.objects,
+                                   separator_spec=separator_spec,
+                                   attr_specs=attr_specs,
+                                   removed_attrs=removed_attrs,
+                                   backend=backend,
+                                   current_states=report.current_states)
+    plan.validation = report
+    if dry_run:
+        return plan
+    if not preserve:
+        return planner.apply_plan(plan, backend=backend, inventory=inventory)
+
+    return apply_preserving(plan, backend=backend, inventory=inventory)
+
+
+def apply_preserving(plan: planner.AttrPlan,
+                     backend: backends.AttrBackend = None,
+                     inventory=None,
+                     after=None):
+    """
+    Applies a plan in one flush, carrying over the data of every attribute it
+    re-creates (see `snapshot`). The snapshot report is stored on `plan.snapshots`.
+
+    `after` is called with the backend to queue more edits once the data is
+    restored, still in the same flush.
+    """
+    backend = backend or backends.get_backend()
+    snapshots = snapshot.capture(plan, backend=backend)
+    if not snapshots:
+        return planner.apply_plan(plan, backend=backend, inventory=inventory, after=after)
+
+    def restore(restore_backend):
+        snapshots.restore(restore_backend)
+        if after:
+            after(restore_backend)
+
+    planner.apply_plan(plan, backend=backend, inventory=inventory,
+                       before=snapshots.detach, after=restore)
+    plan.snapshots = snapshots
+    if inventory is not None:
+        # The restored lock and keyable states are not part of the plan.
+        inventory.mark_dirty(inventory.cmds.ls(list({item.node for item in snapshots.snapshots}), uuid=True) or [])
+    return plan
+
+
+def reorder_attrs(objects: list,
+                  order: list,
+                  backend: backends.AttrBackend = None,
+                  dry_run: bool = False,
+                  inventory=None):
+    """
+    Backend-driven body of `core.reorder_attrs`.
+
+    Referenced nodes are skipped: their attributes cannot be re-created.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) re-creations.
+    """
+    if not objects or not order:
+        return planner.AttrPlan()
+
+    backend = backend or backends.get_backend()
+    referenced = deletion.referenced_nodes(backend.cmds, objects)
+    editable = [node for node in objects if node not in referenced]
+    plan = planner.plan_reorder(objects=editable,
+                                order=order,
+                                backend=backend,
+                                current_states=inventory.states_for(editable) if inventory and editable else None)
+    plan.skipped = [(node, None, deletion.REFERENCED) for node in objects if node in referenced]
+    if dry_run:
+        return plan
+
+    return apply_preserving(plan, backend=backend, inventory=inventory)
+
+
+def delete_all_attrs(objects: list,
+                     backend: backends.AttrBackend = None,
+                     dry_run: bool = False,
+                     inventory=None):
+    """
+    Backend-driven body of `core.delete_all_attrs`.
+
+    Every user-defined attribute is deleted in one backend flush; locked
+    attributes and attributes of referenced nodes are skipped and reported.
+
+    Returns:
+        DeletionPlan: The planned (and, unless `dry_run` is set, applied) deletions.
+    """
+    return deletion.delete_attrs(objects=objects, backend=backend, dry_run=dry_run, inventory=inventory)
@@ -0,0 +1,397 @@
+"""
+Incremental edits of enum fields that keep the index of every field that stays.
+
+Stored values, keys and connections (e.g. a condition node testing `== 2`)
+refer to enum fields by index, so re-writing a whole enum string shifts what
+they point to. The edits below only touch the fields they name:
+
+    - `append(name)` adds a field after the last one, at a new index;
+    - `insert(name, position)` adds a field before the one at `position`, at
+      the free index after its predecessor, or else moves the following fields
+      up by one;
+    - `rename(name, new_name)` keeps the index;
+    - `remove(name, fallback)` drops a field, moving what used it to `fallback`
+      (the first remaining field by default).
+
+They are applied in bulk: the current fields of every object are read once
+(or taken from the inventory), then one `addAttr -e` per object is queued and
+flushed in one go. Values are set to their new index in the same flush and
+keys are edited right after it:
+
+    plan = enums.edit_enum_fields(objects, "mode", [enums.append("ik"), enums.remove("old", "fk")])
+    print(plan.report(), plan.remapped.report())
+
+`planner.apply_plan` does the same remapping for any enum edit, e.g. an enum
+mode separator losing one of its fields.
+"""
+from typing import NamedTuple
+
+from crv_attrs import backends, planner, profiler, snapshot, validation
+
+# Edit actions
+APPEND = "append"
+INSERT = "insert"
+RENAME = "rename"
+REMOVE = "remove"
+EDIT_ACTIONS = (APPEND, INSERT, RENAME, REMOVE)
+
+# Skip reasons
+MISSING = "missing"
+NOT_ENUM = "not an enum"
+UNKNOWN_FIELD = "unknown field"
+DUPLICATE_FIELD = "field already exists"
+LAST_FIELD = "cannot remove the last field"
+
+
+class EnumEdit(NamedTuple):
+    """
+    One edit of the fields of an enum attribute.
+    """
+    action: str
+    name: str
+    # RENAME: the new name of the field.
+    new_name: str = None
+    # INSERT: the position the new field is shown at.
+    position: int = None
+    # REMOVE: the field the values and keys of the removed one move to.
+    fallback: str = None
+
+
+class EnumEditError(ValueError):
+    """
+    Raised when an edit does not fit the current fields.
+    """
+
+    def __init__(self, reason: str, name: str):
+        super().__init__(f"{reason}: {name!r}")
+        self.reason = reason
+        self.name = name
+
+
+def append(name: str):
+    return EnumEdit(APPEND, name)
+
+
+def insert(name: str, position: int):
+    return EnumEdit(INSERT, name, position=position)
+
+
+def rename(name: str, new_name: str):
+    return EnumEdit(RENAME, name, new_name=new_name)
+
+
+def remove(name: str, fallback: str = None):
+    return EnumEdit(REMOVE, name, fallback=fallback)
+
+
+def parse_edits(text: str):
+    """
+    Reads edits from the short form typed in the UI, separated by spaces or commas:
+
+        +name        append          +name@2      insert at position 2
+        -name        remove          -name>other  remove, moving its values to other
+        name>new     rename
+
+    Returns:
+        list: EnumEdit, in order.
+    """
+    edits = []
+    for token in text.replace(",", " ").split():
+        if token.startswith("+"):
+            name, _, position = token[1:].partition("@")
+            edits.append(insert(name, int(position)) if position else append(name))
+        elif token.startswith("-"):
+            name, _, fallback = token[1:].partition(">")
+            edits.append(remove(name, fallback or None))
+        elif ">" in token:
+            name, _, new_name = token.partition(">")
+            edits.append(rename(name, new_name))
+        else:
+            raise ValueError(f"Unknown enum edit {token!r}")
+    return edits
+
+
+# -------------------------------------------------
+# ----------------- Field Edits -------------------
+# -------------------------------------------------
+def _index_of(fields: list, name: str):
+    for index, field_name in fields:
+        if field_name == name:
+            return index
+    raise EnumEditError(UNKNOWN_FIELD, name)
+
+
+def apply_edits(fields: list, edits: list):
+    """
+    Applies edits to (index, name) fields.
+
+    Returns:
+        tuple: (fields, remap). `remap` is {old index: new index} for every field
+               of `fields` whose index changes, removed fields included.
+
+    Raises:
+        EnumEditError: When an edit names a missing field or adds an existing one.
+    """
+    fields = list(fields)
+    names = {name for _, name in fields}
+    # Indices given up in this edit are not handed out again.
+    used = {index for index, _ in fields}
+    # Original index -> current index.
+    origins = {index: index for index, _ in fields}
+
+    for edit in edits:
+        moves = {}
+        if edit.action in (APPEND, INSERT):
+            if edit.name in names:
+                raise EnumEditError(DUPLICATE_FIELD, edit.name)
+            position = len(fields) if edit.action == APPEND else max(0, min(edit.position, len(fields)))
+            if position == len(fields):
+                index = max(used, default=-1) + 1
+            else:
+                index = fields[position - 1][0] + 1 if position else 0
+                if index in used:
+                    # No free index before the next field: the following fields move up.
+                    index = fields[position][0]
+                    last = index
+                    for field_position in range(position, len(fields)):
+                        old_index, name = fields[field_position]
+                        new_index = max(old_index, last + 1)
+                        if new_index != old_index:
+                            moves[old_index] = new_index
+                            fields[field_position] = (new_index, name)
+                            used.add(new_index)
+                        last = new_index
+            fields.insert(position, (index, edit.name))
+            names.add(edit.name)
+            used.add(index)
+
+        elif edit.action == RENAME:
+            index = _index_of(fields, edit.name)
+            if edit.new_name in names:
+                raise EnumEditError(DUPLICATE_FIELD, edit.new_name)
+            fields = [(field_index, edit.new_name if field_index == index else name) for field_index, name in fields]
+            names.discard(edit.name)
+            names.add(edit.new_name)
+
+        elif edit.action == REMOVE:
+            index = _index_of(fields, edit.name)
+            fields = [field for field in fields if field[0] != index]
+            if not fields:
+                raise EnumEditError(LAST_FIELD, edit.name)
+            moves[index] = _index_of(fields, edit.fallback) if edit.fallback else fields[0][0]
+            names.discard(edit.name)
+
+        else:
+            raise ValueError(f"Unknown enum edit action {edit.action!r}")
+
+        origins = {origin: moves.get(current, current) for origin, current in origins.items()}
+
+    return fields, {origin: current for origin, current in origins.items() if origin != current}
+
+
+def index_remap(current: str, new: str):
+    """
+    Returns {old index: new index} moving the values of `current` fields to `new`.
+
+    Fields are matched by name; a field gone from `new` whose index `new` still
+    uses keeps it (an explicit rename), otherwise it moves to the first field.
+    """
+    new_fields = backends.parse_enum_string(new)
+    if not new_fields:
+        return {}
+    new_indices = {name: index for index, name in new_fields}
+    remap = {}
+    for index, name in backends.parse_enum_string(current):
+        if name in new_indices:
+            target = new_indices[name]
+        elif index in new_indices.values():
+            continue
+        else:
+            target = new_fields[0][0]
+        if target != index:
+            remap[index] = target
+    return remap
+
+
+# -------------------------------------------------
+# ----------------- Values And Keys ---------------
+# -------------------------------------------------
+class EnumRemap:
+    """
+    Values and keys of enum attributes to move to new indices, read before the edits.
+    """
+
+    def __init__(self):
+        # (node, attr, value, {old: new}) of the attributes set directly.
+        self.values: list = []
+        # {animCurve: {old: new}} of the keyed attributes.
+        self.curves: dict = {}
+        # (plug, message) pairs of the data left as is.
+        self.issues: list = []
+        self.remapped_values = 0
+        self.remapped_keys = 0
+
+    def __bool__(self):
+        return bool(self.values or self.curves)
+
+    def restore(self, backend: backends.AttrBackend):
+        """
+        Queues the new index of every stored value, after the enum edits.
+        """
+        self.remapped_values = 0
+        for node, attr, value, remap in self.values:
+            new_index = remap.get(int(round(value))) if value is not None else None
+            if new_index is not None:
+                backend.set_value(node, attr, "enum", new_index)
+                self.remapped_values += 1
+
+    def remap_keys(self, cmds):
+        """
+        Moves the keys to their new index, one `keyframe -edit` per curve and index.
+        """
+        self.remapped_keys = 0
+        for curve, remap in self.curves.items():
+            moved = {}
+            for key_index, value in enumerate(cmds.keyframe(curve, query=True, valueChange=True) or []):
+                new_index = remap.get(int(round(value)))
+                if new_index is not None:
+                    moved.setdefault(new_index, []).append((key_index, key_index))
+            for new_index, key_ranges in moved.items():
+                cmds.keyframe(curve, edit=True, absolute=True, index=key_ranges, valueChange=new_index)
+                self.remapped_keys += len(key_ranges)
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        lines = [f"{self.remapped_values} values and {self.remapped_keys} keys remapped, {len(self.issues)} issues"]
+        if verbose or self.issues:
+            lines.extend(f"  {plug}: {message}" for plug, message in self.issues[:limit])
+            if len(self.issues) > limit:
+                lines.append(f"  ... and {len(self.issues) - limit} more")
+        return "\n".join(lines)
+
+
+def capture(plan: planner.AttrPlan, backend: backends.AttrBackend = None):
+    """
+    Reads, in bulk, the values and keyed curves of the enum attributes whose
+    field indices a plan changes.
+
+    Returns:
+        EnumRemap: The data to remap around the plan edits.
+    """
+    remap = EnumRemap()
+    targets = []
+    for change in plan.pending():
+        if change.action != planner.EDIT_ENUM or change.state is None:
+            continue
+        indices = plan.enum_remaps.get((change.node, change.attr))
+        if indices is None:
+            indices = index_remap(change.state.enum_names, change.spec.enum_names)
+        if not indices:
+            continue
+        if change.state.multi:
+            remap.issues.append((f"{change.node}.{change.attr}", "element values of multi attributes are not remapped"))
+            continue
+        targets.append((change.node, change.attr, indices))
+    if not targets:
+        return remap
+
+    backend = backend or backends.get_backend()
+    cmds = backend.cmds
+    with profiler.section("enums.capture"):
+        long_names = backends.long_names(cmds, [node for node, _, _ in targets])
+        plugs = [f"{long_names.get(node, node)}.{attr}" for node, attr, _ in targets]
+        inputs = snapshot.list_connections(cmds, plugs, source=True, destination=False, skipConversionNodes=True)
+        free = [(node, attr, indices) for (node, attr, indices), plug in zip(targets, plugs) if plug not in inputs]
+        values = backend.get_values([(node, attr, "enum") for node, attr, _ in free])
+
+    remap.values = [(node, attr, value, indices) for (node, attr, indices), value in zip(free, values)]
+    curve_types = set(cmds.ls([source.partition(".")[0] for sources in inputs.values() for source in sources],
+                              type="animCurve") or [])
+    for (node, attr, indices), plug in zip(targets, plugs):
+        for source in inputs.get(plug, ()):
+            curve = source.partition(".")[0]
+            if curve in curve_types:
+                remap.curves[curve] = indices
+            else:
+                remap.issues.append((f"{node}.{attr}", f"driven by {source}, not remapped"))
+    return remap
+
+
+# -------------------------------------------------
+# ----------------- Bulk Edits --------------------
+# -------------------------------------------------
+def plan_enum_edits(objects: list,
+                    attr: str,
+                    edits: list,
+                    backend: backends.AttrBackend = None,
+                    inventory=None):
+    """
+    Plans the same field edits on an enum attribute of every object.
+
+    Args:
+        objects (list): Object names.
+        attr (str): The enum attribute, e.g. a separator.
+        edits (list): EnumEdit, applied in order.
+        backend (AttrBackend): Reads the current fields when no inventory is given.
+        inventory (AttrInventory): Provides the current fields from its cache.
+
+    Returns:
+        AttrPlan: One EDIT_ENUM change per object, with explicit indices, and the
+                  index moves in `enum_remaps`. Objects the edits do not fit are skipped.
+    """
+    backend = backend or backends.get_backend()
+    existing, missing = validation.existing_objects(backend.cmds, objects)
+    if inventory is not None:
+        current_states = inventory.states_for(existing) if existing else {}
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(existing) if existing else {}
+
+    plan = planner.AttrPlan(skipped=[(node, attr, MISSING) for node in missing])
+    for node in existing:
+        state = current_states.get(node, {}).get(attr)
+        if state is None:
+            plan.skipped.append((node, attr, MISSING))
+            continue
+        if state.attr_type != "enum":
+            plan.skipped.append((node, attr, NOT_ENUM))
+            continue
+        try:
+            fields, indices = apply_edits(backends.parse_enum_string(state.enum_names), edits)
+        except EnumEditError as error:
+            plan.skipped.append((node, attr, error.reason))
+            continue
+
+        spec = planner.spec_from_state(attr, state)._replace(enum_names=backends.format_enum_fields(fields))
+        plan.changes.append(planner.AttrChange(node, attr, planner.EDIT_ENUM, spec, state))
+        if indices:
+            plan.enum_remaps[(node, attr)] = indices
+    return plan
+
+
+def edit_enum_fields(objects: list,
+                     attr: str,
+                     edits: list,
+                     backend: backends.AttrBackend = None,
+                     dry_run: bool = False,
+                     inventory=None):
+    """
+    Appends, inserts, renames and removes enum fields on every object, in one flush.
+
+    Args:
+        objects (list): Object names.
+        attr (str): The enum attribute.
+        edits (list): EnumEdit (see `append`, `insert`, `rename`, `remove` and `parse_edits`).
+        backend (AttrBackend): The engine that executes the edits.
+        dry_run (bool): Only plan the changes, without touching the scene.
+        inventory (AttrInventory): Provides the current fields and records the changes.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) changes;
+                  `remapped` reports the values and keys moved to new indices.
+    """
+    backend = backend or backends.get_backend()
+    with profiler.section("enums.plan"):
+        plan = plan_enum_edits(objects, attr, edits, backend=backend, inventory=inventory)
+    if dry_run or not plan.pending():
+        return plan
+    return planner.apply_plan(plan, backend=backend, inventory=inventory)
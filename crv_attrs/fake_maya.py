@@ -0,0 +1,1299 @@
+"""
+Pure-Python stand-in for the parts of `maya.cmds` and `maya.api.OpenMaya` used by `crv_attrs`.
+
+It models nodes, user-defined attributes (type, range, enum fields, keyable,
+channel box and lock state, value), undo chunks and the handful of MEL
+commands the backends queue on an `MDGModifier`. Every command call is
+counted, so the stand-in can be used to measure how many Maya round trips an
+operation would cost, without a Maya session:
+
+    scene = FakeScene()
+    cmds = FakeCmds(scene)
+    om = FakeOpenMaya(scene)
+    backend = backends.get_backend("om2", om=om, cmds=cmds, undoable=False)
+"""
+import copy
+import fnmatch
+import json
+import shlex
+import sys
+import types
+import uuid
+from collections import Counter
+
+STATIC_ATTRS: dict = {
+    "transform": ["message", "caching", "frozen", "isHistoricallyInteresting", "nodeState",
+                  "binMembership", "visibility", "translate", "translateX", "translateY",
+                  "translateZ", "rotate", "rotateX", "rotateY", "rotateZ", "scale", "scaleX",
+                  "scaleY", "scaleZ", "rotateOrder", "parentMatrix", "worldMatrix"],
+    "unitConversion": ["message", "caching", "frozen", "isHistoricallyInteresting", "nodeState",
+                       "binMembership", "input", "output", "conversionFactor"],
+    "remapValue": ["message", "caching", "frozen", "isHistoricallyInteresting", "nodeState",
+                   "binMembership", "inputValue", "inputMin", "inputMax", "outputMin", "outputMax", "outValue"],
+    "animCurveTU": ["message", "caching", "frozen", "isHistoricallyInteresting", "nodeState",
+                    "binMembership", "input", "output"],
+}
+# Values of the static attributes of utility nodes that differ from 0.
+STATIC_DEFAULTS: dict = {"unitConversion": {"conversionFactor": 1.0},
+                         "remapValue": {"inputMax": 1.0, "outputMax": 1.0}}
+DEFAULT_STATIC_ATTRS = ["message", "caching", "frozen", "isHistoricallyInteresting", "nodeState",
+                        "binMembership"]
+SHAPE_TYPES = ("nurbsCurve", "nurbsSurface", "mesh", "locator")
+# Node types also matched by `ls(type=...)` of their base type.
+DERIVED_TYPES = {"transform": ("joint",), "animCurve": ("animCurveTU",)}
+
+_FLAG_ALIASES = {"ln": "longName", "nn": "niceName", "at": "attributeType", "k": "keyable",
+                 "r": "readable", "en": "enumName", "e": "edit", "q": "query", "min": "minValue",
+                 "max": "maxValue", "cb": "channelBox", "l": "lock", "ud": "userDefined",
+                 "dv": "defaultValue", "sl": "selection", "n": "name", "p": "parent",
+                 "typ": "type", "le": "listEnum", "mn": "minimum", "mx": "maximum",
+                 "mne": "minExists", "mxe": "maxExists", "ex": "exists", "st": "showType",
+                 "s": "shapes", "f": "fullPath", "ad": "allDescendents", "c": "children", "w": "world",
+                 "dt": "dataType", "m": "multi", "nc": "numberOfChildren", "smn": "softMinValue",
+                 "smx": "softMaxValue", "hnv": "hasMinValue", "hxv": "hasMaxValue",
+                 "hsn": "hasSoftMinValue", "hsx": "hasSoftMaxValue", "lc": "listChildren",
+                 "lp": "listParent", "ld": "listDefault"}
+
+_NUMERIC_DEFAULTS = {"bool": False, "enum": 0}
+# Attributes whose value is held by their children, or that have no single value.
+_CONTAINER_TYPES = ("compound", "double3", "float3")
+
+
+def _normalize_flags(flags: dict):
+    return {_FLAG_ALIASES.get(flag, flag): value for flag, value in flags.items()}
+
+
+# -------------------------------------------------
+# ----------------- Scene Model -------------------
+# -------------------------------------------------
+class FakeAttr:
+    """
+    One dynamic attribute definition and its value.
+    """
+    __slots__ = ("name", "nice_name", "attr_type", "min_val", "max_val", "enum_names",
+                 "keyable", "channel_box", "locked", "value", "default_val", "soft_min", "soft_max",
+                 "multi", "parent", "children")
+
+    def __init__(self, name, attr_type, min_val=None, max_val=None, enum_names=None,
+                 keyable=False, channel_box=False, locked=False, value=None, nice_name=None,
+                 default_val=None, soft_min=None, soft_max=None, multi=False, parent=None, children=None):
+        self.name = name
+        self.nice_name = nice_name or name
+        self.attr_type = attr_type
+        self.min_val = min_val
+        self.max_val = max_val
+        self.enum_names = enum_names
+        self.keyable = keyable
+        self.channel_box = channel_box
+        self.locked = locked
+        self.default_val = default_val
+        self.soft_min = soft_min
+        self.soft_max = soft_max
+        self.multi = multi
+        # Name of the parent compound, and the child names (FakeAttr objects while being built).
+        self.parent = parent
+        self.children = list(children or [])
+        if value is None and attr_type not in _CONTAINER_TYPES:
+            value = default_val if default_val is not None else \
+                "" if attr_type == "string" else _NUMERIC_DEFAULTS.get(attr_type, 0.0)
+        self.value = value
+
+    def copy(self):
+        attr = copy.copy(self)
+        attr.children = list(self.children)
+        return attr
+
+
+class FakeNode:
+    """
+    A scene node holding its user-defined attributes in creation order.
+    """
+    __slots__ = ("name", "node_type", "uuid", "parent", "attrs", "static_values")
+
+    def __init__(self, name, node_type="transform", parent=None):
+        self.name = name
+        self.node_type = node_type
+        self.uuid = str(uuid.uuid4()).upper()
+        self.parent = parent
+        self.attrs: dict = {}
+        # FakeAttr holding the value of static attributes, created when first read or set.
+        self.static_values: dict = {}
+
+    @property
+    def static_attrs(self):
+        return STATIC_ATTRS.get(self.node_type, DEFAULT_STATIC_ATTRS)
+
+
+class FakeScene:
+    """
+    In-memory scene shared by `FakeCmds` and `FakeOpenMaya`.
+    """
+
+    def __init__(self):
+        self.nodes: dict = {}
+        self.selection: list = []
+        # objectSet name -> member node names.
+        self.sets: dict = {}
+        # Names of the nodes read from a referenced file.
+        self.referenced: set = set()
+        # Connections indexed both ways, with plugs as "node.attr" and short node names:
+        # {destination: source} and {source: {destination: None}} (an ordered set).
+        self.inputs: dict = {}
+        self.outputs: dict = {}
+        # animCurve name -> [[time, value], ...] sorted by time.
+        self.keys: dict = {}
+        self.path = None
+        self.undo_state = True
+        self.undo_depth = 0
+        # Names of the outermost undo chunks, i.e. the undo steps a user would see.
+        self.undo_chunks: list = []
+
+    def create_node(self, node_type="transform", name=None, parent=None):
+        name = name or f"{node_type}{len(self.nodes) + 1}"
+        node = self.nodes[name] = FakeNode(name, node_type, parent)
+        return node
+
+    def create_set(self, name: str, members: list = ()):
+        self.create_node("objectSet", name)
+        self.sets[name] = [self.node(member).name for member in members]
+        return name
+
+    def children(self, node: FakeNode):
+        return [child for child in self.nodes.values() if child.parent == node.name]
+
+    def long_name(self, node: FakeNode):
+        """
+        Returns the full DAG path of a node, e.g. "|rig|arm_ctrl".
+        """
+        if node.node_type == "objectSet":
+            return node.name
+        path = [node.name]
+        while node.parent:
+            node = self.nodes[node.parent]
+            path.append(node.name)
+        return "|" + "|".join(reversed(path))
+
+    def populate(self, count: int, prefix: str = "ctrl", node_type: str = "transform"):
+        """
+        Creates `count` nodes named prefix_0, prefix_1, ... and returns their names.
+        """
+        names = [f"{prefix}_{index}" for index in range(count)]
+        for name in names:
+            self.create_node(node_type, name)
+        return names
+
+    # ----------------- Scene Files -------------
+    def to_dict(self):
+        return {"nodes": [{"name": node.name, "type": node.node_type, "uuid": node.uuid, "parent": node.parent,
+                           "attrs": [{slot: getattr(attr, slot) for slot in FakeAttr.__slots__}
+                                     for attr in node.attrs.values()]}
+                          for node in self.nodes.values()],
+                "sets": self.sets,
+                "referenced": sorted(self.referenced),
+                "connections": [list(connection) for connection in self.connections],
+                "keys": self.keys}
+
+    def load_dict(self, data: dict):
+        """
+        Replaces the scene content with a dict written by `to_dict`.
+        """
+        self.nodes = {}
+        self.selection = []
+        self.sets = {name: list(members) for name, members in data.get("sets", {}).items()}
+        self.referenced = set(data.get("referenced", []))
+        self.connections = [tuple(connection) for connection in data.get("connections", [])]
+        self.keys = {curve: [list(key) for key in keys] for curve, keys in data.get("keys", {}).items()}
+        for node_data in data.get("nodes", []):
+            node = self.create_node(node_data.get("type", "transform"), node_data["name"], node_data.get("parent"))
+            node.uuid = node_data.get("uuid", node.uuid)
+            for attr_data in node_data.get("attrs", []):
+                attr_data = dict(attr_data)
+                name = attr_data.pop("name")
+                node.attrs[name] = FakeAttr(name, attr_data.pop("attr_type"), **attr_data)
+
+    def load(self, path: str):
+        with open(path) as scene_file:
+            self.load_dict(json.load(scene_file))
+
+    def save(self, path: str):
+        with open(path, "w") as scene_file:
+            json.dump(self.to_dict(), scene_file)
+
+    def find(self, name: str):
+        """
+        Returns the node called `name` (short name or DAG path), or None.
+        """
+        return self.nodes.get(name.rpartition("|")[2])
+
+    def node(self, name: str):
+        try:
+            return self.nodes[name.rpartition("|")[2]]
+        except KeyError:
+            raise ValueError(f"No object matches name: {name}")
+
+    def short_plug(self, plug: str):
+        """
+        Returns "node.attr" with the short node name, checking the attribute exists.
+        """
+        node_name, _, attr = plug.partition(".")
+        node = self.node(node_name)
+        if node.node_type in STATIC_ATTRS and attr not in node.attrs and attr not in node.static_attrs:
+            raise ValueError(f"No attribute matches name: {plug}")
+        return f"{node.name}.{attr}"
+
+    def add_attr(self, node: FakeNode, attr: FakeAttr, parent: str = None):
+        """
+        Adds an attribute built with its child FakeAttr objects, flattening the children.
+        """
+        if attr.name in node.attrs or attr.name in node.static_attrs:
+            raise RuntimeError(f"Attribute '{attr.name}' already exists on {node.name}")
+        added = attr.copy()
+        added.parent = parent
+        added.children = [child.name for child in attr.children]
+        node.attrs[attr.name] = added
+        for child in attr.children:
+            self.add_attr(node, child, attr.name)
+
+    def remove_attr(self, node: FakeNode, name: str):
+        """
+        Removes an attribute, its children and their connections.
+        """
+        attr = node.attrs.pop(name)
+        for child in attr.children:
+            self.remove_attr(node, child)
+        self.disconnect_plug(f"{node.name}.{name}")
+
+    def plug(self, plug: str):
+        node_name, _, attr = plug.partition(".")
+        node = self.node(node_name)
+        if attr not in node.attrs:
+            if node.node_type in STATIC_ATTRS and attr in node.static_attrs:
+                default = STATIC_DEFAULTS.get(node.node_type, {}).get(attr, 0.0)
+                return node, node.static_values.setdefault(attr, FakeAttr(attr, "double", value=default))
+            raise ValueError(f"No attribute matches name: {plug}")
+        return node, node.attrs[attr]
+
+    # ----------------- Connections -------------
+    @property
+    def connections(self):
+        """
+        Returns every (source plug, destination plug) pair, in connection order.
+        """
+        return [(source, destination) for destination, source in self.inputs.items()]
+
+    @connections.setter
+    def connections(self, pairs):
+        self.inputs = {}
+        self.outputs = {}
+        for source, destination in pairs:
+            self.connect(source, destination)
+
+    def connect(self, source: str, destination: str):
+        """
+        Connects two plugs, replacing the current input of `destination`.
+        """
+        self.disconnect(self.inputs.get(destination), destination)
+        self.inputs[destination] = source
+        self.outputs.setdefault(source, {})[destination] = None
+
+    def disconnect(self, source: str, destination: str):
+        """
+        Removes one connection. Returns False when it does not exist.
+        """
+        if source is None or self.inputs.get(destination) != source:
+            return False
+        del self.inputs[destination]
+        destinations = self.outputs[source]
+        del destinations[destination]
+        if not destinations:
+            del self.outputs[source]
+        return True
+
+    def disconnect_plug(self, plug: str):
+        self.disconnect(self.inputs.get(plug), plug)
+        for destination in list(self.outputs.get(plug, ())):
+            self.disconnect(plug, destination)
+
+    def disconnect_node(self, name: str):
+        prefix = f"{name}."
+        for plug in {plug for plug in (*self.inputs, *self.outputs) if plug.startswith(prefix)}:
+            self.disconnect_plug(plug)
+
+
+# -------------------------------------------------
+# ----------------- maya.cmds ---------------------
+# -------------------------------------------------
+class FakeCmds:
+    """
+    Counting stand-in for `maya.cmds`.
+    """
+
+    def __init__(self, scene: FakeScene = None):
+        self.scene = scene or FakeScene()
+        self.calls = Counter()
+
+    def _count(self, command):
+        self.calls[command] += 1
+
+    def reset_calls(self):
+        self.calls.clear()
+
+    # ----------------- Nodes -------------------
+    def createNode(self, node_type, **flags):
+        self._count("createNode")
+        flags = _normalize_flags(flags)
+        return self.scene.create_node(node_type, flags.get("name"), flags.get("parent")).name
+
+    def objExists(self, name):
+        self._count("objExists")
+        return self._plug_exists(name)
+
+    def _plug_exists(self, name):
+        node_name, _, attr = name.partition(".")
+        node = self.scene.find(node_name)
+        return node is not None and (not attr or attr in node.attrs or attr in node.static_attrs)
+
+    def ls(self, *names, **flags):
+        self._count("ls")
+        flags = _normalize_flags(flags)
+        if flags.get("selection"):
+            nodes = [node for node in map(self.scene.find, self.scene.selection) if node is not None]
+        elif names:
+            flat = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+            if any("." in name for name in flat):
+                # Plugs are returned as given when they exist.
+                return [name for name in flat if self._plug_exists(name)]
+            if any("*" in name or "?" in name for name in flat):
+                flat = [node_name for name in flat for node_name in fnmatch.filter(self.scene.nodes, name)]
+            nodes = [self.scene.find(name) for name in flat]
+            if None in nodes:
+                by_uuid = {node.uuid: node for node in self.scene.nodes.values()}
+                nodes = [node or by_uuid.get(name) for node, name in zip(nodes, flat)]
+            nodes = [node for node in nodes if node is not None]
+        else:
+            nodes = list(self.scene.nodes.values())
+
+        return self._format_nodes(nodes, flags)
+
+    def _format_nodes(self, nodes: list, flags: dict):
+        if flags.get("type"):
+            types = {flags["type"]} if isinstance(flags["type"], str) else set(flags["type"])
+            types.update(derived for node_type in list(types) for derived in DERIVED_TYPES.get(node_type, ()))
+            nodes = [node for node in nodes if node.node_type in types]
+        if flags.get("shapes"):
+            nodes = [node for node in nodes if node.node_type in SHAPE_TYPES]
+        if flags.get("referencedNodes"):
+            nodes = [node for node in nodes if node.name in self.scene.referenced]
+        if flags.get("uuid"):
+            return [node.uuid for node in nodes]
+
+        long = flags.get("long") or flags.get("fullPath")
+        names = [self.scene.long_name(node) if long else node.name for node in nodes]
+        if flags.get("showType"):
+            return [item for name, node in zip(names, nodes) for item in (name, node.node_type)]
+        return names
+
+    def listRelatives(self, *names, **flags):
+        self._count("listRelatives")
+        flags = _normalize_flags(flags)
+        flat = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        relatives = []
+        for node in map(self.scene.node, flat):
+            if flags.get("parent"):
+                relatives.extend([self.scene.nodes[node.parent]] if node.parent else [])
+            elif flags.get("allDescendents"):
+                pending = self.scene.children(node)
+                while pending:
+                    child = pending.pop(0)
+                    relatives.append(child)
+                    pending.extend(self.scene.children(child))
+            else:
+                relatives.extend(self.scene.children(node))
+        return self._format_nodes(relatives, flags) or None
+
+    def sets(self, *members, **flags):
+        """
+        Creates an objectSet, or with `query` returns its members.
+        """
+        self._count("sets")
+        flags = _normalize_flags(flags)
+        if flags.get("query"):
+            return list(self.scene.sets.get(members[0], [])) or None
+        flat = [name for item in members for name in ([item] if isinstance(item, str) else item)]
+        return self.scene.create_set(flags.get("name") or f"set{len(self.scene.sets) + 1}", flat)
+
+    def rename(self, old_name, new_name):
+        self._count("rename")
+        node = self.scene.node(old_name)
+        for child in self.scene.children(node):
+            child.parent = new_name
+        for members in self.scene.sets.values():
+            members[:] = [new_name if member == node.name else member for member in members]
+        self.scene.connections = [tuple(f"{new_name}.{plug.partition('.')[2]}"
+                                        if plug.partition(".")[0] == node.name else plug for plug in connection)
+                                  for connection in self.scene.connections]
+        del self.scene.nodes[node.name]
+        node.name = new_name
+        self.scene.nodes[new_name] = node
+        return new_name
+
+    def parent(self, child, new_parent=None, **flags):
+        self._count("parent")
+        flags = _normalize_flags(flags)
+        node = self.scene.node(child)
+        node.parent = None if flags.get("world") else self.scene.node(new_parent).name
+        return [node.name]
+
+    def delete(self, *names):
+        self._count("delete")
+        flat = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        pending = [self.scene.node(name) for name in flat]
+        while pending:
+            node = pending.pop()
+            pending.extend(self.scene.children(node))
+            self.scene.nodes.pop(node.name, None)
+            self.scene.sets.pop(node.name, None)
+            self.scene.disconnect_node(node.name)
+            for members in self.scene.sets.values():
+                if node.name in members:
+                    members.remove(node.name)
+
+    def select(self, *names, **flags):
+        self._count("select")
+        flags = _normalize_flags(flags)
+        flat = [name for item in names for name in ([item] if isinstance(item, str) else item)]
+        if flags.get("clear"):
+            self.scene.selection = []
+        elif flags.get("add"):
+            self.scene.selection.extend(flat)
+        else:
+            self.scene.selection = list(flat)
+
+    # ----------------- Attributes --------------
+    def listAttr(self, node_name, **flags):
+        self._count("listAttr")
+        flags = _normalize_flags(flags)
+        node = self.scene.node(node_name)
+        if flags.get("userDefined"):
+            return list(node.attrs) or None
+        return list(node.static_attrs) + list(node.attrs)
+
+    def attributeInfo(self, **flags):
+        self._count("attributeInfo")
+        return list(STATIC_ATTRS.get(flags.get("type"), DEFAULT_STATIC_ATTRS))
+
+    def addAttr(self, target, **flags):
+        self._count("addAttr")
+        flags = _normalize_flags(flags)
+
+        if flags.get("edit") or flags.get("query"):
+            node, attr = self.scene.plug(target)
+            if flags.get("query"):
+                return self._query_attr_def(attr, flags)
+            if attr.locked and "enumName" in flags:
+                raise RuntimeError(f"The attribute '{target}' is locked.")
+            for flag, field in (("enumName", "enum_names"), ("minValue", "min_val"),
+                                ("maxValue", "max_val"), ("niceName", "nice_name"),
+                                ("softMinValue", "soft_min"), ("softMaxValue", "soft_max"),
+                                ("defaultValue", "default_val")):
+                if flag in flags:
+                    setattr(attr, field, flags[flag])
+            for flag, field in (("hasMinValue", "min_val"), ("hasMaxValue", "max_val"),
+                                ("hasSoftMinValue", "soft_min"), ("hasSoftMaxValue", "soft_max")):
+                if flag in flags and not flags[flag]:
+                    setattr(attr, field, None)
+            if "keyable" in flags:
+                attr.keyable = bool(flags["keyable"])
+            return None
+
+        node = self.scene.node(target)
+        name = flags["longName"]
+        if name in node.attrs or name in node.static_attrs:
+            raise RuntimeError(f"Found more than one attribute named '{name}' on {target}.")
+        attr_type = flags.get("attributeType", flags.get("dataType", "double"))
+        parent = flags.get("parent")
+        if parent:
+            node.attrs[parent].children.append(name)
+        node.attrs[name] = FakeAttr(name, attr_type,
+                                    min_val=flags.get("minValue"),
+                                    max_val=flags.get("maxValue"),
+                                    enum_names=flags.get("enumName"),
+                                    keyable=bool(flags.get("keyable", False)),
+                                    nice_name=flags.get("niceName"),
+                                    default_val=flags.get("defaultValue"),
+                                    soft_min=flags.get("softMinValue"),
+                                    soft_max=flags.get("softMaxValue"),
+                                    multi=bool(flags.get("multi", False)),
+                                    parent=parent)
+        return None
+
+    @staticmethod
+    def _query_attr_def(attr: FakeAttr, flags: dict):
+        if flags.get("enumName"):
+            return attr.enum_names
+        if flags.get("attributeType"):
+            return attr.attr_type
+        if flags.get("minValue"):
+            return attr.min_val
+        if flags.get("maxValue"):
+            return attr.max_val
+        if flags.get("hasMinValue"):
+            return attr.min_val is not None
+        if flags.get("hasMaxValue"):
+            return attr.max_val is not None
+        return None
+
+    def attributeQuery(self, attr_name, **flags):
+        self._count("attributeQuery")
+        flags = _normalize_flags(flags)
+        if "type" in flags:
+            # Static attributes of a node type.
+            return attr_name in STATIC_ATTRS.get(flags["type"], DEFAULT_STATIC_ATTRS)
+        node = self.scene.node(flags["node"])
+        if flags.get("exists"):
+            return attr_name in node.attrs or attr_name in node.static_attrs
+        attr = node.attrs[attr_name]
+        if flags.get("listEnum"):
+            return [attr.enum_names] if attr.enum_names is not None else None
+        if flags.get("minExists"):
+            return attr.min_val is not None
+        if flags.get("maxExists"):
+            return attr.max_val is not None
+        if flags.get("minimum"):
+            return [attr.min_val]
+        if flags.get("maximum"):
+            return [attr.max_val]
+        if flags.get("softMinExists"):
+            return attr.soft_min is not None
+        if flags.get("softMaxExists"):
+            return attr.soft_max is not None
+        if flags.get("softMin"):
+            return [attr.soft_min]
+        if flags.get("softMax"):
+            return [attr.soft_max]
+        if flags.get("listDefault"):
+            default = attr.default_val
+            return [default if default is not None else _NUMERIC_DEFAULTS.get(attr.attr_type, 0.0)]
+        if flags.get("multi"):
+            return attr.multi
+        if flags.get("listChildren"):
+            return list(attr.children) or None
+        if flags.get("listParent"):
+            return [attr.parent] if attr.parent else None
+        if flags.get("attributeType"):
+            return "typed" if attr.attr_type == "string" else attr.attr_type
+        if flags.get("keyable"):
+            return attr.keyable
+        if flags.get("channelBox"):
+            return attr.channel_box
+        return None
+
+    def deleteAttr(self, target, **flags):
+        self._count("deleteAttr")
+        flags = _normalize_flags(flags)
+        if "attribute" in flags:
+            node, attr = self.scene.plug(f"{target}.{flags['attribute']}")
+        else:
+            node, attr = self.scene.plug(target)
+        if attr.locked:
+            raise RuntimeError(f"Cannot delete locked attribute '{node.name}.{attr.name}'.")
+        self.scene.remove_attr(node, attr.name)
+
+    def getAttr(self, plug, **flags):
+        self._count("getAttr")
+        flags = _normalize_flags(flags)
+        node, attr = self.scene.plug(plug)
+        if flags.get("type"):
+            return "TdataCompound" if attr.attr_type == "compound" else attr.attr_type
+        if flags.get("keyable"):
+            return attr.keyable
+        if flags.get("channelBox"):
+            return attr.channel_box
+        if flags.get("lock"):
+            return attr.locked
+        if attr.attr_type in ("double3", "float3"):
+            return [tuple(node.attrs[child].value for child in attr.children)]
+        return attr.value
+
+    def setAttr(self, plug, *values, **flags):
+        self._count("setAttr")
+        flags = _normalize_flags(flags)
+        node, attr = self.scene.plug(plug)
+        if "lock" in flags:
+            attr.locked = bool(flags["lock"])
+        if "keyable" in flags:
+            attr.keyable = bool(flags["keyable"])
+            attr.channel_box = attr.channel_box and not attr.keyable
+        if "channelBox" in flags:
+            attr.channel_box = bool(flags["channelBox"]) and not attr.keyable
+        if values:
+            if attr.locked:
+                raise RuntimeError(f"The attribute '{plug}' is locked or connected and cannot be modified.")
+            if attr.attr_type in ("double3", "float3"):
+                for child, value in zip(attr.children, values):
+                    node.attrs[child].value = value
+            elif flags.get("type") == "string":
+                attr.value = str(values[0])
+            else:
+                attr.value = values[0] if len(values) == 1 else list(values)
+
+    # ----------------- Connections -------------
+    def connectAttr(self, source, destination, **flags):
+        self._count("connectAttr")
+        flags = _normalize_flags(flags)
+        source, destination = self.scene.short_plug(source), self.scene.short_plug(destination)
+        current = self.scene.inputs.get(destination)
+        if current is not None and not (flags.get("force") or flags.get("f")):
+            raise RuntimeError(f"'{destination}' already has an incoming connection from '{current}'.")
+        # A replaced input goes to the end, like a new connection.
+        self.scene.disconnect(current, destination)
+        self.scene.connect(source, destination)
+
+    def disconnectAttr(self, source, destination, **flags):
+        self._count("disconnectAttr")
+        if not self.scene.disconnect(self.scene.short_plug(source), self.scene.short_plug(destination)):
+            raise RuntimeError(f"There is no connection from '{source}' to '{destination}' to disconnect.")
+
+    def listConnections(self, *plugs, **flags):
+        self._count("listConnections")
+        flags = _normalize_flags(flags)
+        flat = [plug for item in plugs for plug in ([item] if isinstance(item, str) else item)]
+        both = "source" not in flags and "destination" not in flags
+        result = []
+        for plug in flat:
+            plug = self.scene.short_plug(plug)
+            others = []
+            if (both or flags.get("source")) and plug in self.scene.inputs:
+                others.append(self.scene.inputs[plug])
+            if both or flags.get("destination"):
+                others.extend(self.scene.outputs.get(plug, ()))
+            if flags.get("type"):
+                types = {flags["type"], *DERIVED_TYPES.get(flags["type"], ())}
+                others = [other for other in others if self.scene.node(other.partition(".")[0]).node_type in types]
+            for other in others:
+                other = other if flags.get("plugs") else other.partition(".")[0]
+                result.extend([plug, other] if flags.get("connections") else [other])
+        return result or None
+
+    # ----------------- Animation ---------------
+    def setKeyframe(self, curve, time=0.0, value=0.0, **flags):
+        """
+        Adds (or replaces) the key at `time` on an existing animCurve node.
+        """
+        self._count("setKeyframe")
+        keys = self.scene.keys.setdefault(self.scene.node(curve).name, [])
+        keys[:] = sorted([key for key in keys if key[0] != time] + [[time, value]])
+        return 1
+
+    def keyframe(self, curve, **flags):
+        """
+        Queries the key times or values of an animCurve node, or edits the value of
+        the keys at the given `index` ranges.
+        """
+        self._count("keyframe")
+        flags = _normalize_flags(flags)
+        keys = self.scene.keys.get(self.scene.node(curve).name, [])
+        if flags.get("query"):
+            column = 0 if flags.get("timeChange") else 1
+            return [key[column] for key in keys] or None
+        if flags.get("edit") and "valueChange" in flags:
+            ranges = flags.get("index", [])
+            ranges = [ranges] if isinstance(ranges, tuple) else ranges
+            for start, end in ranges:
+                for key in keys[start:end + 1]:
+                    key[1] = flags["valueChange"] if flags.get("absolute", True) else key[1] + flags["valueChange"]
+        return len(keys)
+
+    # ----------------- Files -------------------
+    def file(self, path=None, **flags):
+        """
+        Opens and saves fake scene files, which are JSON dumps of a `FakeScene`.
+        """
+        self._count("file")
+        if flags.get("query"):
+            return self.scene.path or ""
+        if flags.get("open"):
+            self.scene.load(path)
+            self.scene.path = path
+        elif flags.get("rename"):
+            self.scene.path = flags["rename"]
+        elif flags.get("save"):
+            self.scene.save(self.scene.path)
+        elif flags.get("new"):
+            self.scene.load_dict({})
+            self.scene.path = None
+        return self.scene.path
+
+    # ----------------- Undo --------------------
+    def undoInfo(self, **flags):
+        self._count("undoInfo")
+        if "state" in flags:
+            self.scene.undo_state = bool(flags["state"])
+        elif flags.get("openChunk"):
+            if not self.scene.undo_depth:
+                self.scene.undo_chunks.append(flags.get("chunkName"))
+            self.scene.undo_depth += 1
+        elif flags.get("closeChunk"):
+            if not self.scene.undo_depth:
+                raise RuntimeError("undoInfo: no open chunk to close.")
+            self.scene.undo_depth -= 1
+        return None
+
+    # ----------------- Plug-ins ----------------
+    def pluginInfo(self, *args, **flags):
+        self._count("pluginInfo")
+        return False
+
+    def loadPlugin(self, *args, **flags):
+        raise RuntimeError("Plug-ins cannot be loaded in the fake Maya session.")
+
+
+class FakeMel:
+    """
+    Executes the small MEL subset queued by `OpenMayaBackend` through `FakeCmds`.
+    """
+    _value_flags = {"lock", "keyable", "channelBox", "en", "min", "max", "nn", "dv", "type",
+                    "minValue", "maxValue", "softMinValue", "softMaxValue", "hasMinValue", "hasMaxValue",
+                    "hasSoftMinValue", "hasSoftMaxValue", "defaultValue"}
+
+    def __init__(self, cmds: FakeCmds):
+        self.cmds = cmds
+
+    @staticmethod
+    def _convert(value: str):
+        if value in ("true", "false"):
+            return value == "true"
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+    def eval(self, script: str):
+        result = None
+        for statement in filter(None, (part.strip() for part in _split_statements(script))):
+            tokens = shlex.split(statement)
+            command, args, flags = tokens[0], [], {}
+            tokens = iter(tokens[1:])
+            for token in tokens:
+                if token.startswith("-") and not token[1:2].isdigit():
+                    flag = token[1:]
+                    flags[flag] = self._convert(next(tokens)) if flag in self._value_flags else True
+                else:
+                    args.append(token)
+            if flags.get("type") != "string":
+                args = [self._convert(arg) for arg in args]
+            result = getattr(self.cmds, command)(*args, **flags)
+        return result
+
+
+def _split_statements(script: str):
+    statements, current, quoted = [], [], False
+    for char in script:
+        if char == '"':
+            quoted = not quoted
+        if char == ";" and not quoted:
+            statements.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    statements.append("".join(current))
+    return statements
+
+
+# -------------------------------------------------
+# ----------------- maya.api.OpenMaya -------------
+# -------------------------------------------------
+class FakeOpenMaya:
+    """
+    Stand-in for the `maya.api.OpenMaya` module, bound to one `FakeScene`.
+
+    Only the classes and members used by `OpenMayaBackend` are provided.
+    """
+
+    def __init__(self, scene: FakeScene, cmds: FakeCmds = None):
+        self.scene = scene
+        self.cmds = cmds or FakeCmds(scene)
+        # Queries (function sets, plug lookups and reads) and modifier operations, by name.
+        self.calls = Counter()
+        self.mel = FakeMel(self.cmds)
+        _build_open_maya(self)
+
+
+def _build_open_maya(om: FakeOpenMaya):
+    scene = om.scene
+
+    class MFn:
+        kInvalid = 0
+        kDependencyNode = 1
+        kAttribute = 2
+        kNumericAttribute = 3
+        kEnumAttribute = 4
+        kTypedAttribute = 5
+        kCompoundAttribute = 6
+
+    class MFnNumericData:
+        kBoolean, kShort, kLong, kByte, kFloat, kDouble, k3Float, k3Double = range(1, 9)
+
+    class MFnData:
+        kString = 4
+
+    numeric_names = {MFnNumericData.kBoolean: "bool", MFnNumericData.kShort: "short",
+                     MFnNumericData.kLong: "long", MFnNumericData.kByte: "byte",
+                     MFnNumericData.kFloat: "float", MFnNumericData.kDouble: "double",
+                     MFnNumericData.k3Float: "float3", MFnNumericData.k3Double: "double3"}
+    numeric_types = {name: data_type for data_type, name in numeric_names.items()}
+
+    class MObject:
+        def __init__(self, node=None, attr=None, static=False):
+            self.node = node
+            self.attr = attr
+            self.static = static
+
+        def isNull(self):
+            return self.node is None and self.attr is None
+
+        def hasFn(self, fn_type):
+            if self.attr is None:
+                return fn_type == MFn.kDependencyNode and self.node is not None
+            if fn_type == MFn.kAttribute:
+                return True
+            if fn_type == MFn.kEnumAttribute:
+                return self.attr.attr_type == "enum"
+            if fn_type == MFn.kNumericAttribute:
+                return self.attr.attr_type in numeric_types
+            if fn_type == MFn.kCompoundAttribute:
+                return self.attr.attr_type in _CONTAINER_TYPES
+            if fn_type == MFn.kTypedAttribute:
+                return self.attr.attr_type == "string"
+            return False
+
+        @property
+        def apiTypeStr(self):
+            if self.attr is None:
+                return "kDependencyNode"
+            if self.hasFn(MFn.kEnumAttribute):
+                return "kEnumAttribute"
+            if self.hasFn(MFn.kNumericAttribute):
+                return "kNumericAttribute"
+            return "kCompoundAttribute" if self.hasFn(MFn.kCompoundAttribute) else "kTypedAttribute"
+
+    class MObjectHandle:
+        def __init__(self, mobject):
+            self._mobject = mobject
+
+        def isValid(self):
+            node = self._mobject.node
+            return node is not None and scene.nodes.get(node.name) is node
+
+        def object(self):
+            return self._mobject
+
+    class MSelectionList:
+        def __init__(self):
+            self._nodes = []
+            self._attrs = []
+
+        def add(self, name):
+            om.calls["MSelectionList.add"] += 1
+            node_name, _, attr = name.partition(".")
+            node = scene.node(node_name)
+            if attr:
+                # Only existing plugs can be added, as in Maya.
+                scene.plug(f"{node.name}.{attr}")
+            self._nodes.append(node)
+            self._attrs.append(attr)
+
+        def length(self):
+            return len(self._nodes)
+
+        def getDependNode(self, index):
+            return MObject(node=self._nodes[index])
+
+        def getPlug(self, index):
+            node = self._nodes[index]
+            return MPlug(MObject(node), MObject(node, scene.plug(f"{node.name}.{self._attrs[index]}")[1]))
+
+    class MNodeClass:
+        def __init__(self, type_name):
+            self._attrs = STATIC_ATTRS.get(type_name, DEFAULT_STATIC_ATTRS)
+
+        def getAttributes(self):
+            return [MObject(attr=FakeAttr(name, "static"), static=True) for name in self._attrs]
+
+    class MFnDependencyNode:
+        def __init__(self, mobject):
+            om.calls["MFnDependencyNode"] += 1
+            self._node = mobject.node
+
+        @property
+        def typeName(self):
+            return self._node.node_type
+
+        def name(self):
+            return self._node.name
+
+        def attributeCount(self):
+            return len(self._node.static_attrs) + len(self._node.attrs)
+
+        def attribute(self, key):
+            om.calls["MFnDependencyNode.attribute"] += 1
+            return self._attribute(key)
+
+        def _attribute(self, key):
+            static_attrs = self._node.static_attrs
+            if isinstance(key, int):
+                if key < len(static_attrs):
+                    return MObject(self._node, FakeAttr(static_attrs[key], "static"), static=True)
+                return MObject(self._node, list(self._node.attrs.values())[key - len(static_attrs)])
+            if key in self._node.attrs:
+                return MObject(self._node, self._node.attrs[key])
+            if key in static_attrs:
+                # Utility nodes hold values on their static attributes.
+                attr = scene.plug(f"{self._node.name}.{key}")[1] if self._node.node_type in STATIC_ATTRS \
+                    else FakeAttr(key, "static")
+                return MObject(self._node, attr, static=True)
+            return MObject()
+
+        def hasAttribute(self, name):
+            return name in self._node.attrs or name in self._node.static_attrs
+
+        def findPlug(self, name, want_networked_plug):
+            om.calls["MFnDependencyNode.findPlug"] += 1
+            attr_obj = self._attribute(name)
+            if attr_obj.isNull():
+                raise RuntimeError(f"No attribute matches name: {name}")
+            return MPlug(MObject(self._node), attr_obj)
+
+    class MFnAttribute:
+        def __init__(self, mobject=None):
+            if mobject is not None:
+                om.calls["MFnAttribute"] += 1
+            self._mobject = mobject
+
+        @property
+        def _attr(self):
+            return self._mobject.attr
+
+        @property
+        def name(self):
+            return self._attr.name
+
+        @property
+        def dynamic(self):
+            return not self._mobject.static
+
+        @property
+        def parent(self):
+            node = self._mobject.node
+            if node is None or not self._attr.parent:
+                return MObject()
+            return MObject(node, node.attrs[self._attr.parent])
+
+        @property
+        def array(self):
+            return self._attr.multi
+
+        @array.setter
+        def array(self, value):
+            self._attr.multi = bool(value)
+
+        @property
+        def usesArrayDataBuilder(self):
+            return True
+
+        @usesArrayDataBuilder.setter
+        def usesArrayDataBuilder(self, value):
+            pass
+
+        @property
+        def default(self):
+            return self._attr.default_val if self._attr.default_val is not None else self._attr.value
+
+        @property
+        def keyable(self):
+            return self._attr.keyable
+
+        @keyable.setter
+        def keyable(self, value):
+            self._attr.keyable = bool(value)
+
+        @property
+        def channelBox(self):
+            return self._attr.channel_box
+
+        @channelBox.setter
+        def channelBox(self, value):
+            self._attr.channel_box = bool(value)
+
+        def setNiceNameOverride(self, name):
+            self._attr.nice_name = name
+
+    class MFnEnumAttribute(MFnAttribute):
+        def create(self, long_name, short_name, default=0):
+            self._mobject = MObject(attr=FakeAttr(long_name, "enum", enum_names="", value=default,
+                                                  default_val=default))
+            return self._mobject
+
+        def addField(self, name, index):
+            fields = [field for field in self._attr.enum_names.split(":") if field]
+            fields.append(f"{name}={index}")
+            self._attr.enum_names = ":".join(fields)
+
+        def _fields(self):
+            from crv_attrs.backends import parse_enum_string
+            return dict(parse_enum_string(self._attr.enum_names))
+
+        def getMin(self):
+            return min(self._fields() or [0])
+
+        def getMax(self):
+            return max(self._fields() or [0])
+
+        def fieldName(self, index):
+            try:
+                return self._fields()[index]
+            except KeyError:
+                raise RuntimeError(f"Invalid enum index: {index}")
+
+    class MFnNumericAttribute(MFnAttribute):
+        def create(self, long_name, short_name, data_type, *args):
+            if isinstance(data_type, MObject):
+                # Three-child compound: create(longName, shortName, child1, child2, child3)
+                children = [data_type.attr] + [child.attr for child in args]
+                attr_type = "float3" if children[0].attr_type == "float" else "double3"
+                self._mobject = MObject(attr=FakeAttr(long_name, attr_type, children=children))
+                return self._mobject
+            default = args[0] if args else 0
+            self._mobject = MObject(attr=FakeAttr(long_name, numeric_names[data_type],
+                                                  value=default, default_val=default))
+            return self._mobject
+
+        def hasSoftMin(self):
+            return self._attr.soft_min is not None
+
+        def hasSoftMax(self):
+            return self._attr.soft_max is not None
+
+        def getSoftMin(self):
+            return self._attr.soft_min
+
+        def getSoftMax(self):
+            return self._attr.soft_max
+
+        def setSoftMin(self, value):
+            self._attr.soft_min = value
+
+        def setSoftMax(self, value):
+            self._attr.soft_max = value
+
+        def numericType(self):
+            return numeric_types[self._attr.attr_type]
+
+        def hasMin(self):
+            return self._attr.min_val is not None
+
+        def hasMax(self):
+            return self._attr.max_val is not None
+
+        def getMin(self):
+            return self._attr.min_val
+
+        def getMax(self):
+            return self._attr.max_val
+
+        def setMin(self, value):
+            self._attr.min_val = value
+
+        def setMax(self, value):
+            self._attr.max_val = value
+
+    class MFnTypedAttribute(MFnAttribute):
+        def create(self, long_name, short_name, data_type, default=None):
+            value = default.attr.value if default is not None else None
+            self._mobject = MObject(attr=FakeAttr(long_name, "string", value=value, default_val=value))
+            return self._mobject
+
+        def attrType(self):
+            return MFnData.kString
+
+    class MFnStringData:
+        def create(self, value):
+            return MObject(attr=FakeAttr("", "string", value=value))
+
+    class MFnCompoundAttribute(MFnAttribute):
+        def create(self, long_name, short_name):
+            self._mobject = MObject(attr=FakeAttr(long_name, "compound"))
+            return self._mobject
+
+        def addChild(self, child_obj):
+            self._attr.children.append(child_obj.attr)
+
+        def numChildren(self):
+            return len(self._attr.children)
+
+        def child(self, index):
+            child = self._attr.children[index]
+            if isinstance(child, FakeAttr):
+                return MObject(attr=child)
+            return MObject(self._mobject.node, self._mobject.node.attrs[child])
+
+    class MPlug:
+        def __init__(self, node_obj, attr_obj):
+            self._node = node_obj.node
+            self._attr = attr_obj.attr
+
+        def child(self, index):
+            return MPlug(MObject(self._node), MObject(self._node, self._node.attrs[self._attr.children[index]]))
+
+        @property
+        def isLocked(self):
+            return self._attr.locked
+
+        @property
+        def isDestination(self):
+            return self.name() in scene.inputs
+
+        def name(self):
+            return f"{self._node.name}.{self._attr.name}"
+
+        def asDouble(self):
+            om.calls["MPlug.asDouble"] += 1
+            return float(self._attr.value)
+
+        def asInt(self):
+            om.calls["MPlug.asInt"] += 1
+            return int(self._attr.value)
+
+        def asBool(self):
+            om.calls["MPlug.asBool"] += 1
+            return bool(self._attr.value)
+
+        def asString(self):
+            om.calls["MPlug.asString"] += 1
+            return str(self._attr.value)
+
+    class MDGModifier:
+        def __init__(self):
+            self._operations = []
+            self._snapshots = None
+
+        def addAttribute(self, node_obj, attr_obj):
+            self._operations.append(("add", node_obj.node, attr_obj.attr))
+
+        def removeAttribute(self, node_obj, attr_obj):
+            if attr_obj.isNull():
+                raise RuntimeError("Attribute not found")
+            self._operations.append(("remove", node_obj.node, attr_obj.attr.name))
+
+        def commandToExecute(self, command):
+            self._operations.append(("mel", None, command))
+
+        def createNode(self, node_type):
+            # The node only enters the scene on doIt, like in Maya.
+            node = FakeNode(f"{node_type}{len(scene.nodes) + len(self._operations) + 1}", node_type)
+            self._operations.append(("createNode", node, None))
+            return MObject(node)
+
+        def renameNode(self, node_obj, name):
+            self._operations.append(("renameNode", node_obj.node, name))
+
+        def deleteNode(self, node_obj):
+            self._operations.append(("deleteNode", node_obj.node, None))
+
+        def connect(self, source_plug, destination_plug):
+            self._operations.append(("connect", destination_plug._node, (source_plug.name(), destination_plug.name())))
+
+        @staticmethod
+        def _command_node(command):
+            # The first quoted plug names the edited node.
+            plugs = [token for token in command.split('"')[1::2]
+                     if "." in token and scene.find(token.partition(".")[0])]
+            return scene.node(plugs[0].partition(".")[0])
+
+        def doIt(self):
+            om.calls["MDGModifier.doIt"] += 1
+            self._snapshots = {}
+            self._created = []
+            self._deleted = []
+            self._connections = list(scene.connections)
+            for operation, node, payload in self._operations:
+                if operation == "mel":
+                    node = self._command_node(payload)
+                if node.name not in self._snapshots and operation != "createNode":
+                    self._snapshots[node.name] = (node, {name: attr.copy() for name, attr in node.attrs.items()})
+                om.calls[f"MDGModifier.{operation}"] += 1
+                if operation == "add":
+                    scene.add_attr(node, payload)
+                elif operation == "remove":
+                    scene.remove_attr(node, payload)
+                elif operation == "createNode":
+                    scene.nodes[node.name] = node
+                    self._created.append(node)
+                elif operation == "deleteNode":
+                    scene.nodes.pop(node.name)
+                    scene.disconnect_node(node.name)
+                    self._deleted.append(node)
+                elif operation == "renameNode":
+                    del scene.nodes[node.name]
+                    node.name = payload
+                    scene.nodes[payload] = node
+                elif operation == "connect":
+                    if payload[1] in scene.inputs:
+                        raise RuntimeError(f"'{payload[1]}' is already connected.")
+                    scene.connect(*payload)
+                else:
+                    om.mel.eval(payload)
+
+        def undoIt(self):
+            if self._snapshots is None:
+                return
+            for node, attrs in self._snapshots.values():
+                node.attrs = attrs
+            for node in self._created:
+                scene.nodes.pop(node.name, None)
+            for node in self._deleted:
+                scene.nodes[node.name] = node
+            scene.connections = self._connections
+            self._snapshots = None
+
+    for cls in (MFn, MFnNumericData, MObject, MObjectHandle, MSelectionList, MNodeClass,
+                MFnDependencyNode, MFnAttribute, MFnEnumAttribute, MFnNumericAttribute,
+                MFnData, MFnTypedAttribute, MFnStringData, MFnCompoundAttribute, MPlug, MDGModifier):
+        setattr(om, cls.__name__, cls)
+
+
+# -------------------------------------------------
+# ----------------- Module Install ----------------
+# -------------------------------------------------
+def install(scene: FakeScene = None):
+    """
+    Registers the stand-ins as the `maya`, `maya.cmds`, `maya.mel`, `maya.api.OpenMaya`
+    and `maya.standalone` modules, so code importing Maya runs in a plain Python
+    interpreter (e.g. batch workers started with `--fake`).
+
+    Returns:
+        FakeScene: The scene the installed modules operate on.
+    """
+    scene = scene or FakeScene()
+    cmds = FakeCmds(scene)
+    open_maya = FakeOpenMaya(scene, cmds)
+
+    maya_module = types.ModuleType("maya")
+    api_module = types.ModuleType("maya.api")
+    standalone_module = types.ModuleType("maya.standalone")
+    standalone_module.initialize = lambda *args, **kwargs: None
+    standalone_module.uninitialize = lambda *args, **kwargs: None
+
+    maya_module.cmds = cmds
+    maya_module.mel = open_maya.mel
+    maya_module.api = api_module
+    maya_module.standalone = standalone_module
+    api_module.OpenMaya = open_maya
+
+    sys.modules.update({"maya": maya_module,
+                        "maya.cmds": cmds,
+                        "maya.mel": open_maya.mel,
+                        "maya.api": api_module,
+                        "maya.api.OpenMaya": open_maya,
+                        "maya.standalone": standalone_module})
+    return scene
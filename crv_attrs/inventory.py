@@ -0,0 +1,323 @@
+"""
+In-session inventory of the user-defined attributes of every transform.
+
+The inventory is built once, reading every transform through the backend in a
+single pass, and then answers without touching the scene:
+
+    inventory = inventory.scene_inventory()
+    inventory.nodes_with_attr("FACE")         # transforms having the attribute
+    inventory.separator_members("FACE")       # {node: [attributes under the separator]}
+    core.create_custom_attributes(..., inventory=inventory)
+
+It is keyed by node UUID and kept current incrementally: nodes reported as
+added, removed or as having an attribute added, removed, renamed, locked or
+made (un)keyable are re-read on the next query, and only them. Inside Maya the
+reports come from OpenMaya callbacks; elsewhere use `mark_dirty`/`mark_removed`.
+Operations run through `crv_attrs` with an inventory write their own changes
+into it, so they do not trigger a re-read.
+
+Maya sends no callback when the range or enum fields of an existing attribute
+are edited with `addAttr -e`. The name and separator queries do not depend on
+them, and `states_for`, which feeds the planners, always re-reads the nodes it
+is asked for in one bulk query, so such edits made outside `crv_attrs` never
+lead to a wrong plan.
+"""
+from contextlib import contextmanager
+
+from crv_attrs import backends, planner, profiler
+
+
+class AttrInventory:
+    """
+    Maps attributes and separators of every transform to the nodes holding them.
+
+    Args:
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        cmds: The `maya.cmds` module. Defaults to the backend's.
+    """
+
+    def __init__(self, backend: backends.AttrBackend = None, cmds=None):
+        self.backend = backend or backends.get_backend()
+        self.cmds = cmds or self.backend.cmds
+        self.built = False
+        # uuid -> ordered {attr: AttrState}
+        self.states: dict = {}
+        # attr -> set of uuids, and separator -> set of uuids
+        self.attr_nodes: dict = {}
+        self.separator_nodes: dict = {}
+
+        self._dirty: set = set()
+        self._removed: set = set()
+        self._paused = False
+        self._callback_ids: list = []
+        self._node_callbacks: dict = {}
+
+    # ----------------- Reading -----------------
+    def _index(self, uuid: str, states: dict):
+        self._unindex(uuid)
+        self.states[uuid] = states
+        for attr, state in states.items():
+            self.attr_nodes.setdefault(attr, set()).add(uuid)
+            if planner.is_separator(state):
+                self.separator_nodes.setdefault(attr, set()).add(uuid)
+
+    def _unindex(self, uuid: str):
+        for attr in self.states.pop(uuid, {}):
+            for reverse_index in (self.attr_nodes, self.separator_nodes):
+                nodes = reverse_index.get(attr)
+                if nodes is not None:
+                    nodes.discard(uuid)
+                    if not nodes:
+                        del reverse_index[attr]
+
+    def _read(self, uuids: list):
+        paths = self._paths(uuids)
+        with profiler.section(f"{self.backend.name}.query_user_attrs"):
+            current_states = self.backend.query_user_attrs(list(paths.values()))
+        for uuid, path in paths.items():
+            self._index(uuid, current_states.get(path, {}))
+
+    def build(self):
+        """
+        Reads the user-defined attributes of every transform in the scene.
+        """
+        self.states = {}
+        self.attr_nodes = {}
+        self.separator_nodes = {}
+        self._dirty.clear()
+        self._removed.clear()
+
+        self._read(self.cmds.ls(type="transform", uuid=True) or [])
+        self.built = True
+
+    def refresh(self, full: bool = False):
+        """
+        Builds the inventory the first time (or when `full` is set), then only
+        re-reads the nodes marked dirty and drops the removed ones.
+        """
+        if full or not self.built:
+            self.build()
+            return
+
+        for uuid in self._removed:
+            self._unindex(uuid)
+        dirty = list(self._dirty - self._removed)
+        self._removed.clear()
+        self._dirty.clear()
+
+        if dirty:
+            for uuid in dirty:
+                self._unindex(uuid)
+            self._read(dirty)
+
+    # ----------------- Invalidation ------------
+    def mark_dirty(self, uuids):
+        """
+        Flags nodes whose attributes changed, or that were added, since the last refresh.
+        """
+        if not self._paused:
+            self._dirty.update([uuids] if isinstance(uuids, str) else uuids)
+
+    def mark_removed(self, uuids):
+        self._removed.update([uuids] if isinstance(uuids, str) else uuids)
+
+    def invalidate(self):
+        """
+        Forces a full build on the next refresh (e.g. after a new scene was opened).
+        """
+        self.built = False
+
+    @contextmanager
+    def paused(self):
+        """
+        Ignores the attribute callbacks of the edits made inside the `with` block,
+        for operations that record their own changes with `record_plan`.
+        """
+        self._paused = True
+        try:
+            yield self
+        finally:
+            self._paused = False
+
+    def record_plan(self, plan: planner.AttrPlan, uuids: dict = None):
+        """
+        Writes the changes of an applied plan into the inventory, without reading the scene.
+
+        Args:
+            plan (AttrPlan): The applied plan.
+            uuids (dict): {node name: uuid} of the planned nodes, when already known.
+        """
+        changes = plan.pending()
+        if not changes:
+            return
+        if uuids is None:
+            uuids = backends.node_uuids(self.cmds, [change.node for change in changes])
+
+        for change in changes:
+            uuid = uuids.get(change.node)
+            if uuid not in self.states:
+                continue
+            states = dict(self.states[uuid])
+            if change.attr not in states and change.action in (planner.EDIT_RANGE, planner.EDIT_DEFAULT):
+                # An edit of a compound child: re-read its parent.
+                self._dirty.add(uuid)
+                continue
+            if change.action in (planner.DELETE, planner.REPLACE, planner.RECREATE):
+                states.pop(change.attr, None)
+            if change.action in (planner.ADD, planner.REPLACE, planner.RECREATE,
+                                 planner.EDIT_ENUM, planner.EDIT_RANGE, planner.EDIT_DEFAULT):
+                state = planner.state_from_spec(change.spec)
+                if change.action in (planner.EDIT_ENUM, planner.EDIT_RANGE, planner.EDIT_DEFAULT):
+                    state = state._replace(default_val=change.spec.default_val if change.spec.default_val
+                                           is not None else change.state.default_val)
+                if change.action in (planner.EDIT_RANGE, planner.EDIT_DEFAULT):
+                    state = state._replace(locked=change.state.locked)
+                states[change.attr] = state
+            self._index(uuid, states)
+
+    # ----------------- Callbacks ---------------
+    def attach_callbacks(self, om=None):
+        """
+        Keeps the inventory current through OpenMaya callbacks: one global
+        node added/removed callback pair, and one attribute callback per transform.
+
+        Returns:
+            bool: False when the callbacks are not available (e.g. in a stand-in session).
+        """
+        if self._callback_ids:
+            return True
+        if om is None:
+            import maya.api.OpenMaya as om
+        if not hasattr(om, "MDGMessage"):
+            return False
+
+        watched_messages = (om.MNodeMessage.kAttributeAdded | om.MNodeMessage.kAttributeRemoved
+                            | om.MNodeMessage.kAttributeRenamed | om.MNodeMessage.kAttributeLocked
+                            | om.MNodeMessage.kAttributeUnlocked | om.MNodeMessage.kAttributeKeyable
+                            | om.MNodeMessage.kAttributeUnkeyable)
+
+        def node_uuid(mobject):
+            return om.MFnDependencyNode(mobject).uuid().asString()
+
+        def on_attribute_changed(message, plug, other_plug, client_data):
+            if message & watched_messages:
+                self.mark_dirty(client_data)
+
+        def watch(mobject):
+            uuid = node_uuid(mobject)
+            if uuid not in self._node_callbacks:
+                self._node_callbacks[uuid] = om.MNodeMessage.addAttributeChangedCallback(
+                    mobject, on_attribute_changed, uuid)
+            return uuid
+
+        def on_added(mobject, client_data):
+            self.mark_dirty(watch(mobject))
+
+        def on_removed(mobject, client_data):
+            uuid = node_uuid(mobject)
+            self.mark_removed(uuid)
+            callback_id = self._node_callbacks.pop(uuid, None)
+            if callback_id is not None:
+                om.MMessage.removeCallback(callback_id)
+
+        def on_new_scene(client_data):
+            self.detach_callbacks(om)
+            self.invalidate()
+            self.attach_callbacks(om)
+
+        iterator = om.MItDependencyNodes(om.MFn.kTransform)
+        while not iterator.isDone():
+            watch(iterator.thisNode())
+            iterator.next()
+
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(on_added, "transform"),
+            om.MDGMessage.addNodeRemovedCallback(on_removed, "transform"),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, on_new_scene),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, on_new_scene),
+        ]
+        return True
+
+    def detach_callbacks(self, om=None):
+        if not (self._callback_ids or self._node_callbacks):
+            return
+        if om is None:
+            import maya.api.OpenMaya as om
+        om.MMessage.removeCallbacks(self._callback_ids + list(self._node_callbacks.values()))
+        self._callback_ids = []
+        self._node_callbacks = {}
+
+    # ----------------- Queries -----------------
+    def _paths(self, uuids):
+        """
+        Returns {uuid: full path} for the nodes that still exist.
+        """
+        return backends.long_names(self.cmds, list(uuids))
+
+    def states_for(self, objects: list):
+        """
+        Returns the {node: {attr: AttrState}} of the objects, as expected by
+        `planner.plan_attributes(current_states=...)`.
+
+        The objects are re-read through the backend in one pass rather than taken
+        from the index: Maya sends no callback for range or enum edits, so indexed
+        states may be stale. The fresh states are written back into the index.
+        """
+        with profiler.section(f"{self.backend.name}.query_user_attrs"):
+            current_states = self.backend.query_user_attrs(objects)
+        if self.built:
+            for node, uuid in backends.node_uuids(self.cmds, list(current_states)).items():
+                if uuid in self.states:
+                    self._index(uuid, dict(current_states[node]))
+        return current_states
+
+    def nodes_with_attr(self, attr: str, uuids: bool = False):
+        """
+        Returns the transforms having the user-defined attribute `attr`, as full
+        paths (or UUIDs when `uuids` is set).
+        """
+        self.refresh()
+        nodes = sorted(self.attr_nodes.get(attr, ()))
+        return nodes if uuids else list(self._paths(nodes).values())
+
+    def nodes_with_separator(self, separator: str, uuids: bool = False):
+        """
+        Returns the transforms having `separator` as a separator attribute.
+        """
+        self.refresh()
+        nodes = sorted(self.separator_nodes.get(separator, ()))
+        return nodes if uuids else list(self._paths(nodes).values())
+
+    def separator_members(self, separator: str):
+        """
+        Returns {node path: [attributes under the separator]} for every transform having it.
+        """
+        self.refresh()
+        members = {}
+        for uuid, path in self._paths(sorted(self.separator_nodes.get(separator, ()))).items():
+            section = None
+            members[path] = []
+            for attr, state in self.states.get(uuid, {}).items():
+                if planner.is_separator(state):
+                    section = attr
+                elif section == separator:
+                    members[path].append(attr)
+
+        return members
+
+
+_scene_inventory = None
+
+
+def scene_inventory(backend: backends.AttrBackend = None):
+    """
+    Returns the session-wide inventory, attaching its callbacks on first use.
+    """
+    global _scene_inventory
+    if _scene_inventory is None:
+        _scene_inventory = AttrInventory(backend=backend)
+        try:
+            _scene_inventory.attach_callbacks()
+        except ImportError:
+            pass
+    return _scene_inventory
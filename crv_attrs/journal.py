@@ -0,0 +1,449 @@
+"""
+Append-only journal of the attribute changes made in a session or a batch.
+
+Journaling is off by default. While a recording is open, every plan applied
+through `planner.apply_plan` writes one line per planned change, then one
+checkpoint line with the objects it applied to once the backend flushed:
+
+    with journal.recording("edits.jsonl", "Add New", objects):
+        core.create_custom_attributes(objects, ...)
+
+The file is JSON lines and is only ever appended to, so a crash loses at most
+the line being written. It can then be read back to:
+
+    - resume an interrupted operation on the objects it did not reach:
+      `journal.pending_objects("edits.jsonl")`;
+    - replay the applied changes onto another scene (e.g. the last saved
+      version of the crashed one): `journal.replay("edits.jsonl")`.
+
+Replayed changes are diffed again against the target scene, so objects that
+already have them are left untouched.
+"""
+import itertools
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from crv_attrs import backends, engine, planner, profiler, validation
+
+# Record kinds
+BEGIN = "begin"
+CHANGE = "change"
+APPLIED = "applied"
+END = "end"
+
+# Operation status
+OK = "ok"
+FAILED = "failed"
+CANCELLED = "cancelled"
+# An operation without an end record: the session crashed or is still running.
+INTERRUPTED = "interrupted"
+
+# Skip reasons of `replay`
+MISSING = "missing"
+
+# Stack of the currently open recordings.
+_active_journals: list = []
+_operation_ids = itertools.count(1)
+
+
+def default_path():
+    """
+    Returns the journal used by `SmartAttributeUI`: `$CRV_ATTRS_JOURNAL`, or a file in the home folder.
+    """
+    return os.environ.get("CRV_ATTRS_JOURNAL") or os.path.join(os.path.expanduser("~"), "crv_attrs_journal.jsonl")
+
+
+def spec_to_dict(spec: planner.AttrSpec):
+    data = spec._asdict()
+    data["children"] = [spec_to_dict(child) for child in spec.children]
+    return data
+
+
+def spec_from_dict(data: dict):
+    data = dict(data)
+    data["children"] = tuple(spec_from_dict(child) for child in data.get("children", ()))
+    for field in ("default_val", "min_val", "max_val"):
+        # JSON turns vector defaults into lists.
+        if isinstance(data.get(field), list):
+            data[field] = tuple(data[field])
+    return planner.AttrSpec(**data)
+
+
+class Journal:
+    """
+    Writes the records of one or more operations to an append-only file.
+
+    Args:
+        path (str): The journal file, created when missing. When None, the records
+                    are only kept in `records` (e.g. to be sent back by a batch worker).
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.records: list = []
+        self.operation = None
+        # Set by the caller to report how the current operation ended (e.g. CANCELLED).
+        self.status = None
+        self._file = None
+        if path:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a")
+
+    def write(self, records: list, sync: bool = False):
+        """
+        Appends records, one JSON line each, flushed to the file (and synced to disk with `sync`).
+        """
+        if not records:
+            return
+        if self._file is None:
+            self.records.extend(records)
+            return
+        self._file.write("".join(json.dumps(record) + "\n" for record in records))
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def begin(self, name: str, objects: list = (), **info):
+        """
+        Starts an operation on `objects` and returns its id.
+        """
+        self.operation = f"{os.getpid()}-{int(time.time())}-{next(_operation_ids)}"
+        self.status = None
+        self.write([dict(info, kind=BEGIN, operation=self.operation, name=name, time=time.time(),
+                         objects=list(objects))], sync=True)
+        return self.operation
+
+    def record_plan(self, plan: planner.AttrPlan):
+        """
+        Appends one record per pending change of a plan about to be applied.
+        """
+        self.write([{"kind": CHANGE, "operation": self.operation, "node": change.node, "attr": change.attr,
+                     "action": change.action, "spec": spec_to_dict(change.spec) if change.spec else None}
+                    for change in plan.pending()])
+
+    def checkpoint(self, nodes: list):
+        """
+        Records that every change planned for `nodes` so far was applied.
+        """
+        if nodes:
+            self.write([{"kind": APPLIED, "operation": self.operation, "nodes": list(nodes)}], sync=True)
+
+    def end(self, status: str = None, error: str = None):
+        self.write([{"kind": END, "operation": self.operation, "status": status or self.status or OK,
+                     "error": error, "time": time.time()}], sync=True)
+        self.operation = None
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+# -------------------------------------------------
+# ----------------- Recording ---------------------
+# -------------------------------------------------
+def active_journal():
+    """
+    Returns the innermost open recording, or None when journaling is off.
+    """
+    return _active_journals[-1] if _active_journals else None
+
+
+@contextmanager
+def recording(path, name: str = "", objects: list = (), **info):
+    """
+    Records every plan applied inside the `with` block as one operation.
+
+    Args:
+        path: The journal file, or an open `Journal` (kept open afterwards).
+        name (str): The operation name, e.g. "Add New".
+        objects (list): Every object the operation targets, for `pending_objects`.
+
+    Yields:
+        Journal: The journal; set its `status` to report a cancelled operation.
+    """
+    log = path if isinstance(path, Journal) else Journal(path)
+    log.begin(name, objects, **info)
+    _active_journals.append(log)
+    try:
+        yield log
+    except Exception as error:
+        log.end(FAILED, error=f"{type(error).__name__}: {error}")
+        raise
+    else:
+        log.end()
+    finally:
+        _active_journals.remove(log)
+        if log is not path:
+            log.close()
+
+
+def record_plan(plan: planner.AttrPlan):
+    log = active_journal()
+    if log is not None and log.operation is not None:
+        log.record_plan(plan)
+
+
+def record_applied(plan: planner.AttrPlan):
+    log = active_journal()
+    if log is not None and log.operation is not None:
+        # Objects already up to date count as done too.
+        log.checkpoint(list(dict.fromkeys(change.node for change in plan.changes)))
+
+
+# -------------------------------------------------
+# ----------------- Reading -----------------------
+# -------------------------------------------------
+class Operation(NamedTuple):
+    """
+    One operation read back from a journal.
+    """
+    id: str
+    name: str
+    objects: list
+    # AttrChange (without state) of every planned change, in order.
+    changes: list
+    applied: set
+    status: str
+
+    def applied_changes(self):
+        return [change for change in self.changes if change.node in self.applied]
+
+    def pending_objects(self):
+        return [node for node in self.objects if node not in self.applied]
+
+
+def read_records(path: str):
+    """
+    Returns every record of a journal file. A last line cut short by a crash is ignored.
+    """
+    records = []
+    with open(path) as journal_file:
+        for line in journal_file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+def read_operations(source):
+    """
+    Groups the records of a journal into operations, in the order they began.
+
+    Args:
+        source: A journal file path, a `Journal` or a list of records.
+
+    Returns:
+        list: Operation for every operation of the journal.
+    """
+    if isinstance(source, Journal):
+        records = source.records if source.path is None else read_records(source.path)
+    elif isinstance(source, str):
+        records = read_records(source)
+    else:
+        records = source
+
+    operations = {}
+    for record in records:
+        operation_id, kind = record.get("operation"), record.get("kind")
+        if kind == BEGIN:
+            operations[operation_id] = {"name": record.get("name", ""), "objects": record.get("objects", []),
+                                        "changes": [], "applied": set(), "status": INTERRUPTED}
+            continue
+        operation = operations.get(operation_id)
+        if operation is None:
+            continue
+        if kind == CHANGE:
+            spec = spec_from_dict(record["spec"]) if record.get("spec") else None
+            operation["changes"].append(planner.AttrChange(record["node"], record["attr"], record["action"], spec))
+        elif kind == APPLIED:
+            operation["applied"].update(record["nodes"])
+        elif kind == END:
+            operation["status"] = record.get("status", OK)
+
+    return [Operation(operation_id, **operation) for operation_id, operation in operations.items()]
+
+
+def last_interrupted(source):
+    """
+    Returns the last operation that never ended (or was cancelled or failed), or None.
+    """
+    for operation in reversed(read_operations(source)):
+        if operation.status != OK:
+            return operation
+    return None
+
+
+def pending_objects(source, operation: str = None):
+    """
+    Returns the objects an interrupted operation did not reach, to run it again on them only.
+
+    Args:
+        source: A journal file path, a `Journal` or a list of records.
+        operation (str): The operation id. Defaults to the last interrupted operation.
+    """
+    if operation is None:
+        found = last_interrupted(source)
+    else:
+        found = next((item for item in read_operations(source) if item.id == operation), None)
+    return found.pending_objects() if found else []
+
+
+# -------------------------------------------------
+# ----------------- Replay ------------------------
+# -------------------------------------------------
+def _fold_child(spec: planner.AttrSpec, child: planner.AttrSpec):
+    """
+    Returns the spec of a vector or compound with the range and default of one child edited.
+    """
+    if spec.attr_type not in backends.VECTOR_TYPES:
+        return spec._replace(children=tuple(child if current.name == child.name else current
+                                            for current in spec.children))
+    # Vector children share the range of their parent and take its default per axis.
+    defaults = spec.default_val
+    if not isinstance(defaults, (list, tuple)):
+        defaults = (defaults,) * len(backends.VECTOR_AXES)
+    axis = child.name[len(spec.name):]
+    if axis in backends.VECTOR_AXES:
+        defaults = list(defaults)
+        defaults[backends.VECTOR_AXES.index(axis)] = child.default_val
+    return spec._replace(min_val=child.min_val, max_val=child.max_val, soft_min=child.soft_min,
+                         soft_max=child.soft_max, default_val=tuple(defaults))
+
+
+def plan_replay(changes: list,
+                backend: backends.AttrBackend = None,
+                rename: dict = None,
+                inventory=None):
+    """
+    Re-plans recorded changes against the current scene.
+
+    The changes are first folded into the final result they lead to, one per
+    attribute (e.g. added, then re-created with another type: one attribute of
+    the last type), which is then diffed against the scene like a new request.
+    Range and default edits of vector or compound children are folded into
+    their parent's spec.
+
+    Args:
+        changes (list): Recorded AttrChange, in order.
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        rename (dict): {recorded node: target node}, for scenes where the objects are named differently.
+        inventory (AttrInventory): Provides the current attributes instead of the backend.
+
+    Returns:
+        AttrPlan: The changes still needed. Missing objects are reported as skipped.
+    """
+    backend = backend or backends.get_backend()
+    rename = rename or {}
+    changes = [(rename.get(change.node, change.node), change) for change in changes]
+
+    nodes = list(dict.fromkeys(node for node, _ in changes))
+    existing, missing = validation.existing_objects(backend.cmds, nodes)
+    if inventory is not None and existing:
+        current_states = inventory.states_for(existing)
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(existing) if existing else {}
+
+    # (node, child) -> parent, for the children of vectors and compounds.
+    parents = {(node, child): attr for node, states in current_states.items()
+               for attr, state in states.items() for child, _ in state.children}
+
+    # (node, attr) -> (last action, spec, reordered). Adds and re-creations move the
+    # attribute to the end of the node, as they did when recorded.
+    final = {}
+    # (node, parent) -> {child: child spec}: child edits of attributes the journal did not create.
+    child_edits = {}
+    for node, change in changes:
+        key = (node, change.attr)
+        parent = parents.get(key) if change.action in (planner.EDIT_RANGE, planner.EDIT_DEFAULT) else None
+        if parent is not None:
+            # A child edit is folded into the spec of its parent.
+            if (node, parent) in final:
+                action, spec, reordered = final[(node, parent)]
+                final[(node, parent)] = (action, _fold_child(spec, change.spec), reordered)
+            else:
+                child_edits.setdefault((node, parent), {})[change.attr] = change.spec
+            continue
+
+        if change.action in (planner.ADD, planner.REPLACE, planner.RECREATE):
+            reordered = change.action == planner.RECREATE or final.pop(key, (None, None, False))[2]
+            final[key] = (change.action, change.spec, reordered)
+        else:
+            reordered = final.get(key, (None, None, False))[2]
+            final[key] = (change.action, change.spec, reordered)
+        if change.action in (planner.ADD, planner.REPLACE, planner.RECREATE, planner.DELETE):
+            # Re-created or deleted as a whole: the earlier child edits are superseded.
+            child_edits.pop(key, None)
+        if change.spec is not None:
+            parents.update(((node, child.name), change.attr) for child in planner.child_specs(change.spec))
+
+    missing = set(missing)
+    plan = planner.AttrPlan(skipped=[(node, None, MISSING) for node in nodes if node in missing])
+    for (node, attr), (action, spec, reordered) in final.items():
+        if node in missing:
+            continue
+        state = current_states.get(node, {}).get(attr)
+        if action == planner.DELETE:
+            if state is not None:
+                plan.changes.append(planner.AttrChange(node, attr, planner.DELETE, state=state))
+            continue
+
+        change = planner.diff_attr(node, spec, state)
+        if reordered and change.action not in (planner.ADD, planner.REPLACE):
+            change = planner.AttrChange(node, attr, planner.RECREATE, spec, state)
+        if change.action != planner.NOOP:
+            plan.changes.append(change)
+        if change.action not in (planner.ADD, planner.REPLACE, planner.RECREATE):
+            plan.changes.extend(planner.diff_children(node, spec, state))
+
+    for (node, parent), specs in child_edits.items():
+        state = current_states.get(node, {}).get(parent)
+        if node in missing or state is None:
+            continue
+        child_states = dict(state.children)
+        for child, spec in specs.items():
+            change = planner.diff_attr(node, spec, child_states.get(child))
+            if change.action in (planner.EDIT_RANGE, planner.EDIT_DEFAULT):
+                plan.changes.append(change)
+
+    return plan
+
+
+def replay(source,
+           operations: list = None,
+           rename: dict = None,
+           backend: backends.AttrBackend = None,
+           dry_run: bool = False,
+           inventory=None):
+    """
+    Applies the changes recorded in a journal onto the current scene, in one flush.
+
+    Only the changes that were applied when they were recorded are replayed;
+    re-created attributes keep their data (see `engine.apply_preserving`).
+
+    Args:
+        source: A journal file path, a `Journal` or a list of records.
+        operations (list): Ids of the operations to replay. Defaults to all of them.
+        rename (dict): {recorded node: target node}.
+        backend (AttrBackend): The engine that executes the edits.
+        dry_run (bool): Only plan the changes, without touching the scene.
+        inventory (AttrInventory): Provides the current attributes and records the changes.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) changes.
+    """
+    changes = [change for operation in read_operations(source)
+               if operations is None or operation.id in operations
+               for change in operation.applied_changes()]
+    backend = backend or backends.get_backend()
+    with profiler.section("journal.replay"):
+        plan = plan_replay(changes, backend=backend, rename=rename, inventory=inventory)
+    if dry_run or not plan.pending():
+        return plan
+    return engine.apply_preserving(plan, backend=backend, inventory=inventory)
@@ -0,0 +1,408 @@
+"""
+Transfer and mirroring of whole attribute layouts between objects.
+
+A layout is the ordered list of the user-defined attributes of one object,
+separators included, each as the `planner.AttrSpec` that re-creates it
+(type, range, enum fields, defaults, children), and optionally the current
+values. It is read once, from the attributes read for every source in one
+pass, and applied to any number of targets through the same diff as
+`create_custom_attributes`: only the missing or different attributes are
+edited, and every target is edited in a single backend flush.
+
+    source = layout.read_layout("L_brow_ctrl")
+    layout.transfer_layout(source, ["C_brow_ctrl", "R_brow_ctrl"], values=True)
+
+    # Every L_* control onto its R_* counterpart, attributes named L_* renamed too.
+    layout.mirror_layouts(objects, layout.MirrorRule("L_*", "R_*"))
+"""
+import re
+from typing import NamedTuple
+
+from crv_attrs import backends, engine, planner, profiler, validation
+
+# Skip reasons
+MISSING = "missing"
+LOCKED = "locked"
+
+
+class AttrLayout(NamedTuple):
+    """
+    The attribute layout of one object, in channel box order.
+    """
+    source: str
+    # AttrSpec of every attribute, separators included.
+    specs: tuple
+    # (attr, value) pairs, when the layout was read with its values.
+    values: tuple = ()
+
+    def names(self):
+        return [spec.name for spec in self.specs]
+
+    def sections(self):
+        """
+        Returns {separator: [attributes under it]}; attributes before the first
+        separator are listed under None.
+        """
+        sections = {}
+        section = None
+        for spec in self.specs:
+            if planner.is_separator(planner.state_from_spec(spec)):
+                section = spec.name
+                sections[section] = []
+            else:
+                sections.setdefault(section, []).append(spec.name)
+        return sections
+
+
+class LayoutPlan(planner.AttrPlan):
+    """
+    The attribute changes of a layout transfer, plus the values it sets.
+    """
+
+    def __init__(self, changes: list = None, skipped: list = None, values: list = None):
+        super().__init__(changes, skipped)
+        # (node, attr, attr_type, value) of the values set after the attribute edits.
+        self.values: list = values or []
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        lines = [super().report(verbose=verbose, limit=limit)]
+        if self.values:
+            lines.append(f"{len(self.values)} values to set")
+        return "\n".join(lines)
+
+
+# -------------------------------------------------
+# ----------------- Reading -----------------------
+# -------------------------------------------------
+def _copied_values(states: dict):
+    # Separators hold no data, and multi or compound values are not carried over.
+    return [(attr, state.attr_type) for attr, state in states.items()
+            if not planner.is_separator(state) and not state.multi and state.attr_type != "compound"]
+
+
+def read_layouts(objects: list,
+                 backend: backends.AttrBackend = None,
+                 inventory=None,
+                 values: bool = False):
+    """
+    Reads the layout of every object, with one attribute pass (and one value pass).
+
+    Args:
+        objects (list): The source objects.
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+        values (bool): Also read the current values.
+
+    Returns:
+        dict: {object: AttrLayout}.
+    """
+    backend = backend or backends.get_backend()
+    if not objects:
+        return {}
+    if inventory is not None:
+        current_states = inventory.states_for(objects)
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(objects)
+
+    read_values = {}
+    if values:
+        plugs = [(node, attr, attr_type) for node, states in current_states.items()
+                 for attr, attr_type in _copied_values(states)]
+        read_values = dict(zip(((node, attr) for node, attr, _ in plugs), backend.get_values(plugs)))
+
+    layouts = {}
+    for node, states in current_states.items():
+        specs = tuple(planner.spec_from_state(attr, state) for attr, state in states.items())
+        node_values = tuple((attr, read_values[(node, attr)]) for attr, _ in _copied_values(states)
+                            if read_values.get((node, attr)) is not None)
+        layouts[node] = AttrLayout(node, specs, node_values)
+    return layouts
+
+
+def read_layout(node: str,
+                backend: backends.AttrBackend = None,
+                inventory=None,
+                values: bool = False):
+    """
+    Returns the AttrLayout of one object, see `read_layouts`.
+    """
+    return read_layouts([node], backend=backend, inventory=inventory, values=values)[node]
+
+
+# -------------------------------------------------
+# ----------------- Mirroring ---------------------
+# -------------------------------------------------
+class MirrorRule:
+    """
+    Maps names matching a glob to their mirrored name, e.g. "L_*" -> "R_*".
+
+    Every "*" of `target` takes the text matched by the "*" at the same
+    position in `source`.
+
+    Args:
+        source (str): Glob with "*" wildcards, e.g. "L_*" or "*_L".
+        target (str): The mirrored name, with as many "*" as `source`.
+    """
+
+    def __init__(self, source: str = "L_*", target: str = "R_*"):
+        if source.count("*") != target.count("*"):
+            raise ValueError(f"Mirror rule {source!r} -> {target!r}: both sides need the same number of '*'")
+        self.source = source
+        self.target = target
+        self._regex = re.compile("^" + "(.*?)".join(map(re.escape, source.split("*"))) + "$")
+        self._parts = target.split("*")
+
+    def __repr__(self):
+        return f"MirrorRule({self.source!r}, {self.target!r})"
+
+    @classmethod
+    def parse(cls, text: str):
+        """
+        Builds a rule from "source:target" text, e.g. "L_*:R_*".
+        """
+        source, separator, target = (text or "").partition(":")
+        if not separator or not source.strip() or not target.strip():
+            raise ValueError(f"Invalid mirror rule {text!r}, expected e.g. 'L_*:R_*'")
+        return cls(source.strip(), target.strip())
+
+    def apply(self, name: str):
+        """
+        Returns the mirrored name, or None when `name` does not match the rule.
+        """
+        match = self._regex.match(name)
+        if match is None:
+            return None
+        captured = iter(match.groups())
+        return "".join(part + next(captured, "") for part in self._parts)
+
+    def apply_path(self, path: str):
+        """
+        Mirrors every component of a DAG path, keeping the ones that do not match.
+        Returns None when no component matches.
+        """
+        components = path.split("|")
+        mirrored = [self.apply(component) for component in components]
+        if not any(mirrored):
+            return None
+        return "|".join(new or old for old, new in zip(components, mirrored))
+
+
+def _rename_spec(spec: planner.AttrSpec, rule: MirrorRule):
+    return spec._replace(name=rule.apply(spec.name) or spec.name,
+                         children=tuple(_rename_spec(child, rule) for child in spec.children))
+
+
+def mirror_layout(layout: AttrLayout, rule: MirrorRule, rename_attrs: bool = True):
+    """
+    Returns the layout with its attribute names mirrored by the rule (those that match).
+    """
+    if not rename_attrs:
+        return layout
+    return layout._replace(specs=tuple(_rename_spec(spec, rule) for spec in layout.specs),
+                           values=tuple((rule.apply(attr) or attr, value) for attr, value in layout.values))
+
+
+# -------------------------------------------------
+# ----------------- Applying ----------------------
+# -------------------------------------------------
+def plan_layouts(assignments: list,
+                 backend: backends.AttrBackend = None,
+                 inventory=None,
+                 exact: bool = False,
+                 preserve: bool = True):
+    """
+    Plans every (layout, targets) assignment in one pass, without editing the scene.
+
+    The targets are read once; each layout is validated and diffed against its
+    targets like a `create_custom_attributes` request. Attributes after the first
+    one out of order on a target are re-created, so the target ends up in the
+    layout's order.
+
+    Args:
+        assignments (list): (AttrLayout, [target objects]) pairs.
+        backend (AttrBackend): Reads the targets. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+        exact (bool): Also delete the user-defined attributes of the targets that are
+                      not part of their layout. Locked ones are skipped.
+        preserve (bool): Whether re-created attributes keep their data.
+
+    Returns:
+        LayoutPlan: The changes, the values to set and the skipped targets and attributes.
+                    `plan.validation` holds the conflicts of every layout.
+    """
+    backend = backend or backends.get_backend()
+    targets = list(dict.fromkeys(target for _, layout_targets in assignments for target in layout_targets))
+    if not targets:
+        return LayoutPlan()
+
+    existing, missing = validation.existing_objects(backend.cmds, targets)
+    skipped = [(node, None, MISSING) for node in missing]
+    if inventory is not None:
+        current_states = inventory.states_for(existing) if existing else {}
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(existing)
+
+    existing = set(existing)
+    conflicts = []
+    changes = []
+    values = []
+    for layout, layout_targets in assignments:
+        layout_targets = [target for target in dict.fromkeys(layout_targets) if target in existing]
+        if not layout_targets or not layout.specs:
+            continue
+        # The first spec takes the separator slot: validate_specs checks it like any other.
+        report = validation.validate_specs(layout_targets, layout.specs[0], list(layout.specs[1:]),
+                                           backend=backend, preserve=preserve, current_states=current_states)
+        conflicts.extend(report.conflicts)
+
+        names = set(layout.names())
+        types = {spec.name: spec.attr_type for spec in layout.specs}
+        for node in layout_targets:
+            states = current_states.get(node, {})
+            if exact:
+                for attr, state in states.items():
+                    if attr in names:
+                        continue
+                    if state.locked:
+                        skipped.append((node, attr, LOCKED))
+                    else:
+                        changes.append(planner.AttrChange(node, attr, planner.DELETE, state=state))
+            # Attributes are only ever appended: from the first one out of place (missing,
+            # re-typed or moved) on, the layout is re-created in order, as `plan_reorder` does.
+            diffs = [planner.diff_attr(node, spec, states.get(spec.name)) for spec in layout.specs]
+            current = [attr for attr, state in states.items() if attr in names or not exact or state.locked]
+            kept = planner.kept_prefix_length(current, [spec.name for spec in layout.specs])
+            kept = next((index for index, change in enumerate(diffs[:kept]) if change.action == planner.REPLACE),
+                        kept)
+            for index, change in enumerate(diffs):
+                if index >= kept and change.action not in (planner.ADD, planner.REPLACE):
+                    change = planner.AttrChange(node, change.attr, planner.RECREATE, change.spec, change.state)
+                changes.append(change)
+                if change.action not in (planner.ADD, planner.REPLACE, planner.RECREATE):
+                    changes.extend(planner.diff_children(node, change.spec, change.state))
+            for attr, value in layout.values:
+                state = states.get(attr)
+                if state is not None and state.locked:
+                    skipped.append((node, attr, LOCKED))
+                else:
+                    values.append((node, attr, types[attr], value))
+
+    plan = LayoutPlan(changes, skipped, values)
+    plan.validation = validation.ValidationReport(conflicts, sorted(existing), current_states)
+    return plan
+
+
+def apply_layout_plan(plan: LayoutPlan,
+                      backend: backends.AttrBackend = None,
+                      inventory=None,
+                      preserve: bool = True):
+    """
+    Applies the attribute changes and then sets the values, in one backend flush.
+
+    Returns:
+        LayoutPlan: The applied plan.
+    """
+    backend = backend or backends.get_backend()
+
+    def set_values(value_backend):
+        for node, attr, attr_type, value in plan.values:
+            value_backend.set_value(node, attr, attr_type, value)
+
+    if not preserve:
+        return planner.apply_plan(plan, backend=backend, inventory=inventory, after=set_values)
+    return engine.apply_preserving(plan, backend=backend, inventory=inventory, after=set_values)
+
+
+def apply_layouts(assignments: list,
+                  backend: backends.AttrBackend = None,
+                  dry_run: bool = False,
+                  inventory=None,
+                  exact: bool = False,
+                  preserve: bool = True):
+    """
+    Plans and, unless `dry_run` is set, applies (layout, targets) assignments.
+
+    Raises:
+        ValidationError: If a layout has errors on its targets. Nothing is edited then;
+                         with `dry_run` the report is stored on `plan.validation` instead.
+
+    Returns:
+        LayoutPlan: The planned (and applied) changes.
+    """
+    backend = backend or backends.get_backend()
+    plan = plan_layouts(assignments, backend=backend, inventory=inventory, exact=exact, preserve=preserve)
+    if dry_run:
+        return plan
+    if not plan.validation.ok:
+        raise validation.ValidationError(plan.validation)
+
+    return apply_layout_plan(plan, backend=backend, inventory=inventory, preserve=preserve)
+
+
+def transfer_layout(layout: AttrLayout,
+                    targets: list,
+                    backend: backends.AttrBackend = None,
+                    dry_run: bool = False,
+                    inventory=None,
+                    values: bool = True,
+                    exact: bool = False,
+                    preserve: bool = True):
+    """
+    Applies one layout to every target in a single pass.
+
+    Args:
+        layout (AttrLayout): The layout, from `read_layout`.
+        targets (list): The target objects. The layout source is ignored among them.
+        values (bool): Also set the values stored in the layout.
+
+    Returns:
+        LayoutPlan: The planned (and applied) changes.
+    """
+    if not values:
+        layout = layout._replace(values=())
+    targets = [target for target in targets if target != layout.source]
+    return apply_layouts([(layout, targets)], backend=backend, dry_run=dry_run, inventory=inventory,
+                         exact=exact, preserve=preserve)
+
+
+def mirror_layouts(objects: list,
+                   rule: MirrorRule = None,
+                   rename_attrs: bool = True,
+                   backend: backends.AttrBackend = None,
+                   dry_run: bool = False,
+                   inventory=None,
+                   values: bool = False,
+                   exact: bool = False,
+                   preserve: bool = True):
+    """
+    Copies the layout of every object matching the rule onto its mirrored counterpart.
+
+    The layouts of all sources are read in one pass; sources sharing the same
+    layout are planned together, and every counterpart is edited in one flush.
+
+    Args:
+        objects (list): The objects; those not matching the rule are ignored.
+        rule (MirrorRule): The name rule. Defaults to "L_*" -> "R_*".
+        rename_attrs (bool): Mirror the attribute names matching the rule too.
+        values (bool): Also copy the current values.
+
+    Returns:
+        LayoutPlan: The planned (and applied) changes. Counterparts that do not
+                    exist are reported as skipped.
+    """
+    rule = rule or MirrorRule()
+    pairs = [(node, rule.apply_path(node)) for node in objects]
+    pairs = [(source, target) for source, target in pairs if target and target != source]
+    layouts = read_layouts([source for source, _ in pairs], backend=backend, inventory=inventory, values=values)
+
+    assignments = {}
+    for source, target in pairs:
+        # Identical layouts share one entry, so they are validated once.
+        mirrored = mirror_layout(layouts[source], rule, rename_attrs)
+        key = (mirrored.specs, mirrored.values)
+        assignments.setdefault(key, (mirrored, []))[1].append(target)
+
+    return apply_layouts(list(assignments.values()), backend=backend, dry_run=dry_run, inventory=inventory,
+                         exact=exact, preserve=preserve)
@@ -0,0 +1,483 @@
+"""
+Plan/apply engine for attribute requests.
+
+Instead of deleting and re-creating every requested attribute, the planner
+reads the current user-defined attributes of every object once, compares
+them against the requested specs and keeps only the edits that are really
+needed. The resulting `AttrPlan` can be printed as a dry-run report before
+`apply_plan` sends it to a backend.
+"""
+import contextlib
+import math
+from collections import Counter
+from typing import NamedTuple
+
+from crv_attrs import backends, profiler
+
+# Plan actions
+ADD = "add"
+REPLACE = "replace"
+DELETE = "delete"
+EDIT_RANGE = "edit_range"
+EDIT_ENUM = "edit_enum"
+EDIT_DEFAULT = "edit_default"
+RECREATE = "recreate"
+NOOP = "noop"
+
+ACTIONS = (ADD, REPLACE, DELETE, EDIT_RANGE, EDIT_ENUM, EDIT_DEFAULT, RECREATE, NOOP)
+
+
+class AttrSpec(NamedTuple):
+    """
+    Requested definition of one attribute.
+    """
+    name: str
+    attr_type: str
+    min_val: float = None
+    max_val: float = None
+    enum_names: str = None
+    keyable: bool = True
+    channel_box: bool = False
+    # None leaves the default (or, for soft limits, removes them).
+    default_val: object = None
+    soft_min: float = None
+    soft_max: float = None
+    # AttrSpec of each child of a compound. Vector children are derived, see `child_specs`.
+    children: tuple = ()
+    multi: bool = False
+
+
+class AttrChange(NamedTuple):
+    """
+    One planned edit on one object.
+    """
+    node: str
+    attr: str
+    action: str
+    spec: AttrSpec = None
+    state: backends.AttrState = None
+
+
+class AttrPlan:
+    """
+    Ordered change set produced by `plan_attributes`.
+    """
+
+    def __init__(self, changes: list = None, skipped: list = None):
+        self.changes: list = changes or []
+        # (node, attr, reason) entries left out of the plan.
+        self.skipped: list = skipped or []
+        # SnapshotSet of the re-created attributes whose data was carried over, once applied.
+        self.snapshots = None
+        # ValidationReport of the request, when it was validated.
+        self.validation = None
+        # {(node, attr): {old index: new index}} for enum edits whose moved or removed
+        # fields are not matched by name (see `enums.plan_enum_edits`).
+        self.enum_remaps: dict = {}
+        # EnumRemap of the values and keys moved to new enum indices, once applied.
+        self.remapped = None
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def pending(self):
+        """
+        Returns every change that edits the scene (everything except no-ops).
+        """
+        return [change for change in self.changes if change.action != NOOP]
+
+    def counts(self):
+        """
+        Returns a {action: count} dict covering every action.
+        """
+        counter = Counter(change.action for change in self.changes)
+        return {action: counter.get(action, 0) for action in ACTIONS}
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        """
+        Returns a human-readable dry-run summary of the plan.
+
+        Args:
+            verbose (bool): Also list the pending changes, one per line.
+            limit (int): Maximum number of changes listed in verbose mode.
+        """
+        nodes = {change.node for change in self.changes}
+        counts = ", ".join(f"{action}: {count}" for action, count in self.counts().items())
+        lines = [f"{len(nodes)} objects, {len(self.changes)} attributes -> {counts}"]
+        if verbose:
+            pending = self.pending()
+            lines.extend(f"  {change.action:<10} {change.node}.{change.attr}" for change in pending[:limit])
+            if len(pending) > limit:
+                lines.append(f"  ... and {len(pending) - limit} more")
+        if self.skipped:
+            lines.append(f"skipped: {len(self.skipped)} ("
+                         + ", ".join(sorted({reason for _, _, reason in self.skipped})) + ")")
+        if self.validation is not None and self.validation.conflicts:
+            lines.append(self.validation.report(verbose=verbose, limit=limit))
+        if self.snapshots:
+            lines.append(self.snapshots.report(verbose=verbose, limit=limit))
+
+        return "\n".join(lines)
+
+
+# -------------------------------------------------
+# ----------------- Planning ----------------------
+# -------------------------------------------------
+def build_specs(attrs_names: list,
+                chosen_separator_attr: str,
+                attribute_type: str,
+                min_val: float,
+                max_val: float,
+                default_val=None,
+                soft_min: float = None,
+                soft_max: float = None,
+                multi: bool = False):
+    """
+    Turns the arguments of `create_custom_attributes` into specs.
+
+    Returns:
+        tuple: (separator_spec, attr_specs, removed_attrs). In "enum" mode the
+               names become the separator fields, no attribute specs are
+               returned and existing attributes with those names are removed.
+               In "compound" mode the first name is the compound and the
+               others its float children.
+    """
+    attribute_type = backends.normalize_type(attribute_type)
+    if attribute_type == "enum":
+        separator_enum = ":".join(attrs_names)
+        attr_specs = []
+        removed_attrs = [attr for attr in attrs_names if attr != chosen_separator_attr]
+    else:
+        separator_enum = backends.SEPARATOR_ENUM
+        # Integer ranges used to be ignored: only "float" took the range. Compounds pass it to their children.
+        ranged = (attribute_type in backends.RANGED_TYPES or attribute_type in backends.VECTOR_TYPES
+                  or attribute_type == "compound")
+        value_kwargs = {"min_val": min_val, "max_val": max_val,
+                        "soft_min": soft_min, "soft_max": soft_max} if ranged else {}
+        if attribute_type != "string" or isinstance(default_val, str):
+            value_kwargs["default_val"] = default_val
+        names = [attr for attr in attrs_names if attr != chosen_separator_attr]
+        if attribute_type == "compound":
+            children = tuple(AttrSpec(child, "float", **value_kwargs) for child in names[1:])
+            attr_specs = [AttrSpec(names[0], "compound", children=children, multi=multi)] if names else []
+        else:
+            attr_specs = [AttrSpec(attr, attribute_type, multi=multi, **value_kwargs) for attr in names]
+        removed_attrs = []
+
+    separator_spec = AttrSpec(chosen_separator_attr, "enum", enum_names=separator_enum,
+                              keyable=False, channel_box=True)
+
+    return separator_spec, attr_specs, removed_attrs
+
+
+def child_specs(spec: AttrSpec):
+    """
+    Returns the specs of the children of a compound, or of the X, Y and Z
+    children of a vector, which share its range and take its default per axis.
+    """
+    if spec.attr_type not in backends.VECTOR_TYPES:
+        return tuple(spec.children)
+
+    defaults = spec.default_val
+    if not isinstance(defaults, (list, tuple)):
+        defaults = (defaults,) * len(backends.VECTOR_AXES)
+    return tuple(AttrSpec(spec.name + axis, backends.VECTOR_TYPES[spec.attr_type],
+                          min_val=spec.min_val, max_val=spec.max_val, default_val=default,
+                          soft_min=spec.soft_min, soft_max=spec.soft_max, keyable=spec.keyable)
+                 for axis, default in zip(backends.VECTOR_AXES, defaults))
+
+
+def state_from_spec(spec: AttrSpec, locked: bool = False):
+    """
+    Returns the state an attribute has right after being created from `spec`.
+    """
+    return backends.AttrState(attr_type=spec.attr_type,
+                              min_val=spec.min_val,
+                              max_val=spec.max_val,
+                              enum_names=spec.enum_names,
+                              keyable=spec.keyable,
+                              channel_box=spec.channel_box and not spec.keyable,
+                              locked=locked,
+                              default_val=spec.default_val,
+                              soft_min=spec.soft_min,
+                              soft_max=spec.soft_max,
+                              children=tuple((child.name, state_from_spec(child)) for child in child_specs(spec)),
+                              multi=spec.multi)
+
+
+def is_separator(state: backends.AttrState):
+    """
+    Tells whether an attribute is a separator: a non-keyable enum shown in the channel box.
+    """
+    return state.attr_type == "enum" and not state.keyable and state.channel_box
+
+
+def _same_value(current, requested):
+    if current is None or requested is None:
+        return current is requested
+    return math.isclose(current, requested, rel_tol=1e-6, abs_tol=1e-6)
+
+
+def diff_attr(node: str,
+              spec: AttrSpec,
+              state: backends.AttrState = None):
+    """
+    Compares one requested spec with the current state of the attribute.
+
+    Returns:
+        AttrChange: The minimal change needed to reach the spec.
+    """
+    if state is None:
+        return AttrChange(node, spec.name, ADD, spec)
+
+    structure = [(child.name, child.attr_type) for child in child_specs(spec)]
+    if state.attr_type != spec.attr_type or state.multi != spec.multi or \
+            structure != [(child, child_state.attr_type) for child, child_state in state.children]:
+        return AttrChange(node, spec.name, REPLACE, spec, state)
+
+    if spec.attr_type == "enum":
+        display_ok = spec.keyable or (not state.keyable and state.channel_box)
+        if not backends.same_enum_fields(state.enum_names, spec.enum_names) or not display_ok:
+            if not backends.has_explicit_indices(spec.enum_names):
+                spec = spec._replace(enum_names=backends.merge_enum_fields(state.enum_names, spec.enum_names))
+            return AttrChange(node, spec.name, EDIT_ENUM, spec, state)
+
+    elif spec.attr_type in backends.RANGED_TYPES:
+        if not all(_same_value(getattr(state, field), getattr(spec, field))
+                   for field in ("min_val", "max_val", "soft_min", "soft_max")):
+            return AttrChange(node, spec.name, EDIT_RANGE, spec, state)
+
+    if spec.default_val is not None and (spec.attr_type == "enum" or spec.attr_type in backends.NUMERIC_TYPES):
+        if not _same_value(state.default_val, spec.default_val):
+            return AttrChange(node, spec.name, EDIT_DEFAULT, spec, state)
+
+    return AttrChange(node, spec.name, NOOP, spec, state)
+
+
+def diff_children(node: str,
+                  spec: AttrSpec,
+                  state: backends.AttrState):
+    """
+    Returns the edits of the children of a compound or vector whose structure
+    already matches (range and default edits only).
+    """
+    child_states = dict(state.children) if state else {}
+    changes = [diff_attr(node, child, child_states.get(child.name)) for child in child_specs(spec)]
+    return [change for change in changes if change.action in (EDIT_RANGE, EDIT_DEFAULT)]
+
+
+def plan_attributes(objects: list,
+                    separator_spec: AttrSpec,
+                    attr_specs: list,
+                    removed_attrs: list = (),
+                    backend: backends.AttrBackend = None,
+                    current_states: dict = None):
+    """
+    Builds the minimal change set that brings every object to the requested specs.
+
+    Args:
+        objects (list): Object names to plan for.
+        separator_spec (AttrSpec): The separator enum heading the section.
+        attr_specs (list): AttrSpec for every attribute of the section, in order.
+        removed_attrs (list): Attributes that must not exist after the operation.
+        backend (AttrBackend): Used to read the current attributes when
+                               `current_states` is not given.
+        current_states (dict): Pre-read {node: {attr: AttrState}} data.
+
+    Returns:
+        AttrPlan: The planned changes, grouped per object.
+    """
+    if current_states is None:
+        backend = backend or backends.get_backend()
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(objects)
+
+    changes = []
+    for node in objects:
+        states = current_states.get(node, {})
+
+        changes.extend(AttrChange(node, attr, DELETE, state=states[attr])
+                       for attr in removed_attrs if attr in states)
+        separator_state = states.get(separator_spec.name)
+        if separator_spec.enum_names == backends.SEPARATOR_ENUM and separator_state is not None \
+                and separator_state.attr_type == "enum" and separator_state.enum_names:
+            # The default divider never replaces the fields an existing separator already has.
+            changes.append(diff_attr(node, separator_spec._replace(enum_names=separator_state.enum_names),
+                                     separator_state))
+        else:
+            changes.append(diff_attr(node, separator_spec, separator_state))
+        for spec in attr_specs:
+            change = diff_attr(node, spec, states.get(spec.name))
+            changes.append(change)
+            if change.action not in (ADD, REPLACE):
+                changes.extend(diff_children(node, spec, change.state))
+
+    return AttrPlan(changes)
+
+
+def spec_from_state(attr: str, state: backends.AttrState):
+    """
+    Returns the spec that re-creates an attribute exactly as it is.
+    """
+    if state.attr_type in backends.VECTOR_TYPES and state.children:
+        # Vector children are derived from the parent spec: take their range and defaults.
+        first_child = state.children[0][1]
+        return AttrSpec(attr, state.attr_type, min_val=first_child.min_val, max_val=first_child.max_val,
+                        keyable=state.keyable, channel_box=state.channel_box and not state.keyable,
+                        default_val=tuple(child_state.default_val for _, child_state in state.children),
+                        soft_min=first_child.soft_min, soft_max=first_child.soft_max, multi=state.multi)
+
+    return AttrSpec(attr, state.attr_type, min_val=state.min_val, max_val=state.max_val,
+                    enum_names=state.enum_names, keyable=state.keyable,
+                    channel_box=state.channel_box and not state.keyable,
+                    default_val=state.default_val, soft_min=state.soft_min, soft_max=state.soft_max,
+                    children=tuple(spec_from_state(child, child_state) for child, child_state in state.children),
+                    multi=state.multi)
+
+
+def reorder_target(current: list, order: list):
+    """
+    Returns `current` with the attributes named in `order` moved, in that order,
+    into the slots they occupy. Attributes missing from `current` are ignored.
+    """
+    present = set(current)
+    moved = [attr for attr in dict.fromkeys(order) if attr in present]
+    moved_set = set(moved)
+    slots = iter(moved)
+    return [next(slots) if attr in moved_set else attr for attr in current]
+
+
+def kept_prefix_length(current: list, target: list):
+    """
+    Returns the length of the longest prefix of `target` that already appears, in
+    order, in `current`. Attributes are only ever appended, so these can stay and
+    every later attribute of `target` has to be re-created.
+    """
+    position = 0
+    for kept, attr in enumerate(target):
+        try:
+            position = current.index(attr, position) + 1
+        except ValueError:
+            return kept
+    return len(target)
+
+
+def plan_reorder(objects: list,
+                 order: list,
+                 backend: backends.AttrBackend = None,
+                 current_states: dict = None):
+    """
+    Plans the smallest set of attributes to re-create so that, on every object,
+    the attributes named in `order` appear in that order.
+
+    Returns:
+        AttrPlan: RECREATE changes, in the order the attributes must be re-added,
+                  and NOOP changes for the attributes that stay.
+    """
+    if current_states is None:
+        backend = backend or backends.get_backend()
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(objects)
+
+    changes = []
+    for node in objects:
+        states = current_states.get(node, {})
+        current = list(states)
+        target = reorder_target(current, order)
+        kept = kept_prefix_length(current, target)
+        changes.extend(AttrChange(node, attr, NOOP if index < kept else RECREATE,
+                                  spec_from_state(attr, states[attr]), states[attr])
+                       for index, attr in enumerate(target))
+
+    return AttrPlan(changes)
+
+
+# -------------------------------------------------
+# ----------------- Applying ----------------------
+# -------------------------------------------------
+def _add_spec(backend: backends.AttrBackend, node: str, spec: AttrSpec):
+    backend.add_attr(node, spec.name, spec.attr_type,
+                     min_val=spec.min_val, max_val=spec.max_val, enum_names=spec.enum_names,
+                     keyable=spec.keyable, channel_box=spec.channel_box,
+                     default_val=spec.default_val, soft_min=spec.soft_min, soft_max=spec.soft_max,
+                     children=child_specs(spec), multi=spec.multi)
+
+
+def apply_change(backend: backends.AttrBackend, change: AttrChange):
+    """
+    Queues the backend edits of a single change.
+    """
+    node, attr, spec = change.node, change.attr, change.spec
+
+    if change.action == DELETE:
+        backend.delete_attr(node, attr)
+    elif change.action == ADD:
+        _add_spec(backend, node, spec)
+    elif change.action in (REPLACE, RECREATE):
+        backend.delete_attr(node, attr)
+        _add_spec(backend, node, spec)
+    elif change.action == EDIT_ENUM:
+        # `edit_enum` unlocks the attribute: lock it again as it was.
+        backend.edit_enum(node, attr, spec.enum_names)
+        if not spec.keyable:
+            backend.set_channel_box(node, attr)
+        if change.state is not None and change.state.locked:
+            backend.set_lock(node, attr, True)
+    elif change.action in (EDIT_RANGE, EDIT_DEFAULT):
+        locked = change.state is not None and change.state.locked
+        if locked:
+            backend.set_lock(node, attr, False)
+        if change.action == EDIT_RANGE:
+            backend.edit_range(node, attr, spec.min_val, spec.max_val, spec.soft_min, spec.soft_max)
+        # A range edit may come with a new default too: the diff reports one action per attribute.
+        if spec.default_val is not None and not _same_value(change.state.default_val, spec.default_val):
+            backend.edit_default(node, attr, spec.default_val)
+        if locked:
+            backend.set_lock(node, attr, True)
+
+
+def apply_plan(plan: AttrPlan,
+               backend: backends.AttrBackend = None,
+               inventory=None,
+               before=None,
+               after=None):
+    """
+    Sends every pending change of a plan to the backend and flushes it once.
+
+    Args:
+        plan (AttrPlan): The plan to apply.
+        backend (AttrBackend): The engine that executes the edits.
+        inventory (AttrInventory): Records the applied changes, so it needs no re-read.
+        before (callable): Called with the backend to queue edits ahead of the plan.
+        after (callable): Called with the backend to queue edits after the plan,
+                          still in the same flush.
+
+    Returns:
+        AttrPlan: The applied plan.
+    """
+    # Records the plan when a journal recording is open (see `journal`), and moves
+    # the values and keys of enum fields whose index changes (see `enums`).
+    from crv_attrs import enums, journal
+
+    backend = backend or backends.get_backend()
+    plan.remapped = enums.capture(plan, backend)
+    journal.record_plan(plan)
+    pause = inventory.paused() if inventory is not None else contextlib.nullcontext()
+    with pause:
+        if before:
+            before(backend)
+        for change in plan.pending():
+            apply_change(backend, change)
+        plan.remapped.restore(backend)
+        if after:
+            after(backend)
+        backend.flush()
+        plan.remapped.remap_keys(backend.cmds)
+    journal.record_applied(plan)
+
+    if inventory is not None:
+        inventory.record_plan(plan)
+    return plan
@@ -0,0 +1,237 @@
+"""
+Opt-in instrumentation of the Maya commands issued by the attribute operations.
+
+Profiling is off by default and costs nothing until a session is opened:
+
+    with profiler.profile("Add New") as session:
+        core.create_custom_attributes(...)
+    print(session.format_report())
+    data = session.report()
+
+While a session is active, every backend built by `backends.get_backend()`
+talks to Maya through an `InstrumentedCmds` proxy that counts and times each
+command and groups it by the object and attribute it touched.
+"""
+import time
+from contextlib import contextmanager
+
+# Stack of the currently open profiling sessions.
+_active_profilers: list = []
+
+
+class CommandStats:
+    """
+    Call count and accumulated time of one command or one target.
+    """
+    __slots__ = ("count", "total_time")
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total_time += seconds
+
+    def as_dict(self):
+        return {"count": self.count, "time": self.total_time}
+
+
+class CommandProfiler:
+    """
+    Collects per-command and per-target statistics for one operation.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self.wall_time = 0.0
+        # Time the session waited outside the operation, e.g. in the event loop between chunks.
+        self.idle_time = 0.0
+        self.commands: dict = {}
+        self.sections: dict = {}
+        self.targets: dict = {}
+
+    def record(self, command: str, seconds: float, node: str = None, attr: str = None):
+        """
+        Adds one call of `command` that took `seconds`, optionally against node.attr.
+        """
+        self.commands.setdefault(command, CommandStats()).add(seconds)
+        if node:
+            target = f"{node}.{attr}" if attr else node
+            self.targets.setdefault(target, CommandStats()).add(seconds)
+
+    def record_section(self, section: str, seconds: float):
+        """
+        Adds the duration of one code section (e.g. a bulk read or the undo chunk).
+        """
+        self.sections.setdefault(section, CommandStats()).add(seconds)
+
+    def exclude_idle(self, working_time: float):
+        """
+        Keeps `working_time` as the wall time of a finished session and reports
+        the rest of it as idle time.
+        """
+        self.idle_time = max(0.0, self.wall_time - working_time)
+        self.wall_time = working_time
+
+    def wrap(self, cmds):
+        """
+        Returns a proxy of `cmds` that records every call on this profiler.
+        """
+        return InstrumentedCmds(cmds, self)
+
+    def report(self, top: int = 20):
+        """
+        Returns the structured report of the session.
+
+        Args:
+            top (int): Number of most expensive targets to include.
+
+        Returns:
+            dict: {"name", "wall_time", "idle_time", "command_time", "total_calls", "commands",
+                  "sections", "targets"} where commands, sections and targets map names to {"count", "time"}.
+        """
+        commands = sorted(self.commands.items(), key=lambda item: item[1].total_time, reverse=True)
+        targets = sorted(self.targets.items(), key=lambda item: item[1].total_time, reverse=True)[:top]
+
+        return {"name": self.name,
+                "wall_time": self.wall_time,
+                "idle_time": self.idle_time,
+                "command_time": sum(stats.total_time for stats in self.commands.values()),
+                "total_calls": sum(stats.count for stats in self.commands.values()),
+                "commands": {command: stats.as_dict() for command, stats in commands},
+                "sections": {section: stats.as_dict() for section, stats in self.sections.items()},
+                "targets": {target: stats.as_dict() for target, stats in targets}}
+
+    def format_report(self, top: int = 10):
+        """
+        Returns the report as readable text, as shown by `SmartAttributeUI`.
+        """
+        report = self.report(top=top)
+        idle = f" (+{report['idle_time']:.3f}s idle)" if report["idle_time"] else ""
+        lines = [f":: {report['name'] or 'Operation'} :: {report['wall_time']:.3f}s total{idle}, "
+                 f"{report['total_calls']} calls in {report['command_time']:.3f}s", "", "Commands:"]
+        lines.extend(f"  {command:<28} {stats['count']:>8} calls {stats['time']:9.4f}s"
+                     for command, stats in report["commands"].items())
+        if report["sections"]:
+            lines.extend(["", "Sections:"])
+            lines.extend(f"  {section:<28} {stats['count']:>8} runs  {stats['time']:9.4f}s"
+                         for section, stats in report["sections"].items())
+        if report["targets"]:
+            lines.extend(["", f"Top {len(report['targets'])} targets:"])
+            lines.extend(f"  {target:<40} {stats['count']:>6} calls {stats['time']:9.4f}s"
+                         for target, stats in report["targets"].items())
+
+        return "\n".join(lines)
+
+
+def _split_target(args: tuple, kwargs: dict):
+    node = attr = None
+    if args and isinstance(args[0], str):
+        node, _, attr = args[0].partition(".")
+    if "node" in kwargs:
+        # attributeQuery(attr, node=...)
+        node, attr = kwargs["node"], node
+    attr = attr or kwargs.get("attribute") or kwargs.get("ln") or kwargs.get("longName")
+
+    return node, attr
+
+
+class InstrumentedCmds:
+    """
+    Proxy of `maya.cmds` timing every command call on a `CommandProfiler`.
+    """
+
+    def __init__(self, cmds, profiler: CommandProfiler):
+        self._cmds = cmds
+        self._profiler = profiler
+
+    def __getattr__(self, command):
+        function = getattr(self._cmds, command)
+        if not callable(function):
+            return function
+
+        profiler = self._profiler
+
+        def timed_command(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                node, attr = _split_target(args, kwargs)
+                profiler.record(command, time.perf_counter() - start, node, attr)
+
+        return timed_command
+
+
+# -------------------------------------------------
+# ----------------- Session Helpers ---------------
+# -------------------------------------------------
+def active_profiler():
+    """
+    Returns the innermost open profiling session, or None when profiling is off.
+    """
+    return _active_profilers[-1] if _active_profilers else None
+
+
+def instrument(cmds):
+    """
+    Wraps `cmds` for the active session, or returns it untouched when profiling is off.
+    """
+    profiler = active_profiler()
+    return profiler.wrap(cmds) if profiler else cmds
+
+
+@contextmanager
+def profile(name: str = ""):
+    """
+    Opens a profiling session for everything run inside the `with` block.
+
+    Yields:
+        CommandProfiler: The session; its report is complete once the block exits.
+    """
+    profiler = CommandProfiler(name)
+    _active_profilers.append(profiler)
+    start = time.perf_counter()
+    try:
+        yield profiler
+    finally:
+        profiler.wall_time = time.perf_counter() - start
+        _active_profilers.remove(profiler)
+
+
+@contextmanager
+def timed(command: str, node: str = None, attr: str = None):
+    """
+    Records the duration of the `with` block as one call of `command`, if profiling is on.
+    """
+    profiler = active_profiler()
+    if profiler is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(command, time.perf_counter() - start, node, attr)
+
+
+@contextmanager
+def section(name: str):
+    """
+    Records the duration of the `with` block as a named section, if profiling is on.
+
+    Sections group several commands (a bulk read, the whole undo chunk) and are
+    reported separately from the commands, so their time is not counted twice.
+    """
+    profiler = active_profiler()
+    if profiler is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record_section(name, time.perf_counter() - start)
@@ -0,0 +1,217 @@
+"""
+Chunked, cancellable execution of attribute operations.
+
+`ChunkedTask` splits the object list into chunks and runs one chunk per
+`step()`. The chunk size adapts to the measured per-object cost so that each
+step takes roughly `target_chunk_time` seconds. The whole task stays one undo
+step: the undo chunk is opened by `start()` and closed exactly once when the
+task finishes, is cancelled or fails.
+
+`run_deferred` drives a task from a Qt timer, so the UI keeps processing
+events (progress bar, Cancel button) between chunks. User input to every other
+widget, Maya's included, is blocked until the task finishes: anything the
+artist did in between would otherwise land in the task's undo step.
+`ChunkedTask.run` runs it synchronously for scripts.
+"""
+import time
+
+
+class ChunkedTask:
+    """
+    Runs `function(chunk)` over `objects` in adaptively sized chunks.
+
+    Args:
+        objects (list): Every object the operation applies to.
+        function (callable): Called with each chunk (a list of objects).
+        name (str): Undo chunk name.
+        cmds: The `maya.cmds` module used for the undo chunk. Imported when omitted.
+        chunk_size (int): Size of the first chunk.
+        target_chunk_time (float): Seconds each chunk should take.
+        max_chunk_size (int): Upper bound of the adaptive chunk size.
+    """
+
+    def __init__(self, objects: list, function, name: str = "", cmds=None,
+                 chunk_size: int = 25, target_chunk_time: float = 0.05, max_chunk_size: int = 5000):
+        if cmds is None:
+            from maya import cmds
+        self.cmds = cmds
+        self.objects = list(objects)
+        self.function = function
+        self.name = name
+        self.chunk_size = max(1, chunk_size)
+        self.target_chunk_time = target_chunk_time
+        self.max_chunk_size = max_chunk_size
+
+        self.done = 0
+        self.elapsed = 0.0
+        self.started = False
+        self.finished = False
+        self.cancelled = False
+        self.error = None
+
+    @property
+    def total(self):
+        return len(self.objects)
+
+    @property
+    def progress(self):
+        """
+        Returns the completed fraction, between 0 and 1.
+        """
+        return self.done / self.total if self.total else 1.0
+
+    @property
+    def eta(self):
+        """
+        Returns the estimated remaining seconds, or None before the first chunk ran.
+        """
+        if not self.done:
+            return None
+        return self.elapsed / self.done * (self.total - self.done)
+
+    def start(self):
+        """
+        Opens the undo chunk shared by every step.
+        """
+        if not self.started:
+            self.cmds.undoInfo(openChunk=True, chunkName=self.name or None)
+            self.started = True
+
+    def cancel(self):
+        """
+        Stops the task before its next chunk. Chunks already applied stay in the
+        (single) undo step.
+        """
+        self.cancelled = True
+
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        if self.started:
+            self.cmds.undoInfo(closeChunk=True)
+
+    def _adapt_chunk_size(self, chunk_length: int, seconds: float):
+        if seconds <= 0:
+            self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+            return
+        per_object = seconds / chunk_length
+        self.chunk_size = int(min(max(1, self.target_chunk_time / per_object), self.max_chunk_size))
+
+    def step(self):
+        """
+        Runs the next chunk.
+
+        Returns:
+            bool: True while there is more work to do.
+        """
+        if self.finished:
+            return False
+        if self.cancelled or self.done >= self.total:
+            self._finish()
+            return False
+
+        self.start()
+        chunk = self.objects[self.done:self.done + self.chunk_size]
+        start = time.perf_counter()
+        try:
+            self.function(chunk)
+        except Exception as error:
+            self.error = error
+            self._finish()
+            raise
+        seconds = time.perf_counter() - start
+
+        self.elapsed += seconds
+        self.done += len(chunk)
+        self._adapt_chunk_size(len(chunk), seconds)
+
+        if self.done >= self.total:
+            self._finish()
+            return False
+        return True
+
+    def run(self):
+        """
+        Runs every chunk synchronously and returns the task.
+        """
+        while self.step():
+            pass
+        return self
+
+
+def _input_blocker(interactive: tuple):
+    """
+    Returns an application event filter dropping the mouse, keyboard and shortcut
+    events of every widget except `interactive` ones and their children.
+    """
+    try:
+        from PySide2 import QtCore, QtWidgets
+    except ModuleNotFoundError:
+        from PySide6 import QtCore, QtWidgets
+
+    blocked_types = {QtCore.QEvent.MouseButtonPress, QtCore.QEvent.MouseButtonRelease,
+                     QtCore.QEvent.MouseButtonDblClick, QtCore.QEvent.Wheel, QtCore.QEvent.KeyPress,
+                     QtCore.QEvent.KeyRelease, QtCore.QEvent.Shortcut, QtCore.QEvent.ShortcutOverride,
+                     QtCore.QEvent.ContextMenu}
+
+    class InputBlocker(QtCore.QObject):
+        def eventFilter(self, watched, event):
+            # Window-level events are delivered again to the widget under them: only widgets are filtered.
+            if event.type() not in blocked_types or not isinstance(watched, QtWidgets.QWidget):
+                return False
+            return not any(widget is watched or widget.isAncestorOf(watched) for widget in interactive)
+
+    return InputBlocker()
+
+
+def run_deferred(task: ChunkedTask, on_progress=None, on_finished=None, interactive: tuple = ()):
+    """
+    Runs a task one chunk per Qt event-loop iteration, with user input blocked
+    everywhere but in the `interactive` widgets.
+
+    Args:
+        task (ChunkedTask): The task to run.
+        on_progress (callable): Called with the task after every chunk.
+        on_finished (callable): Called with the task once it finished, was
+                                cancelled or raised.
+        interactive (tuple): Widgets that still take input, e.g. the Cancel button.
+
+    Returns:
+        QtCore.QTimer: The driving timer; keep a reference until the task finishes.
+    """
+    try:
+        from PySide2 import QtCore, QtWidgets
+    except ModuleNotFoundError:
+        from PySide6 import QtCore, QtWidgets
+
+    timer = QtCore.QTimer()
+    timer.setInterval(0)
+    application = QtWidgets.QApplication.instance()
+    blocker = _input_blocker(tuple(interactive))
+
+    def stop():
+        timer.stop()
+        application.removeEventFilter(blocker)
+        if on_finished:
+            on_finished(task)
+
+    def run_next_chunk():
+        try:
+            more = task.step()
+        except Exception:
+            stop()
+            raise
+
+        if on_progress:
+            on_progress(task)
+        if not more:
+            stop()
+
+    timer.timeout.connect(run_next_chunk)
+    # The filter is kept alive by the timer connection until `stop` removes it.
+    application.installEventFilter(blocker)
+    task.start()
+    timer.start()
+
+    return timer
@@ -0,0 +1,286 @@
+"""
+Named, versioned attribute schemas stored as JSON.
+
+A schema describes one separator section: the separator name, its enum
+fields and the ordered attributes under it, each with its own type, range and
+enum fields. It is saved to disk as:
+
+    {
+        "name": "face_ctrl",
+        "version": 2,
+        "separator": "FACE",
+        "separator_enum": "=======",
+        "attributes": [
+            {"name": "blink", "type": "float", "min": 0, "max": 10},
+            {"name": "mode", "type": "enum", "enum": "off:on"},
+            {"name": "offset", "type": "double3", "default": [0, 1, 0]},
+            {"name": "weights", "type": "float", "multi": true, "soft_min": 0, "soft_max": 1},
+            {"name": "pose", "type": "compound", "children": [
+                {"name": "poseWeight", "type": "float", "min": 0, "max": 1},
+                {"name": "poseName", "type": "string", "default": "rest"}
+            ]}
+        ]
+    }
+
+`compile_schema` validates a schema once and turns it into the specs used by
+the planner. Compiled schemas are cached in memory, keyed by a hash of their
+content, so applying the same template again skips parsing and validation.
+"""
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+from crv_attrs import backends, engine, planner, validation
+
+SCHEMA_DIR_ENV = "CRV_ATTRS_SCHEMA_DIR"
+DEFAULT_SCHEMA_DIR = os.path.join(os.path.expanduser("~"), ".crv_attrs", "schemas")
+
+ATTRIBUTE_TYPES = backends.ATTRIBUTE_TYPES + tuple(backends.TYPE_ALIASES)
+
+_VALID_NAME = validation.VALID_NAME
+
+# Compiled schemas, keyed by content hash.
+_compiled_cache: dict = {}
+
+
+class SchemaError(ValueError):
+    """
+    Raised when a schema cannot be compiled.
+    """
+
+
+class AttrSchema:
+    """
+    A named, versioned separator section layout.
+    """
+
+    def __init__(self, name: str, separator: str, attributes: list = None,
+                 separator_enum: str = backends.SEPARATOR_ENUM, version: int = 1):
+        self.name = name
+        self.version = version
+        self.separator = separator
+        self.separator_enum = separator_enum
+        self.attributes: list = list(attributes or [])
+
+    @classmethod
+    def from_fields(cls, name: str, attrs_names: list, chosen_separator_attr: str,
+                    attribute_type: str, min_val: float = None, max_val: float = None,
+                    default_val=None, soft_min: float = None, soft_max: float = None, multi: bool = False):
+        """
+        Builds a schema from the same arguments as `create_custom_attributes`.
+        """
+        if attribute_type == "enum":
+            return cls(name, chosen_separator_attr, separator_enum=":".join(attrs_names))
+
+        attribute_type = backends.normalize_type(attribute_type)
+        value_type = "float" if attribute_type == "compound" else attribute_type
+        attribute = {"type": value_type}
+        if value_type in backends.RANGED_TYPES or value_type in backends.VECTOR_TYPES:
+            attribute.update({"min": min_val, "max": max_val, "soft_min": soft_min, "soft_max": soft_max})
+        if default_val is not None:
+            attribute["default"] = list(default_val) if isinstance(default_val, tuple) else default_val
+        attribute = {key: value for key, value in attribute.items() if value is not None}
+
+        if attribute_type == "compound":
+            children = [dict(attribute, name=attr) for attr in attrs_names[1:]]
+            attributes = [{"name": attrs_names[0], "type": "compound", "children": children}] if attrs_names else []
+        else:
+            attributes = [dict(attribute, name=attr) for attr in attrs_names]
+        if multi:
+            attributes = [dict(attribute, multi=True) for attribute in attributes]
+        return cls(name, chosen_separator_attr, attributes)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(name=data.get("name", ""),
+                   separator=data.get("separator", ""),
+                   attributes=data.get("attributes", []),
+                   separator_enum=data.get("separator_enum", backends.SEPARATOR_ENUM),
+                   version=data.get("version", 1))
+
+    def to_dict(self):
+        return {"name": self.name,
+                "version": self.version,
+                "separator": self.separator,
+                "separator_enum": self.separator_enum,
+                "attributes": [dict(attribute) for attribute in self.attributes]}
+
+    def content_hash(self):
+        """
+        Returns a hash of everything that affects the scene (name and version excluded).
+        """
+        data = self.to_dict()
+        del data["name"], data["version"]
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CompiledSchema(NamedTuple):
+    """
+    A validated schema, ready to be planned against any number of objects.
+    """
+    key: str
+    name: str
+    version: int
+    separator_spec: planner.AttrSpec
+    attr_specs: tuple
+
+
+# -------------------------------------------------
+# ----------------- Compiling ---------------------
+# -------------------------------------------------
+def _compile_attribute(attribute: dict, index: int, child: bool = False):
+    name = attribute.get("name", "")
+    attr_type = backends.normalize_type(attribute.get("type", ""))
+    if not _VALID_NAME.match(name):
+        raise SchemaError(f"Attribute {index}: invalid name {name!r}")
+    if attr_type not in ATTRIBUTE_TYPES:
+        raise SchemaError(f"Attribute {name!r}: unsupported type {attr_type!r}")
+    if child and attr_type not in validation.CHILD_TYPES:
+        raise SchemaError(f"Attribute {name!r}: unsupported compound child type {attr_type!r}")
+
+    min_val = attribute.get("min")
+    max_val = attribute.get("max")
+    soft_min = attribute.get("soft_min")
+    soft_max = attribute.get("soft_max")
+    enum_names = attribute.get("enum")
+    if attr_type == "enum" and not enum_names:
+        raise SchemaError(f"Attribute {name!r}: enum attributes need enum fields")
+    if attr_type not in backends.RANGED_TYPES and attr_type not in backends.VECTOR_TYPES:
+        min_val = max_val = soft_min = soft_max = None
+    if min_val is not None and max_val is not None and min_val > max_val:
+        raise SchemaError(f"Attribute {name!r}: min {min_val} is greater than max {max_val}")
+    if soft_min is not None and soft_max is not None and soft_min > soft_max:
+        raise SchemaError(f"Attribute {name!r}: soft min {soft_min} is greater than soft max {soft_max}")
+
+    children = ()
+    if attr_type == "compound":
+        if not attribute.get("children"):
+            raise SchemaError(f"Attribute {name!r}: compound attributes need children")
+        children = tuple(_compile_attribute(child_attribute, child_index, child=True)
+                         for child_index, child_attribute in enumerate(attribute["children"]))
+    default_val = attribute.get("default")
+    if isinstance(default_val, list):
+        default_val = tuple(default_val)
+
+    return planner.AttrSpec(name, attr_type, min_val=min_val, max_val=max_val,
+                            enum_names=enum_names if attr_type == "enum" else None,
+                            default_val=default_val, soft_min=soft_min, soft_max=soft_max,
+                            children=children, multi=bool(attribute.get("multi")))
+
+
+def compile_schema(schema: AttrSchema):
+    """
+    Validates a schema and turns it into planner specs, using the in-memory cache.
+
+    Raises:
+        SchemaError: If a name, type, range or enum definition is invalid.
+
+    Returns:
+        CompiledSchema: The compiled schema. Its specs are shared by every schema with
+                        the same content; its name and version are this schema's.
+    """
+    key = schema.content_hash()
+    compiled = _compiled_cache.get(key)
+    if compiled is not None:
+        # The key leaves out the name and version: another preset may have filled the cache.
+        return compiled._replace(name=schema.name, version=schema.version)
+
+    if not _VALID_NAME.match(schema.separator or ""):
+        raise SchemaError(f"Invalid separator name {schema.separator!r}")
+    if not schema.separator_enum:
+        raise SchemaError("The separator needs at least one enum field")
+
+    attr_specs = tuple(_compile_attribute(attribute, index) for index, attribute in enumerate(schema.attributes))
+    names = [name for spec in attr_specs for name in (spec.name, *(child.name for child in planner.child_specs(spec)))]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise SchemaError(f"Duplicate attributes: {', '.join(duplicates)}")
+    if schema.separator in names:
+        raise SchemaError(f"Attribute {schema.separator!r} has the same name as the separator")
+
+    separator_spec = planner.AttrSpec(schema.separator, "enum", enum_names=schema.separator_enum,
+                                      keyable=False, channel_box=True)
+    compiled = _compiled_cache[key] = CompiledSchema(key, schema.name, schema.version,
+                                                     separator_spec, attr_specs)
+    return compiled
+
+
+def clear_cache():
+    _compiled_cache.clear()
+
+
+def apply_schema(objects: list,
+                 schema,
+                 backend: backends.AttrBackend = None,
+                 dry_run: bool = False):
+    """
+    Applies a schema (or an already compiled one) to every object.
+
+    Returns:
+        AttrPlan: The planned (and, unless `dry_run` is set, applied) changes.
+    """
+    compiled = schema if isinstance(schema, CompiledSchema) else compile_schema(schema)
+    return engine.apply_specs(objects=objects,
+                              separator_spec=compiled.separator_spec,
+                              attr_specs=compiled.attr_specs,
+                              backend=backend,
+                              dry_run=dry_run)
+
+
+# -------------------------------------------------
+# ----------------- Library -----------------------
+# -------------------------------------------------
+def schema_dir():
+    """
+    Returns the schema library folder (`CRV_ATTRS_SCHEMA_DIR`, or ~/.crv_attrs/schemas).
+    """
+    return os.environ.get(SCHEMA_DIR_ENV) or DEFAULT_SCHEMA_DIR
+
+
+def schema_path(name: str, directory: str = None):
+    return os.path.join(directory or schema_dir(), f"{name}.json")
+
+
+def list_schemas(directory: str = None):
+    """
+    Returns the names of the schemas saved in the library folder.
+    """
+    directory = directory or schema_dir()
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.splitext(file_name)[0] for file_name in os.listdir(directory)
+                  if file_name.endswith(".json"))
+
+
+def load_schema(path: str):
+    """
+    Reads a schema from a JSON file, or from the library when given a bare name.
+    """
+    if not os.path.splitext(path)[1]:
+        path = schema_path(path)
+    with open(path) as schema_file:
+        return AttrSchema.from_dict(json.load(schema_file))
+
+
+def save_schema(schema: AttrSchema, path: str = None):
+    """
+    Writes a schema to JSON, by default into the library under its name.
+
+    If the file already holds a different layout, the schema version is bumped
+    past the saved one before writing.
+
+    Returns:
+        str: The written path.
+    """
+    path = path or schema_path(schema.name)
+    if os.path.exists(path):
+        previous = load_schema(path)
+        if previous.content_hash() != schema.content_hash():
+            schema.version = max(schema.version, previous.version + 1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as schema_file:
+        json.dump(schema.to_dict(), schema_file, indent=4)
+
+    return path
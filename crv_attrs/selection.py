@@ -0,0 +1,214 @@
+"""
+Selection model used by `SmartAttributeUI` to hold the target objects.
+
+Objects are stored as node UUIDs, so they survive renames and reparenting.
+Names are only resolved, with a single `cmds.ls` call, when an operation
+needs them or when the list view is expanded.
+
+`LiveSelection` keeps a model in sync with the scene selection. The Maya
+events only flag the selection as changed; once the events stop for
+`debounce` seconds, the selection is read with one `ls` call and diffed
+against the model, so box-selecting thousands of nodes costs one read:
+
+    live = selection.LiveSelection(model, on_selection=refresh, schedule=schedule)
+    live.start()
+"""
+import time
+
+
+class SelectionModel:
+    """
+    An ordered set of scene nodes, stored by UUID.
+
+    Args:
+        cmds: The `maya.cmds` module. Imported when omitted.
+    """
+
+    def __init__(self, cmds=None):
+        if cmds is None:
+            from maya import cmds
+        self.cmds = cmds
+        self._uuids: list = []
+
+    def __len__(self):
+        return len(self._uuids)
+
+    def __bool__(self):
+        return bool(self._uuids)
+
+    @property
+    def uuids(self):
+        return list(self._uuids)
+
+    def set_uuids(self, uuids: list):
+        """
+        Replaces the content with `uuids`, dropping duplicates but keeping their order.
+        """
+        self._uuids = list(dict.fromkeys(uuids or []))
+
+    def set_names(self, names: list):
+        """
+        Replaces the content with the nodes called `names`.
+        """
+        self.set_uuids(self.cmds.ls(names, uuid=True) if names else [])
+
+    def set_from_selection(self, node_type: str = "transform"):
+        """
+        Replaces the content with the current scene selection of `node_type` nodes.
+        """
+        self.set_uuids(self.cmds.ls(sl=True, type=node_type, uuid=True) or [])
+
+    def update_uuids(self, uuids: list):
+        """
+        Replaces the content with `uuids`, like `set_uuids`, and reports the difference.
+
+        Returns:
+            tuple: (added, removed) UUID lists, in selection order. Both are
+                   empty when the content did not change.
+        """
+        uuids = list(dict.fromkeys(uuids or []))
+        if uuids == self._uuids:
+            return [], []
+        previous = set(self._uuids)
+        current = set(uuids)
+        added = [uuid for uuid in uuids if uuid not in previous]
+        removed = [uuid for uuid in self._uuids if uuid not in current]
+        self._uuids = uuids
+        return added, removed
+
+    def clear(self):
+        self._uuids = []
+
+    def names(self, long: bool = False):
+        """
+        Resolves the stored nodes to their current names.
+
+        Nodes deleted since they were stored are skipped.
+
+        Args:
+            long (bool): Return full DAG paths instead of the shortest unique names.
+
+        Returns:
+            list: The node names, in selection order.
+        """
+        if not self._uuids:
+            return []
+        return self.cmds.ls(self._uuids, long=long) or []
+
+    def summary(self):
+        """
+        Returns the compact text shown in the objects field.
+        """
+        count = len(self._uuids)
+        return f"{count} object{'' if count == 1 else 's'}" if count else ""
+
+
+class LiveSelection:
+    """
+    Follows the scene and channel box selection through Maya event callbacks.
+
+    Args:
+        model (SelectionModel): Updated with the selected `node_type` nodes.
+        on_selection (callable): Called with (added, removed) UUIDs after the model changed.
+        on_channel_box (callable): Called, without arguments, after the channel box selection changed.
+        schedule (callable): `schedule(seconds, callback)` runs `callback` later, e.g. from a Qt
+                             timer. When omitted, every event is handled right away.
+        debounce (float): Seconds without events before the selection is read.
+        node_type (str): The type of the nodes kept in the model.
+        clock (callable): Returns the current time in seconds.
+    """
+    SELECTION_EVENT = "SelectionChanged"
+    CHANNEL_BOX_EVENT = "ChannelBoxLabelSelected"
+
+    def __init__(self, model: SelectionModel, on_selection=None, on_channel_box=None, schedule=None,
+                 debounce: float = 0.15, node_type: str = "transform", clock=time.perf_counter):
+        self.model = model
+        self.on_selection = on_selection
+        self.on_channel_box = on_channel_box
+        self.schedule = schedule
+        self.debounce = debounce
+        self.node_type = node_type
+        self.clock = clock
+
+        self._callback_ids: list = []
+        self._om = None
+        self._selection_changed = False
+        self._channel_box_changed = False
+        self._last_event = 0.0
+        self._scheduled = False
+
+    @property
+    def active(self):
+        return bool(self._callback_ids)
+
+    def start(self, om=None):
+        """
+        Subscribes to the selection events and syncs the model once.
+
+        Returns:
+            bool: False when the events are not available (e.g. in a stand-in session).
+        """
+        if self._callback_ids:
+            return True
+        if om is None:
+            import maya.api.OpenMaya as om
+        if not hasattr(om, "MEventMessage"):
+            return False
+
+        self._om = om
+        self._callback_ids = [
+            om.MEventMessage.addEventCallback(self.SELECTION_EVENT, self._on_selection_event),
+            om.MEventMessage.addEventCallback(self.CHANNEL_BOX_EVENT, self._on_channel_box_event),
+        ]
+        self._selection_changed = self._channel_box_changed = True
+        self.flush()
+        return True
+
+    def stop(self):
+        if self._callback_ids:
+            self._om.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+        self._selection_changed = self._channel_box_changed = False
+
+    # ----------------- Events ------------------
+    def _on_selection_event(self, client_data=None):
+        self._selection_changed = True
+        self._notify()
+
+    def _on_channel_box_event(self, client_data=None):
+        self._channel_box_changed = True
+        self._notify()
+
+    def _notify(self):
+        self._last_event = self.clock()
+        if self.schedule is None:
+            self.flush()
+        elif not self._scheduled:
+            self._scheduled = True
+            self.schedule(self.debounce, self._flush_when_idle)
+
+    def _flush_when_idle(self):
+        # Events keep coming (e.g. a drag selection): wait for them to settle.
+        remaining = self.debounce - (self.clock() - self._last_event)
+        if remaining > 0.001:
+            self.schedule(remaining, self._flush_when_idle)
+            return
+        self._scheduled = False
+        self.flush()
+
+    def flush(self):
+        """
+        Reads the pending changes: the selection with one `ls` call, diffed into the model.
+        """
+        if not self._callback_ids:
+            return
+        if self._selection_changed:
+            self._selection_changed = False
+            uuids = self.model.cmds.ls(sl=True, type=self.node_type, uuid=True) or []
+            added, removed = self.model.update_uuids(uuids)
+            if (added or removed) and self.on_selection:
+                self.on_selection(added, removed)
+        if self._channel_box_changed:
+            self._channel_box_changed = False
+            if self.on_channel_box:
+                self.on_channel_box()
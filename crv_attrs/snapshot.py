@@ -0,0 +1,304 @@
+"""
+Snapshot and restore of attribute data around destructive edits.
+
+Changing the type of an attribute means deleting and re-creating it, which
+drops its value, its connections and its animation. Before such a change,
+`capture` reads, for every affected attribute of the whole selection:
+
+    - its value, through the backend in one pass;
+    - its input and output connections, and those of its vector or compound
+      children, with three bulk `listConnections` calls (animation curves are
+      inputs, so keys come with them);
+    - its lock and keyable state, already known from the plan.
+
+`SnapshotSet.detach` then unlocks the attributes and disconnects their inputs,
+so the animation curves survive the deletion, and `SnapshotSet.restore`
+reconnects them, converts and sets the values and restores the lock and
+keyable state. Both are queued on the backend around the plan edits, so the
+whole change still runs in a single flush:
+
+    snapshots = snapshot.capture(plan, backend)
+    planner.apply_plan(plan, backend, before=snapshots.detach, after=snapshots.restore)
+    print(snapshots.report())
+"""
+from typing import NamedTuple
+
+from crv_attrs import backends, planner, profiler
+
+NUMERIC_TYPES = {"bool", "enum", "float", "double", "long", "short", "byte"}
+_INTEGER_TYPES = {"long", "short", "byte"}
+
+
+class AttrSnapshot(NamedTuple):
+    """
+    The data of one attribute, and the spec it is re-created with.
+    """
+    node: str
+    attr: str
+    state: backends.AttrState
+    spec: planner.AttrSpec
+    value: object = None
+    # (immediate source, real source): they differ when a unitConversion node sits in between.
+    input: tuple = None
+    outputs: tuple = ()
+    # (child, input, outputs) of the connected children of a vector or compound.
+    child_connections: tuple = ()
+
+    @property
+    def plug(self):
+        return f"{self.node}.{self.attr}"
+
+
+def _compatible(attr_type: str, new_type: str):
+    return attr_type == new_type or (attr_type in NUMERIC_TYPES and new_type in NUMERIC_TYPES)
+
+
+def convert_value(value, attr_type: str, spec: planner.AttrSpec):
+    """
+    Converts a value read from an `attr_type` attribute for an attribute built from `spec`.
+
+    Returns:
+        tuple: (value, issue). `value` is None when it cannot be converted;
+               `issue` describes a failed or lossy (clamped) conversion.
+    """
+    if value is None:
+        return None, "value could not be read"
+    if attr_type == spec.attr_type and attr_type not in NUMERIC_TYPES:
+        return value, None
+    if not _compatible(attr_type, spec.attr_type):
+        return None, f"cannot convert {attr_type} {value!r} to {spec.attr_type}"
+
+    number = float(value)
+    if spec.attr_type == "bool":
+        return bool(number), None
+    if spec.attr_type == "enum":
+        index = int(round(number))
+        if index not in dict(backends.parse_enum_string(spec.enum_names)):
+            return None, f"{value!r} is not a field of the enum {spec.enum_names!r}"
+        return index, None
+
+    converted = round(number) if spec.attr_type in _INTEGER_TYPES else number
+    issue = None
+    if spec.min_val is not None and converted < spec.min_val:
+        converted, issue = spec.min_val, f"{value!r} clamped to the minimum {spec.min_val}"
+    elif spec.max_val is not None and converted > spec.max_val:
+        converted, issue = spec.max_val, f"{value!r} clamped to the maximum {spec.max_val}"
+    return converted, issue
+
+
+class SnapshotSet:
+    """
+    Snapshots of every attribute affected by one operation, and the restore report.
+    """
+
+    def __init__(self, snapshots: list = None):
+        self.snapshots: list = snapshots or []
+        # (plug, message) pairs of the data that could not be carried over as is.
+        self.issues: list = []
+        self.restored = 0
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def __bool__(self):
+        return bool(self.snapshots)
+
+    def detach(self, backend: backends.AttrBackend):
+        """
+        Queues the unlock and input disconnection of every snapshot attribute.
+        """
+        for snapshot in self.snapshots:
+            if snapshot.state.locked:
+                backend.set_lock(snapshot.node, snapshot.attr, False)
+            if snapshot.input:
+                backend.disconnect_attr(snapshot.input[0], snapshot.plug)
+            for child, child_input, _ in snapshot.child_connections:
+                if child_input:
+                    backend.disconnect_attr(child_input[0], f"{snapshot.node}.{child}")
+
+    def restore(self, backend: backends.AttrBackend):
+        """
+        Queues the restore of connections, values, keyable and lock state on the
+        re-created attributes. Data that cannot be converted is reported in `issues`.
+        """
+        self.issues = []
+        self.restored = 0
+        for snapshot in self.snapshots:
+            node, attr, state, spec = snapshot.node, snapshot.attr, snapshot.state, snapshot.spec
+            compatible = _compatible(state.attr_type, spec.attr_type)
+
+            if snapshot.input:
+                if compatible:
+                    backend.connect_attr(snapshot.input[1], snapshot.plug)
+                else:
+                    self.issues.append((snapshot.plug, f"input {snapshot.input[1]} not reconnected: "
+                                                       f"{state.attr_type} to {spec.attr_type}"))
+            elif state.multi:
+                self.issues.append((snapshot.plug, "element values of multi attributes are not carried over"))
+            elif state.attr_type == "compound":
+                self._restore_children(snapshot, backend)
+            else:
+                value, issue = convert_value(snapshot.value, state.attr_type, spec)
+                if value is not None:
+                    backend.set_value(node, attr, spec.attr_type, value)
+                if issue:
+                    self.issues.append((snapshot.plug, issue))
+
+            for destination in snapshot.outputs:
+                if compatible:
+                    backend.connect_attr(snapshot.plug, destination)
+                else:
+                    self.issues.append((snapshot.plug, f"output {destination} not reconnected: "
+                                                       f"{state.attr_type} to {spec.attr_type}"))
+            self._restore_child_connections(snapshot, backend)
+
+            if (state.keyable, state.channel_box) != (spec.keyable, spec.channel_box and not spec.keyable):
+                backend.set_keyable(node, attr, state.keyable, state.channel_box)
+            if state.locked:
+                backend.set_lock(node, attr, True)
+            self.restored += 1
+
+    def _restore_children(self, snapshot: AttrSnapshot, backend: backends.AttrBackend):
+        # Compound values are the values of their children, matched by name.
+        child_specs = {child.name: child for child in planner.child_specs(snapshot.spec)}
+        for (child, child_state), value in zip(snapshot.state.children, snapshot.value or ()):
+            child_spec = child_specs.get(child)
+            if child_spec is None:
+                self.issues.append((f"{snapshot.node}.{child}", "child removed from the compound"))
+                continue
+            value, issue = convert_value(value, child_state.attr_type, child_spec)
+            if value is not None:
+                backend.set_value(snapshot.node, child, child_spec.attr_type, value)
+            if issue:
+                self.issues.append((f"{snapshot.node}.{child}", issue))
+
+    def _restore_child_connections(self, snapshot: AttrSnapshot, backend: backends.AttrBackend):
+        # Children are matched by name; their inputs (keys included) and outputs are reconnected.
+        child_states = dict(snapshot.state.children)
+        child_specs = {child.name: child for child in planner.child_specs(snapshot.spec)}
+        for child, child_input, child_outputs in snapshot.child_connections:
+            plug = f"{snapshot.node}.{child}"
+            child_spec = child_specs.get(child)
+            if child_spec is None:
+                reason = f"{snapshot.spec.name} has no {child} child any more"
+            elif not _compatible(child_states[child].attr_type, child_spec.attr_type):
+                reason = f"{child_states[child].attr_type} to {child_spec.attr_type}"
+            else:
+                reason = None
+            if child_input:
+                if reason is None:
+                    backend.connect_attr(child_input[1], plug)
+                else:
+                    self.issues.append((plug, f"input {child_input[1]} not reconnected: {reason}"))
+            for destination in child_outputs:
+                if reason is None:
+                    backend.connect_attr(plug, destination)
+                else:
+                    self.issues.append((plug, f"output {destination} not reconnected: {reason}"))
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        lines = [f"{len(self.snapshots)} attributes preserved, {len(self.issues)} issues"]
+        if verbose or self.issues:
+            lines.extend(f"  {plug}: {message}" for plug, message in self.issues[:limit])
+            if len(self.issues) > limit:
+                lines.append(f"  ... and {len(self.issues) - limit} more")
+        return "\n".join(lines)
+
+
+def list_connections(cmds, plugs: list, **flags):
+    """
+    Returns {this plug (long node path): [other plugs]} from one bulk listConnections call.
+    """
+    pairs = cmds.listConnections(plugs, plugs=True, connections=True, **flags) or []
+    long_names = backends.long_names(cmds, [plug.partition(".")[0] for plug in pairs[::2]])
+    connections = {}
+    for this_plug, other_plug in zip(pairs[::2], pairs[1::2]):
+        node, _, attr = this_plug.partition(".")
+        connections.setdefault(f"{long_names.get(node, node)}.{attr}", []).append(other_plug)
+    return connections
+
+
+def _read_values(changes: list, backend: backends.AttrBackend):
+    """
+    Reads the value of every change in one `get_values` pass: compounds as the
+    tuple of their children values, multi attributes not at all (None).
+    """
+    plugs = []
+    for change in changes:
+        state = change.state
+        if state.multi:
+            continue
+        if state.attr_type == "compound":
+            plugs.extend((change.node, child, child_state.attr_type) for child, child_state in state.children)
+        else:
+            plugs.append((change.node, change.attr, state.attr_type))
+    read = iter(backend.get_values(plugs))
+
+    values = []
+    for change in changes:
+        state = change.state
+        if state.multi:
+            values.append(None)
+        elif state.attr_type == "compound":
+            values.append(tuple(next(read) for _ in state.children))
+        else:
+            values.append(next(read))
+    return values
+
+
+def capture(changes,
+            backend: backends.AttrBackend = None,
+            actions: tuple = (planner.REPLACE, planner.RECREATE)):
+    """
+    Reads the data of every attribute the changes re-create, in bulk.
+
+    Args:
+        changes: An AttrPlan, or a list of AttrChange.
+        backend (AttrBackend): Reads the values. Defaults to `backends.get_backend()`.
+        actions (tuple): The plan actions whose attributes are captured.
+
+    Returns:
+        SnapshotSet: The snapshots, to be detached and restored around the edits.
+    """
+    changes = [change for change in changes if change.action in actions and change.state is not None]
+    if not changes:
+        return SnapshotSet()
+
+    backend = backend or backends.get_backend()
+    cmds = backend.cmds
+    with profiler.section("snapshot.capture"):
+        values = _read_values(changes, backend)
+
+        long_names = backends.long_names(cmds, [change.node for change in changes])
+        plugs = [f"{long_names.get(change.node, change.node)}.{change.attr}" for change in changes]
+        # The children of vectors and compounds are queried in the same bulk calls.
+        child_plugs = [f"{long_names.get(change.node, change.node)}.{child}"
+                       for change in changes for child, _ in change.state.children]
+        inputs = list_connections(cmds, plugs + child_plugs, source=True, destination=False)
+        real_inputs = list_connections(cmds, plugs + child_plugs, source=True, destination=False,
+                                       skipConversionNodes=True)
+        outputs = list_connections(cmds, plugs + child_plugs, source=False, destination=True,
+                                   skipConversionNodes=True)
+
+    def connections(plug):
+        source = inputs.get(plug)
+        return (source[0], real_inputs.get(plug, source)[0]) if source else None, tuple(outputs.get(plug, ()))
+
+    snapshots = []
+    for change, plug, value in zip(changes, plugs, values):
+        child_connections = []
+        for child, _ in change.state.children:
+            child_input, child_outputs = connections(f"{long_names.get(change.node, change.node)}.{child}")
+            if child_input or child_outputs:
+                child_connections.append((child, child_input, child_outputs))
+        attr_input, attr_outputs = connections(plug)
+        snapshots.append(AttrSnapshot(node=change.node,
+                                      attr=change.attr,
+                                      state=change.state,
+                                      spec=change.spec,
+                                      value=value,
+                                      input=attr_input,
+                                      outputs=attr_outputs,
+                                      child_connections=tuple(child_connections)))
+
+    return SnapshotSet(snapshots)
@@ -0,0 +1,346 @@
+"""
+Rule-based object targeting, evaluated against an in-memory scene index.
+
+A rule combines any of: a name glob, a name regex, a node type, a shape type
+(e.g. only transforms with a nurbsCurve shape), a hierarchy root and an
+objectSet. Every criterion of a rule must match; a node is targeted when any
+rule matches it:
+
+    index = targeting.scene_index()
+    rules = targeting.parse_rules("name:*_ctrl shape:nurbsCurve under:rig; set:face_ctrls")
+    objects = index.resolve(rules)
+    core.create_custom_attributes(objects=objects, ...)
+
+`SceneIndex` reads every transform (path, type, UUID) and every shape with
+three bulk `cmds.ls` calls, instead of querying node by node. Afterwards it is
+kept current incrementally: nodes reported as added, renamed, reparented or
+removed (by the OpenMaya callbacks, or by `mark_dirty`/`mark_removed`) are
+re-read on the next `resolve`, and only them. Set members are the exception:
+set edits trigger no node callback, so the members of the sets a rule uses
+are read (one `sets` query per set) every time it is resolved.
+"""
+import fnmatch
+import re
+from typing import NamedTuple
+
+RULE_KEYS = ("name", "regex", "type", "shape", "under", "set")
+
+
+class IndexEntry(NamedTuple):
+    """
+    One transform of the scene index.
+    """
+    uuid: str
+    path: str
+    node_type: str
+    shape_types: tuple
+
+    @property
+    def name(self):
+        return self.path.rpartition("|")[2]
+
+
+class TargetRule:
+    """
+    A set of criteria a transform must all match to be targeted.
+
+    Args:
+        name (str): Glob matched against the short name (e.g. "*_ctrl").
+        regex (str): Regular expression searched in the short name.
+        node_type (str): Exact node type (e.g. "joint").
+        shape_type (str): Type one of the node's shapes must have (e.g. "nurbsCurve").
+        under (str): Name or path of a hierarchy root the node must be below.
+        in_set (str): objectSet the node must be a member of.
+    """
+
+    def __init__(self, name: str = None, regex: str = None, node_type: str = None,
+                 shape_type: str = None, under: str = None, in_set: str = None):
+        self.name = name
+        self.regex = re.compile(regex) if regex else None
+        self.node_type = node_type
+        self.shape_type = shape_type
+        self.under = under
+        self.in_set = in_set
+
+    def __repr__(self):
+        criteria = {"name": self.name, "regex": self.regex.pattern if self.regex else None,
+                    "type": self.node_type, "shape": self.shape_type, "under": self.under,
+                    "set": self.in_set}
+        return f"TargetRule({' '.join(f'{key}:{value}' for key, value in criteria.items() if value)})"
+
+    def matches(self, entry: IndexEntry, roots: tuple = (), set_members: set = None):
+        """
+        Args:
+            entry (IndexEntry): The indexed transform.
+            roots (tuple): Paths of the nodes matching `under`.
+            set_members (set): Paths of the members of `in_set`.
+        """
+        if self.node_type and entry.node_type != self.node_type:
+            return False
+        if self.shape_type and self.shape_type not in entry.shape_types:
+            return False
+        if self.name and not fnmatch.fnmatchcase(entry.name, self.name):
+            return False
+        if self.regex and not self.regex.search(entry.name):
+            return False
+        if self.under and not any(entry.path.startswith(root + "|") for root in roots):
+            return False
+        if self.in_set and entry.path not in (set_members or ()):
+            return False
+        return True
+
+
+def parse_rules(text: str):
+    """
+    Parses rules written as "key:value" criteria, rules separated by ";" or new lines.
+
+    Keys are name, regex, type, shape, under and set, e.g.
+    "name:*_ctrl shape:nurbsCurve; set:face_ctrls".
+
+    Raises:
+        ValueError: On an unknown key or an invalid regex.
+
+    Returns:
+        list: The TargetRule objects.
+    """
+    arguments = {"name": "name", "regex": "regex", "type": "node_type", "shape": "shape_type",
+                 "under": "under", "set": "in_set"}
+    rules = []
+    for rule_text in re.split(r"[;\n]", text or ""):
+        criteria = {}
+        for token in rule_text.split():
+            key, separator, value = token.partition(":")
+            if not separator or key not in arguments or not value:
+                raise ValueError(f"Invalid rule criterion {token!r}, expected one of "
+                                 f"{', '.join(key + ':<value>' for key in RULE_KEYS)}")
+            criteria[arguments[key]] = value
+        if criteria:
+            try:
+                rules.append(TargetRule(**criteria))
+            except re.error as error:
+                raise ValueError(f"Invalid regex {criteria['regex']!r}: {error}")
+
+    return rules
+
+
+class SceneIndex:
+    """
+    Transforms of the scene with their path, type and shape types, keyed by UUID.
+
+    Args:
+        cmds: The `maya.cmds` module. Imported when omitted.
+    """
+
+    def __init__(self, cmds=None):
+        if cmds is None:
+            from maya import cmds
+        self.cmds = cmds
+        self.entries: dict = {}
+        self.built = False
+        self._dirty: set = set()
+        self._removed: set = set()
+        self._callback_ids: list = []
+
+    def __len__(self):
+        self.refresh()
+        return len(self.entries)
+
+    # ----------------- Reading -----------------
+    def _shape_types(self, shapes: list):
+        """
+        Groups a flat `ls(long=True, showType=True)` shape list by parent path.
+        """
+        shape_types = {}
+        for path, shape_type in zip(shapes[::2], shapes[1::2]):
+            types = shape_types.setdefault(path.rpartition("|")[0], [])
+            if shape_type not in types:
+                types.append(shape_type)
+        return shape_types
+
+    def build(self):
+        """
+        Reads every transform and shape of the scene with three bulk queries.
+        """
+        transforms = self.cmds.ls(type="transform", long=True, showType=True) or []
+        uuids = self.cmds.ls(type="transform", uuid=True) or []
+        shape_types = self._shape_types(self.cmds.ls(shapes=True, long=True, showType=True) or [])
+
+        self.entries = {uuid: IndexEntry(uuid, path, node_type, tuple(shape_types.get(path, ())))
+                        for uuid, path, node_type in zip(uuids, transforms[::2], transforms[1::2])}
+        self._dirty.clear()
+        self._removed.clear()
+        self.built = True
+
+    def _update(self, uuids: set):
+        uuids = list(uuids)
+        transform_uuids = self.cmds.ls(uuids, type="transform", uuid=True) or []
+
+        # A dirty shape means its parent transform gained or lost a shape type.
+        transform_set = set(transform_uuids)
+        shapes = [uuid for uuid in uuids if uuid not in transform_set]
+        shape_paths = self.cmds.ls(shapes, long=True) or [] if shapes else []
+        parents = [path.rpartition("|")[0] for path in shape_paths if path.count("|") > 1]
+        if parents:
+            transform_uuids += self.cmds.ls(parents, uuid=True) or []
+
+        # Nodes deleted in the meantime are simply not returned by ls.
+        transform_uuids = list(dict.fromkeys(transform_uuids))
+        if not transform_uuids:
+            return
+        transforms = self.cmds.ls(transform_uuids, long=True, showType=True) or []
+        paths = transforms[::2]
+        shapes = self.cmds.listRelatives(paths, shapes=True, fullPath=True) or []
+        shape_types = self._shape_types(self.cmds.ls(shapes, long=True, showType=True) if shapes else [])
+
+        for uuid, path, node_type in zip(transform_uuids, paths, transforms[1::2]):
+            previous = self.entries.get(uuid)
+            self.entries[uuid] = IndexEntry(uuid, path, node_type, tuple(shape_types.get(path, ())))
+            if previous and previous.path != path:
+                self._move_descendants(previous.path, path)
+
+    def _move_descendants(self, old_path: str, new_path: str):
+        prefix = old_path + "|"
+        for uuid, entry in list(self.entries.items()):
+            if entry.path.startswith(prefix):
+                self.entries[uuid] = entry._replace(path=new_path + entry.path[len(old_path):])
+
+    def refresh(self, full: bool = False):
+        """
+        Brings the index up to date: a full build the first time (or when `full`
+        is set), otherwise only the nodes marked dirty or removed are re-read.
+        """
+        if full or not self.built:
+            self.build()
+            return
+        dirty = self._dirty - self._removed
+        for uuid in self._removed:
+            entry = self.entries.pop(uuid, None)
+            if entry:
+                prefix = entry.path + "|"
+                self.entries = {key: value for key, value in self.entries.items()
+                                if not value.path.startswith(prefix)}
+        self._removed.clear()
+        self._dirty.clear()
+        if dirty:
+            self._update(dirty)
+
+    # ----------------- Invalidation ------------
+    def mark_dirty(self, uuids):
+        """
+        Flags nodes (transforms or shapes) added, renamed or reparented since the last refresh.
+        """
+        self._dirty.update([uuids] if isinstance(uuids, str) else uuids)
+
+    def mark_removed(self, uuids):
+        self._removed.update([uuids] if isinstance(uuids, str) else uuids)
+
+    def invalidate(self):
+        """
+        Forces a full build on the next refresh (e.g. after a new scene was opened).
+        """
+        self.built = False
+
+    def attach_callbacks(self, om=None):
+        """
+        Keeps the index current through OpenMaya DAG callbacks.
+
+        Returns:
+            bool: False when the callbacks are not available (e.g. in a stand-in session).
+        """
+        if self._callback_ids:
+            return True
+        if om is None:
+            import maya.api.OpenMaya as om
+        if not hasattr(om, "MDGMessage"):
+            return False
+
+        def node_uuid(mobject):
+            return om.MFnDependencyNode(mobject).uuid().asString()
+
+        def on_added(mobject, client_data):
+            self.mark_dirty(node_uuid(mobject))
+
+        def on_removed(mobject, client_data):
+            if mobject.hasFn(om.MFn.kTransform):
+                self.mark_removed(node_uuid(mobject))
+            else:
+                dag_node = om.MFnDagNode(mobject)
+                if dag_node.parentCount():
+                    self.mark_dirty(node_uuid(dag_node.parent(0)))
+
+        def on_renamed(mobject, previous_name, client_data):
+            if mobject.hasFn(om.MFn.kDagNode):
+                self.mark_dirty(node_uuid(mobject))
+
+        def on_parent_changed(child_path, parent_path, client_data):
+            self.mark_dirty(node_uuid(child_path.node()))
+
+        def on_new_scene(client_data):
+            self.invalidate()
+
+        self._callback_ids = [
+            om.MDGMessage.addNodeAddedCallback(on_added, "dagNode"),
+            om.MDGMessage.addNodeRemovedCallback(on_removed, "dagNode"),
+            om.MNodeMessage.addNameChangedCallback(om.MObject(), on_renamed),
+            om.MDagMessage.addParentAddedCallback(on_parent_changed),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterOpen, on_new_scene),
+            om.MSceneMessage.addCallback(om.MSceneMessage.kAfterNew, on_new_scene),
+        ]
+        return True
+
+    def detach_callbacks(self, om=None):
+        if not self._callback_ids:
+            return
+        if om is None:
+            import maya.api.OpenMaya as om
+        om.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+
+    # ----------------- Resolving ---------------
+    def _matching_entries(self, rules: list):
+        self.refresh()
+
+        roots = {}
+        set_members = {}
+        for rule in rules:
+            if rule.under and rule.under not in roots:
+                roots[rule.under] = tuple(entry.path for entry in self.entries.values()
+                                          if rule.under in (entry.name, entry.path))
+            if rule.in_set and rule.in_set not in set_members:
+                members = self.cmds.sets(rule.in_set, query=True) or []
+                set_members[rule.in_set] = set(self.cmds.ls(members, long=True) or []) if members else set()
+
+        return [entry for entry in self.entries.values()
+                if any(rule.matches(entry, roots.get(rule.under, ()), set_members.get(rule.in_set))
+                       for rule in rules)]
+
+    def resolve(self, rules: list):
+        """
+        Returns the full paths of the transforms matching any of the rules, in
+        scene order. They can be passed straight to `create_custom_attributes`
+        and `delete_all_attrs`.
+        """
+        return [entry.path for entry in self._matching_entries(rules)]
+
+    def resolve_uuids(self, rules: list):
+        """
+        Returns the UUIDs of the transforms matching any of the rules, for a `SelectionModel`.
+        """
+        return [entry.uuid for entry in self._matching_entries(rules)]
+
+
+_scene_index = None
+
+
+def scene_index(cmds=None):
+    """
+    Returns the session-wide scene index, attaching its callbacks on first use.
+    """
+    global _scene_index
+    if _scene_index is None:
+        _scene_index = SceneIndex(cmds=cmds)
+        try:
+            _scene_index.attach_callbacks()
+        except ImportError:
+            pass
+    return _scene_index
@@ -0,0 +1,267 @@
+"""
+Upfront validation of an attribute request against every target object.
+
+Maya reports an invalid name, a clash with a built-in attribute or a locked
+attribute only when the edit reaches it, possibly thousands of objects into
+the operation. `validate_specs` checks the whole request first, without
+touching the scene:
+
+    - the specs themselves: names, types, ranges, enum fields and duplicates;
+    - every object, from the attributes read once for the plan (or taken from
+      an `AttrInventory`): missing and referenced objects, clashes with the
+      built-in attributes of its node type, existing attributes of another
+      type and locked attributes that have to be removed.
+
+    report = validation.validate_specs(objects, separator_spec, attr_specs)
+    if not report.ok:
+        print(report.report(verbose=True))
+
+`engine.apply_specs` runs it on every request and raises `ValidationError`
+before the first edit when it finds errors.
+"""
+import re
+from typing import NamedTuple
+
+from crv_attrs import backends, deletion, planner, profiler
+
+# Severities
+ERROR = "error"
+WARNING = "warning"
+
+ATTRIBUTE_TYPES = backends.ATTRIBUTE_TYPES
+# Types a compound child can have.
+CHILD_TYPES = ("enum", "string") + backends.NUMERIC_TYPES
+
+VALID_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class Conflict(NamedTuple):
+    """
+    One problem found by the validation. `node` is None for problems of the request itself.
+    """
+    severity: str
+    node: str
+    attr: str
+    message: str
+
+
+class ValidationError(ValueError):
+    """
+    Raised when a request has errors, before any scene edit.
+    """
+
+    def __init__(self, report):
+        super().__init__(report.report(verbose=True))
+        self.report = report
+
+
+class ValidationReport:
+    """
+    Every conflict of a request, and the attributes read to find them.
+    """
+
+    def __init__(self, conflicts: list = None, objects: list = None, current_states: dict = None):
+        self.conflicts: list = conflicts or []
+        # The objects that exist, and their {attr: AttrState}, reused by the planner.
+        self.objects: list = objects or []
+        self.current_states: dict = current_states or {}
+
+    def __iter__(self):
+        return iter(self.conflicts)
+
+    def __len__(self):
+        return len(self.conflicts)
+
+    def errors(self):
+        return [conflict for conflict in self.conflicts if conflict.severity == ERROR]
+
+    def warnings(self):
+        return [conflict for conflict in self.conflicts if conflict.severity == WARNING]
+
+    @property
+    def ok(self):
+        return not self.errors()
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        lines = [f"{len(self.errors())} errors, {len(self.warnings())} warnings"]
+        if verbose:
+            for conflict in self.conflicts[:limit]:
+                target = ".".join(part for part in (conflict.node, conflict.attr) if part)
+                lines.append(f"  {conflict.severity:<8} {target}: {conflict.message}")
+            if len(self.conflicts) > limit:
+                lines.append(f"  ... and {len(self.conflicts) - limit} more")
+        return "\n".join(lines)
+
+
+# -------------------------------------------------
+# ----------------- Request -----------------------
+# -------------------------------------------------
+def _check_spec(spec: planner.AttrSpec):
+    if not VALID_NAME.match(spec.name or ""):
+        yield f"invalid attribute name {spec.name!r}"
+        return
+    if spec.attr_type not in ATTRIBUTE_TYPES:
+        yield f"unsupported type {spec.attr_type!r}"
+    if spec.min_val is not None and spec.max_val is not None and spec.min_val > spec.max_val:
+        yield f"min {spec.min_val} is greater than max {spec.max_val}"
+    if spec.soft_min is not None and spec.soft_max is not None and spec.soft_min > spec.soft_max:
+        yield f"soft min {spec.soft_min} is greater than soft max {spec.soft_max}"
+    if spec.attr_type == "compound":
+        if not spec.children:
+            yield "compound attributes need at least one child"
+        for child in spec.children:
+            if child.attr_type not in CHILD_TYPES:
+                yield f"child {child.name!r}: unsupported child type {child.attr_type!r}"
+            yield from (f"child {child.name!r}: {message}" for message in _check_spec(child))
+    if spec.attr_type in backends.VECTOR_TYPES and isinstance(spec.default_val, (list, tuple)) \
+            and len(spec.default_val) != len(backends.VECTOR_AXES):
+        yield f"vector default {spec.default_val!r} needs {len(backends.VECTOR_AXES)} values"
+    if spec.attr_type == "enum":
+        fields = backends.parse_enum_string(spec.enum_names)
+        if not fields or not all(name.strip() for _, name in fields):
+            yield f"empty enum field in {spec.enum_names!r}"
+        indices = [index for index, _ in fields]
+        if len(set(indices)) != len(indices):
+            yield f"duplicate enum index in {spec.enum_names!r}"
+
+
+def _names(spec: planner.AttrSpec):
+    return [spec.name] + [child.name for child in planner.child_specs(spec)]
+
+
+def check_request(separator_spec: planner.AttrSpec, attr_specs: list):
+    """
+    Returns the conflicts of the specs themselves, independent of any object.
+    """
+    conflicts = [Conflict(ERROR, None, spec.name, message)
+                 for spec in (separator_spec, *attr_specs) for message in _check_spec(spec)]
+
+    # Compound and vector children share the attribute namespace of the node.
+    names = [name for spec in attr_specs for name in _names(spec)]
+    conflicts.extend(Conflict(ERROR, None, name, "requested more than once")
+                     for name in sorted({name for name in names if names.count(name) > 1}))
+    if separator_spec.name in names:
+        conflicts.append(Conflict(ERROR, None, separator_spec.name, "has the same name as the separator"))
+    return conflicts
+
+
+# -------------------------------------------------
+# ----------------- Objects -----------------------
+# -------------------------------------------------
+def existing_objects(cmds, objects: list):
+    """
+    Splits the objects into (existing, missing), with one `ls` call when they all exist.
+    """
+    objects = list(dict.fromkeys(objects))
+    if len(cmds.ls(objects) or []) == len(objects):
+        return objects, []
+    existing = [node for node in objects if cmds.objExists(node)]
+    existing_set = set(existing)
+    return existing, [node for node in objects if node not in existing_set]
+
+
+class _BuiltinAttrs:
+    """
+    Answers "is `attr` a built-in attribute of `node_type`", one query per (attr, type) pair.
+    """
+
+    def __init__(self, cmds):
+        self.cmds = cmds
+        self._cache: dict = {}
+
+    def __call__(self, attr: str, node_type: str):
+        key = (attr, node_type)
+        if key not in self._cache:
+            self._cache[key] = bool(self.cmds.attributeQuery(attr, type=node_type, exists=True))
+        return self._cache[key]
+
+
+def _check_attr(node: str, spec: planner.AttrSpec, state: backends.AttrState,
+                builtin: bool, referenced: bool, preserve: bool):
+    if state is None:
+        if builtin:
+            yield ERROR, "clashes with a built-in attribute"
+        return
+
+    change = planner.diff_attr(node, spec, state)
+    if change.action == planner.REPLACE:
+        if referenced:
+            yield ERROR, f"is a {state.attr_type} attribute of a referenced node, it cannot be re-created"
+        elif state.locked and not preserve:
+            yield ERROR, f"is a locked {state.attr_type} attribute, it cannot be re-created"
+        else:
+            kept = ", data preserved" if preserve else ", its value and connections are lost"
+            yield WARNING, f"is re-created as {spec.attr_type} (was {state.attr_type}{kept})"
+    elif change.action in (planner.EDIT_ENUM, planner.EDIT_RANGE, planner.EDIT_DEFAULT) and referenced:
+        yield WARNING, "is edited on a referenced node"
+
+
+def validate_specs(objects: list,
+                   separator_spec: planner.AttrSpec,
+                   attr_specs: list,
+                   removed_attrs: list = (),
+                   backend: backends.AttrBackend = None,
+                   inventory=None,
+                   preserve: bool = True,
+                   current_states: dict = None):
+    """
+    Checks a request against every object in one pass, before anything is edited.
+
+    Args:
+        objects (list): Object names.
+        separator_spec (AttrSpec): The separator enum heading the section.
+        attr_specs (list): AttrSpec for every attribute of the section.
+        removed_attrs (list): Attributes the request deletes.
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+        preserve (bool): Whether re-created attributes keep their data (and are unlocked for it).
+        current_states (dict): Pre-read {node: {attr: AttrState}} data, used instead of
+                               the inventory or the backend.
+
+    Returns:
+        ValidationReport: The conflicts, and the attributes of the existing objects.
+    """
+    backend = backend or backends.get_backend()
+    cmds = backend.cmds
+    conflicts = check_request(separator_spec, attr_specs)
+    if not objects:
+        return ValidationReport(conflicts)
+
+    with profiler.section("validation.validate_specs"):
+        existing, missing = existing_objects(cmds, objects)
+        conflicts.extend(Conflict(ERROR, node, None, "does not exist") for node in missing)
+        if not existing:
+            return ValidationReport(conflicts)
+
+        if current_states is not None:
+            current_states = {node: current_states.get(node, {}) for node in existing}
+        elif inventory is not None:
+            current_states = inventory.states_for(existing)
+        else:
+            with profiler.section(f"{backend.name}.query_user_attrs"):
+                current_states = backend.query_user_attrs(existing)
+        node_types = backends.node_types(cmds, existing)
+        referenced = deletion.referenced_nodes(cmds, existing)
+        is_builtin = _BuiltinAttrs(cmds)
+        # Duplicates are already reported once for the request.
+        specs = list({spec.name: spec for spec in (separator_spec, *attr_specs)}.values())
+
+        for node in existing:
+            node_type = node_types.get(node)
+            states = current_states.get(node, {})
+            node_referenced = node in referenced
+            for spec in specs:
+                state = states.get(spec.name)
+                builtin = state is None and any(is_builtin(name, node_type) for name in _names(spec))
+                conflicts.extend(Conflict(severity, node, spec.name, message) for severity, message
+                                 in _check_attr(node, spec, state, builtin, node_referenced, preserve))
+            for attr in removed_attrs:
+                state = states.get(attr)
+                if state is None:
+                    continue
+                if node_referenced:
+                    conflicts.append(Conflict(ERROR, node, attr, "cannot be deleted from a referenced node"))
+                elif state.locked:
+                    conflicts.append(Conflict(ERROR, node, attr, "is locked and cannot be deleted"))
+
+    return ValidationReport(conflicts, existing, current_states)
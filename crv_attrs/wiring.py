@@ -0,0 +1,503 @@
+"""
+Bulk wiring of driver attributes to their driven plugs.
+
+After the attributes are created, each one usually drives a blendShape
+weight, a deformer envelope or a constraint weight. `plan_wiring` takes the
+whole mapping at once, as `Connection` pairs built by hand or by
+`map_by_pattern`/`map_from_schema`, and resolves it with a few bulk queries:
+
+    - which source and destination plugs exist (one `ls` call);
+    - the current input of every destination (one `listConnections` call);
+    - the source, settings and outputs of the converter nodes already in place.
+
+The plan lists, without touching the scene, what would be connected,
+replaced or left as is. `apply_wiring` then queues every connection, and the
+optional unitConversion or remapValue node in between, on the backend and
+flushes it once. A converter node left without outputs by the replaced
+connections is deleted in the same flush:
+
+    connections = wiring.map_by_pattern(objects, "face_BS.{attr}", patterns=["*_w"])
+    plan = wiring.plan_wiring(connections)
+    print(plan.report(verbose=True))
+    wiring.apply_wiring(plan)
+"""
+import re
+from collections import Counter
+from typing import NamedTuple
+
+from crv_attrs import backends, deletion, planner, profiler, validation
+
+# Actions
+CONNECT = "connect"
+REPLACE = "replace"
+UPDATE = "update"
+NOOP = "noop"
+ACTIONS = (CONNECT, REPLACE, UPDATE, NOOP)
+
+# Skip reasons
+MISSING_SOURCE = "missing source"
+MISSING_DESTINATION = "missing destination"
+CONNECTED = "already connected"
+DUPLICATE = "duplicate destination"
+
+
+class Converter(NamedTuple):
+    """
+    A utility node inserted between a source and its destination.
+    """
+    node_type: str
+    input: str
+    output: str
+    # The attributes set from `Connection.settings`, in order.
+    settings: tuple
+    suffix: str
+
+
+CONVERTERS = {
+    "unitConversion": Converter("unitConversion", "input", "output", ("conversionFactor",), "UC"),
+    "remapValue": Converter("remapValue", "inputValue", "outValue",
+                            ("inputMin", "inputMax", "outputMin", "outputMax"), "RMV"),
+}
+
+
+class Connection(NamedTuple):
+    """
+    One requested connection.
+
+    `converter` names a node type of `CONVERTERS` to insert in between, and
+    `settings` the values of its setting attributes: (factor,) for a
+    unitConversion, (input_min, input_max, output_min, output_max) for a remapValue.
+    """
+    source: str
+    destination: str
+    converter: str = None
+    settings: tuple = ()
+
+
+class WireChange(NamedTuple):
+    """
+    One planned connection, and the current input of its destination.
+    """
+    connection: Connection
+    action: str
+    current: str = None
+    # The converter node: the existing one to update, or the one to create.
+    converter_node: str = None
+    # The converter node feeding `current` that is deleted once replaced.
+    removed_node: str = None
+
+    @property
+    def destination(self):
+        return self.connection.destination
+
+
+class WiringPlan:
+    """
+    Ordered connections produced by `plan_wiring`, and the skipped ones.
+    """
+
+    def __init__(self, changes: list = None, skipped: list = None):
+        self.changes: list = changes or []
+        # (connection, reason) pairs left out of the plan.
+        self.skipped: list = skipped or []
+
+    def __iter__(self):
+        return iter(self.changes)
+
+    def __len__(self):
+        return len(self.changes)
+
+    def pending(self):
+        """
+        Returns every change that edits the scene (everything except no-ops).
+        """
+        return [change for change in self.changes if change.action != NOOP]
+
+    def counts(self):
+        counter = Counter(change.action for change in self.changes)
+        return {action: counter.get(action, 0) for action in ACTIONS}
+
+    def converter_nodes(self):
+        """
+        Returns the converter nodes the plan creates.
+        """
+        return [change.converter_node for change in self.changes
+                if change.converter_node and change.action in (CONNECT, REPLACE)]
+
+    def removed_nodes(self):
+        """
+        Returns the previous converter nodes the plan deletes.
+        """
+        return [change.removed_node for change in self.changes if change.removed_node]
+
+    def report(self, verbose: bool = False, limit: int = 50):
+        counts = ", ".join(f"{action}: {count}" for action, count in self.counts().items())
+        lines = [f"{len(self.changes)} connections -> {counts}"]
+        converters = self.converter_nodes()
+        if converters:
+            lines.append(f"{len(converters)} converter nodes to create")
+        removed = self.removed_nodes()
+        if removed:
+            lines.append(f"{len(removed)} previous converter nodes to delete")
+        if self.skipped:
+            reasons = Counter(reason for _, reason in self.skipped)
+            lines.append("skipped: " + ", ".join(f"{count} {reason}" for reason, count in reasons.items()))
+        if verbose:
+            pending = self.pending()
+            for change in pending[:limit]:
+                connection = change.connection
+                via = f" via {change.converter_node}" if change.converter_node else ""
+                replaced = f" (was {change.current})" if change.action == REPLACE else ""
+                if change.removed_node:
+                    replaced += f", deletes {change.removed_node}"
+                lines.append(f"  {change.action:<8} {connection.source} -> {connection.destination}{via}{replaced}")
+            lines.extend(f"  {reason:<8} {connection.source} -> {connection.destination}"
+                         for connection, reason in self.skipped[:limit])
+            if len(pending) > limit or len(self.skipped) > limit:
+                lines.append("  ...")
+
+        return "\n".join(lines)
+
+
+# -------------------------------------------------
+# ----------------- Mapping -----------------------
+# -------------------------------------------------
+def _format_destination(destination: str, node: str, attr: str, section: str):
+    return destination.format(node=node.rpartition("|")[2], attr=attr, section=section or "")
+
+
+def map_by_pattern(objects: list,
+                   destination: str,
+                   patterns: list = None,
+                   section: str = None,
+                   attr_types: list = None,
+                   converter: str = None,
+                   settings: tuple = (),
+                   backend: backends.AttrBackend = None,
+                   inventory=None):
+    """
+    Maps the user-defined attributes of every object to destination plugs.
+
+    The attributes are read in one pass and selected like `deletion.AttrFilter`
+    does; separators are never wired.
+
+    Args:
+        objects (list): The driver objects.
+        destination (str): Destination plug template, formatted with {node} (the
+                           driver short name), {attr} and {section}, e.g. "face_BS.{attr}".
+        patterns (list): Attribute name globs to wire. Every attribute when omitted.
+        section (str): Only wire the attributes under this separator.
+        attr_types (list): Only wire attributes of these types.
+        converter (str): A `CONVERTERS` node type to insert in between.
+        settings (tuple): The converter settings.
+        backend (AttrBackend): Reads the attributes. Defaults to `backends.get_backend()`.
+        inventory (AttrInventory): Provides the attributes instead of the backend.
+
+    Returns:
+        list: The Connection pairs.
+    """
+    if not objects:
+        return []
+    backend = backend or backends.get_backend()
+    if inventory is not None:
+        current_states = inventory.states_for(objects)
+    else:
+        with profiler.section(f"{backend.name}.query_user_attrs"):
+            current_states = backend.query_user_attrs(objects)
+
+    attr_filter = deletion.AttrFilter(patterns=patterns, section=section, attr_types=attr_types)
+    connections = []
+    for node, states in current_states.items():
+        current_section = None
+        selected = set(attr_filter.select(states))
+        for attr, state in states.items():
+            if planner.is_separator(state):
+                current_section = attr
+                continue
+            if attr in selected:
+                connections.append(Connection(f"{node}.{attr}",
+                                              _format_destination(destination, node, attr, current_section),
+                                              converter, tuple(settings)))
+    return connections
+
+
+def map_from_schema(objects: list,
+                    schema,
+                    destination: str,
+                    converter: str = None,
+                    settings: tuple = ()):
+    """
+    Maps the attributes of a schema, on every object, to destination plugs,
+    without reading the scene.
+
+    Args:
+        objects (list): The driver objects the schema was applied to.
+        schema: An AttrSchema or a CompiledSchema.
+        destination (str): Destination plug template, see `map_by_pattern`.
+
+    Returns:
+        list: The Connection pairs.
+    """
+    if not hasattr(schema, "separator_spec"):
+        from crv_attrs import schema as schema_module
+        schema = schema_module.compile_schema(schema)
+
+    section = schema.separator_spec.name
+    return [Connection(f"{node}.{spec.name}", _format_destination(destination, node, spec.name, section),
+                       converter, tuple(settings))
+            for node in objects for spec in schema.attr_specs]
+
+
+# -------------------------------------------------
+# ----------------- Planning ----------------------
+# -------------------------------------------------
+def _node_names(cmds, plugs):
+    """
+    Returns {node as written in the plugs: long name}.
+    """
+    return backends.long_names(cmds, [plug.partition(".")[0] for plug in plugs])
+
+
+def _normalize(plug: str, long_names: dict):
+    node, _, attr = plug.partition(".")
+    return f"{long_names.get(node, node)}.{attr}"
+
+
+def _outputs(cmds, plugs: list):
+    """
+    Returns {plug (as given): [destination plugs, long names]} from one bulk listConnections call.
+    """
+    if not plugs:
+        return {}
+    pairs = cmds.listConnections(plugs, source=False, destination=True, plugs=True, connections=True,
+                                 skipConversionNodes=False) or []
+    long_names = _node_names(cmds, pairs)
+    by_long = {}
+    for plug, destination in zip(pairs[::2], pairs[1::2]):
+        by_long.setdefault(_normalize(plug, long_names), []).append(_normalize(destination, long_names))
+    given_names = _node_names(cmds, plugs)
+    return {plug: by_long.get(_normalize(plug, given_names), []) for plug in plugs}
+
+
+def _inputs(cmds, plugs: list):
+    """
+    Returns {destination plug (as given): source plug} from one bulk listConnections call.
+    """
+    if not plugs:
+        return {}
+    pairs = cmds.listConnections(plugs, source=True, destination=False, plugs=True, connections=True,
+                                 skipConversionNodes=False) or []
+    long_names = _node_names(cmds, pairs)
+    by_long = {_normalize(destination, long_names): source for destination, source in zip(pairs[::2], pairs[1::2])}
+    given_names = _node_names(cmds, plugs)
+    return {plug: by_long[_normalize(plug, given_names)] for plug in plugs
+            if _normalize(plug, given_names) in by_long}
+
+
+def _converter_base(destination: str, converter: Converter):
+    return re.sub(r"\W+", "_", destination.rpartition("|")[2]).strip("_") + "_" + converter.suffix
+
+
+def _converter_name(base: str, taken: set):
+    name, index = base, 1
+    while name in taken:
+        index += 1
+        name = f"{base}{index}"
+    taken.add(name)
+    return name
+
+
+def plan_wiring(connections: list,
+                backend: backends.AttrBackend = None,
+                replace: bool = True):
+    """
+    Resolves every connection in bulk, without editing the scene.
+
+    Args:
+        connections (list): Connection pairs (or (source, destination) tuples).
+        backend (AttrBackend): Used to read the scene. Defaults to `backends.get_backend()`.
+        replace (bool): Replace the existing inputs of the destinations. When off,
+                        connected destinations are skipped.
+
+    Returns:
+        WiringPlan: One change per destination, and the skipped (connection, reason) pairs.
+    """
+    backend = backend or backends.get_backend()
+    cmds = backend.cmds
+    connections = [connection if isinstance(connection, Connection) else Connection(*connection)
+                   for connection in connections]
+    for connection in connections:
+        if connection.converter and connection.converter not in CONVERTERS:
+            raise ValueError(f"Unknown converter {connection.converter!r}, expected one of "
+                             f"{', '.join(CONVERTERS)}")
+    if not connections:
+        return WiringPlan()
+
+    skipped = []
+    with profiler.section("wiring.plan_wiring"):
+        existing, _ = validation.existing_objects(
+            cmds, [plug for connection in connections for plug in (connection.source, connection.destination)])
+        existing = set(existing)
+
+        valid = []
+        destinations = set()
+        for connection in connections:
+            if connection.source not in existing:
+                skipped.append((connection, MISSING_SOURCE))
+            elif connection.destination not in existing:
+                skipped.append((connection, MISSING_DESTINATION))
+            elif connection.destination in destinations:
+                skipped.append((connection, DUPLICATE))
+            else:
+                destinations.add(connection.destination)
+                valid.append(connection)
+
+        inputs = _inputs(cmds, [connection.destination for connection in valid])
+        converters = _existing_converters(backend, inputs)
+
+        long_names = _node_names(cmds, [connection.source for connection in valid] + list(inputs.values()))
+        # Converter names are made unique against the scene with one wildcard `ls`.
+        bases = {_converter_base(connection.destination, CONVERTERS[connection.converter])
+                 for connection in valid if connection.converter}
+        taken = set(cmds.ls([base + "*" for base in bases]) or []) if bases else set()
+
+        def same_source(plug, connection):
+            return plug is not None and _normalize(plug, long_names) == _normalize(connection.source, long_names)
+
+        changes = []
+        for connection in valid:
+            current = inputs.get(connection.destination)
+            current_node = current.partition(".")[0] if current else None
+            converter = CONVERTERS.get(connection.converter)
+            node_type, converter_source, settings, _ = converters.get(current_node, (None, None, (), ()))
+
+            if current is None:
+                action = CONNECT
+            elif converter and node_type == converter.node_type and same_source(converter_source, connection):
+                # The same kind of converter already sits between the source and the destination.
+                requested = tuple(connection.settings)
+                action = NOOP if settings[:len(requested)] == requested else UPDATE
+                changes.append(WireChange(connection, action, current, current_node))
+                continue
+            elif not converter and same_source(current, connection):
+                action = NOOP
+            elif replace:
+                action = REPLACE
+            else:
+                skipped.append((connection, CONNECTED))
+                continue
+
+            converter_node = _converter_name(_converter_base(connection.destination, converter), taken) \
+                if converter else None
+            changes.append(WireChange(connection, action, current, converter_node))
+
+        changes = _remove_replaced_converters(cmds, changes, converters)
+
+    return WiringPlan(changes, skipped)
+
+
+def _remove_replaced_converters(cmds, changes: list, converters: dict):
+    """
+    Marks the converter nodes whose every output is replaced by the plan for deletion,
+    on the first change that replaces them.
+    """
+    replacing = [change for change in changes
+                 if change.action == REPLACE and change.current.partition(".")[0] in converters]
+    if not replacing:
+        return changes
+
+    long_names = _node_names(cmds, [change.destination for change in replacing])
+    replaced = {}
+    for change in replacing:
+        replaced.setdefault(change.current.partition(".")[0], set()).add(_normalize(change.destination, long_names))
+    removed = set()
+    for index, change in enumerate(changes):
+        node = change.current.partition(".")[0] if change.action == REPLACE else None
+        if node not in replaced or node in removed or not set(converters[node][3]) <= replaced[node]:
+            continue
+        removed.add(node)
+        changes[index] = change._replace(removed_node=node)
+    return changes
+
+
+def _existing_converters(backend: backends.AttrBackend, inputs: dict):
+    """
+    Returns {node: (node type, input source, settings, output destinations)} for the
+    converter nodes feeding the destinations, with one `ls`, two `listConnections`
+    and one `get_values` pass.
+    """
+    cmds = backend.cmds
+    nodes = list(dict.fromkeys(source.partition(".")[0] for source in inputs.values()))
+    if not nodes:
+        return {}
+    node_types = backends.node_types(cmds, nodes)
+    nodes = [node for node in nodes if node_types.get(node) in CONVERTERS]
+    if not nodes:
+        return {}
+
+    converter_inputs = _inputs(cmds, [f"{node}.{CONVERTERS[node_types[node]].input}" for node in nodes])
+    converter_outputs = _outputs(cmds, [f"{node}.{CONVERTERS[node_types[node]].output}" for node in nodes])
+    setting_plugs = [(node, attr, "double") for node in nodes for attr in CONVERTERS[node_types[node]].settings]
+    values = iter(backend.get_values(setting_plugs))
+    return {node: (node_types[node],
+                   converter_inputs.get(f"{node}.{CONVERTERS[node_types[node]].input}"),
+                   tuple(next(values) for _ in CONVERTERS[node_types[node]].settings),
+                   tuple(converter_outputs[f"{node}.{CONVERTERS[node_types[node]].output}"]))
+            for node in nodes}
+
+
+# -------------------------------------------------
+# ----------------- Applying ----------------------
+# -------------------------------------------------
+def _set_settings(backend: backends.AttrBackend, node: str, converter: Converter, settings: tuple):
+    for attr, value in zip(converter.settings, settings):
+        backend.set_value(node, attr, "double", value)
+
+
+def apply_wiring(plan: WiringPlan, backend: backends.AttrBackend = None):
+    """
+    Queues every pending connection, and its converter node, and flushes the backend once.
+
+    Returns:
+        WiringPlan: The applied plan.
+    """
+    backend = backend or backends.get_backend()
+    removed = []
+    for change in plan.pending():
+        connection = change.connection
+        converter = CONVERTERS.get(connection.converter)
+        if converter is None:
+            backend.connect_attr(connection.source, connection.destination)
+        else:
+            node = change.converter_node
+            if change.action != UPDATE:
+                backend.create_node(converter.node_type, node)
+            _set_settings(backend, node, converter, connection.settings)
+            if change.action != UPDATE:
+                backend.connect_attr(connection.source, f"{node}.{converter.input}")
+                backend.connect_attr(f"{node}.{converter.output}", connection.destination)
+        if change.removed_node:
+            removed.append(change.removed_node)
+    # Deleted last, once every destination they fed is connected to its new input.
+    for node in removed:
+        backend.delete_node(node)
+    backend.flush()
+    return plan
+
+
+def wire(connections: list,
+         backend: backends.AttrBackend = None,
+         dry_run: bool = False,
+         replace: bool = True):
+    """
+    Plans and, unless `dry_run` is set, applies a set of connections.
+
+    Returns:
+        WiringPlan: The planned (and applied) connections.
+    """
+    backend = backend or backends.get_backend()
+    plan = plan_wiring(connections, backend=backend, replace=replace)
+    if dry_run:
+        return plan
+
+    return apply_wiring(plan, backend=backend)
@@ -0,0 +1,39 @@
+"""
+Fixtures shared by the tests: a `fake_maya` scene and backends working on it,
+for both the `cmds` and the `om2` engine.
+"""
+import pytest
+
+from crv_attrs import backends, fake_maya
+
+BACKENDS = ("cmds", "om2")
+
+
+class FakeMaya:
+    """
+    One in-memory scene, and a factory of backends working on it.
+    """
+
+    def __init__(self, backend_name: str):
+        self.backend_name = backend_name
+        self.scene = fake_maya.FakeScene()
+        self.cmds = fake_maya.FakeCmds(self.scene)
+        self.om = fake_maya.FakeOpenMaya(self.scene, self.cmds)
+
+    def backend(self):
+        if self.backend_name == "cmds":
+            return backends.CmdsBackend(cmds=self.cmds)
+        return backends.OpenMayaBackend(om=self.om, cmds=self.cmds, undoable=False)
+
+    def states(self, node: str):
+        return self.backend().query_user_attrs([node])[node]
+
+
+@pytest.fixture(params=BACKENDS)
+def maya(request):
+    return FakeMaya(request.param)
+
+
+@pytest.fixture
+def controls(maya):
+    return maya.scene.populate(3, "ctrl")
@@ -0,0 +1,75 @@
+"""
+Scene audit findings and their reports.
+"""
+import csv
+import json
+
+import pytest
+
+from crv_attrs import audit, engine, schema
+
+FACE = schema.AttrSchema("face", "FACE", [{"name": "blink", "type": "float", "min": 0, "max": 10},
+                                          {"name": "smile", "type": "float", "min": 0, "max": 10},
+                                          {"name": "brow", "type": "float"}])
+
+
+@pytest.fixture
+def rig(maya):
+    group = maya.cmds.createNode("transform", name="rig")
+    controls = maya.scene.populate(6, "ctrl")
+    for node in controls:
+        maya.cmds.parent(node, group)
+    controls = maya.cmds.ls(controls, long=True)
+    engine.create_custom_attributes(controls, ["blink", "smile"], "FACE", "float", 0, 10, backend=maya.backend())
+    engine.create_custom_attributes(controls, ["a"], "EMPTY", "float", 0, 1, backend=maya.backend())
+    return controls
+
+
+def findings(report, kind):
+    return {(finding.node.rpartition("|")[2], finding.attr) for finding in report if finding.kind == kind}
+
+
+def test_layout_findings(maya, rig):
+    maya.cmds.deleteAttr(f"{rig[0]}.a")
+    maya.cmds.addAttr(f"{rig[1]}.blink", edit=True, maxValue=5)
+    maya.cmds.addAttr(f"{rig[2]}.FACE", edit=True, enumName="xxxxx")
+
+    report = audit.audit_scene(schemas=[FACE], backend=maya.backend())
+
+    assert findings(report, audit.EMPTY_SEPARATOR) == {("ctrl_0", "EMPTY")}
+    assert findings(report, audit.SEPARATOR_ENUM) == {("ctrl_2", "FACE")}
+    assert findings(report, audit.SCHEMA_DRIFT) == {("ctrl_1", "blink")} | {(f"ctrl_{index}", "brow")
+                                                                         for index in range(6)}
+    assert findings(report, audit.SIBLING_DRIFT) == {("ctrl_0", None), ("ctrl_1", None), ("ctrl_2", None)}
+
+
+def test_sibling_missing_its_whole_layout_is_reported(maya, rig):
+    for attr in ("FACE", "blink", "smile", "EMPTY", "a"):
+        maya.cmds.deleteAttr(f"{rig[3]}.{attr}")
+
+    report = audit.audit_scene(backend=maya.backend())
+
+    assert findings(report, audit.SIBLING_DRIFT) == {("ctrl_3", None)}
+
+
+def test_plain_transforms_with_one_control_are_not_drift(maya):
+    maya.cmds.createNode("transform", name="geo")
+    meshes = maya.scene.populate(4, "mesh")
+    for node in meshes:
+        maya.cmds.parent(node, "geo")
+    maya.cmds.addAttr(meshes[0], longName="blink", attributeType="float")
+
+    assert not findings(audit.audit_scene(backend=maya.backend()), audit.SIBLING_DRIFT)
+
+
+def test_reports_are_written_as_json_and_csv(maya, rig, tmp_path):
+    report = audit.audit_scene(schemas=[FACE], backend=maya.backend())
+
+    report.write_json(str(tmp_path / "audit.json"))
+    report.write_csv(str(tmp_path / "audit.csv"))
+
+    with open(tmp_path / "audit.csv") as csv_file:
+        assert len(list(csv.reader(csv_file))) == len(report) + 1
+    with open(tmp_path / "audit.json") as json_file:
+        assert len(json.load(json_file)["findings"]) == len(report)
+    assert report.counts()[audit.SCHEMA_DRIFT] == len(rig)
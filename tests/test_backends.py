@@ -0,0 +1,70 @@
+"""
+Runs the attribute operations on both backends against the `fake_maya` stand-in.
+
+Run from the folder containing `crv_attrs`:
+
+    python -m pytest -q
+"""
+from crv_attrs import backends, engine, enums
+
+
+def add_face_attrs(maya, controls, attribute_type="float"):
+    return engine.create_custom_attributes(controls, ["blink", "smile"], "FACE", attribute_type, 0, 10,
+                                           backend=maya.backend())
+
+
+def test_add(maya, controls):
+    plan = add_face_attrs(maya, controls)
+
+    assert plan.counts()["add"] == 3 * len(controls)
+    for node in controls:
+        states = maya.states(node)
+        assert list(states) == ["FACE", "blink", "smile"]
+        assert states["FACE"].attr_type == "enum" and not states["FACE"].keyable
+        assert states["blink"].attr_type == "float"
+        assert (states["blink"].min_val, states["blink"].max_val) == (0, 10)
+
+
+def test_rerun_is_a_noop(maya, controls):
+    add_face_attrs(maya, controls)
+    maya.cmds.reset_calls()
+
+    plan = add_face_attrs(maya, controls)
+
+    assert not plan.pending()
+    assert not maya.cmds.calls.get("addAttr")
+    assert not maya.cmds.calls.get("deleteAttr")
+
+
+def test_retype_keeps_the_value(maya, controls):
+    add_face_attrs(maya, controls)
+    maya.cmds.setAttr(f"{controls[0]}.blink", 4.0)
+
+    plan = add_face_attrs(maya, controls, attribute_type="long")
+
+    assert {change.action for change in plan.pending()} == {"replace"}
+    assert maya.states(controls[0])["blink"].attr_type == "long"
+    assert maya.cmds.getAttr(f"{controls[0]}.blink") == 4
+    assert list(maya.states(controls[0])) == ["FACE", "blink", "smile"]
+
+
+def test_enum_edit_moves_the_value(maya, controls):
+    engine.create_custom_attributes(controls, ["low", "mid", "high"], "LOD", "enum", 0, 1, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.LOD", 2)
+
+    plan = enums.edit_enum_fields(controls, "LOD", enums.parse_edits("+ultra@0"), backend=maya.backend())
+
+    assert plan.counts()["edit_enum"] == len(controls)
+    for node in controls:
+        assert backends.same_enum_fields(maya.states(node)["LOD"].enum_names, "ultra:low:mid:high")
+    # "high" moved from index 2 to 3.
+    assert maya.cmds.getAttr(f"{controls[0]}.LOD") == 3
+
+
+def test_delete_all(maya, controls):
+    add_face_attrs(maya, controls)
+
+    plan = engine.delete_all_attrs(controls, backend=maya.backend())
+
+    assert plan.counts()["delete"] == 3 * len(controls)
+    assert all(not maya.states(node) for node in controls)
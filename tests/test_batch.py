@@ -0,0 +1,71 @@
+"""
+Batch mode over fake scene files, on a real process pool.
+"""
+import json
+import os
+
+import pytest
+
+from crv_attrs import batch, fake_maya, journal, schema
+
+FACE = schema.AttrSchema("face", "FACE", [{"name": "blink", "type": "float", "min": 0, "max": 10}])
+
+
+@pytest.fixture
+def scene_files(tmp_path):
+    paths = []
+    for index in range(3):
+        scene = fake_maya.FakeScene()
+        scene.populate(2, "ctrl")
+        scene.create_node("mesh", "ctrl_0Shape", parent="ctrl_0")
+        path = str(tmp_path / "rigs" / f"rig{index}.ma")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        scene.save(path)
+        paths.append(path)
+    return paths
+
+
+def read_attrs(path):
+    scene = fake_maya.FakeScene()
+    scene.load(path)
+    return {node.name: list(node.attrs) for node in scene.nodes.values() if node.attrs}
+
+
+def test_expand_files_keeps_only_scenes(tmp_path, scene_files):
+    (tmp_path / "rigs" / "notes.txt").write_text("")
+
+    assert batch.expand_files([str(tmp_path / "**" / "*"), scene_files[0]]) == sorted(scene_files)
+
+
+def test_schema_is_applied_to_every_file(scene_files):
+    report = batch.run_batch(scene_files, schema_data=FACE.to_dict(), object_patterns=["ctrl_*"],
+                             workers=2, fake=True, log=None)
+
+    assert report["summary"]["ok"] == 3 and report["summary"]["objects"] == 6
+    assert all(read_attrs(path) == {"ctrl_0": ["FACE", "blink"], "ctrl_1": ["FACE", "blink"]}
+               for path in scene_files)
+
+
+def test_failures_are_reported_per_file(scene_files):
+    broken = scene_files[0].replace("rig0", "missing")
+
+    report = batch.run_batch([broken] + scene_files[1:], schema_data=FACE.to_dict(), workers=1, fake=True,
+                             log=None)
+
+    assert [result["status"] for result in report["files"]] == ["failed", "ok", "ok"]
+    assert report["summary"]["failed"] == 1
+
+
+def test_resume_skips_the_completed_files(tmp_path, scene_files):
+    journal_path = str(tmp_path / "batch.jsonl")
+    batch.run_batch(scene_files[:2], operation=batch.DELETE_ALL, workers=1, fake=True, log=None,
+                    journal_path=journal_path)
+
+    report = batch.run_batch(scene_files, operation=batch.DELETE_ALL, workers=1, fake=True, log=None,
+                             journal_path=journal_path, resume=True)
+
+    assert report["resumed"] == scene_files[:2]
+    assert [result["file"] for result in report["files"]] == scene_files[2:]
+    batches = [item for item in journal.read_operations(journal_path) if item.name == "batch delete_all"]
+    assert [item.applied for item in batches] == [set(scene_files[:2]), set(scene_files[2:])]
+    json.dumps(report)
@@ -0,0 +1,53 @@
+"""
+Benchmark scenarios and the regression check between two result files.
+"""
+import json
+
+import pytest
+
+from crv_attrs import benchmark
+
+
+@pytest.mark.parametrize("path", benchmark.PATHS)
+def test_every_path_runs_and_counts_calls(path):
+    scenarios = benchmark.build_scenarios(objects=[2], attrs=[2], attribute_types=["float"], paths=[path])
+
+    results = benchmark.run_benchmarks(scenarios, measure_memory=False, log=None)
+
+    assert [result["key"] for result in results["results"]] == [f"{path}/cmds/float/2x2", f"{path}/om2/float/2x2"]
+    assert all(result["total_calls"] > 0 for result in results["results"])
+    json.dumps(results)
+
+
+def test_every_attribute_type_runs():
+    for scenario in benchmark.build_scenarios(objects=[2], attrs=[2], paths=["readd"]):
+        assert benchmark.run_scenario(scenario)["peak_memory"] > 0
+
+
+def test_undo_chunk_is_closed_when_the_operation_fails(monkeypatch):
+    scenario = benchmark.Scenario("add", "cmds", "float", 2, 1)
+    cmds, _, backend, objects = benchmark._build_scene(scenario)
+    operation = benchmark._operation(scenario, backend, objects)
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(benchmark.engine, "create_custom_attributes", fail)
+    with pytest.raises(RuntimeError):
+        operation()
+
+    assert cmds.scene.undo_depth == 0
+
+
+def test_compare_results_reports_slower_and_busier_scenarios():
+    baseline = {"results": [{"key": "a", "wall_time": 0.1, "total_calls": 10},
+                            {"key": "b", "wall_time": 0.1, "total_calls": 10},
+                            {"key": "c", "wall_time": 0.001, "total_calls": 10}]}
+    current = {"results": [{"key": "a", "wall_time": 0.3, "total_calls": 10},
+                           {"key": "b", "wall_time": 0.1, "total_calls": 12},
+                           {"key": "c", "wall_time": 0.004, "total_calls": 10},
+                           {"key": "new", "wall_time": 9.0, "total_calls": 99}]}
+
+    regressions = benchmark.compare_results(current, baseline)
+
+    assert [regression.split(":")[0] for regression in regressions] == ["a", "b"]
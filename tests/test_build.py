@@ -0,0 +1,70 @@
+"""
+Tool startup: what the dialog imports, and reusing it between launches.
+"""
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def maya_ui():
+    """
+    Runs the dialog against the `fake_maya` stand-in, parented to a plain widget.
+    """
+    import shiboken6
+    from PySide6 import QtWidgets
+    from crv_attrs import fake_maya
+
+    saved_modules = dict(sys.modules)
+    scene = fake_maya.install()
+    application = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    main_window = QtWidgets.QWidget()
+    open_maya_ui = types.ModuleType("maya.OpenMayaUI")
+    open_maya_ui.MQtUtil = types.SimpleNamespace(mainWindow=lambda: shiboken6.getCppPointer(main_window)[0])
+    sys.modules["maya.OpenMayaUI"] = open_maya_ui
+    sys.modules["maya"].OpenMayaUI = open_maya_ui
+
+    from crv_attrs import build
+    yield scene, build
+
+    build.crv_attrs_ui.close()
+    application.processEvents()
+    for name in set(sys.modules) - set(saved_modules):
+        del sys.modules[name]
+    sys.modules.update(saved_modules)
+
+
+def test_opening_the_dialog_skips_the_feature_modules():
+    script = ("import sys\n"
+              "from crv_attrs import fake_maya\n"
+              "fake_maya.install()\n"
+              "import crv_attrs.crv_attrs_ui\n"
+              "print(' '.join(sorted(name for name in sys.modules if name.startswith('crv_attrs.'))))\n")
+    output = subprocess.run([sys.executable, "-c", script], cwd=PACKAGE_ROOT, capture_output=True, text=True,
+                            check=True, env=dict(os.environ, QT_QPA_PLATFORM="offscreen")).stdout
+
+    loaded = set(output.split())
+    assert "crv_attrs.core" in loaded
+    assert not loaded & {f"crv_attrs.{name}" for name in ("engine", "inventory", "journal", "layout", "scheduler",
+                                                          "schema", "targeting", "wiring", "enums")}
+
+
+def test_launch_reuses_the_dialog(maya_ui):
+    _, build = maya_ui
+
+    dialog = build.launch(dev=False)
+    assert build.launch(dev=False) is dialog
+    assert build.crv_attrs_ui.STARTUP_TIMES["build"] == 0.0
+
+    rebuilt = build.launch(dev=True)
+    assert rebuilt is not dialog
+    assert set(build.crv_attrs_ui.STARTUP_TIMES) == {"import", "build", "show"}
+    assert "import" in build.crv_attrs_ui.startup_report()
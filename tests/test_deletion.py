@@ -0,0 +1,46 @@
+"""
+Selective deletion filters and the attributes they must skip.
+"""
+from crv_attrs import deletion, engine, schema
+
+
+def add_sections(maya, controls):
+    engine.create_custom_attributes(controls, ["a", "b"], "FACE", "float", 0, 1, backend=maya.backend())
+    engine.create_custom_attributes(controls, ["c", "d_old"], "BODY", "bool", 0, 1, backend=maya.backend())
+
+
+def test_section_filter_skips_locked_and_referenced_attributes(maya, controls):
+    add_sections(maya, controls)
+    maya.cmds.setAttr(f"{controls[1]}.a", lock=True)
+    maya.scene.referenced.add(controls[2])
+
+    plan = deletion.delete_attrs(controls, deletion.AttrFilter(section="FACE"), backend=maya.backend())
+
+    assert sorted(plan.skipped) == [(controls[1], "a", "locked"), (controls[2], "FACE", "referenced"),
+                                    (controls[2], "a", "referenced"), (controls[2], "b", "referenced")]
+    assert list(maya.states(controls[0])) == ["BODY", "c", "d_old"]
+    assert list(maya.states(controls[1])) == ["a", "BODY", "c", "d_old"]
+    assert "skipped: 1 locked, 3 referenced" in plan.report()
+
+
+def test_filters_combine(maya, controls):
+    add_sections(maya, controls)
+    kept = schema.AttrSchema("body", "BODY", [{"name": "c", "type": "bool"}])
+
+    plan = deletion.plan_deletion(controls, deletion.AttrFilter(patterns="*_old"), backend=maya.backend())
+    assert {change.attr for change in plan} == {"d_old"}
+
+    attr_filter = deletion.AttrFilter(not_in=kept, attr_types=["float", "bool"])
+    plan = deletion.plan_deletion(controls, attr_filter, backend=maya.backend())
+    assert {change.attr for change in plan} == {"a", "b", "d_old"}
+
+
+def test_dry_run_leaves_the_scene_untouched(maya, controls):
+    add_sections(maya, controls)
+    maya.cmds.reset_calls()
+
+    plan = deletion.delete_attrs(controls, backend=maya.backend(), dry_run=True)
+
+    assert len(plan) == 6 * len(controls)
+    assert not maya.cmds.calls.get("deleteAttr")
+    assert list(maya.states(controls[0])) == ["FACE", "a", "b", "BODY", "c", "d_old"]
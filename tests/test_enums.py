@@ -0,0 +1,79 @@
+"""
+Incremental enum field edits, and the values and keys they move.
+"""
+import pytest
+
+from crv_attrs import backends, engine, enums
+
+FIELDS = backends.parse_enum_string("a:b:c")
+
+
+def enum_fields(maya, node, attr="MODE"):
+    return backends.parse_enum_string(maya.cmds.attributeQuery(attr, node=node, listEnum=True)[0])
+
+
+@pytest.mark.parametrize("edits, fields, remap", [
+    ([enums.append("d")], [(0, "a"), (1, "b"), (2, "c"), (3, "d")], {}),
+    ([enums.insert("x", 1)], [(0, "a"), (1, "x"), (2, "b"), (3, "c")], {1: 2, 2: 3}),
+    ([enums.remove("b", "c"), enums.append("d"), enums.rename("a", "A")], [(0, "A"), (2, "c"), (3, "d")], {1: 2}),
+])
+def test_apply_edits(edits, fields, remap):
+    assert enums.apply_edits(FIELDS, edits) == (fields, remap)
+
+
+def test_insert_keeps_explicit_indices():
+    assert enums.apply_edits(backends.parse_enum_string("a=0:b=5"), [enums.insert("x", 1)]) == \
+        ([(0, "a"), (1, "x"), (5, "b")], {})
+
+
+@pytest.mark.parametrize("edits, reason", [
+    ([enums.append("a")], enums.DUPLICATE_FIELD),
+    ([enums.remove("z")], enums.UNKNOWN_FIELD),
+    ([enums.remove("a"), enums.remove("b"), enums.remove("c")], enums.LAST_FIELD),
+])
+def test_invalid_edits_are_rejected(edits, reason):
+    with pytest.raises(enums.EnumEditError) as raised:
+        enums.apply_edits(FIELDS, edits)
+    assert raised.value.reason == reason
+
+
+def test_parse_edits():
+    assert enums.parse_edits("+d, +x@1 -b>c a>A") == [enums.append("d"), enums.insert("x", 1),
+                                                     enums.remove("b", "c"), enums.rename("a", "A")]
+
+
+def test_edits_move_values_and_keys(maya, controls):
+    engine.create_custom_attributes(controls, ["ik", "fk", "blend"], "MODE", "enum", None, None,
+                                    backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.MODE", 2)
+    curve = maya.cmds.createNode("animCurveTU", name="modeCurve")
+    for time, value in ((1, 0), (5, 1), (9, 2)):
+        maya.cmds.setKeyframe(curve, time=time, value=value)
+    maya.cmds.connectAttr(f"{curve}.output", f"{controls[1]}.MODE")
+
+    plan = enums.edit_enum_fields(controls, "MODE", [enums.insert("x", 1), enums.remove("ik", "blend")],
+                                  backend=maya.backend())
+
+    assert enum_fields(maya, controls[0]) == [(1, "x"), (2, "fk"), (3, "blend")]
+    assert maya.cmds.getAttr(f"{controls[0]}.MODE") == 3
+    assert maya.cmds.keyframe(curve, query=True, valueChange=True) == [3, 2, 3]
+    assert plan.remapped
+
+
+def test_locked_enum_stays_locked(maya, controls):
+    engine.create_custom_attributes(controls, ["ik", "fk"], "MODE", "enum", None, None, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.MODE", lock=True)
+
+    enums.edit_enum_fields(controls, "MODE", [enums.append("blend")], backend=maya.backend())
+
+    assert enum_fields(maya, controls[0]) == [(0, "ik"), (1, "fk"), (2, "blend")]
+    assert maya.states(controls[0])["MODE"].locked
+    assert not maya.states(controls[1])["MODE"].locked
+
+
+def test_objects_without_the_field_are_skipped(maya, controls):
+    engine.create_custom_attributes(controls, ["ik", "fk"], "MODE", "enum", None, None, backend=maya.backend())
+
+    plan = enums.edit_enum_fields(controls + ["nope"], "MODE", [enums.remove("zzz")], backend=maya.backend())
+
+    assert not plan.changes and len(plan.skipped) == len(controls) + 1
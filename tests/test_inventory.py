@@ -0,0 +1,59 @@
+"""
+The scene attribute inventory and its incremental updates.
+"""
+from crv_attrs import engine, inventory
+
+
+def test_planning_sees_external_range_edits(maya, controls):
+    scene_inventory = inventory.AttrInventory(backend=maya.backend())
+    engine.create_custom_attributes(controls, ["blink"], "FACE", "float", 0, 10, backend=maya.backend(),
+                                    inventory=scene_inventory)
+    scene_inventory.refresh()
+    # Edited outside crv_attrs: Maya sends no callback for it.
+    maya.cmds.addAttr(f"{controls[0]}.blink", edit=True, maxValue=5)
+
+    plan = engine.create_custom_attributes(controls, ["blink"], "FACE", "float", 0, 10, backend=maya.backend(),
+                                           inventory=scene_inventory)
+
+    assert [(change.node, change.action) for change in plan.pending()] == [(controls[0], "edit_range")]
+    assert maya.states(controls[0])["blink"].max_val == 10
+
+
+def test_queries_follow_the_applied_plans(maya):
+    controls = maya.scene.populate(6, "ctrl")
+    engine.create_custom_attributes(controls[:4], ["a", "b"], "FACE", "float", 0, 1, backend=maya.backend())
+    scene_inventory = inventory.AttrInventory(backend=maya.backend())
+
+    assert len(scene_inventory.nodes_with_attr("a")) == 4
+    assert scene_inventory.separator_members("FACE")["|ctrl_0"] == ["a", "b"]
+
+    engine.create_custom_attributes(controls, ["a", "b", "c"], "FACE", "float", 0, 1, backend=maya.backend(),
+                                    inventory=scene_inventory)
+
+    assert sorted(scene_inventory.nodes_with_separator("FACE")) == [f"|{node}" for node in controls]
+    assert scene_inventory.separator_members("FACE")["|ctrl_5"] == ["a", "b", "c"]
+
+
+def test_only_nodes_marked_dirty_are_read_again(maya, controls):
+    engine.create_custom_attributes(controls, ["a"], "FACE", "float", 0, 1, backend=maya.backend())
+    scene_inventory = inventory.AttrInventory(backend=maya.backend())
+    scene_inventory.refresh()
+    maya.cmds.deleteAttr(controls[0], attribute="a")
+    maya.cmds.deleteAttr(controls[1], attribute="a")
+
+    scene_inventory.mark_dirty(maya.cmds.ls(controls[0], uuid=True)[0])
+
+    assert sorted(scene_inventory.nodes_with_attr("a")) == [f"|{node}" for node in controls[1:]]
+    scene_inventory.refresh(full=True)
+    assert scene_inventory.nodes_with_attr("a") == [f"|{controls[2]}"]
+
+
+def test_paused_inventory_ignores_dirty_marks(maya, controls):
+    scene_inventory = inventory.AttrInventory(backend=maya.backend())
+    scene_inventory.refresh()
+
+    with scene_inventory.paused():
+        engine.create_custom_attributes(controls, ["a"], "FACE", "float", 0, 1, backend=maya.backend())
+        scene_inventory.mark_dirty(maya.cmds.ls(controls, uuid=True))
+
+    assert not scene_inventory.nodes_with_attr("a")
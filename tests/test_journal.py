@@ -0,0 +1,97 @@
+"""
+Recording, resume and replay of operations through the journal.
+"""
+import pytest
+
+from crv_attrs import engine, journal, scheduler
+from conftest import FakeMaya
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+def test_replay_folds_child_edits_into_their_parent(maya, controls, journal_path):
+    with journal.recording(journal_path, "Add New", controls):
+        engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 10, backend=maya.backend())
+        engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 5, backend=maya.backend())
+        engine.create_custom_attributes(controls, ["pose", "w"], "P", "compound", 0, 5, backend=maya.backend())
+        engine.create_custom_attributes(controls, ["pose", "w"], "P", "compound", 0, 2, backend=maya.backend())
+
+    target = FakeMaya(maya.backend_name)
+    target.scene.populate(len(controls), "ctrl")
+    plan = journal.replay(journal_path, backend=target.backend())
+
+    assert {change.action for change in plan.pending()} == {"add"}
+    assert target.backend().query_user_attrs(controls) == maya.backend().query_user_attrs(controls)
+    assert not journal.replay(journal_path, backend=target.backend(), dry_run=True).pending()
+
+
+def test_replay_edits_children_of_existing_attributes(maya, controls, journal_path):
+    engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 10, backend=maya.backend())
+    with journal.recording(journal_path, "Add New", controls):
+        engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 5, backend=maya.backend())
+
+    target = FakeMaya(maya.backend_name)
+    target.scene.populate(len(controls), "ctrl")
+    engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 10, backend=target.backend())
+    plan = journal.replay(journal_path, backend=target.backend())
+
+    assert {change.attr for change in plan.pending()} == {"offX", "offY", "offZ"}
+    assert target.states(controls[0])["off"] == maya.states(controls[0])["off"]
+
+
+def run_interrupted(maya, controls, journal_path):
+    chunks = []
+
+    def add(chunk):
+        chunks.append(chunk)
+        if len(chunks) == 3:
+            raise RuntimeError("boom")
+        engine.create_custom_attributes(chunk, ["blink", "smile"], "FACE", "float", 0, 10, backend=maya.backend())
+
+    task = scheduler.ChunkedTask(controls, add, "Add New", cmds=maya.cmds, chunk_size=4, max_chunk_size=4)
+    with pytest.raises(RuntimeError):
+        with journal.recording(journal_path, "Add New", controls):
+            task.run()
+
+
+def test_failed_operation_resumes_on_the_objects_it_did_not_reach(maya, journal_path):
+    controls = maya.scene.populate(12, "ctrl")
+    run_interrupted(maya, controls, journal_path)
+    # A crash can cut the last line short.
+    with open(journal_path, "a") as journal_file:
+        journal_file.write('{"kind": "change", "oper')
+
+    operation = journal.last_interrupted(journal_path)
+
+    assert operation.status == journal.FAILED
+    assert journal.pending_objects(journal_path) == controls[8:]
+    assert journal.pending_objects(journal_path, operation=operation.id) == controls[8:]
+
+
+def test_replay_skips_missing_and_renamed_objects(maya, journal_path):
+    controls = maya.scene.populate(12, "ctrl")
+    run_interrupted(maya, controls, journal_path)
+    target = FakeMaya(maya.backend_name)
+    target.scene.populate(12, "ctrl")
+
+    plan = journal.replay(journal_path, backend=target.backend(), rename={controls[0]: "nope"})
+
+    assert ("nope", None, journal.MISSING) in plan.skipped
+    assert list(target.states(controls[1])) == ["FACE", "blink", "smile"]
+    assert not target.states(controls[0]) and not target.states(controls[8])
+
+
+def test_in_memory_journal_records_a_cancelled_operation(maya, controls):
+    engine.create_custom_attributes(controls, ["blink"], "FACE", "float", 0, 10, backend=maya.backend())
+    log = journal.Journal()
+
+    with journal.recording(log, "Delete All", controls[:2]) as recorder:
+        engine.delete_all_attrs(controls[:2], backend=maya.backend())
+        recorder.status = journal.CANCELLED
+
+    operation = journal.read_operations(log)[-1]
+    assert operation.status == journal.CANCELLED and operation.applied == set(controls[:2])
+    assert {change.action for change in operation.changes} == {"delete"}
@@ -0,0 +1,61 @@
+"""
+Layout transfer and name-rule mirroring between objects.
+"""
+from crv_attrs import engine, layout
+
+
+def add(maya, nodes, attrs, separator):
+    engine.create_custom_attributes(nodes, attrs, separator, "float", 0, 10, backend=maya.backend())
+
+
+def test_transfer_inserts_missing_attributes_in_place(maya, controls):
+    source, target = controls[:2]
+    add(maya, [source], ["x", "A", "B"], "SEP1")
+    add(maya, [source], ["C"], "SEP2")
+    add(maya, [target], ["A", "B"], "SEP1")
+    add(maya, [target], ["C"], "SEP2")
+    maya.cmds.setAttr(f"{target}.B", 4.0)
+
+    plan = layout.transfer_layout(layout.read_layout(source, backend=maya.backend()), [target],
+                                  backend=maya.backend(), values=False)
+
+    assert maya.cmds.listAttr(target, ud=True) == ["SEP1", "x", "A", "B", "SEP2", "C"]
+    assert [(change.action, change.attr) for change in plan.pending()][:2] == [("add", "x"), ("recreate", "A")]
+    assert maya.cmds.getAttr(f"{target}.B") == 4.0
+    assert not layout.transfer_layout(layout.read_layout(source, backend=maya.backend()), [target],
+                                      backend=maya.backend(), values=False, dry_run=True).pending()
+
+
+def test_mirror_rule():
+    rule = layout.MirrorRule.parse("L_*:R_*")
+
+    assert rule.apply("L_ctrl") == "R_ctrl" and rule.apply("ctrl") is None
+    assert rule.apply_path("|rig|L_arm|L_ctrl") == "|rig|R_arm|R_ctrl"
+    assert layout.MirrorRule("*_L", "*_R").apply("arm_L") == "arm_R"
+
+
+def test_mirror_renames_sided_attributes_and_copies_values(maya):
+    left = maya.scene.populate(4, "L_ctrl")
+    maya.scene.populate(3, "R_ctrl")
+    add(maya, left, ["L_blink", "smile"], "FACE")
+    engine.create_custom_attributes(left, ["off", "on"], "MODE", "enum", None, None, backend=maya.backend())
+    maya.cmds.setAttr("L_ctrl_1.smile", 4.0)
+    rule = layout.MirrorRule.parse("L_*:R_*")
+
+    plan = layout.mirror_layouts(left + ["unsided"], rule, backend=maya.backend(), values=True)
+
+    assert maya.cmds.listAttr("R_ctrl_1", ud=True) == ["FACE", "R_blink", "smile", "MODE"]
+    assert maya.cmds.getAttr("R_ctrl_1.smile") == 4.0
+    assert plan.skipped == [("R_ctrl_3", None, layout.MISSING)]
+    assert not layout.mirror_layouts(left[:3], rule, backend=maya.backend(), dry_run=True).pending()
+
+
+def test_exact_transfer_removes_extra_attributes(maya, controls):
+    source, target = controls[:2]
+    add(maya, [source], ["A", "B"], "SEP")
+    maya.cmds.addAttr(target, longName="extra", attributeType="float")
+
+    layout.transfer_layout(layout.read_layout(source, backend=maya.backend()), [target], backend=maya.backend(),
+                           exact=True, values=False)
+
+    assert maya.cmds.listAttr(target, ud=True) == ["SEP", "A", "B"]
@@ -0,0 +1,48 @@
+"""
+Diffing requested specs against the current attributes.
+"""
+from crv_attrs import backends, engine, planner
+
+
+def float_state(min_val=0, max_val=10):
+    return backends.AttrState(attr_type="float", min_val=min_val, max_val=max_val, keyable=True)
+
+
+def test_diff_attr_picks_the_smallest_change():
+    spec = planner.AttrSpec("blink", "float", min_val=0, max_val=10)
+
+    assert planner.diff_attr("ctrl1", spec).action == planner.ADD
+    assert planner.diff_attr("ctrl1", spec, float_state()).action == planner.NOOP
+    assert planner.diff_attr("ctrl1", spec, float_state(max_val=5)).action == planner.EDIT_RANGE
+    assert planner.diff_attr("ctrl1", spec._replace(attr_type="long"), float_state()).action == planner.REPLACE
+    assert planner.diff_attr("ctrl1", spec._replace(default_val=2), float_state()).action == planner.EDIT_DEFAULT
+
+
+def test_diff_attr_keeps_the_index_of_existing_enum_fields():
+    spec = planner.AttrSpec("LOD", "enum", enum_names="low:high:ultra", keyable=False, channel_box=True)
+    state = backends.AttrState(attr_type="enum", enum_names="low:mid:high", keyable=False, channel_box=True)
+
+    change = planner.diff_attr("ctrl1", spec, state)
+
+    assert change.action == planner.EDIT_ENUM
+    assert backends.parse_enum_string(change.spec.enum_names) == [(0, "low"), (2, "high"), (3, "ultra")]
+
+
+def test_build_specs_enum_mode_removes_the_field_attributes():
+    separator, specs, removed = planner.build_specs(["low", "high"], "LOD", "enum", 0, 1)
+
+    assert separator.enum_names == "low:high" and not specs
+    assert removed == ["low", "high"]
+
+
+def test_plan_only_touches_what_changed(maya, controls):
+    engine.create_custom_attributes(controls, ["blink", "smile"], "FACE", "float", 0, 10, backend=maya.backend())
+    maya.cmds.reset_calls()
+
+    plan = engine.create_custom_attributes(controls, ["blink", "smile", "frown"], "FACE", "float", 0, 10,
+                                           backend=maya.backend(), dry_run=True)
+
+    assert [(change.attr, change.action) for change in plan.pending()] == [("frown", "add")] * len(controls)
+    assert plan.counts()["noop"] == 3 * len(controls)
+    assert not maya.cmds.calls.get("addAttr")
+    assert "add: 3" in plan.report(verbose=True)
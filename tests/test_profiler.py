@@ -0,0 +1,40 @@
+"""
+Command counts, sections and timings collected by profiling sessions.
+"""
+from crv_attrs import backends, engine, profiler
+from conftest import FakeMaya
+
+
+def test_profiling_is_off_outside_a_session():
+    maya = FakeMaya("cmds")
+
+    assert profiler.active_profiler() is None
+    assert profiler.instrument(maya.cmds) is maya.cmds
+
+
+def test_session_counts_the_commands_per_target():
+    maya = FakeMaya("cmds")
+    controls = maya.scene.populate(2, "ctrl")
+
+    with profiler.profile("Add New") as session:
+        backend = backends.get_backend("cmds", cmds=maya.cmds)
+        engine.create_custom_attributes(controls, ["blink"], "FACE", "float", 0, 10, backend=backend)
+
+    report = session.report()
+    assert profiler.active_profiler() is None
+    assert report["name"] == "Add New"
+    assert report["commands"]["addAttr"]["count"] == maya.cmds.calls["addAttr"]
+    assert report["total_calls"] == sum(stats["count"] for stats in report["commands"].values())
+    assert f"{controls[0]}.blink" in report["targets"]
+    assert "cmds.query_user_attrs" in report["sections"]
+    assert session.format_report().startswith(":: Add New ::")
+
+
+def test_exclude_idle_moves_the_waiting_time_out_of_the_wall_time():
+    session = profiler.CommandProfiler("chunked")
+    session.wall_time = 2.0
+
+    session.exclude_idle(0.5)
+
+    assert (session.wall_time, session.idle_time) == (0.5, 1.5)
+    assert "(+1.500s idle)" in session.format_report()
@@ -0,0 +1,39 @@
+"""
+Channel-box reordering with the fewest re-created attributes.
+"""
+from crv_attrs import engine, planner
+
+
+def test_reorder_target_and_kept_prefix():
+    current = list("SabcTx")
+    target = planner.reorder_target(current, list("cab"))
+
+    assert target == list("ScabTx")
+    assert planner.kept_prefix_length(current, target) == 2
+    assert planner.kept_prefix_length(current, current) == len(current)
+
+
+def test_only_the_attributes_after_the_kept_prefix_are_recreated(maya, controls):
+    engine.create_custom_attributes(controls, ["a", "b", "c"], "S", "float", 0, 10, backend=maya.backend())
+    engine.create_custom_attributes(controls, ["x"], "T", "bool", 0, 1, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.b", 3.0)
+    maya.cmds.setAttr(f"{controls[0]}.b", lock=True)
+
+    plan = engine.reorder_attrs(controls, ["a", "c", "b"], backend=maya.backend())
+
+    assert [change.attr for change in plan.pending() if change.node == controls[0]] == ["b", "T", "x"]
+    assert list(maya.states(controls[0])) == ["S", "a", "c", "b", "T", "x"]
+    assert maya.cmds.getAttr(f"{controls[0]}.b") == 3.0
+    assert maya.states(controls[0])["b"].locked
+    assert not engine.reorder_attrs(controls, ["a", "c", "b"], backend=maya.backend()).pending()
+
+
+def test_referenced_objects_are_skipped(maya, controls):
+    engine.create_custom_attributes(controls, ["a", "b"], "S", "float", 0, 10, backend=maya.backend())
+    maya.scene.referenced.add(controls[2])
+
+    plan = engine.reorder_attrs(controls, ["b", "a"], backend=maya.backend())
+
+    assert plan.skipped == [(controls[2], None, "referenced")]
+    assert list(maya.states(controls[2])) == ["S", "a", "b"]
+    assert list(maya.states(controls[0])) == ["S", "b", "a"]
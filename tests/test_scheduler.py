@@ -0,0 +1,56 @@
+"""
+Chunked, cancellable tasks and their single undo step.
+"""
+import pytest
+
+from crv_attrs import engine, scheduler
+
+
+def test_task_runs_every_object_in_one_undo_chunk(maya):
+    controls = maya.scene.populate(60, "ctrl")
+    chunks = []
+
+    def add(chunk):
+        chunks.append(len(chunk))
+        engine.create_custom_attributes(chunk, ["blink"], "FACE", "float", 0, 10, backend=maya.backend())
+
+    task = scheduler.ChunkedTask(controls, add, "Add New", cmds=maya.cmds, chunk_size=7, max_chunk_size=20).run()
+
+    assert task.finished and task.progress == 1.0 and task.eta == 0
+    assert sum(chunks) == len(controls) and chunks[0] == 7 and max(chunks) <= 20
+    assert maya.scene.undo_chunks == ["Add New"] and maya.scene.undo_depth == 0
+    assert all("blink" in maya.states(node) for node in controls)
+
+
+def test_cancel_stops_before_the_next_chunk(maya):
+    controls = maya.scene.populate(10, "ctrl")
+    task = scheduler.ChunkedTask(controls, lambda chunk: None, cmds=maya.cmds, chunk_size=2, max_chunk_size=2)
+
+    assert task.step()
+    task.cancel()
+
+    assert not task.step()
+    assert task.done == 2 and task.cancelled and task.finished
+    assert maya.scene.undo_depth == 0
+
+
+def test_error_closes_the_undo_chunk(maya):
+    controls = maya.scene.populate(4, "ctrl")
+
+    def fail(chunk):
+        raise RuntimeError("boom")
+
+    task = scheduler.ChunkedTask(controls, fail, cmds=maya.cmds)
+    with pytest.raises(RuntimeError):
+        task.run()
+
+    assert isinstance(task.error, RuntimeError) and task.finished
+    assert maya.scene.undo_depth == 0
+    assert not task.step()
+
+
+def test_empty_task_opens_no_undo_chunk(maya):
+    task = scheduler.ChunkedTask([], lambda chunk: None, cmds=maya.cmds).run()
+
+    assert task.finished and task.progress == 1.0
+    assert not maya.scene.undo_chunks
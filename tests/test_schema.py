@@ -0,0 +1,63 @@
+"""
+Schema compilation, its cache and the preset library on disk.
+"""
+import pytest
+
+from crv_attrs import schema
+
+FACE = [{"name": "blink", "type": "float", "min": 0, "max": 10},
+        {"name": "mode", "type": "enum", "enum": "off:on"},
+        {"name": "offset", "type": "vector", "default": [0, 1, 0]}]
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.setenv(schema.SCHEMA_DIR_ENV, str(tmp_path))
+    schema.clear_cache()
+    yield str(tmp_path)
+    schema.clear_cache()
+
+
+def test_compiled_specs_are_shared_but_keep_their_own_name(library):
+    first = schema.compile_schema(schema.AttrSchema("face", "FACE", FACE))
+    second = schema.compile_schema(schema.AttrSchema("head", "FACE", FACE, version=3))
+
+    assert second.attr_specs is first.attr_specs
+    assert (second.name, second.version) == ("head", 3)
+    assert [spec.attr_type for spec in first.attr_specs] == ["float", "enum", "double3"]
+
+
+@pytest.mark.parametrize("attributes, message", [
+    ([{"name": "1a", "type": "float"}], "invalid name"),
+    ([{"name": "a", "type": "matrix"}], "unsupported type"),
+    ([{"name": "a", "type": "enum"}], "enum fields"),
+    ([{"name": "a", "type": "float", "min": 2, "max": 1}], "greater than max"),
+    ([{"name": "a", "type": "float"}, {"name": "a", "type": "bool"}], "Duplicate"),
+    ([{"name": "FACE", "type": "float"}], "separator"),
+])
+def test_invalid_schemas_are_rejected(library, attributes, message):
+    with pytest.raises(schema.SchemaError, match=message):
+        schema.compile_schema(schema.AttrSchema("bad", "FACE", attributes))
+
+
+def test_saving_a_changed_layout_bumps_the_version(library):
+    face = schema.AttrSchema("face", "FACE", FACE)
+    schema.save_schema(face)
+    schema.save_schema(face)
+    assert schema.load_schema("face").version == 1
+
+    face.attributes = FACE[:1]
+    schema.save_schema(face)
+
+    assert schema.list_schemas() == ["face"]
+    assert schema.load_schema("face").version == 2
+
+
+def test_apply_schema_matches_the_fields_it_was_built_from(library, maya, controls):
+    preset = schema.AttrSchema.from_fields("face", ["blink", "smile"], "FACE", "float", 0, 10)
+
+    schema.apply_schema(controls, preset, backend=maya.backend())
+    plan = schema.apply_schema(controls, preset, backend=maya.backend())
+
+    assert not plan.pending()
+    assert list(maya.states(controls[0])) == ["FACE", "blink", "smile"]
@@ -0,0 +1,110 @@
+"""
+The UUID-backed selection model behind the objects field.
+"""
+import types
+
+from crv_attrs import selection
+
+
+class FakeEvents:
+    """
+    `MEventMessage` stand-in firing the registered callbacks by hand, and a
+    manual clock and timer queue for the debounce.
+    """
+
+    def __init__(self):
+        self.callbacks = {}
+        self.removed = []
+        self.now = 0.0
+        self.queue = []
+        self.om = types.SimpleNamespace(
+            MEventMessage=types.SimpleNamespace(addEventCallback=self.add_callback),
+            MMessage=types.SimpleNamespace(removeCallbacks=self.removed.extend))
+
+    def add_callback(self, event, callback):
+        self.callbacks[event] = callback
+        return event
+
+    def fire(self, event):
+        self.callbacks[event]()
+
+    def schedule(self, seconds, callback):
+        self.queue.append((self.now + seconds, callback))
+
+    def run_timers(self):
+        while self.queue:
+            due, callback = self.queue.pop(0)
+            self.now = max(self.now, due)
+            callback()
+
+
+def test_model_follows_renames_and_deletions(maya, controls):
+    model = selection.SelectionModel(cmds=maya.cmds)
+    model.set_names(controls + controls[:1])
+
+    maya.cmds.rename(controls[0], "head_ctrl")
+    maya.cmds.delete(controls[1])
+
+    assert len(model) == len(controls)
+    assert model.names() == ["head_ctrl", controls[2]]
+    assert model.summary() == "3 objects"
+
+
+def test_model_reads_the_scene_selection(maya, controls):
+    maya.cmds.createNode("mesh", name="shape1")
+    maya.cmds.select(controls[1], "shape1", controls[0])
+    model = selection.SelectionModel(cmds=maya.cmds)
+
+    model.set_from_selection()
+
+    assert model.names() == [controls[1], controls[0]]
+
+
+def test_update_uuids_reports_the_difference(maya, controls):
+    model = selection.SelectionModel(cmds=maya.cmds)
+    model.set_names(controls[:2])
+    uuids = maya.cmds.ls(controls, uuid=True)
+
+    assert model.update_uuids(uuids[1:]) == ([uuids[2]], [uuids[0]])
+    assert model.update_uuids(uuids[1:]) == ([], [])
+
+    model.clear()
+    assert not model and model.summary() == "" and model.names() == []
+
+
+def test_live_selection_reads_once_after_the_events_settle(maya):
+    nodes = maya.scene.populate(500, "ctrl")
+    events = FakeEvents()
+    changes = []
+    model = selection.SelectionModel(cmds=maya.cmds)
+    live = selection.LiveSelection(model, schedule=events.schedule, clock=lambda: events.now,
+                                   on_selection=lambda added, removed: changes.append((len(added), len(removed))))
+    assert live.start(events.om) and live.active
+    maya.cmds.reset_calls()
+
+    # A drag selection: one event per step, closer together than the debounce.
+    for count in range(50, 550, 50):
+        maya.cmds.select(nodes[:count])
+        events.fire(live.SELECTION_EVENT)
+        events.now += 0.01
+    assert len(events.queue) == 1
+
+    events.run_timers()
+
+    assert maya.cmds.calls["ls"] == 1
+    assert changes == [(500, 0)] and len(model) == 500
+
+
+def test_live_selection_reports_channel_box_changes_and_stops(maya, controls):
+    events = FakeEvents()
+    channel_box = []
+    model = selection.SelectionModel(cmds=maya.cmds)
+    live = selection.LiveSelection(model, on_channel_box=lambda: channel_box.append(True))
+    live.start(events.om)
+
+    events.fire(live.CHANNEL_BOX_EVENT)
+    live.stop()
+
+    assert channel_box == [True, True]
+    assert events.removed == [live.SELECTION_EVENT, live.CHANNEL_BOX_EVENT] and not live.active
+    assert not selection.LiveSelection(model).start(types.SimpleNamespace())
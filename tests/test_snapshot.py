@@ -0,0 +1,116 @@
+"""
+Values, connections and keys carried over when attributes are re-created.
+"""
+import pytest
+
+from crv_attrs import engine, planner, snapshot
+
+
+def add_layout(maya, controls):
+    engine.create_custom_attributes(controls, ["A"], "S", "float", 0, 10, backend=maya.backend())
+    engine.create_custom_attributes(controls, ["off"], "S", "double3", 0, 10, backend=maya.backend())
+    engine.create_custom_attributes(controls, ["B", "w"], "S", "compound", 0, 10, backend=maya.backend())
+
+
+def inputs(maya, plug):
+    return maya.cmds.listConnections(plug, source=True, destination=False, plugs=True)
+
+
+def outputs(maya, plug):
+    return maya.cmds.listConnections(plug, source=False, destination=True, plugs=True)
+
+
+def connect_children(maya, node):
+    curve = maya.cmds.createNode("animCurveTU", name="curve1")
+    maya.cmds.setKeyframe(curve, time=1, value=3.0)
+    maya.cmds.connectAttr(f"{curve}.output", f"{node}.offX")
+    maya.cmds.connectAttr(f"{curve}.output", f"{node}.w")
+    driven = maya.cmds.createNode("transform", name="driven")
+    maya.cmds.addAttr(driven, longName="o", attributeType="double")
+    maya.cmds.connectAttr(f"{node}.offY", f"{driven}.o")
+
+
+def test_retype_keeps_value_and_connections(maya, controls):
+    engine.create_custom_attributes(controls, ["A"], "S", "float", 0, 10, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.A", 7.6)
+    curve = maya.cmds.createNode("animCurveTU", name="curve1")
+    maya.cmds.connectAttr(f"{curve}.output", f"{controls[1]}.A")
+
+    plan = engine.create_custom_attributes(controls, ["A"], "S", "long", 0, 10, backend=maya.backend())
+
+    assert maya.states(controls[0])["A"].attr_type == "long"
+    assert maya.cmds.getAttr(f"{controls[0]}.A") == 8
+    assert inputs(maya, f"{controls[1]}.A") == ["curve1.output"]
+    assert not plan.snapshots.issues
+
+
+def test_reorder_keeps_child_keys_and_connections(maya, controls):
+    add_layout(maya, controls)
+    connect_children(maya, controls[0])
+
+    plan = engine.reorder_attrs(controls, ["B", "w", "A", "off"], backend=maya.backend())
+
+    assert list(maya.states(controls[0])) == ["S", "B", "A", "off"]
+    assert inputs(maya, f"{controls[0]}.offX") == ["curve1.output"]
+    assert outputs(maya, f"{controls[0]}.offY") == ["driven.o"]
+    assert inputs(maya, f"{controls[0]}.w") == ["curve1.output"]
+    assert not plan.snapshots.issues
+
+
+def test_recreated_compound_keeps_child_connections(maya, controls):
+    add_layout(maya, controls)
+    connect_children(maya, controls[0])
+
+    plan = engine.reorder_attrs(controls, ["off", "A", "B"], backend=maya.backend())
+
+    assert "B" in {change.attr for change in plan.pending()}
+    assert inputs(maya, f"{controls[0]}.w") == ["curve1.output"]
+
+
+def test_lost_child_connections_are_reported(maya, controls):
+    add_layout(maya, controls)
+    connect_children(maya, controls[0])
+
+    plan = engine.create_custom_attributes(controls, ["off"], "S", "float", 0, 10, backend=maya.backend())
+
+    issues = dict(plan.snapshots.issues)
+    assert "curve1.output" in issues[f"{controls[0]}.offX"]
+    assert "driven.o" in issues[f"{controls[0]}.offY"]
+
+
+@pytest.mark.parametrize("value, attr_type, spec, expected", [
+    (7.6, "float", planner.AttrSpec("a", "long"), (8, None)),
+    (0.4, "float", planner.AttrSpec("a", "bool"), (True, None)),
+    (12.0, "float", planner.AttrSpec("a", "float", max_val=10), (10, "12.0 clamped to the maximum 10")),
+    (2, "long", planner.AttrSpec("a", "enum", enum_names="off:on"), (None, "2 is not a field of the enum 'off:on'")),
+    ("x", "string", planner.AttrSpec("a", "float"), (None, "cannot convert string 'x' to float")),
+])
+def test_convert_value(value, attr_type, spec, expected):
+    assert snapshot.convert_value(value, attr_type, spec) == expected
+
+
+def test_retype_keeps_lock_and_channel_box_state(maya, controls):
+    engine.create_custom_attributes(controls, ["a", "b"], "S", "bool", 0, 1, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.a", True)
+    maya.cmds.setAttr(f"{controls[0]}.a", lock=True)
+    maya.cmds.setAttr(f"{controls[0]}.b", keyable=False)
+    maya.cmds.setAttr(f"{controls[0]}.b", channelBox=True)
+
+    plan = engine.create_custom_attributes(controls, ["a", "b"], "S", "float", 0, 0.5, backend=maya.backend())
+
+    states = maya.states(controls[0])
+    assert states["a"].attr_type == "float" and states["a"].locked
+    assert maya.cmds.getAttr(f"{controls[0]}.a") == 0.5
+    assert not states["b"].keyable and states["b"].channel_box
+    assert [plug for plug, _ in plan.snapshots.issues] == [f"{controls[0]}.a"]
+
+
+def test_preserve_off_drops_the_data(maya, controls):
+    engine.create_custom_attributes(controls, ["a"], "S", "float", 0, 10, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[0]}.a", 4.0)
+
+    plan = engine.create_custom_attributes(controls, ["a"], "S", "long", 0, 10, backend=maya.backend(),
+                                           preserve=False)
+
+    assert not plan.snapshots
+    assert maya.cmds.getAttr(f"{controls[0]}.a") == 0
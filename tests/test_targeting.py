@@ -0,0 +1,65 @@
+"""
+Targeting rules and the scene index they are resolved against.
+"""
+import pytest
+
+from crv_attrs import targeting
+from conftest import FakeMaya
+
+
+@pytest.fixture
+def rig():
+    maya = FakeMaya("cmds")
+    maya.scene.create_node("transform", "rig")
+    for index in range(3):
+        maya.scene.create_node("transform", f"arm{index}_ctrl", "rig")
+        maya.scene.create_node("nurbsCurve", f"arm{index}_ctrlShape", f"arm{index}_ctrl")
+    maya.scene.create_node("transform", "loc_ctrl")
+    maya.scene.create_node("locator", "loc_ctrlShape", "loc_ctrl")
+    maya.scene.create_node("joint", "j1", "rig")
+    maya.cmds.sets("arm0_ctrl", "loc_ctrl", name="face_set")
+    return maya
+
+
+def resolve(index, text):
+    return index.resolve(targeting.parse_rules(text))
+
+
+def test_rules_combine_their_criteria(rig):
+    index = targeting.SceneIndex(rig.cmds)
+
+    assert resolve(index, "name:*_ctrl shape:nurbsCurve") == ["|rig|arm0_ctrl", "|rig|arm1_ctrl", "|rig|arm2_ctrl"]
+    assert resolve(index, "under:rig type:joint; set:face_set") == ["|rig|arm0_ctrl", "|loc_ctrl", "|rig|j1"]
+    assert resolve(index, "regex:^arm[12]") == ["|rig|arm1_ctrl", "|rig|arm2_ctrl"]
+
+
+def test_resolving_again_reads_nothing(rig):
+    index = targeting.SceneIndex(rig.cmds)
+    resolve(index, "name:*_ctrl")
+    rig.cmds.reset_calls()
+
+    resolve(index, "name:*_ctrl shape:locator")
+
+    assert not rig.cmds.calls
+
+
+def test_only_marked_nodes_are_read_again(rig):
+    index = targeting.SceneIndex(rig.cmds)
+    resolve(index, "name:*_ctrl")
+    leg = rig.scene.create_node("transform", "leg_ctrl", "rig")
+    shape = rig.scene.create_node("nurbsCurve", "leg_ctrlShape", "leg_ctrl")
+    rig.cmds.rename("rig", "rig_grp")
+    removed = rig.scene.nodes["arm1_ctrl"].uuid
+    rig.cmds.delete("arm1_ctrl")
+
+    index.mark_dirty([leg.uuid, shape.uuid, rig.scene.nodes["rig_grp"].uuid])
+    index.mark_removed([removed])
+
+    assert resolve(index, "shape:nurbsCurve under:rig_grp") == ["|rig_grp|arm0_ctrl", "|rig_grp|arm2_ctrl",
+                                                                "|rig_grp|leg_ctrl"]
+
+
+@pytest.mark.parametrize("text", ["foo:bar", "name:", "regex:(", "name"])
+def test_invalid_rules_are_rejected(text):
+    with pytest.raises(ValueError):
+        targeting.parse_rules(text)
@@ -0,0 +1,54 @@
+"""
+Extended attribute types: long, string, vector, compound and multi.
+"""
+from crv_attrs import engine, planner
+
+SEPARATOR = planner.AttrSpec("SEP", "enum", enum_names="=======", keyable=False, channel_box=True)
+SPECS = [planner.AttrSpec("count", "long", min_val=0, max_val=10, default_val=3, soft_min=1, soft_max=5),
+         planner.AttrSpec("label", "string", default_val='he said "hi"'),
+         planner.AttrSpec("offset", "double3", min_val=-1, max_val=1, default_val=(0.1, 0.2, 0.3)),
+         planner.AttrSpec("pose", "compound", children=(planner.AttrSpec("w", "float", default_val=0.5),
+                                                       planner.AttrSpec("on", "bool"))),
+         planner.AttrSpec("weights", "float", multi=True)]
+
+
+def test_compound_children_take_the_range(maya, controls):
+    engine.create_custom_attributes(controls, ["pose", "weight", "blend"], "POSE", "compound", 0, 10,
+                                    backend=maya.backend())
+
+    children = dict(maya.states(controls[0])["pose"].children)
+    assert list(children) == ["weight", "blend"]
+    assert all((state.min_val, state.max_val) == (0, 10) for state in children.values())
+
+    plan = engine.create_custom_attributes(controls, ["pose", "weight", "blend"], "POSE", "compound", 0, 5,
+                                           backend=maya.backend())
+    assert {change.action for change in plan.pending()} == {"edit_range"}
+    children = dict(maya.states(controls[0])["pose"].children)
+    assert all(state.max_val == 5 for state in children.values())
+
+
+def test_every_type_is_created_once(maya, controls):
+    engine.apply_specs(controls, SEPARATOR, SPECS, backend=maya.backend())
+
+    states = maya.states(controls[0])
+    assert list(states) == ["SEP", "count", "label", "offset", "pose", "weights"]
+    assert (states["count"].soft_min, states["count"].soft_max, states["count"].default_val) == (1, 5, 3)
+    assert [child for child, _ in states["offset"].children] == ["offsetX", "offsetY", "offsetZ"]
+    assert states["weights"].multi
+    assert maya.cmds.getAttr(f"{controls[0]}.label") == 'he said "hi"'
+    assert maya.cmds.getAttr(f"{controls[0]}.offset") == [(0.1, 0.2, 0.3)]
+    assert not engine.apply_specs(controls, SEPARATOR, SPECS, backend=maya.backend(), dry_run=True).pending()
+
+
+def test_vector_ranges_and_soft_limits_are_edited_in_place(maya, controls):
+    engine.apply_specs(controls, SEPARATOR, SPECS, backend=maya.backend())
+    specs = list(SPECS)
+    specs[0] = SPECS[0]._replace(soft_max=None, default_val=4)
+    specs[2] = SPECS[2]._replace(max_val=2)
+
+    plan = engine.apply_specs(controls, SEPARATOR, specs, backend=maya.backend())
+
+    assert {change.action for change in plan.pending()} == {"edit_range"}
+    states = maya.states(controls[1])
+    assert states["count"].soft_max is None and states["count"].default_val == 4
+    assert all(child.max_val == 2 for _, child in states["offset"].children)
@@ -0,0 +1,53 @@
+"""
+Upfront validation of requests, before any scene edit.
+"""
+import pytest
+
+from crv_attrs import engine, planner, validation
+
+
+def validate(maya, objects, names, separator, attribute_type, min_val=0, max_val=1, **kwargs):
+    separator_spec, attr_specs, removed_attrs = planner.build_specs(names, separator, attribute_type,
+                                                                   min_val, max_val)
+    return validation.validate_specs(objects, separator_spec, attr_specs, removed_attrs,
+                                     backend=maya.backend(), **kwargs)
+
+
+def errors(report):
+    return {(conflict.node, conflict.attr) for conflict in report.errors()}
+
+
+def test_request_and_object_conflicts(maya, controls):
+    engine.create_custom_attributes(controls[:2], ["a", "b"], "SEP", "float", 0, 1, backend=maya.backend())
+
+    report = validate(maya, controls + ["nope"], ["a", "translateX", "bad name", "a"], "SEP", "bool")
+
+    assert not report.ok
+    assert errors(report) == {(None, "bad name"), (None, "a"), ("nope", None),
+                              *((node, "translateX") for node in controls)}
+    assert {conflict.node for conflict in report.warnings()} == set(controls[:2])
+
+
+def test_invalid_ranges_are_errors(maya, controls):
+    assert errors(validate(maya, controls, ["x"], "SEP", "float", 5, 1)) == {(None, "x")}
+
+
+def test_locked_attributes_block_deletion_and_unpreserved_retype(maya, controls):
+    engine.create_custom_attributes(controls, ["a", "b"], "SEP", "float", 0, 1, backend=maya.backend())
+    maya.cmds.setAttr(f"{controls[1]}.a", lock=True)
+
+    assert errors(validate(maya, controls, ["a", "b"], "SEP", "enum")) == {(controls[1], "a")}
+    assert errors(validate(maya, controls, ["a"], "SEP", "long", preserve=False)) == {(controls[1], "a")}
+    assert validate(maya, controls, ["a"], "SEP", "long").ok
+
+
+def test_errors_stop_the_operation_before_any_edit(maya, controls):
+    engine.create_custom_attributes(controls, ["a"], "SEP", "float", 0, 1, backend=maya.backend())
+    maya.cmds.reset_calls()
+
+    with pytest.raises(validation.ValidationError) as raised:
+        engine.create_custom_attributes(controls + ["nope"], ["a"], "SEP", "bool", 0, 1, backend=maya.backend())
+
+    assert not raised.value.report.ok
+    assert not maya.cmds.calls.get("addAttr") and not maya.cmds.calls.get("deleteAttr")
+    assert maya.states(controls[0])["a"].attr_type == "float"
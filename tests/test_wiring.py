@@ -0,0 +1,81 @@
+"""
+Bulk driver-to-driven wiring and the converter nodes in between.
+"""
+import pytest
+
+from crv_attrs import engine, schema, wiring
+
+
+@pytest.fixture
+def blend_shape(maya, controls):
+    engine.create_custom_attributes(controls, ["blink", "smile"], "FACE", "float", 0, 10, backend=maya.backend())
+    node = maya.cmds.createNode("transform", name="face_BS")
+    for control in controls:
+        for attr in ("blink", "smile"):
+            maya.cmds.addAttr(node, longName=f"{control}_{attr}", attributeType="float")
+    return node
+
+
+def source(maya, plug):
+    return maya.cmds.listConnections(plug, source=True, destination=False, plugs=True)
+
+
+def test_wire_connects_every_mapped_attribute_once(maya, controls, blend_shape):
+    connections = wiring.map_by_pattern(controls, "face_BS.{node}_{attr}", backend=maya.backend())
+
+    extra = [("nope.x", f"face_BS.{controls[0]}_smile"), (f"{controls[1]}.blink", f"face_BS.{controls[0]}_blink")]
+    plan = wiring.plan_wiring(connections + extra, backend=maya.backend())
+    assert plan.counts()["connect"] == 2 * len(controls)
+    assert {reason for _, reason in plan.skipped} == {wiring.MISSING_SOURCE, wiring.DUPLICATE}
+
+    wiring.apply_wiring(plan, backend=maya.backend())
+    assert source(maya, f"face_BS.{controls[1]}_smile") == [f"{controls[1]}.smile"]
+    assert not wiring.plan_wiring(connections, backend=maya.backend()).pending()
+
+
+def test_map_from_schema_needs_no_scene_read(controls):
+    face = schema.AttrSchema("face", "FACE", [{"name": "blink", "type": "float"}])
+
+    connections = wiring.map_from_schema(controls[:2], face, "face_BS.{section}_{node}_{attr}")
+
+    assert connections == [wiring.Connection(f"{node}.blink", f"face_BS.FACE_{node}_blink", None, ())
+                           for node in controls[:2]]
+
+
+def test_converter_settings_are_updated_in_place(maya, controls, blend_shape):
+    connections = [wiring.Connection(f"{node}.blink", f"face_BS.{node}_blink", "remapValue", (0, 10, 0, 1))
+                   for node in controls]
+    plan = wiring.wire(connections, backend=maya.backend())
+    assert len(plan.converter_nodes()) == len(controls)
+
+    plan = wiring.wire([connection._replace(settings=(0, 5, 0, 1)) for connection in connections],
+                       backend=maya.backend())
+
+    assert plan.counts()["update"] == len(controls)
+    assert maya.cmds.getAttr(f"{plan.changes[0].converter_node}.inputMax") == 5
+
+
+def test_replaced_converters_are_deleted_unless_still_used(maya, controls, blend_shape):
+    destination = f"face_BS.{controls[0]}_blink"
+    wiring.wire([wiring.Connection(f"{controls[0]}.blink", destination, "remapValue", (0, 1, 0, 2))],
+                backend=maya.backend())
+    converter = source(maya, destination)[0].partition(".")[0]
+
+    plan = wiring.wire([(f"{controls[0]}.smile", destination)], backend=maya.backend())
+    assert plan.removed_nodes() == [converter] and not maya.cmds.objExists(converter)
+
+    wiring.wire([wiring.Connection(f"{controls[0]}.blink", destination, "remapValue", (0, 1, 0, 2))],
+                backend=maya.backend())
+    converter = source(maya, destination)[0].partition(".")[0]
+    maya.cmds.connectAttr(f"{converter}.outValue", f"face_BS.{controls[0]}_smile")
+    plan = wiring.wire([(f"{controls[1]}.blink", destination)], backend=maya.backend())
+    assert not plan.removed_nodes() and maya.cmds.objExists(converter)
+
+
+def test_connected_destinations_are_kept_without_replace(maya, controls, blend_shape):
+    wiring.wire([(f"{controls[0]}.blink", f"face_BS.{controls[0]}_blink")], backend=maya.backend())
+
+    plan = wiring.plan_wiring([(f"{controls[1]}.blink", f"face_BS.{controls[0]}_blink")], backend=maya.backend(),
+                              replace=False)
+
+    assert [reason for _, reason in plan.skipped] == [wiring.CONNECTED]